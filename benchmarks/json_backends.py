@@ -0,0 +1,123 @@
+"""
+Benchmarks the JSON backends (see terraform_manager.utilities.json_backend) against response bodies
+captured from the mock Terraform API (see tests/utilities/mock_terraform_api.py): a full page of
+workspaces as fetched by fetch_all, a workspace's variables, and a workspace's runs as polled by the
+run watcher, as well as the request bodies sent by batch_operation and configure_variables. Only
+the backends which are installed are benchmarked. Run from the root of the repository:
+
+    python -m benchmarks.json_backends
+    python -m benchmarks.json_backends --iterations 5000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+import requests  # noqa: E402
+from tabulate import tabulate  # noqa: E402
+from terraform_manager.entities.variable import Variable  # noqa: E402
+from terraform_manager.utilities import json_backend  # noqa: E402
+
+from tests.utilities.mock_terraform_api import MockTerraformApi, generate_organization  # noqa: E402
+
+_organization: str = "benchmark"
+
+
+def capture_payloads() -> Dict[str, bytes]:
+    """
+    :return: Response bodies captured from the mock Terraform API, keyed by a description.
+    """
+
+    organization = generate_organization(_organization, 100, runs_per_workspace=20)
+    workspace_id = organization["workspaces"][0]["id"]
+    with MockTerraformApi(organization) as api:
+        base_url = f"http://{api.domain}/api/v2"
+        headers = {"Authorization": "Bearer benchmark"}
+
+        def capture(path: str) -> bytes:
+            return requests.get(f"{base_url}{path}", headers=headers).content
+
+        workspaces_path = f"/organizations/{_organization}/workspaces?page[size]=100"
+        return {
+            "workspace page (100 workspaces)": capture(workspaces_path),
+            "variables (1 workspace)": capture(f"/workspaces/{workspace_id}/vars"),
+            "runs (1 workspace)": capture(f"/workspaces/{workspace_id}/runs")
+        }
+
+
+def _request_bodies() -> Dict[str, object]:
+    variable = Variable(key="key", value="value").to_json()
+    # yapf: disable
+    return {
+        "batch_operation body": {
+            "data": {"type": "workspaces", "attributes": {"auto-apply": True}}
+        },
+        "configure_variables body": {"data": {"type": "vars", "attributes": variable}}
+    }
+    # yapf: enable
+
+
+def run_benchmarks(iterations: int) -> List[List[object]]:
+    """
+    :return: One row per payload per installed backend: the payload, the backend, the operation,
+             the mean number of microseconds per operation, and the speedup relative to the
+             standard library.
+    """
+
+    # The standard library is benchmarked first so that the speedups can be computed
+    backends = []
+    for backend in sorted(json_backend.BACKENDS, key=lambda name: name != "json"):
+        try:
+            __import__(backend)
+            backends.append(backend)
+        except ImportError:
+            pass
+
+    rows = []
+    try:
+        payloads = capture_payloads()
+        documents = {name: json_backend.loads(payload) for name, payload in payloads.items()}
+        documents.update(_request_bodies())
+        for name, document in documents.items():
+            timings = {}
+            for backend in backends:
+                json_backend.use_backend(backend)
+                if name in payloads:
+                    operation = "decode"
+                    payload = payloads[name]
+                    seconds = timeit.timeit(lambda: json_backend.loads(payload), number=iterations)
+                else:
+                    operation = "encode"
+                    seconds = timeit.timeit(lambda: json_backend.dumps(document), number=iterations)
+                timings[backend] = seconds / iterations * 1000000
+                rows.append([
+                    name,
+                    backend,
+                    operation,
+                    round(timings[backend], 2),
+                    round(timings["json"] / timings[backend], 2)
+                ])
+    finally:
+        json_backend.use_backend(None)
+    return rows
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks the JSON backends.")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parsed = parser.parse_args(arguments)
+
+    print(
+        tabulate(
+            run_benchmarks(parsed.iterations),
+            headers=["Payload", "Backend", "Operation", "Microseconds", "Speedup"]
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
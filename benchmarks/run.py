@@ -0,0 +1,256 @@
+"""
+End-to-end benchmarks for terraform-manager's operations. Each operation is executed against a mock
+Terraform API (see tests/utilities/mock_terraform_api.py) serving synthetic organizations of various
+sizes, and the number of requests issued, wall time, CPU time, and peak memory are reported.
+
+The mock API runs in a separate process so that its own CPU time and memory allocations are not
+attributed to terraform-manager. Run from the root of the repository:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 100 1000 --json results.json
+    python -m benchmarks.run --compare results.json  # Exits with 1 if any benchmark regressed
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from tabulate import tabulate  # noqa: E402
+from terraform_manager.entities.variable import Variable  # noqa: E402
+from terraform_manager.entities.workspace import Workspace  # noqa: E402
+from terraform_manager.terraform import locking, runs, variables, workspaces  # noqa: E402
+from terraform_manager.utilities import throttle  # noqa: E402
+
+from tests.utilities.mock_terraform_api import MockTerraformApi, generate_organization  # noqa: E402
+
+_organization: str = "benchmark"
+_token: str = "benchmark"
+_default_sizes: List[int] = [100, 1000, 10000]
+
+# Benchmark results are compared on these metrics (wall time is not compared because it depends too
+# much on the machine), and an increase is only considered a regression if it exceeds both the
+# tolerance and the metric's noise floor
+_noise_floors: Dict[str, float] = {"requests": 0, "cpu_seconds": 0.25, "peak_memory_kib": 64}
+
+
+def _serve(connection: Any, workspace_count: int) -> None:
+    # Runs in a child process and answers commands sent by the benchmark process
+    with MockTerraformApi(generate_organization(_organization, workspace_count)) as api:
+        connection.send(api.domain)
+        while True:
+            command = connection.recv()
+            if command == "count":
+                connection.send(api.request_count)
+            elif command == "reset":
+                # Organizations are generated deterministically, so this restores the initial state
+                api.add_organization(generate_organization(_organization, workspace_count))
+                connection.send(None)
+            elif command == "stop":
+                break
+
+
+class _MockApiProcess:
+    def __init__(self, workspace_count: int):
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(child_connection, workspace_count), daemon=True
+        )
+
+    def __enter__(self) -> "_MockApiProcess":
+        self._process.start()
+        self.domain = self._connection.recv()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._connection.send("stop")
+        self._process.join()
+
+    @property
+    def request_count(self) -> int:
+        self._connection.send("count")
+        return self._connection.recv()
+
+    def reset(self) -> None:
+        self._connection.send("reset")
+        self._connection.recv()
+
+
+def _thread_time() -> float:
+    # time.thread_time does not exist in Python 3.6
+    return time.thread_time() if hasattr(time, "thread_time") else time.process_time()
+
+
+def _measure(
+    api: _MockApiProcess, operation: Callable[[List[Workspace]], Any], targets: List[Workspace]
+) -> Dict[str, Any]:
+    # Tracing memory allocations slows Python down considerably, so the operation is executed once
+    # for timing and once more for memory. Operations change both the mock API's state and the
+    # targeted workspaces (see update_from_response), so both are restored before each execution to
+    # make both executions do the same work
+    api.reset()
+    fresh_targets = copy.deepcopy(targets)
+    requests_before = api.request_count
+    wall_start, cpu_start = time.perf_counter(), _thread_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        operation(fresh_targets)
+    wall, cpu = time.perf_counter() - wall_start, _thread_time() - cpu_start
+    request_count = api.request_count - requests_before
+
+    api.reset()
+    fresh_targets = copy.deepcopy(targets)
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        operation(fresh_targets)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "requests": request_count,
+        "wall_seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "peak_memory_kib": round(peak / 1024, 1)
+    }
+
+
+def _operations(domain: str) -> Dict[str, Callable[[List[Workspace]], Any]]:
+    common = {"no_tls": True, "token": _token, "write_output": True}
+
+    def fetch_all(targets: List[Workspace]) -> None:
+        workspaces.fetch_all(domain, _organization, no_tls=True, token=_token)
+
+    def write_summary(targets: List[Workspace]) -> None:
+        workspaces.write_summary(
+            domain, _organization, targets, targeting_specific_workspaces=False, write_output=True
+        )
+
+    def batch_operation(targets: List[Workspace]) -> None:
+        workspaces.batch_operation(
+            domain,
+            _organization,
+            targets,
+            field_mappers=[lambda w: w.auto_apply],
+            field_names=["auto-apply"],
+            new_values=[True],
+            **common
+        )
+
+    def lock_or_unlock_workspaces(targets: List[Workspace]) -> None:
+        locking.lock_or_unlock_workspaces(domain, _organization, targets, set_lock=True, **common)
+
+    def configure_variables(targets: List[Workspace]) -> None:
+        configured = [Variable(key="variable0", value="updated"), Variable(key="new", value="new")]
+        variables.configure_variables(
+            domain, _organization, targets, variables=configured, **common
+        )
+
+    def delete_variables(targets: List[Workspace]) -> None:
+        variables.delete_variables(
+            domain, _organization, targets, variables=["variable2"], **common
+        )
+
+    def run_watcher_poll(targets: List[Workspace]) -> None:
+        # This mirrors a single refresh of the run watcher's run generator
+        for workspace in targets:
+            runs._get_active_runs_for_workspace(domain, workspace, no_tls=True, token=_token)
+
+    return {
+        operation.__name__: operation
+        for operation in [
+            fetch_all, write_summary, batch_operation, lock_or_unlock_workspaces,
+            configure_variables, delete_variables, run_watcher_poll
+        ]
+    }
+
+
+def run_benchmarks(sizes: List[int], *, throttled: bool = False) -> List[Dict[str, Any]]:
+    """
+    Runs every benchmark against synthetic organizations of the given sizes.
+
+    :param sizes: The numbers of workspaces in the synthetic organizations.
+    :param throttled: Whether to enforce the Terraform API rate limit. By default, the rate limit is
+                      lifted so that the benchmarks measure terraform-manager itself.
+    :return: One result dictionary per operation per size.
+    """
+
+    if not throttled:
+        throttle.set_rate_limit(1000000)
+
+    results = []
+    try:
+        for size in sizes:
+            with _MockApiProcess(size) as api:
+                targets = workspaces.fetch_all(api.domain, _organization, no_tls=True, token=_token)
+                for name, operation in _operations(api.domain).items():
+                    measurements = _measure(api, operation, targets)
+                    results.append({"operation": name, "workspaces": size, **measurements})
+    finally:
+        throttle.set_rate_limit(None)
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            tolerance: float) -> List[str]:
+    """
+    :return: A description of each metric that increased by more than the tolerance (a fraction)
+             relative to the baseline.
+    """
+
+    indexed = {(b["operation"], b["workspaces"]): b for b in baseline}
+    regressions = []
+    for result in results:
+        before = indexed.get((result["operation"], result["workspaces"]))
+        if before is None:
+            continue
+        for metric, noise_floor in _noise_floors.items():
+            increase = result[metric] - before[metric]
+            if increase > before[metric] * tolerance and increase > noise_floor:
+                regressions.append((
+                    f"{result['operation']} ({result['workspaces']} workspaces): {metric} went "
+                    f"from {before[metric]} to {result[metric]}"
+                ))
+    return regressions
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks terraform-manager's operations.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=_default_sizes)
+    parser.add_argument("--throttled", action="store_true", help="Enforce the API rate limit.")
+    parser.add_argument("--json", type=str, metavar="FILE", help="Write the results to FILE.")
+    parser.add_argument(
+        "--compare",
+        type=str,
+        metavar="FILE",
+        help="Compare the results to a previous --json FILE."
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parsed = parser.parse_args(arguments)
+
+    results = run_benchmarks(parsed.sizes, throttled=parsed.throttled)
+    print(tabulate([list(result.values()) for result in results], headers=list(results[0].keys())))
+
+    if parsed.json is not None:
+        with open(parsed.json, "w") as file:
+            json.dump(results, file, indent=2)
+    if parsed.compare is not None:
+        with open(parsed.compare, "r") as file:
+            regressions = compare(results, json.load(file), parsed.tolerance)
+        print()
+        if len(regressions) > 0:
+            print(os.linesep.join(["Regressions:"] + regressions), file=sys.stderr)
+            sys.exit(1)
+        else:
+            print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,18 @@
-from pkg_resources import get_distribution, DistributionNotFound
+try:
+    # importlib.metadata is much faster to import than pkg_resources, which matters because this
+    # module is imported on every CLI invocation (it is only available on Python 3.8+)
+    from importlib.metadata import version as _get_version, PackageNotFoundError
+except ImportError:  # pragma: no cover
+    from pkg_resources import get_distribution, DistributionNotFound as PackageNotFoundError
+
+    def _get_version(distribution_name: str) -> str:
+        return get_distribution(distribution_name).version
+
 
 try:
     dist_name = __name__
-    __version__ = get_distribution(dist_name).version
-except DistributionNotFound:
+    __version__ = _get_version(dist_name)
+except PackageNotFoundError:
     __version__ = "unknown"
 finally:
-    del get_distribution, DistributionNotFound
+    del _get_version, PackageNotFoundError
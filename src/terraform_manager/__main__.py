@@ -1,10 +1,36 @@
 import sys
-from argparse import ArgumentParser, Namespace
-from typing import List, Optional, Dict, Any
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from typing import List, Optional, Dict, Any, Tuple, Union, TYPE_CHECKING
 
 from terraform_manager import cli_handlers
-from terraform_manager.entities.terraform import Terraform
-from terraform_manager.terraform import CLOUD_DOMAIN
+
+if TYPE_CHECKING:  # pragma: no cover
+    from terraform_manager.entities.terraform import Terraform
+    from terraform_manager.entities.terraform_fleet import TerraformFleet
+
+# Note: in order to keep the CLI responsive, this module and cli_handlers must not import any
+# third-party modules (directly or transitively) at module level; import them where they are used
+
+
+def _positive_number(value: str) -> float:
+    try:
+        number = float(value)
+    except ValueError:
+        raise ArgumentTypeError(f"{value} is not a number")
+    if number <= 0:
+        raise ArgumentTypeError(f"{value} is not a positive number")
+    return number
+
+
+def _shard(value: str) -> Tuple[int, int]:
+    try:
+        index, count = [int(part) for part in value.split("/")]
+    except ValueError:
+        raise ArgumentTypeError(f"{value} is not of the form INDEX/COUNT")
+    if not 1 <= index <= count:
+        raise ArgumentTypeError(f"{value} does not have an INDEX between 1 and COUNT")
+    return index, count
+
 
 _parser: ArgumentParser = ArgumentParser(
     description="Manages Terraform workspaces in batch fashion."
@@ -18,8 +44,14 @@ _selection_group.add_argument(
     "--organization",
     type=str,
     metavar="ORGANIZATION",
+    nargs="+",
     dest="organization",
-    help="The name of the organization to target within your Terraform installation (see --domain)."
+    help=(
+        "The name of the organization to target within your Terraform installation (see --domain). "
+        "Multiple organizations may be specified, in which case the operation is applied to all of "
+        "them. An organization in a different installation can be specified as "
+        '"DOMAIN/ORGANIZATION".'
+    )
 )
 _selection_group.add_argument(
     "--domain",  # We do not alias this with "-d" to avoid confusion around "-d" meaning "delete"
@@ -61,6 +93,93 @@ _selection_group.add_argument(
     dest="blacklist",
     help="Inverts the workspace selection criteria (see --workspaces)."
 )
+_selection_group.add_argument(
+    "--query",
+    type=str,
+    metavar="EXPRESSION",
+    dest="query",
+    help=(
+        "Only targets the workspaces matching the given expression, which compares fields (id, "
+        "name, terraform_version, execution_mode, agent_pool_id, working_directory, locked, "
+        "auto_apply, speculative) to values using =, !=, <, <=, > or >=, combined with and, or, "
+        'not and parentheses (e.g. "terraform_version < 1.0 and execution_mode = agent"). If the '
+        "--inventory file contains the organization, no requests are made to select workspaces."
+    )
+)
+_selection_group.add_argument(
+    "--inventory",
+    type=str,
+    metavar="FILE",
+    dest="inventory",
+    help=(
+        "Stores the workspaces fetched from the Terraform API in the given SQLite database, and "
+        "selects workspaces from it instead of fetching them when --query is used. Use it without "
+        "--query (e.g. with --summary) to refresh it."
+    )
+)
+_selection_group.add_argument(
+    "--where-version",
+    type=str,
+    metavar="VERSION",
+    nargs="+",
+    dest="where_version",
+    help=(
+        'Only targets the workspaces using any of the given Terraform versions (or "latest"). Use '
+        "--query to select a range of versions."
+    )
+)
+_selection_group.add_argument(
+    "--where-execution-mode",
+    type=str,
+    metavar="MODE",
+    nargs="+",
+    dest="where_execution_mode",
+    help="Only targets the workspaces using any of the given execution modes."
+)
+_selection_group.add_argument(
+    "--where-agent-pool",
+    type=str,
+    metavar="ID",
+    nargs="+",
+    dest="where_agent_pool",
+    help="Only targets the workspaces using any of the agent pools with the given IDs."
+)
+_where_locked_group = _selection_group.add_mutually_exclusive_group(required=False)
+_where_locked_group.add_argument(
+    "--where-locked",
+    action="store_true",
+    dest="where_locked",
+    help="Only targets the workspaces which are locked."
+)
+_where_locked_group.add_argument(
+    "--where-unlocked",
+    action="store_true",
+    dest="where_unlocked",
+    help="Only targets the workspaces which are unlocked."
+)
+_selection_group.add_argument(
+    "--where-tag",
+    type=str,
+    metavar="TAG",
+    nargs="+",
+    dest="where_tag",
+    help=(
+        "Only targets the workspaces having all of the given tags. The tags are matched by the "
+        "Terraform API, so fewer workspaces have to be fetched."
+    )
+)
+_selection_group.add_argument(
+    "--shard",
+    type=_shard,
+    metavar="INDEX/COUNT",
+    dest="shard",
+    help=(
+        "Only targets the selected workspaces in the given shard (e.g. 2/4 for the second of "
+        "four), so that COUNT processes (such as the jobs of a CI matrix) can each handle one "
+        "shard of the same selection. Workspaces are assigned to shards by a hash of their IDs, "
+        "and each process uses 1/COUNT of the rate limit so that together they stay within it."
+    )
+)
 _selection_group.add_argument(
     "-s",
     "--silent",
@@ -71,6 +190,124 @@ _selection_group.add_argument(
         "all (potentially helpful) error messages."
     )
 )
+_selection_group.add_argument(
+    "--metrics-port",
+    type=int,
+    metavar="PORT",
+    dest="metrics_port",
+    help=(
+        "Only applicable with --watch-runs. Instead of launching a TUI, serves metrics about run "
+        "activity in the OpenMetrics (Prometheus) format at http://HOST:PORT/metrics."
+    )
+)
+_selection_group.add_argument(
+    "--metrics-host",
+    type=str,
+    metavar="HOST",
+    dest="metrics_host",
+    help=(
+        "Only applicable with --metrics-port. The network interface on which to serve the metrics. "
+        "Defaults to 127.0.0.1 (i.e. the metrics are only reachable from the same machine); "
+        "specify 0.0.0.0 to allow remote scraping."
+    )
+)
+_selection_group.add_argument(
+    "--record",
+    type=str,
+    metavar="FILE",
+    dest="record",
+    help=(
+        "Records every Terraform API response received during the operation into the given "
+        "(compressed) file so that the operation can be replayed later (see --replay)."
+    )
+)
+_selection_group.add_argument(
+    "--replay",
+    type=str,
+    metavar="FILE",
+    dest="replay",
+    help=(
+        "Serves Terraform API responses from a file created by --record instead of contacting the "
+        "Terraform API. Operations which modify workspaces will NOT modify anything when replayed."
+    )
+)
+_selection_group.add_argument(
+    "--plan",
+    action="store_true",
+    dest="plan",
+    help=(
+        "Computes the Terraform API requests the operation would send without modifying anything, "
+        "and reports them along with an estimate of how long sending them would take under the "
+        "rate limit."
+    )
+)
+_selection_group.add_argument(
+    "--connect-timeout",
+    type=_positive_number,
+    metavar="SECONDS",
+    dest="connect_timeout",
+    help=(
+        "The number of seconds to wait for a connection to the Terraform API to be established "
+        "(defaults to 10)."
+    )
+)
+_selection_group.add_argument(
+    "--read-timeout",
+    type=_positive_number,
+    metavar="SECONDS",
+    dest="read_timeout",
+    help=(
+        "The number of seconds to wait for the Terraform API to send data before a request is "
+        "considered failed (defaults to 60)."
+    )
+)
+_selection_group.add_argument(
+    "--hedge",
+    action="store_true",
+    dest="hedge",
+    help=(
+        "Sends a duplicate of any read request which is slower than 95%% of the previous requests "
+        "to the same endpoint and uses whichever response arrives first. This shortens the "
+        "operation at the cost of a few extra requests (at most 10%%, within the rate limit)."
+    )
+)
+_selection_group.add_argument(
+    "--journal",
+    type=str,
+    metavar="FILE",
+    dest="journal",
+    help=(
+        "Records which workspaces the operation (workspace setting, variable configuration, or "
+        "variable deletion) has been completed for in the given file, so that it can be resumed "
+        "with --resume if it is interrupted."
+    )
+)
+_selection_group.add_argument(
+    "--resume",
+    action="store_true",
+    dest="resume",
+    help=(
+        "Resumes the operation recorded in the --journal file: workspaces the operation has "
+        "already been completed for are skipped, and failed workspaces are retried (up to 3 "
+        "attempts)."
+    )
+)
+_selection_group.add_argument(
+    "--stats",
+    action="store_true",
+    dest="stats",
+    help=(
+        "Writes statistics about the Terraform API requests made by the operation (per endpoint) "
+        "to STDOUT once the operation finishes."
+    )
+)
+_selection_group.add_argument(
+    "--stats-file",
+    type=str,
+    metavar="FILE",
+    dest="stats_file",
+    help="Writes the statistics described in --stats to the given file in JSON format."
+)
 
 _operation_group.add_argument(
     "--summary",
@@ -78,6 +315,12 @@ _operation_group.add_argument(
     dest="summary",
     help="Writes a summary of the workspaces' information in tabulated format to STDOUT."
 )
+_operation_group.add_argument(
+    "--version-report",
+    action="store_true",
+    dest="version_report",
+    help="Writes the number of workspaces using each Terraform version to STDOUT."
+)
 _operation_group.add_argument(
     "--watch-runs",
     action="store_true",
@@ -87,17 +330,6 @@ _operation_group.add_argument(
         "organization."
     )
 )
-_operation_group.add_argument(
-    "--terraform-version",
-    type=str,
-    metavar="VERSION",
-    dest="terraform_version",
-    help=(
-        "Sets the workspaces' Terraform versions to the value provided. This can only be used to "
-        "upgrade versions; downgrading is not supported due to limitations in Terraform itself. "
-        "The program will stop you if the version you specify would cause a downgrade."
-    )
-)
 _operation_group.add_argument(
     "--lock",
     "--lock-workspaces",
@@ -113,19 +345,61 @@ _operation_group.add_argument(
     help="Unlocks the workspaces."
 )
 _operation_group.add_argument(
+    "--configure-vars",
+    type=str,
+    metavar="FILE",
+    dest="configure_variables",
+    help=(
+        "Creates/updates the variables specified in the given file in the workspaces. See also "
+        "--create-vars-template."
+    )
+)
+_operation_group.add_argument(
+    "--delete-vars",
+    type=str,
+    metavar="KEY",
+    nargs="+",
+    dest="delete_variables",
+    help="Deletes the variables specified by-key in the workspaces."
+)
+_operation_group.add_argument(
+    "--apply-state",
+    type=str,
+    metavar="FILE",
+    dest="apply_state",
+    help=(
+        "Reconciles the workspaces with the desired settings, lock states, and variables declared "
+        "in the given JSON (or YAML) file, only sending the differences to the Terraform API."
+    )
+)
+
+# The flags which change workspace settings are not part of the operation group because several of
+# them may be combined (in which case all the settings are patched with one request per workspace)
+_selection_group.add_argument(
+    "--terraform-version",
+    type=str,
+    metavar="VERSION",
+    dest="terraform_version",
+    help=(
+        "Sets the workspaces' Terraform versions to the value provided. This can only be used to "
+        "upgrade versions; downgrading is not supported due to limitations in Terraform itself. "
+        "The program will stop you if the version you specify would cause a downgrade."
+    )
+)
+_selection_group.add_argument(
     "--working-dir",
     type=str,
     metavar="DIRECTORY",
     dest="working_directory",
     help="Sets the workspaces' working directories to the value provided."
 )
-_operation_group.add_argument(
+_selection_group.add_argument(
     "--clear-working-dir",
     action="store_true",
     dest="clear_working_directory",
     help="Clears the workspaces' working directories."
 )
-_operation_group.add_argument(
+_selection_group.add_argument(
     "--execution-mode",
     type=str,
     metavar="MODE",
@@ -136,48 +410,30 @@ _operation_group.add_argument(
         'a comma followed by the agent-pool-id as in "--execution-mode agent,apool-BjTA7mVFm5WHTc3"'
     )
 )
-_operation_group.add_argument(
+_selection_group.add_argument(
     "--enable-auto-apply",
     action="store_true",
     dest="enable_auto_apply",
     help="Enables auto-apply on the workspaces."
 )
-_operation_group.add_argument(
+_selection_group.add_argument(
     "--disable-auto-apply",
     action="store_true",
     dest="disable_auto_apply",
     help="Disables auto-apply on the workspaces."
 )
-_operation_group.add_argument(
+_selection_group.add_argument(
     "--enable-speculative",
     action="store_true",
     dest="enable_speculative",
     help="Enables speculative runs on the workspaces."
 )
-_operation_group.add_argument(
+_selection_group.add_argument(
     "--disable-speculative",
     action="store_true",
     dest="disable_speculative",
     help="Disables speculative runs on the workspaces."
 )
-_operation_group.add_argument(
-    "--configure-vars",
-    type=str,
-    metavar="FILE",
-    dest="configure_variables",
-    help=(
-        "Creates/updates the variables specified in the given file in the workspaces. See also "
-        "--create-vars-template."
-    )
-)
-_operation_group.add_argument(
-    "--delete-vars",
-    type=str,
-    metavar="KEY",
-    nargs="+",
-    dest="delete_variables",
-    help="Deletes the variables specified by-key in the workspaces."
-)
 
 _special_group.add_argument(
     "--create-vars-template",
@@ -225,11 +481,20 @@ def _get_selection_argument(arguments: List[str]) -> Optional[str]:  # pragma: n
         "--organization",
         "--domain",
         "--no-tls",
-        "--no-ssl"
+        "--no-ssl",
         "-w",
         "--workspaces",
         "-b",
-        "--blacklist"
+        "--blacklist",
+        "--query",
+        "--inventory",
+        "--where-version",
+        "--where-execution-mode",
+        "--where-agent-pool",
+        "--where-locked",
+        "--where-unlocked",
+        "--where-tag",
+        "--shard"
     ]
     for flag in flags:
         if flag in arguments:
@@ -245,37 +510,227 @@ def _get_special_argument(arguments: List[str]) -> Optional[str]:  # pragma: no
     return None
 
 
+def _get_settings(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    # Maps the workspace settings flags that were specified to the arguments of
+    # cli_handlers.update_settings
+    settings = {}
+    if arguments.get("terraform_version") is not None:
+        settings["terraform_version"] = arguments["terraform_version"]
+    if arguments.get("working_directory") is not None or arguments["clear_working_directory"]:
+        settings["working_directory"] = arguments.get("working_directory") or ""
+    if arguments.get("execution_mode") is not None:
+        settings["execution_mode"] = arguments["execution_mode"]
+    if arguments["enable_auto_apply"] or arguments["disable_auto_apply"]:
+        settings["auto_apply"] = arguments["enable_auto_apply"]
+    if arguments["enable_speculative"] or arguments["disable_speculative"]:
+        settings["speculative"] = arguments["enable_speculative"]
+    return settings
+
+
+def _get_conflicting_settings(arguments: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    conflicts = [
+        ("working_directory", "clear_working_directory", "--working-dir", "--clear-working-dir"),
+        ("enable_auto_apply", "disable_auto_apply", "--enable-auto-apply", "--disable-auto-apply"),
+        (
+            "enable_speculative",
+            "disable_speculative",
+            "--enable-speculative",
+            "--disable-speculative"
+        )
+    ]
+    for first, second, first_flag, second_flag in conflicts:
+        if arguments.get(first) not in [None, False] and arguments.get(second) not in [None, False]:
+            return first_flag, second_flag
+    return None
+
+
+def _has_other_operation(arguments: Dict[str, Any]) -> bool:
+    operations = [
+        "summary",
+        "version_report",
+        "watch_runs",
+        "lock_workspaces",
+        "unlock_workspaces",
+        "configure_variables",
+        "delete_variables",
+        "apply_state"
+    ]
+    return any([arguments.get(operation) not in [None, False] for operation in operations])
+
+
+def _get_argument_error(arguments: Dict[str, Any]) -> Optional[str]:
+    # Checks the combinations of arguments which argparse cannot express, so that invalid ones are
+    # rejected before any workspaces are fetched
+    conflicting_settings = _get_conflicting_settings(arguments)
+    if conflicting_settings is not None:
+        first_flag, second_flag = conflicting_settings
+        return f"You cannot specify {first_flag} at the same time as {second_flag}."
+    elif len(_get_settings(arguments)) > 0 and _has_other_operation(arguments):
+        return "The flags which change workspace settings cannot be combined with other operations."
+    elif arguments.get("metrics_port") is not None and not arguments["watch_runs"]:
+        return "The --metrics-port flag can only be used with --watch-runs."
+    elif arguments.get("metrics_host") is not None and arguments.get("metrics_port") is None:
+        return "The --metrics-host flag can only be used with --metrics-port."
+    elif arguments["watch_runs"] and len(arguments["organization"]) > 1:
+        return "The run watcher can only target a single organization."
+    return None
+
+
 def _no_selection_arguments_main(arguments: Dict[str, Any]) -> None:
     if arguments["create_variables_template"]:
         cli_handlers.create_variables_template(arguments["silent"])
 
 
+def _parse_target(target: str, default_domain: str) -> Tuple[str, str]:
+    if "/" in target:
+        domain, organization = target.split("/", 1)
+        return domain.lower(), organization
+    else:
+        return default_domain, target
+
+
 def _organization_required_main(arguments: Dict[str, Any]) -> None:
-    organization: str = arguments["organization"]
+    from terraform_manager.entities.terraform import Terraform
+    from terraform_manager.entities.terraform_fleet import TerraformFleet
+    from terraform_manager.entities.workspace_filter import WorkspaceFilter
+    from terraform_manager.terraform import CLOUD_DOMAIN
+
     if arguments.get("domain") is None:
         domain: str = CLOUD_DOMAIN
     else:
         domain: str = arguments["domain"].lower()
+    targets = [_parse_target(target, domain) for target in arguments["organization"]]
     workspaces_to_target: Optional[List[str]] = arguments.get("workspaces")
     blacklist: bool = arguments["blacklist"]
+    query: Optional[str] = arguments.get("query")
+    shard: Optional[Tuple[int, int]] = arguments.get("shard")
+    where_locked: Optional[bool] = None
+    if arguments["where_locked"] or arguments["where_unlocked"]:
+        where_locked = arguments["where_locked"]
+    where = WorkspaceFilter(
+        versions=arguments.get("where_version"),
+        execution_modes=arguments.get("where_execution_mode"),
+        agent_pool_ids=arguments.get("where_agent_pool"),
+        locked=where_locked,
+        tags=arguments.get("where_tag")
+    )
     no_tls: bool = arguments["no_tls"]
     silent: bool = _is_silenced(parsed_arguments=arguments)
 
-    terraform: Terraform = Terraform(
-        domain,
-        organization,
-        workspace_names=workspaces_to_target,
-        blacklist=blacklist,
-        no_tls=no_tls,
-        token=None,  # We disallow specifying a token inline at the CLI for security reasons
-        write_output=(not silent)
-    )
-    if not terraform.configuration_is_valid() or not cli_handlers.validate(terraform):
+    argument_error = _get_argument_error(arguments)
+    if argument_error is not None:
+        if silent:
+            _parser_fail()
+        else:
+            _parser.error(argument_error)
+        return
+
+    if len(targets) == 1:
+        terraform: Union[Terraform, TerraformFleet] = Terraform(
+            targets[0][0],
+            targets[0][1],
+            workspace_names=workspaces_to_target,
+            blacklist=blacklist,
+            query=query,
+            where=where,
+            shard=shard,
+            no_tls=no_tls,
+            token=None,  # We disallow specifying a token inline at the CLI for security reasons
+            write_output=(not silent)
+        )
+    else:
+        terraform: Union[Terraform, TerraformFleet] = TerraformFleet(
+            targets,
+            workspace_names=workspaces_to_target,
+            blacklist=blacklist,
+            query=query,
+            where=where,
+            shard=shard,
+            no_tls=no_tls,
+            tokens=None,  # We disallow specifying a token inline at the CLI for security reasons
+            write_output=(not silent)
+        )
+    from terraform_manager.utilities import http_client, throttle
+    from terraform_manager.utilities.instrumentation import recorder
+    from terraform_manager.utilities.circuit_breaker import CircuitBreaker
+    from terraform_manager.utilities.hedging import Hedger
+    from terraform_manager.utilities.planner import Plan
+    from terraform_manager.utilities.revalidation import ValidatorCache
+
+    recorder.enabled = arguments["stats"] or arguments.get("stats_file") is not None
+    # Opening any of these resources may fail (which exits), so they are all opened within the try
+    # block to ensure the ones which were already opened are always closed again
+    cassette, journal, inventory, plan = None, None, None, None
+    try:
+        cassette = cli_handlers.open_cassette(
+            record=arguments.get("record"), replay=arguments.get("replay"), silent=silent
+        )
+        journal = cli_handlers.open_journal(
+            path=arguments.get("journal"), resume=arguments["resume"], silent=silent
+        )
+        inventory = cli_handlers.open_inventory(path=arguments.get("inventory"), silent=silent)
+        plan = Plan() if arguments["plan"] else None
+        http_client.use_plan(plan)
+        http_client.set_timeouts(
+            connect=arguments.get("connect_timeout"), read=arguments.get("read_timeout")
+        )
+        http_client.use_hedger(Hedger() if arguments["hedge"] else None)
+        http_client.use_circuit_breaker(CircuitBreaker())
+        http_client.use_validator_cache(ValidatorCache())
+        if shard is not None:
+            throttle.share_rate_limit(shard[1])
+        _run_operation(arguments, terraform, silent)
+    finally:
+        if cassette is not None:
+            cli_handlers.close_cassette(cassette)
+        if journal is not None:
+            cli_handlers.close_journal(journal)
+        if inventory is not None:
+            cli_handlers.close_inventory(inventory)
+        http_client.use_plan(None)
+        http_client.use_hedger(None)
+        http_client.use_circuit_breaker(None)
+        http_client.use_validator_cache(None)
+        if shard is not None:
+            throttle.share_rate_limit(1)
+        if plan is not None:
+            plan.write_summary(write_output=not silent)
+        if recorder.enabled:
+            cli_handlers.write_statistics(
+                recorder,
+                print_report=arguments["stats"],
+                file=arguments.get("stats_file"),
+                silent=silent
+            )
+
+
+def _run_operation(
+    arguments: Dict[str, Any], terraform: Union["Terraform", "TerraformFleet"], silent: bool
+) -> None:
+    settings = _get_settings(arguments)
+    if not terraform.configuration_is_valid():
+        cli_handlers.fail()
+    elif terraform.shard is not None and len(terraform.workspaces) == 0:
+        # Selections which are small relative to the number of shards leave some shards empty, which
+        # is not an error since the other shards handle the selected workspaces
+        if not silent:
+            index, count = terraform.shard
+            print(f"There are no selected workspaces in shard {index}/{count}; nothing to do.")
+    elif not cli_handlers.validate(terraform):
         cli_handlers.fail()
+    elif len(settings) > 1:
+        cli_handlers.update_settings(terraform, **settings)
     elif arguments["summary"]:
         terraform.write_summary()
+    elif arguments["version_report"]:
+        terraform.write_version_report()
     elif arguments["watch_runs"]:
-        terraform.launch_run_watcher()
+        if arguments.get("metrics_host") is not None:
+            terraform.export_run_metrics(arguments["metrics_port"], host=arguments["metrics_host"])
+        elif arguments.get("metrics_port") is not None:
+            terraform.export_run_metrics(arguments["metrics_port"])
+        else:
+            terraform.launch_run_watcher()
     elif arguments.get("terraform_version") is not None:
         cli_handlers.set_versions(terraform, arguments["terraform_version"])
     elif arguments["lock_workspaces"] or arguments["unlock_workspaces"]:
@@ -288,6 +743,8 @@ def _organization_required_main(arguments: Dict[str, Any]) -> None:
         cli_handlers.configure_variables(terraform, arguments["configure_variables"])
     elif arguments.get("delete_variables") is not None:
         cli_handlers.delete_variables(terraform, arguments["delete_variables"])
+    elif arguments.get("apply_state") is not None:
+        cli_handlers.apply_desired_state(terraform, arguments["apply_state"])
     elif arguments["enable_auto_apply"] or arguments["disable_auto_apply"]:
         cli_handlers.set_auto_apply(terraform, arguments["enable_auto_apply"])
     elif arguments["enable_speculative"] or arguments["disable_speculative"]:
@@ -318,7 +775,7 @@ def main() -> None:
         arguments = _parse_arguments(args)
         if arguments["create_variables_template"]:
             _no_selection_arguments_main(arguments)
-        elif "organization" not in arguments:
+        elif arguments.get("organization") is None:
             if _is_silenced(arguments=args, parsed_arguments=arguments):
                 _parser_fail()
             else:
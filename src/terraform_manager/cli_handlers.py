@@ -1,10 +1,12 @@
 import sys
-from typing import Optional, List
+from typing import Optional, List, TYPE_CHECKING
 
-import semver
-from terraform_manager.entities.terraform import Terraform
-from terraform_manager.terraform import LATEST_VERSION, variables
-from terraform_manager.terraform.variables import parse_variables
+if TYPE_CHECKING:  # pragma: no cover
+    from terraform_manager.entities.terraform import Terraform
+    from terraform_manager.utilities.cassette import Cassette
+    from terraform_manager.utilities.instrumentation import RequestRecorder
+    from terraform_manager.utilities.inventory import Inventory
+    from terraform_manager.utilities.journal import Journal
 
 
 def _fallible(operation: bool) -> None:
@@ -18,9 +20,24 @@ def fail() -> None:
     sys.exit(1)
 
 
-def validate(terraform: Terraform) -> bool:
+def validate(terraform: "Terraform") -> bool:
     if len(terraform.workspaces) == 0:
-        if terraform.workspace_names is not None:
+        if terraform.query is not None:
+            if terraform.write_output:
+                print(
+                    f"Error: no workspaces could be found matching the query: {terraform.query}",
+                    file=sys.stderr
+                )
+            return False
+        elif terraform.where is not None and not terraform.where.is_empty:
+            if terraform.write_output:
+                print(
+                    f"Error: no workspaces could be found matching the selection criteria: "
+                    f"{terraform.where.describe()}",
+                    file=sys.stderr
+                )
+            return False
+        elif terraform.workspace_names is not None:
             if terraform.write_output:
                 names = ", ".join(terraform.workspace_names)
                 print(
@@ -36,30 +53,41 @@ def validate(terraform: Terraform) -> bool:
 
 
 def create_variables_template(silent: bool) -> None:
+    from terraform_manager.terraform import variables
+
     _fallible(variables.create_variables_template(write_output=(not silent)))
 
 
-def set_versions(terraform: Terraform, desired_version: Optional[str]) -> None:
-    if not semver.VersionInfo.isvalid(desired_version) and desired_version != LATEST_VERSION:
+def _version_is_valid(terraform: "Terraform", desired_version: Optional[str]) -> bool:
+    from terraform_manager.terraform import LATEST_VERSION
+    from terraform_manager.utilities.utilities import parse_version
+
+    if parse_version(desired_version) is None and desired_version != LATEST_VERSION:
         if terraform.write_output:
             print(
                 f"Error: the version you specified ({desired_version}) is not valid.",
                 file=sys.stderr
             )
+        return False
+    return True
+
+
+def set_versions(terraform: "Terraform", desired_version: Optional[str]) -> None:
+    if not _version_is_valid(terraform, desired_version):
         fail()
     else:
         _fallible(terraform.set_versions(desired_version))
 
 
-def lock_or_unlock_workspaces(terraform: Terraform, lock: bool) -> None:
+def lock_or_unlock_workspaces(terraform: "Terraform", lock: bool) -> None:
     _fallible(terraform.lock_workspaces() if lock else terraform.unlock_workspaces())
 
 
-def set_working_directories(terraform: Terraform, working_directory: Optional[str]) -> None:
+def set_working_directories(terraform: "Terraform", working_directory: Optional[str]) -> None:
     _fallible(terraform.set_working_directories(working_directory))
 
 
-def set_execution_modes(terraform: Terraform, execution_mode: str) -> None:
+def set_execution_modes(terraform: "Terraform", execution_mode: str) -> None:
     arguments = execution_mode.split(",")
     if len(arguments) > 1:
         _fallible(terraform.set_execution_modes(arguments[0], agent_pool_id=arguments[1]))
@@ -67,15 +95,44 @@ def set_execution_modes(terraform: Terraform, execution_mode: str) -> None:
         _fallible(terraform.set_execution_modes(execution_mode))
 
 
-def set_auto_apply(terraform: Terraform, auto_apply: bool) -> None:
+def update_settings(
+    terraform: "Terraform",
+    *,
+    terraform_version: Optional[str] = None,
+    working_directory: Optional[str] = None,
+    execution_mode: Optional[str] = None,
+    auto_apply: Optional[bool] = None,
+    speculative: Optional[bool] = None
+) -> None:
+    if terraform_version is not None and not _version_is_valid(terraform, terraform_version):
+        fail()
+    else:
+        agent_pool_id = None
+        if execution_mode is not None and "," in execution_mode:
+            execution_mode, agent_pool_id = execution_mode.split(",")[:2]
+        _fallible(
+            terraform.update_settings(
+                terraform_version=terraform_version,
+                working_directory=working_directory,
+                execution_mode=execution_mode,
+                agent_pool_id=agent_pool_id,
+                auto_apply=auto_apply,
+                speculative=speculative
+            )
+        )
+
+
+def set_auto_apply(terraform: "Terraform", auto_apply: bool) -> None:
     _fallible(terraform.set_auto_apply(auto_apply))
 
 
-def set_speculative(terraform: Terraform, speculative: bool) -> None:
+def set_speculative(terraform: "Terraform", speculative: bool) -> None:
     _fallible(terraform.set_speculative(speculative))
 
 
-def configure_variables(terraform: Terraform, file: str) -> None:
+def configure_variables(terraform: "Terraform", file: str) -> None:
+    from terraform_manager.terraform.variables import parse_variables
+
     variables_to_configure = parse_variables(file, write_output=True)
     if len(variables_to_configure) == 0:
         if terraform.write_output:
@@ -85,5 +142,111 @@ def configure_variables(terraform: Terraform, file: str) -> None:
         _fallible(terraform.configure_variables(variables_to_configure))
 
 
-def delete_variables(terraform: Terraform, variable_keys: List[str]) -> None:
+def apply_desired_state(terraform: "Terraform", file: str) -> None:
+    from terraform_manager.terraform.reconcile import parse_desired_state
+
+    desired_state = parse_desired_state(file, write_output=terraform.write_output)
+    if desired_state is None:
+        fail()
+    else:
+        _fallible(terraform.apply_desired_state(desired_state))
+
+
+def delete_variables(terraform: "Terraform", variable_keys: List[str]) -> None:
     _fallible(terraform.delete_variables(variable_keys))
+
+
+def write_statistics(
+    recorder: "RequestRecorder", *, print_report: bool, file: Optional[str], silent: bool
+) -> None:
+    recorder.write_report(write_output=print_report and not silent)
+    if file is not None:
+        try:
+            recorder.write_json(file)
+        except OSError as e:
+            if not silent:
+                print(f"Error: unable to write request statistics to {file}: {e}", file=sys.stderr)
+
+
+def open_cassette(*, record: Optional[str], replay: Optional[str],
+                  silent: bool) -> Optional["Cassette"]:
+    from terraform_manager.utilities import http_client
+    from terraform_manager.utilities.cassette import Cassette
+
+    if record is None and replay is None:
+        return None
+    elif record is not None and replay is not None:
+        if not silent:
+            print("Error: you cannot use --record and --replay at the same time.", file=sys.stderr)
+        fail()
+        return None
+    path = replay if replay is not None else record
+    try:
+        cassette = Cassette(path, replay=replay is not None)
+    except (OSError, ValueError) as e:
+        if not silent:
+            print(f"Error: unable to open {path}: {e}", file=sys.stderr)
+        fail()
+        return None
+    http_client.use_cassette(cassette)
+    return cassette
+
+
+def close_cassette(cassette: "Cassette") -> None:
+    from terraform_manager.utilities import http_client
+
+    http_client.use_cassette(None)
+    cassette.close()
+
+
+def open_journal(*, path: Optional[str], resume: bool, silent: bool) -> Optional["Journal"]:
+    from terraform_manager.utilities import journal
+    from terraform_manager.utilities.journal import Journal
+
+    if path is None:
+        if resume:
+            if not silent:
+                print("Error: --resume requires a --journal file to resume from.", file=sys.stderr)
+            fail()
+        return None
+    try:
+        opened_journal = Journal(path, resume=resume)
+    except OSError as e:
+        if not silent:
+            print(f"Error: unable to open {path}: {e}", file=sys.stderr)
+        fail()
+        return None
+    journal.use_journal(opened_journal)
+    return opened_journal
+
+
+def close_journal(opened_journal: "Journal") -> None:
+    from terraform_manager.utilities import journal
+
+    journal.use_journal(None)
+    opened_journal.close()
+
+
+def open_inventory(*, path: Optional[str], silent: bool) -> Optional["Inventory"]:
+    import sqlite3
+    from terraform_manager.utilities import inventory
+    from terraform_manager.utilities.inventory import Inventory
+
+    if path is None:
+        return None
+    try:
+        opened_inventory = Inventory(path)
+    except (OSError, sqlite3.Error) as e:
+        if not silent:
+            print(f"Error: unable to open {path}: {e}", file=sys.stderr)
+        fail()
+        return None
+    inventory.use_inventory(opened_inventory)
+    return opened_inventory
+
+
+def close_inventory(opened_inventory: "Inventory") -> None:
+    from terraform_manager.utilities import inventory
+
+    inventory.use_inventory(None)
+    opened_inventory.close()
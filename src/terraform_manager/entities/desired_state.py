@@ -0,0 +1,159 @@
+from typing import Dict, Any, List, Optional, Callable
+
+from terraform_manager.entities.variable import Variable
+from terraform_manager.entities.workspace import Workspace
+from terraform_manager.terraform import LATEST_VERSION
+from terraform_manager.utilities.name_matcher import NameMatcher
+from terraform_manager.utilities.utilities import coalesce, parse_version
+
+# Maps the workspace settings that can be declared in a desired state to functions extracting their
+# current values from workspaces; the keys are Terraform API attribute names
+SETTING_MAPPERS: Dict[str, Callable[[Workspace], Any]] = {
+    "terraform-version": lambda w: w.terraform_version,
+    "auto-apply": lambda w: w.auto_apply,
+    "speculative-enabled": lambda w: w.speculative,
+    "working-directory": lambda w: coalesce(w.working_directory, ""),
+    "execution-mode": lambda w: w.execution_mode,
+    "agent-pool-id": lambda w: coalesce(w.agent_pool_id, "")
+}
+
+_boolean_settings: List[str] = ["auto-apply", "speculative-enabled"]
+_execution_modes: List[str] = ["remote", "local", "agent"]
+
+
+class WorkspaceRule:
+    def __init__(
+        self,
+        *,
+        names: List[str],
+        settings: Dict[str, Any],
+        locked: Optional[bool] = None,
+        variables: Optional[List[Variable]] = None
+    ):
+        """
+        The desired state of every workspace whose name matches at least one of the given patterns.
+
+        :param names: Unix-like name patterns (e.g. "aws-*") selecting the workspaces this rule
+                      applies to.
+        :param settings: The desired workspace settings, keyed by Terraform API attribute name (see
+                         SETTING_MAPPERS).
+        :param locked: The desired lock state of the workspaces, or None to leave it unchanged.
+        :param variables: The variables the workspaces should have (other variables are left
+                          untouched).
+        """
+
+        self.names = names
+        self.settings = settings
+        self.locked = locked
+        self.variables = [] if variables is None else variables
+        self._matcher: NameMatcher = NameMatcher(names)
+
+    def matches(self, workspace: Workspace) -> bool:
+        return self._matcher.matches(workspace.name)
+
+    def __repr__(self) -> str:
+        return (
+            f"WorkspaceRule(names={self.names}, settings={self.settings}, locked={self.locked}, "
+            f"variables={self.variables})"
+        )
+
+    def __str__(self) -> str:
+        return repr(self)
+
+
+class DesiredState:
+    def __init__(self, rules: List[WorkspaceRule]):
+        """
+        A declarative description of how workspaces should be configured. Rules are applied in
+        order, so when several rules match a workspace, later rules override earlier ones.
+
+        :param rules: The rules making up the desired state.
+        """
+
+        self.rules = rules
+
+    def settings_for(self, workspace: Workspace) -> Dict[str, Any]:
+        settings = {}
+        for rule in self.rules:
+            if rule.matches(workspace):
+                settings.update(rule.settings)
+        return settings
+
+    def lock_for(self, workspace: Workspace) -> Optional[bool]:
+        locked = None
+        for rule in self.rules:
+            if rule.matches(workspace) and rule.locked is not None:
+                locked = rule.locked
+        return locked
+
+    def variables_for(self, workspace: Workspace) -> List[Variable]:
+        variables = {}
+        for rule in self.rules:
+            if rule.matches(workspace):
+                variables.update({variable.key: variable for variable in rule.variables})
+        return list(variables.values())
+
+    @staticmethod
+    def from_json(json: Any) -> "DesiredState":
+        """
+        Parses a desired state out of a JSON-compatible object of the following form:
+
+            {"workspaces": [{"names": ["aws-*"], "settings": {"auto-apply": true}, "locked": false,
+                             "variables": [{"key": "region", "value": "us-east-1"}]}]}
+
+        :param json: The object to parse.
+        :return: The desired state.
+        :raises ValueError: If the object does not describe a valid desired state.
+        """
+
+        if not isinstance(json, dict) or not isinstance(json.get("workspaces"), list):
+            raise ValueError('the document must be an object with a "workspaces" list')
+        rules = []
+        for i, rule_json in enumerate(json["workspaces"]):
+            if not isinstance(rule_json, dict):
+                raise ValueError(f"workspaces[{i}] must be an object")
+            names = rule_json.get("names", ["*"])
+            if isinstance(names, str):
+                names = [names]
+            if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+                raise ValueError(f"workspaces[{i}].names must be a list of name patterns")
+
+            settings = rule_json.get("settings", {})
+            if not isinstance(settings, dict):
+                raise ValueError(f"workspaces[{i}].settings must be an object")
+            for key, value in settings.items():
+                if key not in SETTING_MAPPERS:
+                    raise ValueError(f"workspaces[{i}].settings.{key} is not a supported setting")
+                elif key in _boolean_settings and not isinstance(value, bool):
+                    raise ValueError(f"workspaces[{i}].settings.{key} must be true or false")
+                elif key not in _boolean_settings and not isinstance(value, str):
+                    raise ValueError(f"workspaces[{i}].settings.{key} must be a string")
+            version = settings.get("terraform-version")
+            if version is not None and version != LATEST_VERSION and parse_version(version) is None:
+                raise ValueError(f"workspaces[{i}].settings.terraform-version is not valid")
+            if settings.get("execution-mode", "remote") not in _execution_modes:
+                raise ValueError(
+                    f"workspaces[{i}].settings.execution-mode must be one of {_execution_modes}"
+                )
+
+            locked = rule_json.get("locked")
+            if locked is not None and not isinstance(locked, bool):
+                raise ValueError(f"workspaces[{i}].locked must be true or false")
+
+            variables = []
+            for j, variable_json in enumerate(rule_json.get("variables", [])):
+                variable = Variable.from_json(variable_json)
+                if variable is None or not variable.is_valid:
+                    raise ValueError(f"workspaces[{i}].variables[{j}] is not a valid variable")
+                variables.append(variable)
+
+            rules.append(
+                WorkspaceRule(names=names, settings=settings, locked=locked, variables=variables)
+            )
+        return DesiredState(rules)
+
+    def __repr__(self) -> str:
+        return f"DesiredState(rules={self.rules})"
+
+    def __str__(self) -> str:
+        return repr(self)
@@ -1,13 +1,20 @@
 import sys
-from typing import Optional, List
+from typing import Optional, List, Callable, Any, Tuple
 
+from terraform_manager.entities.desired_state import DesiredState
 from terraform_manager.entities.variable import Variable
 from terraform_manager.entities.workspace import Workspace
+from terraform_manager.entities.workspace_attribute_index import WorkspaceAttributeIndex
+from terraform_manager.entities.workspace_filter import WorkspaceFilter
+from terraform_manager.entities.workspace_version_index import WorkspaceVersionIndex
 from terraform_manager.terraform import CLOUD_DOMAIN
 from terraform_manager.terraform.locking import lock_or_unlock_workspaces
-from terraform_manager.terraform.runs import launch_run_watcher
+from terraform_manager.terraform.reconcile import apply_desired_state
+from terraform_manager.terraform.runs import launch_run_watcher, export_run_metrics
 from terraform_manager.terraform.variables import configure_variables, delete_variables
-from terraform_manager.terraform.workspaces import fetch_all, batch_operation, write_summary
+from terraform_manager.terraform.workspaces import fetch_all, batch_operation, write_summary, \
+    write_version_report, sync_workspaces, filter_workspaces, shard_workspaces
+from terraform_manager.utilities import inventory
 from terraform_manager.utilities.utilities import is_empty, coalesce
 
 
@@ -19,6 +26,9 @@ class Terraform:
         *,
         workspace_names: Optional[List[str]] = None,
         blacklist: bool = False,
+        query: Optional[str] = None,
+        where: Optional[WorkspaceFilter] = None,
+        shard: Optional[Tuple[int, int]] = None,
         no_tls: bool = False,
         token: Optional[str] = None,
         write_output: bool = False
@@ -33,6 +43,18 @@ class Terraform:
         :param workspace_names: The name(s) of workspace(s) for which data should be fetched. If not
                                 specified, all workspace data will be fetched.
         :param blacklist: Whether to use the specified workspaces as a blacklist-style filter.
+        :param query: A query expression (e.g. "terraform_version < 1.0 and execution_mode = agent")
+                      which the workspaces must additionally match (see inventory.parse_query). If
+                      an inventory is in use and it contains the organization, the workspaces are
+                      selected from it without contacting the Terraform API, and brought up to date
+                      (see refresh_workspaces) before any operation changes them.
+        :param where: Criteria on the workspaces' attributes (e.g. their execution mode or tags)
+                      which the workspaces must additionally match. The criteria which the Terraform
+                      API supports are applied by it, the rest are looked up in an attribute index
+                      (see attribute_index).
+        :param shard: A pair of a shard index (from 1) and a number of shards. If specified, only
+                      the selected workspaces in that shard are targeted (see shard_workspaces), so
+                      that several processes can each handle one shard of the same selection.
         :param no_tls: Whether to use SSL/TLS encryption when communicating with the Terraform API.
         :param token: A token suitable for authenticating against the Terraform API. If not
                       specified, a token will be searched for in the documented locations.
@@ -43,12 +65,22 @@ class Terraform:
         self.organization = organization
         self.workspace_names = workspace_names
         self.blacklist = blacklist
+        self.query = query
+        self.where = where
+        self.shard = shard
         self.no_tls = no_tls
         self.token = token
         self.write_output = write_output
 
         self._options_hash: int = self._compute_options_hash()
         self._workspace_cache: Optional[List[Workspace]] = None
+        # All the workspaces in the organization (regardless of workspace_names), as of the last
+        # incremental refresh (see refresh_workspaces)
+        self._organization_workspaces: Optional[List[Workspace]] = None
+        # Whether the cached workspaces were selected from the inventory rather than fetched, in
+        # which case they may be outdated (see _refresh_inventory_selection)
+        self._from_inventory: bool = False
+        self._attribute_index: Optional[WorkspaceAttributeIndex] = None
 
     def configuration_is_valid(self) -> bool:
         """
@@ -73,9 +105,27 @@ class Terraform:
                 ), file=sys.stderr)
                 # yapf: enable
             return False
+        elif self.query is not None and not self._query_is_valid():
+            return False
+        elif self.shard is not None and not 1 <= self.shard[0] <= self.shard[1]:
+            if self.write_output:
+                print(
+                    "Error: the shard index must be between 1 and the number of shards.",
+                    file=sys.stderr
+                )
+            return False
         else:
             return True
 
+    def _query_is_valid(self) -> bool:
+        try:
+            inventory.parse_query(self.query)
+            return True
+        except ValueError as e:
+            if self.write_output:
+                print(f"Error: the query is not valid: {e}.", file=sys.stderr)
+            return False
+
     @property
     def is_terraform_cloud(self) -> bool:
         return self.terraform_domain.lower() == CLOUD_DOMAIN
@@ -87,6 +137,12 @@ class Terraform:
                 hash(self.no_tls)
         if self.workspace_names is not None:
             value += hash(tuple(self.workspace_names))
+        if self.query is not None:
+            value += hash(self.query)
+        if self.where is not None:
+            value += hash(self.where)
+        if self.shard is not None:
+            value += hash(self.shard)
         if self.token is not None:
             value += hash(self.token)
         return value
@@ -108,16 +164,146 @@ class Terraform:
             if not self.configuration_is_valid():
                 return []
             self._options_hash = self._compute_options_hash()
-            self._workspace_cache = fetch_all(
-                self.terraform_domain,
-                self.organization,
-                workspace_names=self.workspace_names,
-                blacklist=self.blacklist,
-                token=self.token,
-                write_error_messages=self.write_output
-            )
+            self._from_inventory = False
+            if self.query is None:
+                self._workspace_cache = self._in_shard(
+                    fetch_all(
+                        self.terraform_domain,
+                        self.organization,
+                        workspace_names=self.workspace_names,
+                        blacklist=self.blacklist,
+                        workspace_filter=self.where,
+                        no_tls=self.no_tls,
+                        token=self.token,
+                        write_error_messages=self.write_output
+                    )
+                )
+            else:
+                selected = inventory.select(self.terraform_domain, self.organization, self.query)
+                self._from_inventory = selected is not None
+                if selected is None:
+                    selected = inventory.matching(
+                        fetch_all(
+                            self.terraform_domain,
+                            self.organization,
+                            no_tls=self.no_tls,
+                            token=self.token,
+                            write_error_messages=self.write_output
+                        ),
+                        self.query
+                    )
+                self._workspace_cache = self._select(selected)
+            self._organization_workspaces = None
+            self._attribute_index = None
         return self._workspace_cache
 
+    def refresh_workspaces(self) -> List[Workspace]:
+        """
+        Brings the cached workspaces (see the workspaces property) up to date incrementally rather
+        than re-fetching every page of them: only the workspaces which were updated since the last
+        refresh are fetched (see sync_workspaces), which usually takes a single request. Cached
+        workspace objects are updated in place. The first refresh fetches every page, since the
+        whole organization has to be known in order to detect deleted workspaces.
+
+        :return: The refreshed workspaces, if any. If the configuration in this Terraform instance
+                 is not valid, an empty list will be returned. If the workspaces could not be
+                 fetched, the previously-cached workspaces will be returned.
+        """
+
+        if not self.configuration_is_valid():
+            return []
+        if self._options_hash != self._compute_options_hash():
+            self._options_hash = self._compute_options_hash()
+            self._workspace_cache = None
+            self._organization_workspaces = None
+        synced = sync_workspaces(
+            self.terraform_domain,
+            self.organization,
+            [] if self._organization_workspaces is None else self._organization_workspaces,
+            no_tls=self.no_tls,
+            token=self.token,
+            write_error_messages=self.write_output
+        )
+        if synced is None:
+            return [] if self._workspace_cache is None else self._workspace_cache
+        if self._organization_workspaces is None and self._workspace_cache is not None:
+            # Keep the workspace objects which were handed out by the workspaces property current
+            cached = {workspace.workspace_id: workspace for workspace in self._workspace_cache}
+            for i, workspace in enumerate(synced):
+                if workspace.workspace_id in cached:
+                    cached[workspace.workspace_id].update(workspace)
+                    synced[i] = cached[workspace.workspace_id]
+        self._organization_workspaces = synced
+        self._from_inventory = False
+        self._workspace_cache = self._select(
+            synced if self.query is None else inventory.matching(synced, self.query)
+        )
+        self._attribute_index = None
+        return self._workspace_cache
+
+    def _select(self, workspaces: List[Workspace]) -> List[Workspace]:
+        selected = filter_workspaces(
+            workspaces, workspace_names=self.workspace_names, blacklist=self.blacklist
+        )
+        if self.where is not None and not self.where.is_empty:
+            selected = [workspace for workspace in selected if self.where.matches(workspace)]
+        return self._in_shard(selected)
+
+    def _in_shard(self, workspaces: List[Workspace]) -> List[Workspace]:
+        if self.shard is None:
+            return workspaces
+        return shard_workspaces(workspaces, index=self.shard[0], count=self.shard[1])
+
+    @property
+    def attribute_index(self) -> WorkspaceAttributeIndex:
+        """
+        An index of the workspaces by their attributes (Terraform version, execution mode, agent
+        pool, lock state, and tags). It is built once per workspace fetch (see the workspaces
+        property) and reused until the workspaces are re-fetched or patched.
+
+        :return: The attribute index of the workspaces.
+        """
+
+        workspaces = self.workspaces
+        if self._attribute_index is None:
+            self._attribute_index = WorkspaceAttributeIndex(workspaces)
+        return self._attribute_index
+
+    @property
+    def version_index(self) -> WorkspaceVersionIndex:
+        """
+        An index of the workspaces grouped by Terraform version. It is built once per workspace
+        fetch (see the workspaces property) and reused until the workspaces are re-fetched.
+
+        :return: The version index of the workspaces.
+        """
+
+        return self.attribute_index.version_index
+
+    def _refresh_inventory_selection(self) -> bool:
+        # Workspaces selected from the inventory may have changed since it was last refreshed, so
+        # they are brought up to date before being changed. The inventory's copy of the
+        # organization seeds the refresh, so it usually takes a single request (see
+        # refresh_workspaces).
+        workspaces = self.workspaces
+        if not self._from_inventory:
+            return True
+        selected = {workspace.workspace_id: workspace for workspace in workspaces}
+        stored = inventory.select(self.terraform_domain, self.organization) or []
+        self._organization_workspaces = [
+            selected.get(workspace.workspace_id, workspace) for workspace in stored
+        ]
+        self.refresh_workspaces()
+        return not self._from_inventory
+
+    def _after_patching(self, result: bool) -> bool:
+        # Operations which patch workspaces update the cached workspaces in place (see
+        # update_from_response), which may change their indexed attributes, so the index is rebuilt
+        # and the inventory (if any) is updated as well
+        self._attribute_index = None
+        inventory.update(self.terraform_domain, self.organization, self.workspaces)
+        return result
+
     def lock_workspaces(self) -> bool:
         """
         Locks the workspaces.
@@ -125,14 +311,18 @@ class Terraform:
         :return: Whether all lock operations were successful. If even a single one failed, returns
                  False.
         """
-        return lock_or_unlock_workspaces(
-            self.terraform_domain,
-            self.organization,
-            self.workspaces,
-            set_lock=True,
-            no_tls=self.no_tls,
-            token=self.token,
-            write_output=self.write_output
+        if not self._refresh_inventory_selection():
+            return False
+        return self._after_patching(
+            lock_or_unlock_workspaces(
+                self.terraform_domain,
+                self.organization,
+                self.workspaces,
+                set_lock=True,
+                no_tls=self.no_tls,
+                token=self.token,
+                write_output=self.write_output
+            )
         )
 
     def unlock_workspaces(self) -> bool:
@@ -142,14 +332,18 @@ class Terraform:
         :return: Whether all unlock operations were successful. If even a single one failed, returns
                  False.
         """
-        return lock_or_unlock_workspaces(
-            self.terraform_domain,
-            self.organization,
-            self.workspaces,
-            set_lock=False,
-            no_tls=self.no_tls,
-            token=self.token,
-            write_output=self.write_output
+        if not self._refresh_inventory_selection():
+            return False
+        return self._after_patching(
+            lock_or_unlock_workspaces(
+                self.terraform_domain,
+                self.organization,
+                self.workspaces,
+                set_lock=False,
+                no_tls=self.no_tls,
+                token=self.token,
+                write_output=self.write_output
+            )
         )
 
     def check_versions(self, new_version: str) -> bool:
@@ -163,9 +357,26 @@ class Terraform:
                  version.
         """
 
-        for workspace in self.workspaces:
-            if workspace.is_terraform_version_newer_than(new_version):
-                return False
+        return not self.version_index.any_newer_than(new_version)
+
+    def _version_is_upgrade(
+        self, new_version: str, workspaces: Optional[List[Workspace]] = None
+    ) -> bool:
+        if workspaces is None:
+            is_upgrade = self.check_versions(new_version)
+        else:
+            is_upgrade = not any([
+                w.is_terraform_version_newer_than(new_version) for w in workspaces
+            ])
+        if not is_upgrade:
+            if self.write_output:
+                # yapf: disable
+                print((
+                    "Error: at least one of the target workspaces has a version newer than the one "
+                    "you are attempting to change to. No workspaces were updated."
+                ), file=sys.stderr)
+                # yapf: enable
+            return False
         return True
 
     def set_versions(self, new_version: str) -> bool:
@@ -176,26 +387,21 @@ class Terraform:
         :return: Whether all patch operations were successful. If even a single one failed, returns
                  False.
         """
-        if not self.check_versions(new_version):
-            if self.write_output:
-                # yapf: disable
-                print((
-                    "Error: at least one of the target workspaces has a version newer than the one "
-                    "you are attempting to change to. No workspaces were updated."
-                ), file=sys.stderr)
-                # yapf: enable
+        if not self._refresh_inventory_selection() or not self._version_is_upgrade(new_version):
             return False
         else:
-            return batch_operation(
-                self.terraform_domain,
-                self.organization,
-                self.workspaces,
-                field_mappers=[lambda w: w.terraform_version],
-                field_names=["terraform-version"],
-                new_values=[new_version],
-                no_tls=self.no_tls,
-                token=self.token,
-                write_output=self.write_output
+            return self._after_patching(
+                batch_operation(
+                    self.terraform_domain,
+                    self.organization,
+                    self.workspaces,
+                    field_mappers=[lambda w: w.terraform_version],
+                    field_names=["terraform-version"],
+                    new_values=[new_version],
+                    no_tls=self.no_tls,
+                    token=self.token,
+                    write_output=self.write_output
+                )
             )
 
     def write_summary(self) -> None:
@@ -213,43 +419,49 @@ class Terraform:
             write_output=self.write_output
         )
 
-    def set_working_directories(self, new_working_directory: Optional[str]) -> bool:
+    def write_version_report(self) -> None:
         """
-        Patches the working directories of the workspaces.
+        Writes a tabulated count of workspaces per Terraform version to STDOUT. The counts are taken
+        from the version index, so no additional API calls are made beyond the workspace fetch.
 
-        :param new_working_directory: The new working directory to assign to the workspaces.
-        :return: Whether all patch operations were successful. If even a single one failed, returns
-                 False.
+        :return: None
         """
-        return batch_operation(
+        write_version_report(
             self.terraform_domain,
             self.organization,
-            self.workspaces,
-            field_mappers=[lambda w: w.working_directory],
-            field_names=["working-directory"],
-            new_values=[coalesce(new_working_directory, "")],
-            report_only_value_mappers=[lambda d: coalesce(d, "<none>")],
-            no_tls=self.no_tls,
-            token=self.token,
+            self.version_index,
+            targeting_specific_workspaces=self.workspace_names is not None,
             write_output=self.write_output
         )
 
-    def set_execution_modes(
-        self, new_execution_mode: str, *, agent_pool_id: Optional[str] = None
-    ) -> bool:
+    def set_working_directories(self, new_working_directory: Optional[str]) -> bool:
         """
-        Patches the execution modes of the workspaces.
+        Patches the working directories of the workspaces.
 
-        :param new_execution_mode: The new execution mode to assign to the workspaces. The value
-                                   must be either "remote", "local", or "agent" (case-sensitive).
-        :param agent_pool_id: The agent-pool-id to assign to the workspaces. Only specify this
-                              argument if you are switching to "agent" execution mode AND you are
-                              targeting Terraform Cloud.
+        :param new_working_directory: The new working directory to assign to the workspaces.
         :return: Whether all patch operations were successful. If even a single one failed, returns
-                 False. If the new_execution_mode and agent_pool_id arguments are not compatible,
-                 or you are not targeting Terraform Cloud but you specify "agent" mode, returns
                  False.
         """
+        if not self._refresh_inventory_selection():
+            return False
+        return self._after_patching(
+            batch_operation(
+                self.terraform_domain,
+                self.organization,
+                self.workspaces,
+                field_mappers=[lambda w: w.working_directory],
+                field_names=["working-directory"],
+                new_values=[coalesce(new_working_directory, "")],
+                report_only_value_mappers=[lambda d: coalesce(d, "<none>")],
+                no_tls=self.no_tls,
+                token=self.token,
+                write_output=self.write_output
+            )
+        )
+
+    def _execution_mode_is_valid(
+        self, new_execution_mode: str, agent_pool_id: Optional[str]
+    ) -> bool:
         if new_execution_mode not in ["remote", "local", "agent"]:
             if self.write_output:
                 print(
@@ -282,6 +494,27 @@ class Terraform:
                 ), file=sys.stderr)
                 # yapf: enable
             return False
+        return True
+
+    def set_execution_modes(
+        self, new_execution_mode: str, *, agent_pool_id: Optional[str] = None
+    ) -> bool:
+        """
+        Patches the execution modes of the workspaces.
+
+        :param new_execution_mode: The new execution mode to assign to the workspaces. The value
+                                   must be either "remote", "local", or "agent" (case-sensitive).
+        :param agent_pool_id: The agent-pool-id to assign to the workspaces. Only specify this
+                              argument if you are switching to "agent" execution mode AND you are
+                              targeting Terraform Cloud.
+        :return: Whether all patch operations were successful. If even a single one failed, returns
+                 False. If the new_execution_mode and agent_pool_id arguments are not compatible,
+                 or you are not targeting Terraform Cloud but you specify "agent" mode, returns
+                 False.
+        """
+        if not self._execution_mode_is_valid(new_execution_mode, agent_pool_id) or \
+                not self._refresh_inventory_selection():
+            return False
         else:
             field_mappers = [lambda w: w.execution_mode]
             field_names = ["execution-mode"]
@@ -290,16 +523,18 @@ class Terraform:
                 field_mappers.append(lambda w: w.agent_pool_id)
                 field_names.append("agent-pool-id")
                 new_values.append(agent_pool_id)
-            return batch_operation(
-                self.terraform_domain,
-                self.organization,
-                self.workspaces,
-                field_mappers=field_mappers,
-                field_names=field_names,
-                new_values=new_values,
-                no_tls=self.no_tls,
-                token=self.token,
-                write_output=self.write_output
+            return self._after_patching(
+                batch_operation(
+                    self.terraform_domain,
+                    self.organization,
+                    self.workspaces,
+                    field_mappers=field_mappers,
+                    field_names=field_names,
+                    new_values=new_values,
+                    no_tls=self.no_tls,
+                    token=self.token,
+                    write_output=self.write_output
+                )
             )
 
     def set_auto_apply(self, set_auto_apply: bool) -> bool:
@@ -310,16 +545,20 @@ class Terraform:
         :return: Whether all patch operations were successful. If even a single one failed, returns
                  False.
         """
-        return batch_operation(
-            self.terraform_domain,
-            self.organization,
-            self.workspaces,
-            field_mappers=[lambda w: w.auto_apply],
-            field_names=["auto-apply"],
-            new_values=[set_auto_apply],
-            no_tls=self.no_tls,
-            token=self.token,
-            write_output=self.write_output
+        if not self._refresh_inventory_selection():
+            return False
+        return self._after_patching(
+            batch_operation(
+                self.terraform_domain,
+                self.organization,
+                self.workspaces,
+                field_mappers=[lambda w: w.auto_apply],
+                field_names=["auto-apply"],
+                new_values=[set_auto_apply],
+                no_tls=self.no_tls,
+                token=self.token,
+                write_output=self.write_output
+            )
         )
 
     def set_speculative(self, set_speculative: bool) -> bool:
@@ -330,16 +569,100 @@ class Terraform:
         :return: Whether all patch operations were successful. If even a single one failed, returns
                  False.
         """
-        return batch_operation(
-            self.terraform_domain,
-            self.organization,
-            self.workspaces,
-            field_mappers=[lambda w: w.speculative],
-            field_names=["speculative-enabled"],
-            new_values=[set_speculative],
-            no_tls=self.no_tls,
-            token=self.token,
-            write_output=self.write_output
+        if not self._refresh_inventory_selection():
+            return False
+        return self._after_patching(
+            batch_operation(
+                self.terraform_domain,
+                self.organization,
+                self.workspaces,
+                field_mappers=[lambda w: w.speculative],
+                field_names=["speculative-enabled"],
+                new_values=[set_speculative],
+                no_tls=self.no_tls,
+                token=self.token,
+                write_output=self.write_output
+            )
+        )
+
+    def update_settings(
+        self,
+        *,
+        terraform_version: Optional[str] = None,
+        working_directory: Optional[str] = None,
+        execution_mode: Optional[str] = None,
+        agent_pool_id: Optional[str] = None,
+        auto_apply: Optional[bool] = None,
+        speculative: Optional[bool] = None
+    ) -> bool:
+        """
+        Patches several settings of the workspaces at once. All the settings are sent in a single
+        request per workspace, so this is considerably cheaper than calling e.g. set_versions and
+        set_auto_apply separately. Settings that are not specified are left unchanged. The same
+        validation as in the single-setting methods applies, and if any setting is invalid, no
+        workspaces are updated.
+
+        :param terraform_version: The new Terraform version to assign to the workspaces.
+        :param working_directory: The new working directory to assign to the workspaces. Specify an
+                                  empty string to clear the working directories.
+        :param execution_mode: The new execution mode to assign to the workspaces (see
+                               set_execution_modes).
+        :param agent_pool_id: The agent-pool-id to assign to the workspaces (see
+                              set_execution_modes).
+        :param auto_apply: The desired value of the workspaces' auto-apply setting.
+        :param speculative: The desired value of the workspaces' speculative-enabled setting.
+        :return: Whether all patch operations were successful. If even a single one failed, or if
+                 any of the settings is invalid, returns False.
+        """
+        if not self._refresh_inventory_selection():
+            return False
+        field_mappers = []
+        field_names = []
+        new_values = []
+        report_mappers = []
+
+        def add_field(mapper: Callable[[Workspace], Any], field_name: str, new_value: Any) -> None:
+            field_mappers.append(mapper)
+            field_names.append(field_name)
+            new_values.append(new_value)
+            report_mappers.append(lambda value: "<none>" if value in [None, ""] else str(value))
+
+        if terraform_version is not None:
+            if not self._version_is_upgrade(terraform_version):
+                return False
+            add_field(lambda w: w.terraform_version, "terraform-version", terraform_version)
+        if working_directory is not None:
+            add_field(
+                lambda w: coalesce(w.working_directory, ""), "working-directory", working_directory
+            )
+        if execution_mode is not None or agent_pool_id is not None:
+            if not self._execution_mode_is_valid(execution_mode, agent_pool_id):
+                return False
+            add_field(lambda w: w.execution_mode, "execution-mode", execution_mode)
+            if execution_mode == "agent":
+                add_field(lambda w: w.agent_pool_id, "agent-pool-id", agent_pool_id)
+        if auto_apply is not None:
+            add_field(lambda w: w.auto_apply, "auto-apply", auto_apply)
+        if speculative is not None:
+            add_field(lambda w: w.speculative, "speculative-enabled", speculative)
+
+        if len(field_names) == 0:
+            if self.write_output:
+                print("Error: no workspace settings were specified.", file=sys.stderr)
+            return False
+        return self._after_patching(
+            batch_operation(
+                self.terraform_domain,
+                self.organization,
+                self.workspaces,
+                field_mappers=field_mappers,
+                field_names=field_names,
+                new_values=new_values,
+                report_only_value_mappers=report_mappers,
+                no_tls=self.no_tls,
+                token=self.token,
+                write_output=self.write_output
+            )
         )
 
     def delete_variables(self, variables: List[str]) -> bool:
@@ -352,6 +675,8 @@ class Terraform:
         :return: Whether all HTTP operations were successful. If even a single one failed, returns
                  False.
         """
+        if not self._refresh_inventory_selection():
+            return False
         return delete_variables(
             self.terraform_domain,
             self.organization,
@@ -373,6 +698,8 @@ class Terraform:
         :return: Whether all HTTP operations were successful. If even a single one failed, returns
                  False.
         """
+        if not self._refresh_inventory_selection():
+            return False
         return configure_variables(
             self.terraform_domain,
             self.organization,
@@ -383,6 +710,54 @@ class Terraform:
             write_output=self.write_output
         )
 
+    def _desired_state_is_valid(self, desired_state: DesiredState) -> bool:
+        # The settings of a desired state are subject to the same checks as the equivalent flags,
+        # applied to the settings each workspace would end up with
+        workspaces_by_version = {}
+        for workspace in self.workspaces:
+            settings = desired_state.settings_for(workspace)
+            version = settings.get("terraform-version")
+            if version is not None:
+                workspaces_by_version.setdefault(version, []).append(workspace)
+            if "execution-mode" in settings or "agent-pool-id" in settings:
+                execution_mode = settings.get("execution-mode", workspace.execution_mode)
+                current_agent_pool_id = \
+                    workspace.agent_pool_id if execution_mode == "agent" else None
+                agent_pool_id = settings.get("agent-pool-id", current_agent_pool_id)
+                if not self._execution_mode_is_valid(execution_mode, agent_pool_id):
+                    return False
+        for version, workspaces in workspaces_by_version.items():
+            if not self._version_is_upgrade(version, workspaces):
+                return False
+        return True
+
+    def apply_desired_state(self, desired_state: DesiredState) -> bool:
+        """
+        Reconciles the workspaces with a desired state, sending only the differences between the
+        workspaces' current configuration and the desired state to the Terraform API (all changed
+        settings of a workspace are patched with a single request).
+
+        :param desired_state: The desired state (see DesiredState.from_json).
+        :return: Whether all HTTP operations were successful. If even a single one failed, returns
+                 False. If the desired state would downgrade the Terraform version of any workspace
+                 or assigns an invalid execution mode to any workspace, returns False without
+                 changing any workspace.
+        """
+        if not self._refresh_inventory_selection() or \
+                not self._desired_state_is_valid(desired_state):
+            return False
+        return self._after_patching(
+            apply_desired_state(
+                self.terraform_domain,
+                self.organization,
+                self.workspaces,
+                desired_state=desired_state,
+                no_tls=self.no_tls,
+                token=self.token,
+                write_output=self.write_output
+            )
+        )
+
     def launch_run_watcher(self) -> None:
         """
         Launches a TLI for near-real-time report of all workspace run activity within the
@@ -399,6 +774,26 @@ class Terraform:
             write_output=self.write_output
         )
 
+    def export_run_metrics(self, port: int, host: str = "127.0.0.1") -> None:
+        """
+        Serves OpenMetrics metrics about all workspace run activity within the organization on the
+        given port (see the run watcher).
+
+        :param port: The port on which to serve the metrics.
+        :param host: The interface on which to serve the metrics; defaults to the loopback interface
+                     only (specify "0.0.0.0" to serve them on all interfaces).
+        :return: None.
+        """
+        export_run_metrics(
+            self.terraform_domain,
+            self.workspaces,
+            port=port,
+            host=host,
+            no_tls=self.no_tls,
+            token=self.token,
+            write_output=self.write_output
+        )
+
     def __repr__(self) -> str:
         return (
             "Terraform(domain={}, organization={}, workspaces=List[{}], blacklist={}, no_tls={}, "
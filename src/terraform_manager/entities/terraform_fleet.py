@@ -0,0 +1,281 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Optional, Dict, Callable
+
+from tabulate import tabulate
+from terraform_manager.entities.desired_state import DesiredState
+from terraform_manager.entities.terraform import Terraform
+from terraform_manager.entities.variable import Variable
+from terraform_manager.entities.workspace import Workspace
+from terraform_manager.entities.workspace_filter import WorkspaceFilter
+from terraform_manager.terraform import success_status
+from terraform_manager.terraform.workspaces import write_fleet_summary
+
+_maximum_concurrent_fetches: int = 16
+
+
+class TerraformFleet:
+    def __init__(
+        self,
+        targets: List[Tuple[str, str]],
+        *,
+        workspace_names: Optional[List[str]] = None,
+        blacklist: bool = False,
+        query: Optional[str] = None,
+        where: Optional[WorkspaceFilter] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        no_tls: bool = False,
+        tokens: Optional[Dict[str, str]] = None,
+        write_output: bool = False
+    ):
+        """
+        Creates a class instance which applies the same workspace selection criteria and operations
+        to multiple organizations, potentially across multiple Terraform installations. Workspaces
+        are fetched from all organizations concurrently, and all API interactions against the same
+        domain share a single rate limit.
+
+        :param targets: Pairs of a domain (either Terraform Cloud or Enterprise) and an organization
+                        within that domain.
+        :param workspace_names: The name(s) of workspace(s) for which data should be fetched in each
+                                organization. If not specified, all workspace data will be fetched.
+        :param blacklist: Whether to use the specified workspaces as a blacklist-style filter.
+        :param query: A query expression which the workspaces must additionally match (see the
+                      Terraform class).
+        :param where: Criteria on the workspaces' attributes which the workspaces must additionally
+                      match (see the Terraform class).
+        :param shard: A pair of a shard index (from 1) and a number of shards. If specified, only
+                      the workspaces in that shard of each organization are targeted (see the
+                      Terraform class).
+        :param no_tls: Whether to use SSL/TLS encryption when communicating with the Terraform API.
+        :param tokens: A dictionary mapping domains to tokens suitable for authenticating against
+                       the Terraform API. For domains not present in the dictionary, a token will be
+                       searched for in the documented locations.
+        :param write_output: Whether to write informational messages to STDOUT and STDERR.
+        """
+
+        self.workspace_names = workspace_names
+        self.query = query
+        self.where = where
+        self.shard = shard
+        self.write_output = write_output
+        self.terraforms: List[Terraform] = [
+            Terraform(
+                terraform_domain,
+                organization,
+                workspace_names=workspace_names,
+                blacklist=blacklist,
+                query=query,
+                where=where,
+                shard=shard,
+                no_tls=no_tls,
+                token=None if tokens is None else tokens.get(terraform_domain),
+                write_output=write_output
+            ) for terraform_domain, organization in targets
+        ]
+
+    def configuration_is_valid(self) -> bool:
+        """
+        Checks the configuration of every organization in the fleet for validity.
+
+        :return: Whether the configuration is valid for all organizations.
+        """
+
+        return all([terraform.configuration_is_valid() for terraform in self.terraforms])
+
+    @property
+    def workspaces(self) -> List[Workspace]:
+        """
+        Fetches the workspaces of every organization in the fleet concurrently (see the workspaces
+        property of the Terraform class for caching behavior).
+
+        :return: The fetched workspaces of all organizations, in the order the organizations were
+                 specified.
+        """
+
+        self._fetch_concurrently()
+        return [workspace for terraform in self.terraforms for workspace in terraform.workspaces]
+
+    def _fetch_concurrently(self) -> None:
+        # Each Terraform instance caches its own workspaces, so fetching them here (concurrently)
+        # means that subsequent per-organization operations will not have to fetch them serially
+        if len(self.terraforms) > 0:
+            workers = min(len(self.terraforms), _maximum_concurrent_fetches)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda terraform: terraform.workspaces, self.terraforms))
+
+    def _run_all(self, operation: Callable[[Terraform], bool]) -> bool:
+        self._fetch_concurrently()
+        report = []
+        for terraform in self.terraforms:
+            success = operation(terraform)
+            report.append([
+                terraform.terraform_domain,
+                terraform.organization,
+                len(terraform.workspaces),
+                success_status() if success else "error"
+            ])
+        if self.write_output:
+            print(f"Terraform fleet results for {len(self.terraforms)} organizations:")
+            print()
+            print(
+                tabulate(
+                    sorted(report, key=lambda x: (x[3], x[0], x[1])),
+                    headers=["Domain", "Organization", "Workspaces", "Status"]
+                )
+            )
+            print()
+        return all([row[3] != "error" for row in report])
+
+    def lock_workspaces(self) -> bool:
+        """
+        Locks the workspaces in every organization.
+
+        :return: Whether all lock operations were successful. If even a single one failed, returns
+                 False.
+        """
+        return self._run_all(lambda terraform: terraform.lock_workspaces())
+
+    def unlock_workspaces(self) -> bool:
+        """
+        Unlocks the workspaces in every organization.
+
+        :return: Whether all unlock operations were successful. If even a single one failed, returns
+                 False.
+        """
+        return self._run_all(lambda terraform: terraform.unlock_workspaces())
+
+    def check_versions(self, new_version: str) -> bool:
+        """
+        Asserts whether at least one of the workspaces in any organization would be downgraded by a
+        patch operation involving a given version.
+
+        :param new_version: The new Terraform version to check against the workspaces' versions.
+        :return: Whether there are any workspaces which would be downgraded by patching to the new
+                 version.
+        """
+
+        self._fetch_concurrently()
+        return all([terraform.check_versions(new_version) for terraform in self.terraforms])
+
+    def _version_is_upgrade(self, new_version: str) -> bool:
+        if not self.check_versions(new_version):
+            if self.write_output:
+                # yapf: disable
+                print((
+                    "Error: at least one of the target workspaces has a version newer than the one "
+                    "you are attempting to change to. No workspaces were updated."
+                ), file=sys.stderr)
+                # yapf: enable
+            return False
+        return True
+
+    def set_versions(self, new_version: str) -> bool:
+        """
+        Patches the Terraform version of the workspaces in every organization. If any workspace in
+        any organization would be downgraded, no workspaces are updated.
+
+        :param new_version: The new Terraform version to assign to the workspaces.
+        :return: Whether all patch operations were successful. If even a single one failed, returns
+                 False.
+        """
+        if not self._version_is_upgrade(new_version):
+            return False
+        else:
+            return self._run_all(lambda terraform: terraform.set_versions(new_version))
+
+    def write_summary(self) -> None:
+        """
+        Writes a single tabulated summary of the workspaces' configuration in every organization to
+        STDOUT.
+
+        :return: None
+        """
+        self._fetch_concurrently()
+        targets = [(t.terraform_domain, t.organization, t.workspaces) for t in self.terraforms]
+        write_fleet_summary(
+            targets,
+            targeting_specific_workspaces=self.workspace_names is not None,
+            write_output=self.write_output
+        )
+
+    def write_version_report(self) -> None:
+        """
+        Writes the version report (see the Terraform class) of every organization to STDOUT.
+
+        :return: None
+        """
+        self._fetch_concurrently()
+        for terraform in self.terraforms:
+            terraform.write_version_report()
+
+    def set_working_directories(self, new_working_directory: Optional[str]) -> bool:
+        """
+        See the Terraform class. This applies the operation to every organization.
+        """
+        return self._run_all(
+            lambda terraform: terraform.set_working_directories(new_working_directory)
+        )
+
+    def set_execution_modes(
+        self, new_execution_mode: str, *, agent_pool_id: Optional[str] = None
+    ) -> bool:
+        """
+        See the Terraform class. This applies the operation to every organization.
+        """
+        return self._run_all(
+            lambda terraform: terraform.
+            set_execution_modes(new_execution_mode, agent_pool_id=agent_pool_id)
+        )
+
+    def set_auto_apply(self, set_auto_apply: bool) -> bool:
+        """
+        See the Terraform class. This applies the operation to every organization.
+        """
+        return self._run_all(lambda terraform: terraform.set_auto_apply(set_auto_apply))
+
+    def set_speculative(self, set_speculative: bool) -> bool:
+        """
+        See the Terraform class. This applies the operation to every organization.
+        """
+        return self._run_all(lambda terraform: terraform.set_speculative(set_speculative))
+
+    def update_settings(self, *, terraform_version: Optional[str] = None, **settings) -> bool:
+        """
+        See the Terraform class. This applies the operation to every organization. If any workspace
+        in any organization would be downgraded, no workspaces are updated.
+        """
+        if terraform_version is not None and not self._version_is_upgrade(terraform_version):
+            return False
+        return self._run_all(
+            lambda terraform: terraform.
+            update_settings(terraform_version=terraform_version, **settings)
+        )
+
+    def delete_variables(self, variables: List[str]) -> bool:
+        """
+        See the Terraform class. This applies the operation to every organization.
+        """
+        return self._run_all(lambda terraform: terraform.delete_variables(variables))
+
+    def configure_variables(self, variables: List[Variable]) -> bool:
+        """
+        See the Terraform class. This applies the operation to every organization.
+        """
+        return self._run_all(lambda terraform: terraform.configure_variables(variables))
+
+    def apply_desired_state(self, desired_state: DesiredState) -> bool:
+        """
+        See the Terraform class. This applies the operation to every organization.
+        """
+        return self._run_all(lambda terraform: terraform.apply_desired_state(desired_state))
+
+    def __repr__(self) -> str:
+        return "TerraformFleet(targets=[{}])".format(
+            ", ".join([
+                f"{terraform.terraform_domain}/{terraform.organization}"
+                for terraform in self.terraforms
+            ])
+        )
+
+    def __str__(self) -> str:
+        return repr(self)
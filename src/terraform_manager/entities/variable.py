@@ -1,7 +1,5 @@
 from typing import Optional, Dict, Union, Any
 
-from regex import regex
-
 JSON = Dict[str, Union[str, bool]]
 
 _default_category: str = "terraform"
@@ -63,6 +61,8 @@ class Variable:
                 Terraform API.
         """
 
+        from regex import regex
+
         key_pattern = r"^[a-zA-Z0-9_-]+$"
         key_valid = regex.match(key_pattern, self.key) is not None
         category_valid = self.category in ["terraform", "env"]
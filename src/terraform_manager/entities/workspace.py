@@ -1,7 +1,10 @@
-from typing import Optional
+from typing import List, Optional, TYPE_CHECKING
 
-from semver import VersionInfo
 from terraform_manager.terraform import LATEST_VERSION
+from terraform_manager.utilities.utilities import parse_version
+
+if TYPE_CHECKING:  # pragma: no cover
+    from semver import VersionInfo
 
 
 class Workspace:
@@ -16,15 +19,15 @@ class Workspace:
         working_directory: str,
         agent_pool_id: str,
         execution_mode: str,
-        speculative: bool
+        speculative: bool,
+        updated_at: Optional[str] = None,
+        tag_names: Optional[List[str]] = None
     ):  # pragma: no cover
         self.workspace_id = workspace_id
         self.name = name
 
         self.terraform_version = terraform_version
-        self.parsed_terraform_version: Optional[VersionInfo] = None
-        if VersionInfo.isvalid(terraform_version):
-            self.parsed_terraform_version: VersionInfo = VersionInfo.parse(terraform_version)
+        self.parsed_terraform_version: Optional["VersionInfo"] = parse_version(terraform_version)
         self.is_auto_updating: bool = self.terraform_version == LATEST_VERSION
 
         self.auto_apply = auto_apply
@@ -33,18 +36,47 @@ class Workspace:
         self.agent_pool_id = agent_pool_id
         self.execution_mode = execution_mode
         self.speculative = speculative
+        # An ISO 8601 timestamp as returned by the Terraform API (which always uses the same format,
+        # so timestamps can be compared as strings); older Terraform Enterprise versions omit it
+        self.updated_at = updated_at
+        self.tag_names: List[str] = [] if tag_names is None else list(tag_names)
+
+    def update(self, other: "Workspace") -> None:
+        """
+        Copies the attributes of another object representing the same workspace (e.g. one parsed
+        from the response to a PATCH request) into this one, so that references to this object
+        observe the workspace's latest state.
+
+        :param other: The workspace whose attributes to copy.
+        :return: None
+        """
+
+        self.name = other.name
+        self.terraform_version = other.terraform_version
+        self.parsed_terraform_version = other.parsed_terraform_version
+        self.is_auto_updating = other.is_auto_updating
+        self.auto_apply = other.auto_apply
+        self.is_locked = other.is_locked
+        self.working_directory = other.working_directory
+        self.agent_pool_id = other.agent_pool_id
+        self.execution_mode = other.execution_mode
+        self.speculative = other.speculative
+        self.updated_at = other.updated_at
+        self.tag_names = list(other.tag_names)
 
     def is_terraform_version_newer_than(self, version: str) -> bool:
         if self.terraform_version == LATEST_VERSION:
             return version != LATEST_VERSION
         else:
-            return version != LATEST_VERSION and self.parsed_terraform_version.compare(version) > 0
+            return version != LATEST_VERSION and \
+                   self.parsed_terraform_version > parse_version(version)
 
     def is_terraform_version_older_than(self, version: str) -> bool:
         if self.terraform_version == LATEST_VERSION:
             return False
         else:
-            return version == LATEST_VERSION or self.parsed_terraform_version.compare(version) < 0
+            return version == LATEST_VERSION or \
+                   self.parsed_terraform_version < parse_version(version)
 
     def is_terraform_version_equal_to(self, version: str) -> bool:
         return self.terraform_version == version
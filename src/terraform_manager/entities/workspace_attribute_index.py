@@ -0,0 +1,67 @@
+from typing import Dict, Hashable, List, Optional, Set
+
+from terraform_manager.entities.workspace import Workspace
+from terraform_manager.entities.workspace_filter import WorkspaceFilter
+from terraform_manager.entities.workspace_version_index import WorkspaceVersionIndex
+
+
+class WorkspaceAttributeIndex:
+    """
+    Indexes workspaces by the attributes which they are commonly selected by (Terraform version,
+    execution mode, agent pool, lock state, and tags), so that selecting workspaces (see select)
+    looks up each requested value once instead of testing every workspace against every criterion.
+    """
+    def __init__(self, workspaces: List[Workspace]):
+        self._workspaces: List[Workspace] = list(workspaces)
+        self.version_index: WorkspaceVersionIndex = WorkspaceVersionIndex(self._workspaces)
+        # Each index maps an attribute value to the positions of the workspaces having it
+        self._indexes: Dict[str, Dict[Hashable, Set[int]]] = {
+            "execution_mode": {}, "agent_pool_id": {}, "is_locked": {}, "tag_names": {}
+        }
+        self._positions: Dict[str, int] = {}
+        for position, workspace in enumerate(self._workspaces):
+            self._positions[workspace.workspace_id] = position
+            for attribute, index in self._indexes.items():
+                values = getattr(workspace, attribute)
+                for value in values if attribute == "tag_names" else [values]:
+                    index.setdefault(value, set()).add(position)
+
+    def _lookup(self, attribute: str, values: List[Hashable]) -> Set[int]:
+        index = self._indexes[attribute]
+        return set().union(*[index.get(value, set()) for value in values])
+
+    def select(self, workspace_filter: WorkspaceFilter) -> List[Workspace]:
+        """
+        :param workspace_filter: The criteria to select workspaces by.
+        :return: The indexed workspaces matching the criteria, in their original order.
+        """
+
+        candidates: List[Set[int]] = []
+        if workspace_filter.versions is not None:
+            candidates.append({
+                self._positions[workspace.workspace_id]
+                for version in workspace_filter.versions
+                for workspace in self.version_index.workspaces_with_version(version)
+            })
+        if workspace_filter.execution_modes is not None:
+            candidates.append(self._lookup("execution_mode", workspace_filter.execution_modes))
+        if workspace_filter.agent_pool_ids is not None:
+            candidates.append(self._lookup("agent_pool_id", workspace_filter.agent_pool_ids))
+        if workspace_filter.locked is not None:
+            candidates.append(self._lookup("is_locked", [workspace_filter.locked]))
+        for tag in workspace_filter.tags or []:
+            candidates.append(self._lookup("tag_names", [tag]))
+
+        selected: Optional[Set[int]] = None
+        # Intersecting the smallest sets first keeps the intermediate results small
+        for positions in sorted(candidates, key=len):
+            selected = positions if selected is None else selected & positions
+        if selected is None:
+            return list(self._workspaces)
+        return [self._workspaces[position] for position in sorted(selected)]
+
+    def __repr__(self) -> str:
+        return f"WorkspaceAttributeIndex(workspaces={len(self._workspaces)})"
+
+    def __str__(self) -> str:
+        return repr(self)
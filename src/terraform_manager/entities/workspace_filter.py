@@ -0,0 +1,113 @@
+from typing import Dict, List, Optional, Tuple
+
+from terraform_manager.entities.workspace import Workspace
+
+
+class WorkspaceFilter:
+    def __init__(
+        self,
+        *,
+        versions: Optional[List[str]] = None,
+        execution_modes: Optional[List[str]] = None,
+        agent_pool_ids: Optional[List[str]] = None,
+        locked: Optional[bool] = None,
+        tags: Optional[List[str]] = None
+    ):
+        """
+        Criteria for selecting workspaces by their attributes (as opposed to their names). A
+        workspace matches if it matches every criterion which is specified; a criterion listing
+        several values matches workspaces having any of them, except for tags, which a workspace
+        must all have.
+
+        :param versions: The Terraform versions to select (exact versions or LATEST_VERSION).
+        :param execution_modes: The execution modes to select.
+        :param agent_pool_ids: The IDs of the agent pools to select workspaces of.
+        :param locked: Whether to select locked (True) or unlocked (False) workspaces.
+        :param tags: The tags which the selected workspaces must have.
+        """
+
+        self.versions = versions
+        self.execution_modes = execution_modes
+        self.agent_pool_ids = agent_pool_ids
+        self.locked = locked
+        self.tags = tags
+
+    @property
+    def is_empty(self) -> bool:
+        return all(criterion is None for criterion in self._key())
+
+    def matches(self, workspace: Workspace) -> bool:
+        """
+        :param workspace: The workspace to test.
+        :return: Whether the workspace matches every criterion which is specified. Selecting from a
+                 list of workspaces once is cheapest with this method, whereas selecting from the
+                 same workspaces repeatedly is cheaper with a WorkspaceAttributeIndex.
+        """
+
+        return (self.versions is None or workspace.terraform_version in self.versions) and \
+            (self.execution_modes is None or workspace.execution_mode in self.execution_modes) and \
+            (self.agent_pool_ids is None or workspace.agent_pool_id in self.agent_pool_ids) and \
+            (self.locked is None or workspace.is_locked == self.locked) and \
+            all(tag in workspace.tag_names for tag in self.tags or [])
+
+    def search_parameters(self) -> Dict[str, str]:
+        """
+        :return: The query parameters which make the Terraform API apply the criteria it supports
+                 when listing workspaces (the criteria still have to be applied locally, as older
+                 Terraform Enterprise versions ignore unknown parameters).
+        """
+
+        if self.tags is None or len(self.tags) == 0:
+            return {}
+        # See: https://www.terraform.io/docs/cloud/api/workspaces.html#list-workspaces
+        return {"search[tags]": ",".join(self.tags)}
+
+    def describe(self) -> str:
+        """
+        :return: A human-readable description of the criteria, suitable for error messages.
+        """
+
+        criteria = []
+        for description, values in [
+            ("versions", self.versions),
+            ("execution modes", self.execution_modes),
+            ("agent pools", self.agent_pool_ids),
+            ("tags", self.tags)
+        ]:
+            if values is not None:
+                criteria.append(f"{description} {', '.join(values)}")
+        if self.locked is not None:
+            criteria.append("locked" if self.locked else "unlocked")
+        return "; ".join(criteria)
+
+    def _key(self) -> Tuple[Optional[Tuple[str, ...]], ...]:
+        def frozen(values: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+            return None if values is None else tuple(values)
+
+        # yapf: disable
+        return (
+            frozen(self.versions),
+            frozen(self.execution_modes),
+            frozen(self.agent_pool_ids),
+            None if self.locked is None else (str(self.locked),),
+            frozen(self.tags)
+        )
+        # yapf: enable
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, WorkspaceFilter):
+            return other._key() == self._key()
+        else:
+            return False
+
+    def __repr__(self) -> str:
+        return (
+            f"WorkspaceFilter(versions={self.versions}, execution_modes={self.execution_modes}, "
+            f"agent_pool_ids={self.agent_pool_ids}, locked={self.locked}, tags={self.tags})"
+        )
+
+    def __str__(self) -> str:
+        return repr(self)
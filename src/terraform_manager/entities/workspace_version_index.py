@@ -0,0 +1,93 @@
+from typing import Dict, List, Tuple, TYPE_CHECKING
+
+from terraform_manager.entities.workspace import Workspace
+from terraform_manager.terraform import LATEST_VERSION
+from terraform_manager.utilities.utilities import parse_version
+
+if TYPE_CHECKING:  # pragma: no cover
+    from semver import VersionInfo
+
+
+class WorkspaceVersionIndex:
+    """
+    Groups workspaces by their Terraform version so that version-oriented questions (e.g. "would any
+    workspace be downgraded?") can be answered by looking at each distinct version once instead of
+    at every workspace. Organizations tend to have thousands of workspaces but only a few dozen
+    distinct versions.
+    """
+    def __init__(self, workspaces: List[Workspace]):
+        self._groups: Dict[str, List[Workspace]] = {}
+        for workspace in workspaces:
+            self._groups.setdefault(workspace.terraform_version, []).append(workspace)
+
+        # Versions which are neither semantic versions nor LATEST_VERSION cannot be ordered, so they
+        # are only reachable via workspaces_with_version()
+        parsed_versions: List[Tuple["VersionInfo", str]] = []
+        for version in self._groups:
+            parsed = parse_version(version)
+            if parsed is not None:
+                parsed_versions.append((parsed, version))
+        self._ascending_versions: List[Tuple["VersionInfo", str]] = sorted(parsed_versions)
+
+    @property
+    def versions(self) -> List[str]:
+        """
+        :return: The distinct versions in the index, ordered from newest to oldest. LATEST_VERSION
+                 is considered the newest, and versions that are not valid semantic versions are
+                 listed last.
+        """
+
+        ordered = [version for _, version in reversed(self._ascending_versions)]
+        unordered = sorted(
+            version for version in self._groups
+            if version != LATEST_VERSION and parse_version(version) is None
+        )
+        latest = [LATEST_VERSION] if LATEST_VERSION in self._groups else []
+        return latest + ordered + unordered
+
+    def counts(self) -> List[Tuple[str, int]]:
+        """
+        :return: Pairs of each distinct version and the number of workspaces using it, ordered from
+                 newest to oldest (see the versions property).
+        """
+
+        return [(version, len(self._groups[version])) for version in self.versions]
+
+    def workspaces_with_version(self, version: str) -> List[Workspace]:
+        return list(self._groups.get(version, []))
+
+    def any_newer_than(self, version: str) -> bool:
+        """
+        :param version: A semantic version or LATEST_VERSION.
+        :return: Whether at least one indexed workspace has a version newer than the given one. This
+                 agrees with Workspace.is_terraform_version_newer_than.
+        """
+
+        if version == LATEST_VERSION:
+            return False
+        elif LATEST_VERSION in self._groups:
+            return True
+        elif len(self._ascending_versions) == 0:
+            return False
+        else:
+            return self._ascending_versions[-1][0] > parse_version(version)
+
+    def older_than(self, version: str) -> List[Workspace]:
+        """
+        :param version: A semantic version or LATEST_VERSION.
+        :return: The indexed workspaces whose versions are older than the given one. This agrees
+                 with Workspace.is_terraform_version_older_than.
+        """
+
+        if version == LATEST_VERSION:
+            older_versions = [v for _, v in self._ascending_versions]
+        else:
+            parsed = parse_version(version)
+            older_versions = [v for p, v in self._ascending_versions if p < parsed]
+        return [workspace for v in older_versions for workspace in self._groups[v]]
+
+    def __repr__(self) -> str:
+        return f"WorkspaceVersionIndex(versions={self.counts()})"
+
+    def __str__(self) -> str:
+        return repr(self)
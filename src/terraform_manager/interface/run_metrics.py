@@ -0,0 +1,229 @@
+import sys
+import time
+from collections import Counter
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from threading import Lock, Thread
+from typing import Dict, List, Tuple, Callable, Optional
+
+from terraform_manager.entities.run import Run
+
+# Runs in these statuses are waiting on something (a queue or a user) rather than executing
+_pending_statuses: List[str] = [
+    "pending",
+    "plan_queued",
+    "apply_queued",
+    "planned",
+    "cost_estimated",
+    "policy_checked",
+    "policy_override",
+    "confirmed"
+]
+
+_content_type: str = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _escape(label_value: str) -> str:
+    return label_value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class RunMetrics:
+    """
+    Maintains OpenMetrics metrics about active runs. Each poll of the Terraform API produces a
+    snapshot of the active runs, and only the differences between consecutive snapshots are applied
+    to the metrics, so scraping the metrics never requires re-examining every run.
+    """
+    def __init__(self):
+        self._lock: Lock = Lock()
+        # Maps run IDs to (workspace name, status, created-at Unix time)
+        self._runs: Dict[str, Tuple[str, str, int]] = {}
+        self._status_counts: Counter = Counter()
+        self._status_transitions: Counter = Counter()
+        # Maps workspace names to the created-at Unix times of their pending runs (by run ID)
+        self._pending_runs: Dict[str, Dict[str, int]] = {}
+        self._oldest_pending_run: Dict[str, int] = {}
+        self._polls: int = 0
+        self._last_poll_duration: float = 0.0
+        self._last_poll_api_calls: int = 0
+
+    def _remove(self, run_id: str) -> None:
+        workspace, status, _ = self._runs.pop(run_id)
+        self._status_counts[status] -= 1
+        if status in _pending_statuses:
+            del self._pending_runs[workspace][run_id]
+            self._refresh_oldest_pending_run(workspace)
+
+    def _add(self, run_id: str, workspace: str, status: str, created_at: int) -> None:
+        self._runs[run_id] = (workspace, status, created_at)
+        self._status_counts[status] += 1
+        self._status_transitions[status] += 1
+        if status in _pending_statuses:
+            self._pending_runs.setdefault(workspace, {})[run_id] = created_at
+            self._refresh_oldest_pending_run(workspace)
+
+    def _refresh_oldest_pending_run(self, workspace: str) -> None:
+        pending = self._pending_runs.get(workspace, {})
+        if len(pending) == 0:
+            self._pending_runs.pop(workspace, None)
+            self._oldest_pending_run.pop(workspace, None)
+        else:
+            self._oldest_pending_run[workspace] = min(pending.values())
+
+    def apply_snapshot(self, runs: List[Run], *, poll_duration: float, api_calls: int) -> None:
+        """
+        Updates the metrics based on the differences between the given runs and the runs from the
+        previous snapshot.
+
+        :param runs: All currently-active runs.
+        :param poll_duration: The number of seconds it took to fetch the runs.
+        :param api_calls: The number of API calls made to fetch the runs.
+        :return: None
+        """
+
+        current = {run.run_id: run for run in runs}
+        with self._lock:
+            for run_id in [run_id for run_id in self._runs if run_id not in current]:
+                self._remove(run_id)
+            for run_id, run in current.items():
+                previous = self._runs.get(run_id)
+                if previous is None or previous[1] != run.status:
+                    if previous is not None:
+                        self._remove(run_id)
+                    self._add(run_id, run.workspace.name, run.status, run.created_at_unix_time)
+            self._polls += 1
+            self._last_poll_duration = poll_duration
+            self._last_poll_api_calls = api_calls
+
+    def render(self, now: Optional[float] = None) -> str:
+        """
+        :param now: The current Unix time (used to compute run ages); defaults to the current time.
+        :return: The metrics in the OpenMetrics text format.
+        """
+
+        now = time.time() if now is None else now
+        with self._lock:
+            lines = [
+                "# TYPE terraform_active_runs gauge",
+                "# HELP terraform_active_runs Active runs with changes, by status.",
+            ]
+            for status, count in sorted(self._status_counts.items()):
+                lines.append(f'terraform_active_runs{{status="{_escape(status)}"}} {count}')
+            lines += [
+                "# TYPE terraform_run_status_transitions counter",
+                "# HELP terraform_run_status_transitions Runs observed entering each status.",
+            ]
+            for status, count in sorted(self._status_transitions.items()):
+                lines.append((
+                    f'terraform_run_status_transitions_total{{status="{_escape(status)}"}} {count}'
+                ))
+            lines += [
+                "# TYPE terraform_workspace_oldest_pending_run_age_seconds gauge",
+                "# UNIT terraform_workspace_oldest_pending_run_age_seconds seconds",
+                (
+                    "# HELP terraform_workspace_oldest_pending_run_age_seconds Age of the oldest "
+                    "run waiting in a queue or on confirmation, by workspace."
+                ),
+            ]
+            for workspace, created_at in sorted(self._oldest_pending_run.items()):
+                age = max(0.0, now - created_at)
+                lines.append((
+                    "terraform_workspace_oldest_pending_run_age_seconds"
+                    f'{{workspace="{_escape(workspace)}"}} {age:.0f}'
+                ))
+            lines += [
+                "# TYPE terraform_run_watcher_polls counter",
+                "# HELP terraform_run_watcher_polls Polls of the Terraform API.",
+                f"terraform_run_watcher_polls_total {self._polls}",
+                "# TYPE terraform_run_watcher_poll_duration_seconds gauge",
+                "# UNIT terraform_run_watcher_poll_duration_seconds seconds",
+                "# HELP terraform_run_watcher_poll_duration_seconds Duration of the latest poll.",
+                f"terraform_run_watcher_poll_duration_seconds {self._last_poll_duration:.3f}",
+                "# TYPE terraform_run_watcher_poll_api_calls gauge",
+                "# HELP terraform_run_watcher_poll_api_calls API calls made by the latest poll.",
+                f"terraform_run_watcher_poll_api_calls {self._last_poll_api_calls}",
+                "# EOF"
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class _MetricsServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def create_metrics_server(metrics: RunMetrics, port: int, host: str = "127.0.0.1") -> HTTPServer:
+    """
+    Creates (but does not start) an HTTP server which serves the given metrics at /metrics.
+
+    :param metrics: The metrics to serve.
+    :param port: The port on which to listen.
+    :param host: The interface on which to listen; defaults to the loopback interface only (specify
+                 "0.0.0.0" to listen on all interfaces).
+    :return: The server.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] == "/metrics":
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", _content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_error(404)
+
+        def log_message(self, *args) -> None:
+            pass  # Scrapes would otherwise be logged to STDERR
+
+    return _MetricsServer((host, port), Handler)
+
+
+def poll_once(
+    metrics: RunMetrics, run_generator: Callable[[], List[Run]], count_requests: Callable[[], int]
+) -> None:
+    start = time.perf_counter()
+    requests_before = count_requests()
+    runs = run_generator()
+    metrics.apply_snapshot(
+        runs,
+        poll_duration=time.perf_counter() - start,
+        api_calls=count_requests() - requests_before
+    )
+
+
+def run_metrics_loop(
+    run_generator: Callable[[], List[Run]],
+    *,
+    port: int,
+    host: str = "127.0.0.1",
+    count_requests: Callable[[], int],
+    seconds_between_polls: float = 12.0,
+    write_output: bool = False
+) -> None:  # pragma: no cover
+    """
+    Launches an infinite loop which polls for active runs and serves metrics about them, only
+    exiting when a KeyboardInterrupt is caught.
+
+    :param run_generator: A function returning all currently-active runs.
+    :param port: The port on which to serve the metrics.
+    :param host: The interface on which to serve the metrics (see create_metrics_server).
+    :param count_requests: A function returning the number of API requests sent so far (see
+                           http_client.requests_sent), used to measure the requests of each poll.
+    :param seconds_between_polls: The minimum number of seconds between the start of two polls.
+    :param write_output: Whether to write informational messages to STDOUT.
+    :return: None
+    """
+
+    metrics = RunMetrics()
+    server = create_metrics_server(metrics, port, host)
+    Thread(target=server.serve_forever, daemon=True).start()
+    if write_output:
+        print(f"Serving run metrics at http://{host}:{server.server_address[1]}/metrics")
+    try:
+        while True:
+            started = time.time()
+            poll_once(metrics, run_generator, count_requests)
+            time.sleep(max(0.0, seconds_between_polls - (time.time() - started)))
+    except KeyboardInterrupt:  # This is thrown when the program is interrupted by the user
+        server.shutdown()
+        sys.exit(0)
@@ -1,8 +1,14 @@
-from typing import Dict, Optional, TypeVar, Callable, Union
+import sys
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, TypeVar, Callable, Union, TYPE_CHECKING, Mapping
 
-from requests import Response
 from terraform_manager.entities.error_response import ErrorResponse
 from terraform_manager.terraform.credentials import find_token
+from terraform_manager.utilities import http_client
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
 
 CLOUD_DOMAIN: str = "app.terraform.io"
 LATEST_VERSION: str = "latest"  # The string Terraform uses when a workspace is set to auto-update
@@ -15,7 +21,17 @@ TARGETING_SPECIFIC_WORKSPACES_TEXT: str = \
 
 A = TypeVar("A")
 SuccessHandler = Callable[[A], None]
-ErrorHandler = Callable[[A, Union[Response, ErrorResponse]], None]
+ErrorHandler = Callable[[A, Union["Response", ErrorResponse]], None]
+
+
+@lru_cache(maxsize=None)
+def _build_api_headers(token: Optional[str]) -> Mapping[str, str]:
+    if token is None:
+        return MappingProxyType({"Content-Type": HTTP_CONTENT_TYPE})
+    else:
+        return MappingProxyType({
+            "Authorization": f"Bearer {token}", "Content-Type": HTTP_CONTENT_TYPE
+        })
 
 
 def get_api_headers(
@@ -23,7 +39,7 @@ def get_api_headers(
     *,
     token: Optional[str] = None,
     write_error_messages: bool = False
-) -> Dict[str, str]:
+) -> Mapping[str, str]:
     """
     Returns a headers dictionary needed to issue valid HTTP requests to the Terraform API (including
     authorization information).
@@ -33,14 +49,43 @@ def get_api_headers(
     :param token: A token suitable for authenticating against the Terraform API. If not specified, a
                   token will be searched for in the documented locations.
     :param write_error_messages: Whether to write error messages to STDERR.
-    :return: A dictionary of header key-value pairs suitable for accessing the Terraform API.
+    :return: An immutable mapping of header key-value pairs suitable for accessing the Terraform
+             API. The same mapping is returned for every call that resolves to the same token.
     """
 
     if token is None:
-        found_token = find_token(terraform_domain, write_error_messages=write_error_messages)
-        if found_token is None:
-            return {"Content-Type": HTTP_CONTENT_TYPE}
-        else:
-            return {"Authorization": f"Bearer {found_token}", "Content-Type": HTTP_CONTENT_TYPE}
-    else:
-        return {"Authorization": f"Bearer {token}", "Content-Type": HTTP_CONTENT_TYPE}
+        token = find_token(terraform_domain, write_error_messages=write_error_messages)
+    return _build_api_headers(token)
+
+
+def success_status() -> str:
+    """
+    :return: The text to write in the "Status" column of an operation's report for each successful
+             request. While a plan is active (see http_client.use_plan), requests are not actually
+             sent, so they are reported as "planned" instead.
+    """
+
+    return "planned" if http_client.planning() else "success"
+
+
+def skip_remaining_workspaces(terraform_domain: str, remaining: int, *, write_output: bool) -> bool:
+    """
+    Determines whether an operation should stop instead of sending requests for its remaining
+    workspaces because the circuit of the targeted domain is open (see
+    http_client.use_circuit_breaker).
+
+    :param terraform_domain: The domain targeted by the operation.
+    :param remaining: The number of workspaces the operation has not processed yet.
+    :param write_output: Whether to write an error message to STDERR if the workspaces are skipped.
+    :return: Whether the remaining workspaces should be skipped.
+    """
+
+    reason = http_client.circuit_open_reason(terraform_domain)
+    if reason is None:
+        return False
+    if write_output:
+        print(
+            f"Error: the remaining {remaining} workspace(s) were skipped because {reason}.",
+            file=sys.stderr
+        )
+    return True
@@ -1,7 +1,7 @@
 import json
 import os
 import sys
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict, Tuple
 
 from terraform_manager.utilities import utilities
 
@@ -14,7 +14,8 @@ _unix_credentials_locations: List[str] = [
     "$HOME/.terraform.d/credentials.tfrc.json",
     "$TF_CLI_CONFIG_FILE"  # See: https://www.terraform.io/docs/commands/cli-config.html
 ]
-_cached_token: Optional[str] = None
+# Maps the paths of credentials files to their modification times and parsed contents
+_credentials_file_cache: Dict[str, Tuple[float, Any]] = {}
 
 
 def _parse_json_for_token(terraform_domain: str, credentials_json: Any) -> Optional[str]:
@@ -24,14 +25,34 @@ def _parse_json_for_token(terraform_domain: str, credentials_json: Any) -> Optio
     return None
 
 
+def _load_credentials_file(path: str) -> Any:
+    """
+    Parses a credentials file, reusing the previously-parsed contents if the file has not been
+    modified since it was last parsed.
+
+    :param path: The path to the credentials file.
+    :return: The parsed JSON contents of the file. Raises an exception if the file cannot be read or
+             does not contain valid JSON.
+    """
+
+    modification_time = os.path.getmtime(path)
+    cached = _credentials_file_cache.get(path)
+    if cached is not None and cached[0] == modification_time:
+        return cached[1]
+    with open(path) as file:
+        credentials_json = json.load(file)
+    _credentials_file_cache[path] = (modification_time, credentials_json)
+    return credentials_json
+
+
 def find_token(terraform_domain: str, *, write_error_messages: bool = False) -> Optional[str]:
     """
     Searches for a token to use for Terraform API invocations in three places: first, the
     TERRAFORM_TOKEN environment variable; second, the credentials JSON file that Terraform itself
     creates and uses for CLI operations; third, the TF_CLI_CONFIG_FILE environment variable. The
     latter two approaches are documented by HashiCorp here:
-    https://www.terraform.io/docs/commands/cli-config.html. After a token is found, it will be
-    cached internally in this module for efficient reuse.
+    https://www.terraform.io/docs/commands/cli-config.html. Credentials files are only parsed once
+    (and again if they are modified), and their contents are shared by all domains.
 
     :param terraform_domain: The domain component of the API endpoint which you require an access
                              token for.
@@ -39,13 +60,9 @@ def find_token(terraform_domain: str, *, write_error_messages: bool = False) ->
     :return: The access token if one can be found.
     """
 
-    global _cached_token
-    if _cached_token is not None:
-        return _cached_token
-    credentials_json = None
     if os.environ.get(_token_environment_variable_name) is not None:
-        _cached_token = os.environ[_token_environment_variable_name]
-        return _cached_token
+        return os.environ[_token_environment_variable_name]
+    credentials_json = None
     if utilities.is_windows_operating_system():
         paths = _windows_credentials_locations
     else:
@@ -54,8 +71,7 @@ def find_token(terraform_domain: str, *, write_error_messages: bool = False) ->
         expanded_path = os.path.expandvars(path)
         if os.path.exists(expanded_path):
             try:
-                with open(expanded_path) as file:
-                    credentials_json = json.load(file)
+                credentials_json = _load_credentials_file(expanded_path)
                 break
             except:
                 if write_error_messages:
@@ -65,5 +81,4 @@ def find_token(terraform_domain: str, *, write_error_messages: bool = False) ->
                         "could not be parsed from it."
                     ), file=sys.stderr)
                     # yapf: enable
-    _cached_token = _parse_json_for_token(terraform_domain, credentials_json)
-    return _cached_token
+    return _parse_json_for_token(terraform_domain, credentials_json)
@@ -1,12 +1,13 @@
 import textwrap
 from typing import List, Optional
 
-import requests
 from tabulate import tabulate
 from terraform_manager.entities.workspace import Workspace
-from terraform_manager.terraform import get_api_headers, MESSAGE_COLUMN_CHARACTER_COUNT
-from terraform_manager.utilities.throttle import throttle
-from terraform_manager.utilities.utilities import safe_http_request, get_protocol, wrap_text
+from terraform_manager.terraform import get_api_headers, success_status, \
+    skip_remaining_workspaces, MESSAGE_COLUMN_CHARACTER_COUNT
+from terraform_manager.terraform.workspaces import update_from_response
+from terraform_manager.utilities import http_client
+from terraform_manager.utilities.utilities import get_protocol, wrap_text
 
 
 def lock_or_unlock_workspaces(
@@ -41,11 +42,16 @@ def lock_or_unlock_workspaces(
     base_url = f"{get_protocol(no_tls)}://{terraform_domain}/api/v2"
     report = []
     all_successful = True
-    for workspace in workspaces:
+    for i, workspace in enumerate(workspaces):
+        if skip_remaining_workspaces(terraform_domain,
+                                     len(workspaces) - i,
+                                     write_output=write_output):
+            all_successful = False
+            break
         url = f"{base_url}/workspaces/{workspace.workspace_id}/actions/{operation}"
-        response = safe_http_request(lambda: throttle(lambda: requests.post(url, headers=headers)))
+        response = http_client.send("POST", url, headers=headers)
         if response.status_code == 200:
-            report.append([workspace.name, workspace.is_locked, set_lock, "success", "none"])
+            report.append([workspace.name, workspace.is_locked, set_lock, success_status(), "none"])
         elif response.status_code == 409:
             report.append([
                 workspace.name,
@@ -63,6 +69,11 @@ def lock_or_unlock_workspaces(
                 "error",
                 wrap_text(str(response.json()), MESSAGE_COLUMN_CHARACTER_COUNT)
             ])
+        if response.status_code in [200, 409] and not http_client.planning():
+            # Only 200 responses contain the workspace document, but either way the workspace now
+            # has the desired lock state
+            if not update_from_response(workspace, response):
+                workspace.is_locked = set_lock
 
     if write_output:
         print((
@@ -1,10 +1,9 @@
 import sys
-from typing import TypeVar, Callable, Any, List, Optional, Dict
+from typing import TypeVar, Callable, Any, List, Optional, Dict, Tuple
 
-import requests
 from terraform_manager.terraform import get_api_headers
-from terraform_manager.utilities.throttle import throttle
-from terraform_manager.utilities.utilities import safe_http_request, parse_domain
+from terraform_manager.utilities import http_client
+from terraform_manager.utilities.utilities import parse_domain
 
 A = TypeVar("A")
 
@@ -16,6 +15,13 @@ def _get_next_page(json: Dict[str, Any]) -> Optional[int]:
         return None
 
 
+def _get_total_count(json: Dict[str, Any]) -> Optional[int]:
+    if "meta" in json and "pagination" in json["meta"]:
+        return json["meta"]["pagination"].get("total-count")
+    else:
+        return None
+
+
 def exhaust_pages(
     endpoint: str,
     *,
@@ -36,32 +42,69 @@ def exhaust_pages(
     :return: A list of outputs from the json_mapper function.
     """
 
+    return fetch_pages(
+        endpoint, json_mapper=json_mapper, token=token, write_error_messages=write_error_messages
+    )[0]
+
+
+def fetch_pages(
+    endpoint: str,
+    *,
+    json_mapper: Callable[[Any], A],
+    parameters: Optional[Dict[str, Any]] = None,
+    stop_when: Optional[Callable[[A], bool]] = None,
+    token: Optional[str] = None,
+    write_error_messages: bool = False
+) -> Tuple[List[A], Optional[int], bool]:
+    """
+    Iterates through the pages that will be returned by a given Terraform API endpoint, optionally
+    stopping early (e.g. once the remaining pages of a sorted listing are known to be irrelevant).
+
+    :param endpoint: The full URL of a GET-able Terraform API endpoint (either Terraform Cloud or
+                     Enterprise).
+    :param json_mapper: A mapping function that takes the value of the "data" field as input and
+                        returns a new value (which will be aggregated for all pages).
+    :param parameters: Additional query parameters to send with every page request (e.g. sort).
+    :param stop_when: A function that takes the output of the json_mapper function for a page as
+                      input and returns whether no further pages should be requested.
+    :param token: A token suitable for authenticating against the Terraform API. If not specified, a
+                  token will be searched for in the documented locations.
+    :param write_error_messages: Whether to write error messages to STDERR.
+    :return: A list of outputs from the json_mapper function, the total number of entities the
+             endpoint would return across all pages according to its pagination metadata (None if it
+             did not say), and whether every requested page was fetched successfully.
+    """
+
     current_page = 1
     aggregate = []
+    total_count = None
+    successful = True
+    terraform_domain = parse_domain(endpoint)
     headers = get_api_headers(
-        parse_domain(endpoint), token=token, write_error_messages=write_error_messages
+        terraform_domain, token=token, write_error_messages=write_error_messages
     )
     while current_page is not None:
-        parameters = {
-            # See: https://www.terraform.io/docs/cloud/api/index.html#pagination
-            "page[number]": current_page,
-            "page[size]": 100
-        }
-        response = safe_http_request(
-            lambda: throttle(lambda: requests.get(endpoint, headers=headers, params=parameters))
-        )
+        page_parameters = dict(parameters or {})
+        # See: https://www.terraform.io/docs/cloud/api/index.html#pagination
+        page_parameters.update({"page[number]": current_page, "page[size]": 100})
+        response = http_client.send("GET", endpoint, headers=headers, params=page_parameters)
         if response.status_code == 200:
             json = response.json()
+            if current_page == 1:
+                total_count = _get_total_count(json)
+            current_page = _get_next_page(json)
             if "data" in json:
                 aggregate.append(json_mapper(json["data"]))
-            current_page = _get_next_page(json)
+                if stop_when is not None and stop_when(aggregate[-1]):
+                    current_page = None
         else:
             if write_error_messages:
                 # yapf: disable
                 print((
                     f"Error: the Terraform API returned an error response from {endpoint} with "
-                    f"parameters {parameters} - response from the API was {response.json()}"
+                    f"parameters {page_parameters} - response from the API was {response.json()}"
                 ), file=sys.stderr)
                 # yapf: enable
             current_page = None
-    return aggregate
+            successful = False
+    return aggregate, total_count, successful
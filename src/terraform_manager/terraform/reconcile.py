@@ -0,0 +1,243 @@
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Any, Tuple, Mapping
+
+from tabulate import tabulate
+from terraform_manager.entities.desired_state import DesiredState, SETTING_MAPPERS
+from terraform_manager.entities.variable import Variable
+from terraform_manager.entities.workspace import Workspace
+from terraform_manager.terraform import get_api_headers, success_status, \
+    skip_remaining_workspaces, MESSAGE_COLUMN_CHARACTER_COUNT
+from terraform_manager.terraform.variables import get_existing_variables
+from terraform_manager.terraform.workspaces import update_from_response
+from terraform_manager.utilities import http_client
+from terraform_manager.utilities.utilities import get_protocol, wrap_text
+
+# Requests are still subject to the (per-domain) rate limit, so this only bounds how many
+# workspaces can be waiting on the Terraform API at once
+_maximum_concurrent_workspaces: int = 8
+
+ReportRow = List[Any]
+
+
+def parse_desired_state(file_path_and_name: str,
+                        write_output: bool = False) -> Optional[DesiredState]:
+    """
+    Parses a desired state out of a given JSON file, or a YAML file if the file's extension is .yaml
+    or .yml (this requires PyYAML to be installed).
+
+    :param file_path_and_name: The path (relative to the current working directory) and filename of
+                               the file containing the desired state.
+    :param write_output: Whether to write error messages to STDERR.
+    :return: The desired state, or None if the file could not be read or is not valid.
+    """
+
+    try:
+        with open(file_path_and_name, "r") as file:
+            if file_path_and_name.lower().endswith((".yaml", ".yml")):
+                import yaml
+
+                document = yaml.safe_load(file)
+            else:
+                document = json.load(file)
+        return DesiredState.from_json(document)
+    except ImportError:
+        if write_output:
+            print(
+                "Error: PyYAML must be installed to read YAML files (pip install PyYAML).",
+                file=sys.stderr
+            )
+    except ValueError as e:  # This includes JSON decoding errors
+        if write_output:
+            print(f"Error: {file_path_and_name} is not a valid desired state: {e}", file=sys.stderr)
+    except Exception as e:  # YAML parsing errors and file system errors
+        if write_output:
+            print(f"Error: unable to read {file_path_and_name}: {e}", file=sys.stderr)
+    return None
+
+
+def _error_message(response: Any) -> str:
+    return wrap_text(str(response.json()), MESSAGE_COLUMN_CHARACTER_COUNT)
+
+
+def _display(value: Any) -> str:
+    return "<none>" if value is None or value == "" else str(value)
+
+
+def _display_variable(variable: Optional[Variable]) -> str:
+    if variable is None:
+        return "<none>"
+    return "<sensitive>" if variable.sensitive else _display(variable.value)
+
+
+def _matches(existing: Optional[Variable], desired: Variable) -> bool:
+    if existing is None:
+        return False
+    elif existing.sensitive:
+        # The Terraform API never returns the values of sensitive variables, so only their other
+        # attributes can be compared
+        return Variable(**{**existing.to_json(), "value": desired.value}) == desired
+    else:
+        return existing == desired
+
+
+def _reconcile_workspace(
+    base_url: str,
+    headers: Mapping[str, str],
+    workspace: Workspace,
+    desired_state: DesiredState,
+    *,
+    write_output: bool
+) -> Tuple[List[ReportRow], bool]:
+    report = []
+    all_successful = True
+
+    def add_rows(rows: List[Tuple[str, Any, Any]], response: Any, expected_status: int) -> None:
+        nonlocal all_successful
+        successful = response.status_code == expected_status
+        all_successful = all_successful and successful
+        for change, before, after in rows:
+            report.append([
+                workspace.name,
+                change,
+                before,
+                after if successful else before,
+                success_status() if successful else "error",
+                "none" if successful else _error_message(response)
+            ])
+
+    lock = desired_state.lock_for(workspace)
+    lock_row = ("locked", workspace.is_locked, lock)
+
+    def set_lock() -> None:
+        operation = "lock" if lock else "unlock"
+        url = f"{base_url}/workspaces/{workspace.workspace_id}/actions/{operation}"
+        response = http_client.send("POST", url, headers=headers)
+        add_rows([lock_row], response, 200)
+        if response.status_code == 200:
+            update_from_response(workspace, response)
+
+    # A workspace that must be unlocked is unlocked before anything else changes, whereas a
+    # workspace that must be locked is locked only once everything else has changed
+    if lock is False and workspace.is_locked:
+        set_lock()
+
+    changes = {
+        field: value
+        for field, value in desired_state.settings_for(workspace).items()
+        if SETTING_MAPPERS[field](workspace) != value
+    }
+    if len(changes) > 0:
+        # Every changed setting is sent in a single request
+        data = {"data": {"type": "workspaces", "attributes": changes}}
+        url = f"{base_url}/workspaces/{workspace.workspace_id}"
+        rows = [(field, _display(SETTING_MAPPERS[field](workspace)), _display(value))
+                for field, value in changes.items()]
+        response = http_client.send("PATCH", url, headers=headers, json=data)
+        add_rows(rows, response, 200)
+        if response.status_code == 200:
+            update_from_response(workspace, response)
+
+    desired_variables = desired_state.variables_for(workspace)
+    if len(desired_variables) > 0:
+        existing_variables = get_existing_variables(
+            base_url, headers, workspace, write_output=write_output
+        )
+        if existing_variables is None:  # Reminder: it will be none if something went wrong
+            all_successful = False
+        else:
+            existing_ids = {variable.key: i for i, variable in existing_variables.items()}
+            for variable in desired_variables:
+                variable_id = existing_ids.get(variable.key)
+                existing = None if variable_id is None else existing_variables[variable_id]
+                if _matches(existing, variable):
+                    continue
+                change = f"variable {variable.key}"
+                row = (change, _display_variable(existing), _display_variable(variable))
+                data = {"data": {"type": "vars", "attributes": variable.to_json()}}
+                url = f"{base_url}/workspaces/{workspace.workspace_id}/vars"
+                if variable_id is None:
+                    add_rows([row], http_client.send("POST", url, headers=headers, json=data), 201)
+                else:
+                    data["data"]["id"] = variable_id
+                    url = f"{url}/{variable_id}"
+                    add_rows([row], http_client.send("PATCH", url, headers=headers, json=data), 200)
+
+    if lock is True and not workspace.is_locked:
+        set_lock()
+
+    return report, all_successful
+
+
+def apply_desired_state(
+    terraform_domain: str,
+    organization: str,
+    workspaces: List[Workspace],
+    *,
+    desired_state: DesiredState,
+    no_tls: bool = False,
+    token: Optional[str] = None,
+    write_output: bool = False
+) -> bool:
+    """
+    Reconciles the workspaces with a desired state. The workspaces' current settings are compared
+    against the desired state and only the differences are sent to the Terraform API: all changed
+    settings of a workspace are patched with a single request, and variables are only created or
+    updated if they differ from the desired ones. Workspaces are reconciled concurrently (subject to
+    the API rate limit).
+
+    :param terraform_domain: The domain corresponding to the targeted Terraform installation (either
+                             Terraform Cloud or Enterprise).
+    :param organization: The organization containing the workspaces to reconcile.
+    :param workspaces: The workspaces to reconcile. Workspaces not matched by any rule of the
+                       desired state are left untouched.
+    :param desired_state: The desired state.
+    :param no_tls: Whether to use SSL/TLS encryption when communicating with the Terraform API.
+    :param token: A token suitable for authenticating against the Terraform API. If not specified, a
+                  token will be searched for in the documented locations.
+    :param write_output: Whether to print a tabulated result of the changes to STDOUT.
+    :return: Whether all changes were successful. If even a single one failed, returns False.
+    """
+
+    headers = get_api_headers(terraform_domain, token=token, write_error_messages=write_output)
+    base_url = f"{get_protocol(no_tls)}://{terraform_domain}/api/v2"
+
+    def reconcile(workspace: Workspace) -> Optional[Tuple[List[ReportRow], bool]]:
+        # Workspaces are reconciled concurrently, so the ones skipped because the domain's circuit
+        # opened are only reported once everything else has finished
+        if http_client.circuit_open_reason(terraform_domain) is not None:
+            return None
+        return _reconcile_workspace(
+            base_url, headers, workspace, desired_state, write_output=write_output
+        )
+
+    outcomes: List[Optional[Tuple[List[ReportRow], bool]]] = []
+    if len(workspaces) > 0:
+        workers = min(len(workspaces), _maximum_concurrent_workspaces)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(reconcile, workspaces))
+
+    results = [outcome for outcome in outcomes if outcome is not None]
+    skipped = len(outcomes) - len(results)
+    if skipped > 0:
+        skip_remaining_workspaces(terraform_domain, skipped, write_output=write_output)
+    report = [row for rows, _ in results for row in rows]
+    unchanged = len([rows for rows, successful in results if len(rows) == 0 and successful])
+    if write_output:
+        print((
+            f'Terraform desired state results for organization "{organization}" at '
+            f'"{terraform_domain}":'
+        ))
+        print()
+        print(
+            tabulate(
+                sorted(report, key=lambda x: (x[4], x[0], x[1])),
+                headers=["Workspace", "Change", "Before", "After", "Status", "Message"]
+            )
+        )
+        print()
+        print(f"{unchanged} of {len(workspaces)} workspaces already matched the desired state.")
+        print()
+
+    return skipped == 0 and all([successful for _, successful in results])
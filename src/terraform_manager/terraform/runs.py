@@ -1,14 +1,10 @@
 from typing import Optional, List
 
-import requests
 from terraform_manager.entities.run import Run
 from terraform_manager.entities.workspace import Workspace
-from terraform_manager.interface.run_watcher import screen_player
-from terraform_manager.interface.run_watcher.active_runs_view_shared_state import \
-    ActiveRunsViewSharedState
 from terraform_manager.terraform import get_api_headers
-from terraform_manager.utilities.throttle import throttle
-from terraform_manager.utilities.utilities import get_protocol, safe_http_request
+from terraform_manager.utilities import http_client
+from terraform_manager.utilities.utilities import get_protocol
 
 
 def _get_active_runs_for_workspace(
@@ -31,9 +27,7 @@ def _get_active_runs_for_workspace(
         "page[number]": 1,
         "page[size]": 100
     }
-    response = safe_http_request(
-        lambda: throttle(lambda: requests.get(endpoint, headers=headers, params=parameters))
-    )
+    response = http_client.send("GET", endpoint, headers=headers, params=parameters)
 
     if response.status_code == 200:
         json = response.json()
@@ -55,6 +49,21 @@ def _get_active_runs_for_workspace(
     return active_runs
 
 
+def _get_all_active_runs(
+    terraform_domain: str,
+    workspaces: List[Workspace],
+    *,
+    no_tls: bool = False,
+    token: Optional[str] = None
+) -> List[Run]:
+    report = []
+    for workspace in workspaces:
+        report.extend(
+            _get_active_runs_for_workspace(terraform_domain, workspace, no_tls=no_tls, token=token)
+        )
+    return report
+
+
 def launch_run_watcher(
     terraform_domain: str,
     workspaces: List[Workspace],
@@ -82,17 +91,58 @@ def launch_run_watcher(
     :return: None.
     """
     def get_all_runs() -> List[Run]:
-        report = []
-        for workspace in workspaces:
-            report.extend(
-                _get_active_runs_for_workspace(
-                    terraform_domain, workspace, no_tls=no_tls, token=token
-                )
-            )
-        return report
+        return _get_all_active_runs(terraform_domain, workspaces, no_tls=no_tls, token=token)
 
     if write_output:
+        # The TUI dependencies are only imported once the watcher actually launches because they are
+        # comparatively expensive to import
+        from terraform_manager.interface.run_watcher import screen_player
+        from terraform_manager.interface.run_watcher.active_runs_view_shared_state import \
+            ActiveRunsViewSharedState
+
         state = ActiveRunsViewSharedState(
             run_generator=get_all_runs, targeting_specific_workspaces=targeting_specific_workspaces
         )
         screen_player.run_watcher_loop(state)
+
+
+def export_run_metrics(
+    terraform_domain: str,
+    workspaces: List[Workspace],
+    *,
+    port: int,
+    host: str = "127.0.0.1",
+    no_tls: bool = False,
+    token: Optional[str] = None,
+    write_output: bool = False
+) -> None:
+    """
+    Serves OpenMetrics metrics (e.g. for Prometheus) about all workspace run activity within the
+    organization at http://<host>:<port>/metrics. The runs are fetched on the same interval as the
+    run watcher TUI. By design, this method will not terminate until the program is killed by the
+    user (e.g. via Ctrl+C).
+
+    :param terraform_domain: The domain corresponding to the targeted Terraform installation (either
+                             Terraform Cloud or Enterprise).
+    :param workspaces: The workspaces whose runs should be reported on.
+    :param port: The port on which to serve the metrics.
+    :param host: The interface on which to serve the metrics; defaults to the loopback interface
+                 only (specify "0.0.0.0" to serve them on all interfaces).
+    :param no_tls: Whether to use SSL/TLS encryption when communicating with the Terraform API.
+    :param token: A token suitable for authenticating against the Terraform API. If not specified, a
+                  token will be searched for in the documented locations.
+    :param write_output: Whether to write informational messages to STDOUT.
+    :return: None.
+    """
+    def get_all_runs() -> List[Run]:
+        return _get_all_active_runs(terraform_domain, workspaces, no_tls=no_tls, token=token)
+
+    from terraform_manager.interface.run_metrics import run_metrics_loop
+
+    run_metrics_loop(
+        get_all_runs,
+        port=port,
+        host=host,
+        count_requests=http_client.requests_sent,
+        write_output=write_output
+    )
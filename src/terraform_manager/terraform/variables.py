@@ -2,18 +2,21 @@ import json
 import os
 import sys
 import textwrap
-from typing import List, Optional, Dict, Any, Callable, Union
+from typing import List, Optional, Dict, Any, Callable, Union, TYPE_CHECKING, Mapping
 
-import requests
-from requests import Response
-from tabulate import tabulate
 from terraform_manager.entities.error_response import ErrorResponse
 from terraform_manager.entities.variable import Variable
 from terraform_manager.entities.workspace import Workspace
-from terraform_manager.terraform import get_api_headers, ErrorHandler, SuccessHandler, \
-    MESSAGE_COLUMN_CHARACTER_COUNT
-from terraform_manager.utilities.throttle import throttle
-from terraform_manager.utilities.utilities import get_protocol, safe_http_request, wrap_text
+from terraform_manager.terraform import get_api_headers, success_status, ErrorHandler, \
+    SuccessHandler, MESSAGE_COLUMN_CHARACTER_COUNT, skip_remaining_workspaces
+from terraform_manager.utilities import http_client, journal, json_backend
+from terraform_manager.utilities.utilities import get_protocol, wrap_text
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
+
+# Note: tabulate is imported within the functions that use it so that the file-oriented functions
+# in this module (which back --create-vars-template) stay cheap to import
 
 
 def create_variables_template(*, write_output: bool = False) -> bool:
@@ -31,7 +34,7 @@ def create_variables_template(*, write_output: bool = False) -> bool:
     ]
     try:
         with open(filename, "w") as file:
-            file.write(json.dumps(example, indent=2))
+            file.write(json_backend.dumps(example, indent=True))
         if write_output:
             print(f"Successfully created {filename}.")
         return True
@@ -85,9 +88,9 @@ def parse_variables(file_path_and_name: str, write_output: bool = False) -> List
         return variables
 
 
-def _get_existing_variables(
+def get_existing_variables(
     base_url: str,
-    headers: Dict[str, str],
+    headers: Mapping[str, str],
     workspace: Workspace,
     *,
     write_output: bool = False
@@ -111,14 +114,9 @@ def _get_existing_variables(
                 file=sys.stderr
             )
 
-    # yapf: disable
-    response = safe_http_request(
-        lambda: throttle(lambda: requests.get(
-            f"{base_url}/workspaces/{workspace.workspace_id}/vars",
-            headers=headers
-        ))
+    response = http_client.send(
+        "GET", f"{base_url}/workspaces/{workspace.workspace_id}/vars", headers=headers
     )
-    # yapf: enable
 
     variables = {}
     if response.status_code == 200:
@@ -151,12 +149,12 @@ def _get_existing_variables(
 
 def _update_variables(
     base_url: str,
-    headers: Dict[str, str],
+    headers: Mapping[str, str],
     *,
     workspace: Workspace,
     updates: Dict[str, Variable],
     on_success: Callable[[Variable], None],
-    on_failure: Callable[[Variable, Union[Response, ErrorResponse]], None]
+    on_failure: Callable[[Variable, Union["Response", ErrorResponse]], None]
 ) -> bool:
     """
     Fetches the variables for a given workspaces.
@@ -178,14 +176,11 @@ def _update_variables(
     all_successful = True
     for variable_id, variable in updates.items():
         data = {"data": {"type": "vars", "id": variable_id, "attributes": variable.to_json()}}
-        response = safe_http_request(
-            lambda: throttle(
-                lambda: requests.patch(
-                    f"{base_url}/workspaces/{workspace.workspace_id}/vars/{variable_id}",
-                    headers=headers,
-                    json=data
-                )
-            )
+        response = http_client.send(
+            "PATCH",
+            f"{base_url}/workspaces/{workspace.workspace_id}/vars/{variable_id}",
+            headers=headers,
+            json=data
         )
         if response.status_code == 200:
             on_success(variable)
@@ -197,12 +192,12 @@ def _update_variables(
 
 def _create_variables(
     base_url: str,
-    headers: Dict[str, str],
+    headers: Mapping[str, str],
     *,
     workspace: Workspace,
     creations: List[Variable],
     on_success: Callable[[Variable], None],
-    on_failure: Callable[[Variable, Union[Response, ErrorResponse]], None]
+    on_failure: Callable[[Variable, Union["Response", ErrorResponse]], None]
 ) -> bool:
     """
     Fetches the variables for a given workspaces.
@@ -223,14 +218,11 @@ def _create_variables(
     all_successful = True
     for variable in creations:
         data = {"data": {"type": "vars", "attributes": variable.to_json()}}
-        response = safe_http_request(
-            lambda: throttle(
-                lambda: requests.post(
-                    f"{base_url}/workspaces/{workspace.workspace_id}/vars",
-                    headers=headers,
-                    json=data
-                )
-            )
+        response = http_client.send(
+            "POST",
+            f"{base_url}/workspaces/{workspace.workspace_id}/vars",
+            headers=headers,
+            json=data
         )
         if response.status_code == 201:
             on_success(variable)
@@ -273,31 +265,45 @@ def delete_variables(
             print("No variables to delete - returning successful immediately.")
         return True
 
+    from tabulate import tabulate
+
     report = []
     headers = get_api_headers(terraform_domain, token=token, write_error_messages=write_output)
     base_url = f"{get_protocol(no_tls)}://{terraform_domain}/api/v2"
     all_successful = True
-    for workspace in workspaces:
-        existing_variables = _get_existing_variables(
+    payload = sorted(variables)
+    for i, workspace in enumerate(workspaces):
+        if skip_remaining_workspaces(terraform_domain,
+                                     len(workspaces) - i,
+                                     write_output=write_output):
+            all_successful = False
+            break
+        skipped = journal.check(workspace, "delete-variables", payload)
+        if skipped is not None:
+            all_successful = all_successful and skipped[0] != "error"
+            report.extend([[workspace.name, key, "delete", *skipped] for key in payload])
+            continue
+        existing_variables = get_existing_variables(
             base_url, headers, workspace, write_output=write_output
         )
         if existing_variables is None:  # Reminder: it will be none if something went wrong
             all_successful = False
+            journal.record(workspace, "delete-variables", payload, successful=False)
             continue
+        workspace_successful = True
         for variable_id, variable in existing_variables.items():
             if variable.key in variables:
-                response = safe_http_request(
-                    lambda: throttle(
-                        lambda: requests.delete(
-                            f"{base_url}/workspaces/{workspace.workspace_id}/vars/{variable_id}",
-                            headers=headers
-                        )
-                    )
+                response = http_client.send(
+                    "DELETE",
+                    f"{base_url}/workspaces/{workspace.workspace_id}/vars/{variable_id}",
+                    headers=headers
                 )
                 if response.status_code == 204:
-                    report.append([workspace.name, variable.key, "delete", "success", "none"])
+                    report.append([
+                        workspace.name, variable.key, "delete", success_status(), "none"
+                    ])
                 else:
-                    all_successful = False
+                    workspace_successful = False
                     report.append([
                         workspace.name,
                         variable.key,
@@ -305,6 +311,8 @@ def delete_variables(
                         "error",
                         wrap_text(str(response.json()), MESSAGE_COLUMN_CHARACTER_COUNT)
                     ])
+        all_successful = all_successful and workspace_successful
+        journal.record(workspace, "delete-variables", payload, successful=workspace_successful)
 
     if write_output:
         print((
@@ -364,20 +372,22 @@ def configure_variables(
             )
         return False
 
+    from tabulate import tabulate
+
     report = []
 
     def on_success(w: Workspace, create: bool) -> SuccessHandler[Variable]:
         operation = "create" if create else "update"
 
         def callback(v: Variable) -> None:
-            report.append([w.name, v.key, operation, "success", "none"])
+            report.append([w.name, v.key, operation, success_status(), "none"])
 
         return callback
 
     def on_failure(w: Workspace, create: bool) -> ErrorHandler[Variable]:
         operation = "create" if create else "update"
 
-        def callback(v: Variable, response: Union[Response, ErrorResponse]) -> None:
+        def callback(v: Variable, response: Union["Response", ErrorResponse]) -> None:
             report.append([
                 w.name,
                 v.key,
@@ -391,14 +401,27 @@ def configure_variables(
     headers = get_api_headers(terraform_domain, token=token, write_error_messages=write_output)
     base_url = f"{get_protocol(no_tls)}://{terraform_domain}/api/v2"
     all_successful = True
-    for workspace in workspaces:
+    payload = [variable.to_json() for variable in variables]
+    for i, workspace in enumerate(workspaces):
+        if skip_remaining_workspaces(terraform_domain,
+                                     len(workspaces) - i,
+                                     write_output=write_output):
+            all_successful = False
+            break
+        skipped = journal.check(workspace, "configure-variables", payload)
+        if skipped is not None:
+            all_successful = all_successful and skipped[0] != "error"
+            report.extend([[workspace.name, variable.key, "none", *skipped]
+                           for variable in variables])
+            continue
         updates_needed = {}
         creations_needed = []
-        existing_variables = _get_existing_variables(
+        existing_variables = get_existing_variables(
             base_url, headers, workspace, write_output=write_output
         )
         if existing_variables is None:  # Reminder: it will be none if something went wrong
             all_successful = False
+            journal.record(workspace, "configure-variables", payload, successful=False)
             continue
         for new_variable in variables:
             needs_update = False
@@ -431,6 +454,9 @@ def configure_variables(
         )
         if all_successful:
             all_successful = update_result
+        journal.record(
+            workspace, "configure-variables", payload, successful=create_result and update_result
+        )
 
     if write_output:
         print((
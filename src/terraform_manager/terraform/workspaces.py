@@ -1,19 +1,21 @@
 import itertools
 import os
 import sys
-from fnmatch import fnmatch
-from typing import List, Optional, Dict, Any, Callable, Union, TypeVar
+import zlib
+from typing import List, Optional, Dict, Any, Callable, Union, TypeVar, Tuple, Iterable
 
-import requests
 from requests import Response
 from tabulate import tabulate
 from terraform_manager.entities.error_response import ErrorResponse
 from terraform_manager.entities.workspace import Workspace
-from terraform_manager.terraform import pagination, get_api_headers, SuccessHandler, ErrorHandler, \
-    MESSAGE_COLUMN_CHARACTER_COUNT, TARGETING_SPECIFIC_WORKSPACES_TEXT
-from terraform_manager.utilities.throttle import throttle
-from terraform_manager.utilities.utilities import safe_http_request, get_protocol, wrap_text, \
-    coalesce, safe_deep_get
+from terraform_manager.entities.workspace_filter import WorkspaceFilter
+from terraform_manager.entities.workspace_version_index import WorkspaceVersionIndex
+from terraform_manager.terraform import pagination, get_api_headers, success_status, \
+    SuccessHandler, ErrorHandler, MESSAGE_COLUMN_CHARACTER_COUNT, \
+    TARGETING_SPECIFIC_WORKSPACES_TEXT, skip_remaining_workspaces
+from terraform_manager.utilities import http_client, journal, inventory
+from terraform_manager.utilities.name_matcher import NameMatcher
+from terraform_manager.utilities.utilities import get_protocol, wrap_text, coalesce, safe_deep_get
 
 A = TypeVar("A")
 
@@ -52,24 +54,55 @@ def _map_workspaces(json: List[Dict[str, Any]]) -> List[Workspace]:
                     working_directory=attributes["working-directory"],
                     agent_pool_id=coalesce(agent_pool_id, ""),
                     execution_mode=attributes["execution-mode"],
-                    speculative=attributes["speculative-enabled"]
+                    speculative=attributes["speculative-enabled"],
+                    updated_at=attributes.get("updated-at"),
+                    tag_names=attributes.get("tag-names")
                 )
             )
     return workspaces
 
 
+def update_from_response(workspace: Workspace, response: Union[Response, ErrorResponse]) -> bool:
+    """
+    Updates a workspace in place using the workspace document contained in the response to a
+    request which modified it (the Terraform API returns one for e.g. PATCH and lock requests). This
+    keeps workspaces held in memory (such as the ones cached by the Terraform class) accurate
+    without re-fetching them.
+
+    :param workspace: The workspace to update.
+    :param response: The response to the request which modified the workspace.
+    :return: Whether the workspace was updated. It will not be if the response does not contain a
+             valid document describing the same workspace (e.g. while planning).
+    """
+
+    try:
+        document = response.json()
+    except ValueError:
+        return False
+    data = document.get("data") if isinstance(document, dict) else None
+    updated = _map_workspaces([data]) if isinstance(data, dict) else []
+    if len(updated) == 0 or updated[0].workspace_id != workspace.workspace_id:
+        return False
+    workspace.update(updated[0])
+    return True
+
+
 def fetch_all(
     terraform_domain: str,
     organization: str,
     *,
     workspace_names: Optional[List[str]] = None,
     blacklist: bool = False,
+    workspace_filter: Optional[WorkspaceFilter] = None,
     no_tls: bool = False,
     token: Optional[str] = None,
     write_error_messages: bool = False
 ) -> List[Workspace]:
     """
-    Fetch all workspaces (or a subset if desired) from a particular Terraform organization.
+    Fetch all workspaces (or a subset if desired) from a particular Terraform organization. If an
+    inventory is in use (see inventory.use_inventory), all the organization's workspaces are stored
+    in it regardless of which workspaces are returned, unless the Terraform API was asked to filter
+    them (see WorkspaceFilter.search_parameters).
 
     :param terraform_domain: The domain corresponding to the targeted Terraform installation (either
                              Terraform Cloud or Enterprise).
@@ -77,6 +110,9 @@ def fetch_all(
     :param workspace_names: The name(s) of workspace(s) for which data should be fetched. If not
                             specified, all workspace data will be fetched.
     :param blacklist: Whether to use the specified workspaces as a blacklist-style filter.
+    :param workspace_filter: Criteria for selecting workspaces by their attributes. The criteria
+                             which the Terraform API supports are applied by it, so fewer
+                             workspaces are fetched.
     :param no_tls: Whether to use SSL/TLS encryption when communicating with the Terraform API.
     :param token: A token suitable for authenticating against the Terraform API. If not specified, a
                   token will be searched for in the documented locations.
@@ -84,29 +120,162 @@ def fetch_all(
     :return: The workspace objects corresponding to the given criteria.
     """
 
-    lower_workspaces = [] if workspace_names is None else [
-        workspace.lower() for workspace in workspace_names
-    ]
+    base_url = f"{get_protocol(no_tls)}://{terraform_domain}/api/v2"
+    search_parameters = {} if workspace_filter is None else workspace_filter.search_parameters()
+    pages, _, successful = pagination.fetch_pages(
+        f"{base_url}/organizations/{organization}/workspaces",
+        json_mapper=_map_workspaces,
+        parameters=search_parameters,
+        token=token,
+        write_error_messages=write_error_messages
+    )
+    workspaces = list(itertools.chain.from_iterable(pages))
+    if successful and len(search_parameters) == 0:
+        inventory.store(terraform_domain, organization, workspaces)
+    workspaces = filter_workspaces(workspaces, workspace_names=workspace_names, blacklist=blacklist)
+    if workspace_filter is None or workspace_filter.is_empty:
+        return workspaces
+    return [workspace for workspace in workspaces if workspace_filter.matches(workspace)]
 
-    def is_returnable(workspace: Workspace) -> bool:
-        for name in lower_workspaces:
-            if fnmatch(workspace.name.lower(), name):
-                return not blacklist
-        return blacklist
 
-    base_url = f"{get_protocol(no_tls)}://{terraform_domain}/api/v2"
+def filter_workspaces(
+    workspaces: Iterable[Workspace],
+    *,
+    workspace_names: Optional[List[str]] = None,
+    blacklist: bool = False
+) -> List[Workspace]:
+    """
+    Filters workspaces by name the same way fetch_all does.
+
+    :param workspaces: The workspaces to filter.
+    :param workspace_names: The name(s) of workspace(s) to keep. If not specified, all workspaces
+                            will be kept.
+    :param blacklist: Whether to use the specified workspaces as a blacklist-style filter.
+    :return: The workspaces matching the given criteria, in their original order.
+    """
+
+    if workspace_names is None:
+        return list(workspaces)
+    matcher = NameMatcher(workspace_names)
+    return [workspace for workspace in workspaces if matcher.matches(workspace.name) != blacklist]
+
+
+def shard_workspaces(workspaces: Iterable[Workspace], *, index: int, count: int) -> List[Workspace]:
+    """
+    Partitions workspaces into a number of shards and returns one of them, so that the workspaces
+    can be divided among several processes (e.g. the jobs of a CI matrix). Each workspace is
+    assigned to a shard by a hash of its ID which is the same in every process, so the shards never
+    overlap and together contain every workspace, even if the processes fetched the workspaces in
+    different orders.
+
+    :param workspaces: The workspaces to partition.
+    :param index: The shard to return, from 1 to count.
+    :param count: The number of shards.
+    :return: The workspaces in the given shard, in their original order.
+    """
+
+    # Python's built-in hash of a string differs from one process to the next, so it cannot be used
     return [
-        workspace for workspace in itertools.chain.from_iterable(
-            pagination.exhaust_pages(
-                f"{base_url}/organizations/{organization}/workspaces",
-                json_mapper=_map_workspaces,
-                token=token,
-                write_error_messages=write_error_messages
-            )
-        ) if workspace_names is None or is_returnable(workspace)
+        workspace for workspace in workspaces
+        if zlib.crc32(workspace.workspace_id.encode("utf-8")) % count == index - 1
     ]
 
 
+def sync_workspaces(
+    terraform_domain: str,
+    organization: str,
+    known_workspaces: List[Workspace],
+    *,
+    no_tls: bool = False,
+    token: Optional[str] = None,
+    write_error_messages: bool = False
+) -> Optional[List[Workspace]]:
+    """
+    Incrementally brings a previously-fetched list of all the workspaces in a Terraform organization
+    up to date. Workspaces are requested sorted by when they were last updated (most recent first),
+    and paging stops once a workspace which was last updated before the most recently updated known
+    workspace is reached, so refreshing a large organization usually takes a single request. Known
+    workspaces are updated in place, and new workspaces are added. Deleted workspaces are detected
+    by comparing the total number of workspaces reported in the pagination metadata against the
+    number of workspaces known after merging; if they differ, every page is fetched instead. Like
+    fetch_all, this stores the workspaces in the inventory in use, if any.
+
+    :param terraform_domain: The domain corresponding to the targeted Terraform installation (either
+                             Terraform Cloud or Enterprise).
+    :param organization: The organization for which to sync workspace data.
+    :param known_workspaces: All the workspaces in the organization as of the last fetch or sync
+                             (e.g. the output of fetch_all without any workspace names). If empty,
+                             every page is fetched.
+    :param no_tls: Whether to use SSL/TLS encryption when communicating with the Terraform API.
+    :param token: A token suitable for authenticating against the Terraform API. If not specified, a
+                  token will be searched for in the documented locations.
+    :param write_error_messages: Whether to write error messages to STDERR.
+    :return: All the workspaces in the organization sorted by name, or None if they could not be
+             fetched (some of the known workspaces may have been updated in place regardless).
+    """
+
+    base_url = f"{get_protocol(no_tls)}://{terraform_domain}/api/v2"
+    known = {workspace.workspace_id: workspace for workspace in known_workspaces}
+
+    def fetch(watermark: Optional[str]) -> Optional[Tuple[List[Workspace], Optional[int]]]:
+        previous: List[Optional[str]] = []
+
+        def is_past_watermark(page: List[Workspace]) -> bool:
+            # Paging may only stop early if the API actually sorted the workspaces (older Terraform
+            # Enterprise versions ignore the sort parameter or omit the timestamps)
+            timestamps = previous + [workspace.updated_at for workspace in page]
+            if any(timestamp is None for timestamp in timestamps) or \
+                    timestamps != sorted(timestamps, reverse=True):
+                previous.append(None)
+                return False
+            previous[:] = timestamps[-1:]
+            return len(timestamps) > 0 and timestamps[-1] < watermark
+
+        pages, total_count, successful = pagination.fetch_pages(
+            f"{base_url}/organizations/{organization}/workspaces",
+            json_mapper=_map_workspaces,
+            parameters={"sort": "-updated-at"},
+            stop_when=None if watermark is None else is_past_watermark,
+            token=token,
+            write_error_messages=write_error_messages
+        )
+        if not successful:
+            return None
+        fetched = []
+        for workspace in itertools.chain.from_iterable(pages):
+            if workspace.workspace_id in known:
+                known[workspace.workspace_id].update(workspace)
+                workspace = known[workspace.workspace_id]
+            fetched.append(workspace)
+        return fetched, total_count
+
+    watermark = None
+    if len(known) > 0 and all(workspace.updated_at is not None for workspace in known.values()):
+        watermark = max(workspace.updated_at for workspace in known.values())
+    if watermark is not None:
+        result = fetch(watermark)
+        if result is None:
+            return None
+        fetched, total_count = result
+        fetched_ids = {workspace.workspace_id for workspace in fetched}
+        merged = fetched + [
+            workspace for workspace in known.values() if workspace.workspace_id not in fetched_ids
+        ]
+        if total_count is not None and total_count == len(merged):
+            synced = sorted(merged, key=lambda workspace: workspace.name)
+            inventory.store(terraform_domain, organization, synced)
+            return synced
+
+    # There is no watermark, or workspaces were deleted (or the count is unknown), so only fetching
+    # every page yields the correct set of workspaces
+    result = fetch(None)
+    if result is None:
+        return None
+    synced = sorted(result[0], key=lambda workspace: workspace.name)
+    inventory.store(terraform_domain, organization, synced)
+    return synced
+
+
 def _internal_batch_operation(
     terraform_domain: str,
     workspaces: List[Workspace],
@@ -114,6 +283,7 @@ def _internal_batch_operation(
     json: Dict[str, Any],
     on_success: SuccessHandler[Workspace],
     on_failure: ErrorHandler[Workspace],
+    on_skip: Callable[[Workspace, str, str], None],
     no_tls: bool = False,
     token: Optional[str] = None,
     write_output: bool = False
@@ -121,13 +291,23 @@ def _internal_batch_operation(
     headers = get_api_headers(terraform_domain, token=token, write_error_messages=write_output)
     all_successful = True
     base_url = f"{get_protocol(no_tls)}://{terraform_domain}/api/v2"
-    for workspace in workspaces:
+    for i, workspace in enumerate(workspaces):
+        if skip_remaining_workspaces(terraform_domain,
+                                     len(workspaces) - i,
+                                     write_output=write_output):
+            all_successful = False
+            break
+        skipped = journal.check(workspace, "patch-workspace", json)
+        if skipped is not None:
+            all_successful = all_successful and skipped[0] != "error"
+            on_skip(workspace, *skipped)
+            continue
         url = f"{base_url}/workspaces/{workspace.workspace_id}"
-        response = safe_http_request(
-            lambda: throttle(lambda: requests.patch(url, json=json, headers=headers))
-        )
+        response = http_client.send("PATCH", url, headers=headers, json=json)
+        journal.record(workspace, "patch-workspace", json, successful=response.status_code == 200)
         if response.status_code == 200:
             on_success(workspace)
+            update_from_response(workspace, response)
         else:
             all_successful = False
             on_failure(workspace, response)
@@ -209,7 +389,7 @@ def batch_operation(
                 field_names[i],
                 report_mappers[i](field_mappers[i](workspace)),
                 report_mappers[i](new_values[i]),
-                "success",
+                success_status(),
                 "value unchanged" if field_mappers[i](workspace) == new_values[i] else "none"
             ])
 
@@ -224,12 +404,24 @@ def batch_operation(
                 wrap_text(str(response.json()), MESSAGE_COLUMN_CHARACTER_COUNT)
             ])
 
+    def on_skip(workspace: Workspace, status: str, message: str) -> None:
+        for i in range(len(field_names)):
+            report.append([
+                workspace.name,
+                field_names[i],
+                report_mappers[i](field_mappers[i](workspace)),
+                report_mappers[i](field_mappers[i](workspace)),
+                status,
+                message
+            ])
+
     result = _internal_batch_operation(
         terraform_domain,
         workspaces,
         json=json,
         on_success=on_success,
         on_failure=on_failure,
+        on_skip=on_skip,
         no_tls=no_tls,
         token=token,
         write_output=write_output
@@ -248,10 +440,41 @@ def batch_operation(
             )
         )
         print()
+        if len(field_names) > 1:
+            print((
+                f"{len(field_names)} fields were patched using {len(workspaces)} requests (one per "
+                f"workspace) instead of {len(field_names) * len(workspaces)}."
+            ))
+            print()
 
     return result
 
 
+_summary_headers: List[str] = [
+    "Name",
+    "Version",
+    "Locked",
+    "Auto-Apply",
+    "Speculative",
+    "Working Directory",
+    "Agent Pool ID",
+    "Execution Mode"
+]
+
+
+def _summary_row(workspace: Workspace) -> List[Any]:
+    return [
+        workspace.name,
+        workspace.terraform_version,
+        workspace.is_locked,
+        workspace.auto_apply,
+        workspace.speculative,
+        coalesce(workspace.working_directory, "<none>"),
+        coalesce(workspace.agent_pool_id, "<none>"),
+        workspace.execution_mode
+    ]
+
+
 def write_summary(
     terraform_domain: str,
     organization: str,
@@ -282,32 +505,47 @@ def write_summary(
         ))
         print()
 
-        report = []
-        for workspace in workspaces:
-            report.append([
-                workspace.name,
-                workspace.terraform_version,
-                workspace.is_locked,
-                workspace.auto_apply,
-                workspace.speculative,
-                coalesce(workspace.working_directory, "<none>"),
-                coalesce(workspace.agent_pool_id, "<none>"),
-                workspace.execution_mode
-            ])
+        report = [_summary_row(workspace) for workspace in workspaces]
+        print(tabulate(sorted(report, key=lambda x: x[0]), headers=_summary_headers))
+
+        if targeting_specific_workspaces:
+            print()
+            print(os.linesep + TARGETING_SPECIFIC_WORKSPACES_TEXT)
+
+        print()
+
+
+def write_fleet_summary(
+    targets: List[Tuple[str, str, List[Workspace]]],
+    *,
+    targeting_specific_workspaces: bool,
+    write_output: bool = False
+) -> None:
+    """
+    Writes a single tabulated summary of the workspaces' configuration across multiple organizations
+    (and potentially multiple Terraform installations) to STDOUT. This is otherwise identical to
+    write_summary.
 
+    :param targets: Triples of a domain, an organization within that domain, and the workspaces to
+                    report on within that organization.
+    :param targeting_specific_workspaces: Whether one or more workspaces was specified in order to
+                                          filter the list of workspaces when they were fetched.
+    :param write_output: Whether to print the report to STDOUT. If this is False, this method is a
+                         no-op.
+    :return: None
+    """
+
+    if write_output:
+        print(f"Terraform workspace summary for {len(targets)} organizations:")
+        print()
+
+        report = [[terraform_domain, organization] + _summary_row(workspace)
+                  for terraform_domain, organization, workspaces in targets
+                  for workspace in workspaces]
         print(
             tabulate(
-                sorted(report, key=lambda x: x[0]),
-                headers=[
-                    "Name",
-                    "Version",
-                    "Locked",
-                    "Auto-Apply",
-                    "Speculative",
-                    "Working Directory",
-                    "Agent Pool ID",
-                    "Execution Mode"
-                ]
+                sorted(report, key=lambda x: (x[0], x[1], x[2])),
+                headers=["Domain", "Organization"] + _summary_headers
             )
         )
 
@@ -316,3 +554,41 @@ def write_summary(
             print(os.linesep + TARGETING_SPECIFIC_WORKSPACES_TEXT)
 
         print()
+
+
+def write_version_report(
+    terraform_domain: str,
+    organization: str,
+    version_index: WorkspaceVersionIndex,
+    *,
+    targeting_specific_workspaces: bool,
+    write_output: bool = False
+) -> None:
+    """
+    Writes a tabulated count of workspaces per Terraform version to STDOUT, ordered from the newest
+    version to the oldest.
+
+    :param terraform_domain: The domain corresponding to the targeted Terraform installation (either
+                             Terraform Cloud or Enterprise).
+    :param organization: The organization to which this data pertains.
+    :param version_index: An index of the workspaces to report on.
+    :param targeting_specific_workspaces: Whether one or more workspaces was specified in order to
+                                          filter the list of workspaces when they were fetched.
+    :param write_output: Whether to print the report to STDOUT. If this is False, this method is a
+                         no-op.
+    :return: None
+    """
+
+    if write_output:
+        print((
+            f'Terraform version report for organization "{organization}" at '
+            f'"{terraform_domain}":'
+        ))
+        print()
+        print(tabulate(version_index.counts(), headers=["Version", "Workspaces"]))
+
+        if targeting_specific_workspaces:
+            print()
+            print(os.linesep + TARGETING_SPECIFIC_WORKSPACES_TEXT)
+
+        print()
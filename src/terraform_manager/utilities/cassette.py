@@ -0,0 +1,167 @@
+import gzip
+import hashlib
+import json
+from threading import Lock
+from typing import Dict, Any, List, Optional, Union, Tuple, TYPE_CHECKING
+
+from terraform_manager.entities.error_response import ErrorResponse
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
+
+# Only the response headers which terraform-manager (or a future version of it) may act upon are
+# recorded; everything else would only bloat the cassette
+_recorded_headers: List[str] = [
+    "content-type",
+    "etag",
+    "last-modified",
+    "retry-after",
+    "x-ratelimit-limit",
+    "x-ratelimit-remaining",
+    "x-ratelimit-reset"
+]
+
+
+def _request_key(method: str, url: str, params: Optional[Dict[str, Any]],
+                 json_body: Optional[Any]) -> Tuple[str, str, str]:
+    from requests import Request
+
+    prepared_url = Request(method.upper(), url, params=params).prepare().url
+    # Request bodies may contain secrets (e.g. sensitive variable values), so only a digest of them
+    # is stored
+    body_digest = "" if json_body is None else hashlib.sha256(
+        json.dumps(json_body, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return method.upper(), prepared_url, body_digest
+
+
+def _redact_variable_values(content: str) -> str:
+    # Variable values are returned in plaintext unless the variables are sensitive, so they are
+    # recorded the way the Terraform API returns sensitive variables (i.e. as null)
+    try:
+        body = json.loads(content)
+    except ValueError:
+        return content
+    data = body.get("data") if isinstance(body, dict) else None
+    redacted = False
+    for obj in data if isinstance(data, list) else [data]:
+        if isinstance(obj, dict) and obj.get("type") == "vars":
+            attributes = obj.get("attributes")
+            if isinstance(attributes, dict) and attributes.get("value") is not None:
+                attributes["value"] = None
+                redacted = True
+    return json.dumps(body) if redacted else content
+
+
+class Cassette:
+    def __init__(self, path: str, *, replay: bool):
+        """
+        Records Terraform API responses to, or replays them from, a gzip-compressed file with one
+        JSON object per line. Authorization headers are never recorded, request bodies are only
+        recorded as digests, and the values of variables in responses are redacted.
+
+        :param path: The path of the cassette file.
+        :param replay: Whether to replay responses from the file (True) or to record responses into
+                       it (False), overwriting it.
+        """
+
+        self.path = path
+        self.replaying = replay
+        self._lock: Lock = Lock()
+        self._recordings: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+        self._positions: Dict[Tuple[str, str, str], int] = {}
+        if replay:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                for line in file:
+                    entry = json.loads(line)
+                    key = (entry["method"], entry["url"], entry["body-digest"])
+                    self._recordings.setdefault(key, []).append(entry)
+            self._file = None
+        else:
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]],
+        json_body: Optional[Any],
+        response: Union["Response", ErrorResponse]
+    ) -> None:
+        """
+        Appends a response to the cassette.
+
+        :param method: The HTTP method of the request.
+        :param url: The URL of the request.
+        :param params: The query string parameters of the request, if any.
+        :param json_body: The JSON body of the request, if any.
+        :param response: The response (or the error which occurred instead).
+        :return: None
+        """
+
+        method, prepared_url, body_digest = _request_key(method, url, params, json_body)
+        entry = {"method": method, "url": prepared_url, "body-digest": body_digest}
+        if isinstance(response, ErrorResponse):
+            entry["error"] = response.error_message
+        else:
+            entry["status"] = response.status_code
+            entry["headers"] = {
+                header: response.headers[header]
+                for header in _recorded_headers
+                if header in response.headers
+            }
+            entry["content"] = _redact_variable_values(
+                response.content.decode("utf-8", errors="replace")
+            )
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def replay(
+        self, method: str, url: str, *, params: Optional[Dict[str, Any]], json_body: Optional[Any]
+    ) -> Union["Response", ErrorResponse]:
+        """
+        Returns the recorded response to a request. Identical requests are answered with their
+        recorded responses in the order they were recorded, and once those are exhausted, the last
+        one is repeated (e.g. for the run watcher, which polls the same endpoints indefinitely).
+
+        :return: The recorded response, or an ErrorResponse if no response to the request was
+                 recorded.
+        """
+
+        from requests import Request, Response
+        from requests.structures import CaseInsensitiveDict
+
+        key = _request_key(method, url, params, json_body)
+        with self._lock:
+            entries = self._recordings.get(key)
+            if entries is None:
+                return ErrorResponse(
+                    f"No response to {key[0]} {key[1]} was recorded in {self.path}"
+                )
+            position = self._positions.get(key, 0)
+            self._positions[key] = min(position + 1, len(entries) - 1)
+        entry = entries[position]
+        if "error" in entry:
+            return ErrorResponse(entry["error"])
+        response = Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["content"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = key[1]
+        response.request = Request(key[0], key[1]).prepare()
+        return response
+
+    def close(self) -> None:
+        if self._file is not None:
+            with self._lock:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "Cassette":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,86 @@
+import time
+from threading import Lock
+from typing import Dict, Optional, Union, TYPE_CHECKING
+
+from terraform_manager.entities.error_response import ErrorResponse
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
+
+# These responses mean the token is missing, wrong, or lacks permissions, which no amount of
+# retrying will fix
+_fatal_status_codes = [401, 403]
+
+
+class _DomainState:
+    def __init__(self):
+        self.consecutive_failures: int = 0
+        self.opened_at: Optional[float] = None
+        self.fatal_reason: Optional[str] = None
+
+
+class CircuitBreaker:
+    def __init__(self, *, failure_threshold: int = 5, cooldown: float = 30.0):
+        """
+        Stops requests from being sent to a Terraform domain which is evidently broken, so that an
+        operation targeting many workspaces fails fast instead of sending (and reporting) one
+        failing request per workspace. The circuit of a domain opens after a number of consecutive
+        server errors (5xx responses or connection errors), or immediately upon a 401/403 response.
+        Circuits opened by server errors close again after a cooldown period if the next request
+        succeeds, whereas circuits opened by 401/403 responses never close.
+
+        :param failure_threshold: The number of consecutive server errors after which the circuit of
+                                  a domain opens.
+        :param cooldown: The number of seconds after which a circuit opened by server errors lets a
+                         request through again to determine whether the domain has recovered.
+        """
+
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock: Lock = Lock()
+        self._states: Dict[str, _DomainState] = {}
+
+    def open_reason(self, terraform_domain: str) -> Optional[str]:
+        """
+        :param terraform_domain: The domain to check.
+        :return: Why the circuit of the given domain is open (suitable for completing a sentence
+                 such as "the request was not sent because ..."), or None if it is closed.
+        """
+
+        with self._lock:
+            state = self._states.get(terraform_domain)
+            if state is None:
+                return None
+            elif state.fatal_reason is not None:
+                return state.fatal_reason
+            elif state.opened_at is not None and \
+                    time.monotonic() - state.opened_at < self.cooldown:
+                return (
+                    f"{state.consecutive_failures} consecutive requests to {terraform_domain} "
+                    "failed"
+                )
+        return None
+
+    def record(self, terraform_domain: str, response: Union["Response", ErrorResponse]) -> None:
+        """
+        Updates the circuit of a domain based on the response to a request which was sent to it.
+
+        :param terraform_domain: The domain the request was sent to.
+        :param response: The response (or the error which occurred instead).
+        :return: None
+        """
+
+        with self._lock:
+            state = self._states.setdefault(terraform_domain, _DomainState())
+            if response.status_code in _fatal_status_codes:
+                state.fatal_reason = (
+                    f"the Terraform API at {terraform_domain} rejected the token (HTTP "
+                    f"{response.status_code})"
+                )
+            elif response.status_code >= 500:  # Reminder: ErrorResponses have a status code of 500
+                state.consecutive_failures += 1
+                if state.consecutive_failures >= self.failure_threshold:
+                    state.opened_at = time.monotonic()
+            else:
+                state.consecutive_failures = 0
+                state.opened_at = None
@@ -0,0 +1,153 @@
+import time
+from collections import OrderedDict
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union, TYPE_CHECKING
+
+from terraform_manager.entities.error_response import ErrorResponse
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
+
+Request = Callable[[], Union["Response", ErrorResponse]]
+
+
+def _share_parsed_json(response: Union["Response", ErrorResponse]) -> None:
+    # Every caller sharing a response would otherwise parse its (potentially large) body again
+    if isinstance(response, ErrorResponse) or getattr(response, "_shared_json", False):
+        return  # Responses can be shared more than once (see ValidatorCache)
+    parse = response.json
+    lock = Lock()
+    parsed = []
+
+    def json(**kwargs) -> Any:
+        with lock:
+            if len(parsed) == 0:
+                parsed.append(parse(**kwargs))
+        return parsed[0]
+
+    response.json = json
+    response._shared_json = True
+
+
+class _InFlight:
+    # A minimal future which the callers of an in-flight request wait on
+    def __init__(self):
+        self._done: Event = Event()
+        self._response: Optional[Union["Response", ErrorResponse]] = None
+        self._exception: Optional[BaseException] = None
+
+    def set_result(self, response: Union["Response", ErrorResponse]) -> None:
+        self._response = response
+        self._done.set()
+
+    def set_exception(self, exception: BaseException) -> None:
+        self._exception = exception
+        self._done.set()
+
+    def result(self) -> Union["Response", ErrorResponse]:
+        self._done.wait()
+        if self._exception is not None:
+            raise self._exception
+        return self._response
+
+
+class Coalescer:
+    def __init__(self, *, ttl: float = 0.0, maximum_entries: int = 256):
+        """
+        Coalesces identical requests: a request which is identical to one that is already in flight
+        is not sent, and its caller receives the response to the in-flight request instead (the
+        response's parsed JSON is shared as well, so it must be treated as read-only). Successful
+        responses can additionally be cached for a short amount of time.
+
+        :param ttl: The number of seconds for which successful responses are cached. If 0, responses
+                    are only shared among requests which were in flight at the same time.
+        :param maximum_entries: The maximum number of cached responses. Once it is reached, the
+                                least recently used response is evicted.
+        """
+
+        self.ttl = ttl
+        self.maximum_entries = maximum_entries
+        self._lock: Lock = Lock()
+        self._in_flight: Dict[Hashable, _InFlight] = {}
+        self._cache: "OrderedDict[Hashable, Tuple[float, Union[Response, ErrorResponse]]]" = \
+            OrderedDict()
+        self._sent_count: int = 0
+        self._coalesced_count: int = 0
+        self._generation: int = 0
+
+    @property
+    def sent_count(self) -> int:
+        """
+        :return: The number of requests which were actually sent.
+        """
+
+        with self._lock:
+            return self._sent_count
+
+    @property
+    def coalesced_count(self) -> int:
+        """
+        :return: The number of requests which were answered with the response to another request.
+        """
+
+        with self._lock:
+            return self._coalesced_count
+
+    def invalidate(self) -> None:
+        """
+        Evicts all cached responses (e.g. because something was modified). Requests which are in
+        flight are still shared.
+
+        :return: None
+        """
+
+        with self._lock:
+            self._cache.clear()
+            self._generation += 1
+
+    def send(self, key: Hashable, request: Request) -> Union["Response", ErrorResponse]:
+        """
+        Sends a request unless an identical one is in flight or its response is cached.
+
+        :param key: A key identifying the request; requests with equal keys are identical.
+        :param request: A function sending the request.
+        :return: The response.
+        """
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self._cache.move_to_end(key)
+                    self._coalesced_count += 1
+                    return cached[1]
+                del self._cache[key]
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                self._coalesced_count += 1
+            else:
+                leader = _InFlight()
+                self._in_flight[key] = leader
+                self._sent_count += 1
+                generation = self._generation
+        if in_flight is not None:
+            return in_flight.result()
+
+        try:
+            response = request()
+            _share_parsed_json(response)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            leader.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            # A response which may predate an invalidation is not cached
+            if self.ttl > 0 and response.status_code == 200 and generation == self._generation:
+                self._cache[key] = (time.monotonic() + self.ttl, response)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.maximum_entries:
+                    self._cache.popitem(last=False)
+        leader.set_result(response)
+        return response
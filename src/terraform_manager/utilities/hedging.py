@@ -0,0 +1,134 @@
+import time
+from collections import deque
+from concurrent.futures import Future, as_completed, wait
+from threading import Lock, Thread
+from typing import Callable, Deque, Dict, Optional, Union, TYPE_CHECKING
+
+from terraform_manager.entities.error_response import ErrorResponse
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
+
+Request = Callable[[], Union["Response", ErrorResponse]]
+
+
+class Hedger:
+    def __init__(
+        self,
+        *,
+        percentile: float = 0.95,
+        budget: float = 0.1,
+        minimum_samples: int = 20,
+        maximum_samples: int = 200
+    ):
+        """
+        Sends hedged requests: if a request has not completed after the given percentile of the
+        latencies previously observed for its endpoint, an identical request is sent and whichever
+        of the two completes first is used. This trades a few extra requests for a much shorter tail
+        latency, so it must only be used for idempotent requests. Both requests are subject to the
+        rate limit (see throttle), and the number of extra requests is capped by the budget.
+
+        :param percentile: The percentile of an endpoint's observed latencies after which a request
+                           to that endpoint is hedged.
+        :param budget: The maximum number of hedged requests as a fraction of all requests.
+        :param minimum_samples: The number of latencies which must be observed for an endpoint
+                                before requests to it are hedged.
+        :param maximum_samples: The number of most recent latencies kept per endpoint.
+        """
+
+        self.percentile = percentile
+        self.budget = budget
+        self.minimum_samples = minimum_samples
+        self.maximum_samples = maximum_samples
+        self._lock: Lock = Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._request_count: int = 0
+        self._hedge_count: int = 0
+        self._hedge_wins: int = 0
+
+    @property
+    def hedge_count(self) -> int:
+        with self._lock:
+            return self._hedge_count
+
+    @property
+    def hedge_wins(self) -> int:
+        """
+        :return: The number of hedged requests which completed before the requests they duplicated.
+        """
+
+        with self._lock:
+            return self._hedge_wins
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """
+        :return: The number of seconds after which a request to the given endpoint should be hedged,
+                 or None if not enough latencies have been observed for it yet.
+        """
+
+        with self._lock:
+            latencies = sorted(self._latencies.get(endpoint, []))
+        if len(latencies) < self.minimum_samples:
+            return None
+        return latencies[min(int(len(latencies) * self.percentile), len(latencies) - 1)]
+
+    def _timed(self, request: Request, endpoint: str) -> Union["Response", ErrorResponse]:
+        started = time.perf_counter()
+        response = request()
+        with self._lock:
+            latencies = self._latencies.setdefault(endpoint, deque(maxlen=self.maximum_samples))
+            latencies.append(time.perf_counter() - started)
+        return response
+
+    def _start(self, request: Request, endpoint: str) -> Future:
+        # Daemon threads are used (rather than an executor) so that a request which lost the race
+        # can never delay the program from exiting
+        future = Future()
+
+        def run() -> None:
+            try:
+                future.set_result(self._timed(request, endpoint))
+            except BaseException as e:  # pragma: no cover
+                future.set_exception(e)
+
+        Thread(target=run, daemon=True).start()
+        return future
+
+    def _acquire_budget(self) -> bool:
+        with self._lock:
+            if self._hedge_count + 1 > self._request_count * self.budget:
+                return False
+            self._hedge_count += 1
+            return True
+
+    def send(self, request: Request, endpoint: str) -> Union["Response", ErrorResponse]:
+        """
+        Sends a request, hedging it if it takes too long.
+
+        :param request: A function sending the request. It may be invoked twice (concurrently).
+        :param endpoint: The endpoint targeted by the request (see
+                         instrumentation.endpoint_template); latencies are tracked per endpoint.
+        :return: The first successful response, or the last response if neither was successful.
+        """
+
+        with self._lock:
+            self._request_count += 1
+        delay = self.delay(endpoint)
+        if delay is None:
+            return self._timed(request, endpoint)
+
+        primary = self._start(request, endpoint)
+        done, _ = wait([primary], timeout=delay)
+        if primary in done or not self._acquire_budget():
+            return primary.result()
+
+        hedge = self._start(request, endpoint)
+        response = None
+        for future in as_completed([primary, hedge]):
+            response = future.result()
+            if response.status_code < 500:  # Reminder: ErrorResponses have a status code of 500
+                if future is hedge:
+                    with self._lock:
+                        self._hedge_wins += 1
+                break
+        return response
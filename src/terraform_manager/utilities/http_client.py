@@ -0,0 +1,288 @@
+import time
+from threading import Lock
+from typing import Optional, Dict, Any, Mapping, Union, Tuple, TYPE_CHECKING
+
+from terraform_manager.entities.error_response import ErrorResponse
+from terraform_manager.utilities import instrumentation, json_backend
+from terraform_manager.utilities.coalescing import Coalescer
+from terraform_manager.utilities.throttle import throttle
+from terraform_manager.utilities.utilities import safe_http_request, parse_domain
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
+    from terraform_manager.utilities.cassette import Cassette
+    from terraform_manager.utilities.circuit_breaker import CircuitBreaker
+    from terraform_manager.utilities.hedging import Hedger
+    from terraform_manager.utilities.planner import Plan
+    from terraform_manager.utilities.revalidation import ValidatorCache
+
+# The number of seconds to wait for a connection to be established, and then for each read from it;
+# without these, a single stuck connection would hang an operation forever
+DEFAULT_CONNECT_TIMEOUT: float = 10.0
+DEFAULT_READ_TIMEOUT: float = 60.0
+
+_cassette: Optional["Cassette"] = None
+_plan: Optional["Plan"] = None
+_hedger: Optional["Hedger"] = None
+_circuit_breaker: Optional["CircuitBreaker"] = None
+# Identical GET requests which are in flight at the same time (e.g. when the Terraform class is used
+# from several threads) are sent only once
+_coalescer: Optional[Coalescer] = Coalescer()
+_validator_cache: Optional["ValidatorCache"] = None
+_timeouts: Tuple[float, float] = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+_requests_sent: int = 0
+_requests_sent_lock: Lock = Lock()
+
+
+def use_cassette(cassette: Optional["Cassette"]) -> None:
+    """
+    Routes all subsequent Terraform API requests through a cassette (see the Cassette class), or
+    stops doing so.
+
+    :param cassette: The cassette to record responses to or replay responses from, or None to stop
+                     using a cassette.
+    :return: None
+    """
+
+    global _cassette
+    _cassette = cassette
+
+
+def use_plan(plan: Optional["Plan"]) -> None:
+    """
+    Makes all subsequent Terraform API requests which would modify anything be added to a plan
+    (see the Plan class) instead of being sent, or stops doing so.
+
+    :param plan: The plan to add requests to, or None to stop planning.
+    :return: None
+    """
+
+    global _plan
+    _plan = plan
+
+
+def planning() -> bool:
+    return _plan is not None
+
+
+def use_hedger(hedger: Optional["Hedger"]) -> None:
+    """
+    Makes all subsequent GET requests to the Terraform API be hedged (see the Hedger class), or
+    stops doing so. Only GET requests are hedged because they are the only idempotent ones.
+
+    :param hedger: The hedger to send GET requests with, or None to stop hedging.
+    :return: None
+    """
+
+    global _hedger
+    _hedger = hedger
+
+
+def use_circuit_breaker(circuit_breaker: Optional["CircuitBreaker"]) -> None:
+    """
+    Makes all subsequent Terraform API requests go through a circuit breaker (see the CircuitBreaker
+    class), or stops doing so.
+
+    :param circuit_breaker: The circuit breaker to use, or None to stop using one.
+    :return: None
+    """
+
+    global _circuit_breaker
+    _circuit_breaker = circuit_breaker
+
+
+def circuit_open_reason(terraform_domain: str) -> Optional[str]:
+    """
+    :param terraform_domain: The domain to check.
+    :return: Why requests to the given domain are currently not being sent (see
+             CircuitBreaker.open_reason), or None if they are (or if no circuit breaker is in use).
+    """
+
+    circuit_breaker = _circuit_breaker
+    return None if circuit_breaker is None else circuit_breaker.open_reason(terraform_domain)
+
+
+def use_coalescer(coalescer: Optional[Coalescer]) -> None:
+    """
+    Makes all subsequent GET requests to the Terraform API go through a coalescer (see the Coalescer
+    class), or stops doing so. A coalescer which only shares in-flight requests is used by default;
+    use e.g. Coalescer(ttl=5) to also cache responses for 5 seconds. Cached responses are evicted
+    whenever a request which may modify something is sent.
+
+    :param coalescer: The coalescer to use, or None to stop coalescing.
+    :return: None
+    """
+
+    global _coalescer
+    _coalescer = coalescer
+
+
+def use_validator_cache(validator_cache: Optional["ValidatorCache"]) -> None:
+    """
+    Makes all subsequent GET requests to the Terraform API be revalidated using cache validators
+    (see the ValidatorCache class), or stops doing so.
+
+    :param validator_cache: The validator cache to use, or None to stop revalidating requests.
+    :return: None
+    """
+
+    global _validator_cache
+    _validator_cache = validator_cache
+
+
+def _request_key(
+    url: str, headers: Mapping[str, str], params: Optional[Dict[str, Any]]
+) -> Tuple[str, Optional[str], Tuple[Tuple[str, str], ...]]:
+    # Different tokens may be allowed to see different things, so they must not share responses
+    parameters = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return url, headers.get("Authorization"), parameters
+
+
+def requests_sent() -> int:
+    """
+    Counts the requests which were actually sent to the Terraform API since the program started,
+    including retries and hedged duplicates but excluding requests which were answered without
+    contacting the API (e.g. coalesced, planned, or replayed ones). Callers measure their own
+    traffic as the difference between two counts.
+
+    :return: The number of requests sent so far.
+    """
+
+    with _requests_sent_lock:
+        return _requests_sent
+
+
+def _count_request() -> None:
+    global _requests_sent
+    with _requests_sent_lock:
+        _requests_sent += 1
+
+
+def set_timeouts(*, connect: Optional[float] = None, read: Optional[float] = None) -> None:
+    """
+    Sets the timeouts of all subsequent Terraform API requests. A request which times out results in
+    an ErrorResponse.
+
+    :param connect: The number of seconds to wait for a connection to be established. If not
+                    specified, DEFAULT_CONNECT_TIMEOUT is used.
+    :param read: The number of seconds to wait for the server to send data (between bytes, not for
+                 the entire response). If not specified, DEFAULT_READ_TIMEOUT is used.
+    :return: None
+    """
+
+    global _timeouts
+    _timeouts = (
+        DEFAULT_CONNECT_TIMEOUT if connect is None else connect,
+        DEFAULT_READ_TIMEOUT if read is None else read
+    )
+
+
+def send(
+    method: str,
+    url: str,
+    *,
+    headers: Mapping[str, str],
+    params: Optional[Dict[str, Any]] = None,
+    json: Optional[Any] = None
+) -> Union["Response", ErrorResponse]:
+    """
+    Sends a request to the Terraform API. All Terraform API requests should be sent via this
+    function, which throttles them (see throttle), applies the configured timeouts (see
+    set_timeouts), converts exceptions raised by the requests library into ErrorResponses, stops
+    sending requests to a domain whose circuit is open (if a circuit breaker is in use), coalesces
+    identical GET requests (see use_coalescer), revalidates GET requests if a validator cache is in
+    use, hedges GET requests if a hedger is in use, records or replays them if a cassette is in use,
+    and adds them to the active plan (if any) instead of sending them if they would modify anything.
+    JSON bodies are encoded and decoded using the fastest available JSON library (see
+    json_backend).
+
+    :param method: The HTTP method.
+    :param url: The full URL of the Terraform API endpoint (either Terraform Cloud or Enterprise).
+    :param headers: The headers to send (see get_api_headers).
+    :param params: The query string parameters to send, if any.
+    :param json: The JSON body to send, if any.
+    :return: The response.
+    """
+
+    plan = _plan
+    if plan is not None:
+        if method.upper() != "GET":
+            return plan.add_request(method, url, json)
+        plan.add_read(url)
+
+    cassette = _cassette
+    if cassette is not None and cassette.replaying:
+        started = time.perf_counter()
+        response = cassette.replay(method, url, params=params, json_body=json)
+        json_backend.decode_with_backend(response)
+        if instrumentation.recorder.enabled:
+            instrumentation.recorder.record(
+                instrumentation.endpoint_template(method, url),
+                successful=getattr(response, "ok", False),
+                latency=time.perf_counter() - started,
+                bytes_received=len(getattr(response, "content", b""))
+            )
+        return response
+
+    domain = parse_domain(url)
+    circuit_breaker = _circuit_breaker
+    if circuit_breaker is not None:
+        reason = circuit_breaker.open_reason(domain)
+        if reason is not None:
+            return ErrorResponse(f"The request was not sent because {reason}.")
+
+    import requests
+
+    timeouts = _timeouts
+    endpoint = instrumentation.endpoint_template(method, url)
+
+    def request(request_headers: Mapping[str, str]) -> Union["Response", ErrorResponse]:
+        def attempt() -> "Response":
+            _count_request()
+            if json is None:
+                return requests.request(
+                    method, url, headers=request_headers, params=params, timeout=timeouts
+                )
+            # The body is encoded here (rather than by the requests library) so that the fastest
+            # available JSON backend is used
+            json_headers = {"Content-Type": "application/json", **request_headers}
+            return requests.request(
+                method,
+                url,
+                headers=json_headers,
+                params=params,
+                data=json_backend.dumps(json).encode("utf-8"),
+                timeout=timeouts
+            )
+
+        def throttled() -> Union["Response", ErrorResponse]:
+            response = safe_http_request(lambda: throttle(attempt, domain))
+            json_backend.decode_with_backend(response)
+            return response
+
+        hedger = _hedger
+        if hedger is not None and method.upper() == "GET":
+            return hedger.send(throttled, endpoint)
+        return throttled()
+
+    def send_once() -> Union["Response", ErrorResponse]:
+        validator_cache = _validator_cache
+        if validator_cache is not None and method.upper() == "GET":
+            key = _request_key(url, headers, params)
+            response = validator_cache.send(key, headers, request, endpoint=endpoint)
+        else:
+            response = request(headers)
+        if circuit_breaker is not None:
+            circuit_breaker.record(domain, response)
+        if cassette is not None:
+            cassette.record(method, url, params=params, json_body=json, response=response)
+        return response
+
+    coalescer = _coalescer
+    if coalescer is None:
+        return send_once()
+    elif method.upper() == "GET":
+        return coalescer.send(_request_key(url, headers, params), send_once)
+    else:
+        coalescer.invalidate()
+        return send_once()
@@ -0,0 +1,248 @@
+import json
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+
+# Upper bounds (in milliseconds) of the latency histogram buckets; the last bucket is unbounded
+_latency_buckets: List[int] = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Path segments which are followed by an identifier in Terraform API URLs
+_identifier_placeholders: Dict[str, str] = {
+    "organizations": ":organization",
+    "workspaces": ":workspace_id",
+    "vars": ":variable_id",
+    "runs": ":run_id"
+}
+
+
+def endpoint_template(method: str, url: str) -> str:
+    """
+    Derives an identifier-agnostic name for the Terraform API endpoint targeted by a request so that
+    requests to e.g. different workspaces can be aggregated.
+
+    :param method: The HTTP method of the request.
+    :param url: The URL of the request.
+    :return: The method and path of the request with identifiers replaced by placeholders (e.g.
+             "PATCH /workspaces/:workspace_id").
+    """
+
+    segments = urlparse(url).path.strip("/").split("/")
+    if segments[:2] == ["api", "v2"]:
+        segments = segments[2:]
+    for i in range(1, len(segments)):
+        if segments[i - 1] in _identifier_placeholders and i % 2 == 1:
+            segments[i] = _identifier_placeholders[segments[i - 1]]
+    return f"{method.upper()} /{'/'.join(segments)}"
+
+
+class EndpointStatistics:
+    def __init__(self):
+        self.count: int = 0
+        self.errors: int = 0
+        self.total_latency: float = 0.0
+        self.max_latency: float = 0.0
+        self.latency_histogram: List[int] = [0] * (len(_latency_buckets) + 1)
+        self.bytes_received: int = 0
+        self.limiter_retries: int = 0
+        self.limiter_wait: float = 0.0
+        self.not_modified: int = 0
+        self.bytes_saved: int = 0
+
+    def add(
+        self,
+        *,
+        successful: bool,
+        latency: float,
+        bytes_received: int,
+        limiter_retries: int,
+        limiter_wait: float
+    ) -> None:
+        self.count += 1
+        if not successful:
+            self.errors += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.latency_histogram[bisect_left(_latency_buckets, latency * 1000)] += 1
+        self.bytes_received += bytes_received
+        self.limiter_retries += limiter_retries
+        self.limiter_wait += limiter_wait
+
+    @property
+    def mean_latency(self) -> float:
+        return 0.0 if self.count == 0 else self.total_latency / self.count
+
+    def latency_percentile(self, percentile: float) -> float:
+        """
+        Estimates a latency percentile from the histogram.
+
+        :param percentile: The percentile to estimate, between 0 and 100.
+        :return: The upper bound (in seconds) of the histogram bucket containing the percentile. For
+                 the unbounded bucket, the maximum observed latency is returned instead.
+        """
+
+        threshold = self.count * percentile / 100
+        cumulative = 0
+        for i, bucket_count in enumerate(self.latency_histogram):
+            cumulative += bucket_count
+            if cumulative >= threshold and bucket_count > 0:
+                if i < len(_latency_buckets):
+                    return min(_latency_buckets[i] / 1000, self.max_latency)
+                break
+        return self.max_latency
+
+    def to_json(self) -> Dict[str, Any]:
+        buckets = [str(bound) for bound in _latency_buckets] + ["+Inf"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean-latency-seconds": self.mean_latency,
+            "max-latency-seconds": self.max_latency,
+            "latency-histogram-milliseconds": dict(zip(buckets, self.latency_histogram)),
+            "bytes-received": self.bytes_received,
+            "limiter-retries": self.limiter_retries,
+            "limiter-wait-seconds": self.limiter_wait,
+            "not-modified": self.not_modified,
+            "bytes-saved": self.bytes_saved
+        }
+
+
+class RequestRecorder:
+    """
+    Aggregates statistics about every Terraform API request, per endpoint. Recording is disabled by
+    default (see the enabled attribute) and is safe to use from multiple threads.
+    """
+    def __init__(self):
+        self.enabled: bool = False
+        self._lock: Lock = Lock()
+        self._statistics: Dict[str, EndpointStatistics] = {}
+
+    def record(
+        self,
+        endpoint: str,
+        *,
+        successful: bool,
+        latency: float,
+        bytes_received: int = 0,
+        limiter_retries: int = 0,
+        limiter_wait: float = 0.0
+    ) -> None:
+        with self._lock:
+            if endpoint not in self._statistics:
+                self._statistics[endpoint] = EndpointStatistics()
+            self._statistics[endpoint].add(
+                successful=successful,
+                latency=latency,
+                bytes_received=bytes_received,
+                limiter_retries=limiter_retries,
+                limiter_wait=limiter_wait
+            )
+
+    def record_revalidation(self, endpoint: str, *, bytes_saved: int) -> None:
+        """
+        Records that a request was answered with 304 Not Modified (see ValidatorCache), i.e. that a
+        response body did not have to be downloaded again.
+
+        :param endpoint: The endpoint targeted by the request.
+        :param bytes_saved: The size of the response body which was reused.
+        :return: None
+        """
+
+        with self._lock:
+            if endpoint not in self._statistics:
+                self._statistics[endpoint] = EndpointStatistics()
+            self._statistics[endpoint].not_modified += 1
+            self._statistics[endpoint].bytes_saved += bytes_saved
+
+    @property
+    def statistics(self) -> Dict[str, EndpointStatistics]:
+        with self._lock:
+            return dict(self._statistics)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._statistics = {}
+
+    def to_json(self) -> Dict[str, Any]:
+        return {endpoint: stats.to_json() for endpoint, stats in sorted(self.statistics.items())}
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.to_json(), file, indent=2)
+
+    def write_report(self, *, write_output: bool = False) -> None:
+        """
+        Writes a tabulated report of the recorded statistics to STDOUT.
+
+        :param write_output: Whether to print the report to STDOUT. If this is False, this method is
+                             a no-op.
+        :return: None
+        """
+
+        if write_output:
+            from tabulate import tabulate
+
+            report = []
+            totals = EndpointStatistics()
+            for endpoint, stats in sorted(self.statistics.items()):
+                report.append([
+                    endpoint,
+                    stats.count,
+                    stats.errors,
+                    round(stats.mean_latency * 1000),
+                    round(stats.latency_percentile(95) * 1000),
+                    round(stats.max_latency * 1000),
+                    stats.bytes_received,
+                    stats.bytes_saved,
+                    stats.limiter_retries,
+                    round(stats.limiter_wait, 2)
+                ])
+                totals.count += stats.count
+                totals.errors += stats.errors
+                totals.total_latency += stats.total_latency
+                totals.bytes_received += stats.bytes_received
+                totals.bytes_saved += stats.bytes_saved
+                totals.not_modified += stats.not_modified
+                totals.limiter_retries += stats.limiter_retries
+                totals.limiter_wait += stats.limiter_wait
+
+            print("Terraform API request statistics:")
+            print()
+            print(
+                tabulate(
+                    report,
+                    headers=[
+                        "Endpoint",
+                        "Requests",
+                        "Errors",
+                        "Mean (ms)",
+                        "p95 (ms)",
+                        "Max (ms)",
+                        "Bytes Received",
+                        "Bytes Saved",
+                        "Limiter Retries",
+                        "Limiter Wait (s)"
+                    ]
+                )
+            )
+            print()
+            print((
+                f"Total: {totals.count} requests, {totals.errors} errors, "
+                f"{round(totals.total_latency, 2)}s waiting on responses, "
+                f"{totals.bytes_received} bytes received, "
+                f"{totals.bytes_saved} bytes saved by {totals.not_modified} revalidated responses, "
+                f"{round(totals.limiter_wait, 2)}s blocked by the rate limiter"
+            ))
+            print()
+
+
+recorder: RequestRecorder = RequestRecorder()
+
+
+def request_endpoint(request: Optional[Any]) -> str:
+    # Works with both requests.PreparedRequest objects and None (e.g. for exceptions raised before a
+    # request was prepared)
+    if request is None or getattr(request, "url", None) is None:
+        return "unknown"
+    else:
+        return endpoint_template(request.method, request.url)
@@ -0,0 +1,431 @@
+import re
+import sqlite3
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from terraform_manager.entities.workspace import Workspace
+from terraform_manager.terraform import LATEST_VERSION
+from terraform_manager.utilities.utilities import parse_version
+
+_inventory: Optional["Inventory"] = None
+
+# The fields which can be used in query expressions, mapped to their columns and value types
+_fields: Dict[str, Tuple[str, str]] = {
+    "id": ("workspace_id", "text"),
+    "name": ("name", "name"),
+    "terraform_version": ("version_rank", "version"),
+    "execution_mode": ("execution_mode", "text"),
+    "agent_pool_id": ("agent_pool_id", "text"),
+    "working_directory": ("working_directory", "text"),
+    "locked": ("locked", "boolean"),
+    "auto_apply": ("auto_apply", "boolean"),
+    "speculative": ("speculative", "boolean")
+}
+_token_pattern: "re.Pattern" = re.compile(
+    r"""\s*(?:(<=|>=|!=|=|<|>)|([()])|"([^"]*)"|'([^']*)'|([^\s()<>=!"']+))"""
+)
+
+# "latest" is newer than any actual version
+_latest_rank: int = 2**62
+
+# Names are compared case-insensitively, so their index has to be as well
+# yapf: disable
+_indexed_columns: List[Tuple[str, str]] = [
+    ("name", " COLLATE NOCASE"),
+    ("version_rank", ""),
+    ("execution_mode", ""),
+    ("agent_pool_id", ""),
+    ("locked", "")
+]
+# yapf: enable
+
+_schema: List[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS organizations (
+        domain TEXT NOT NULL,
+        organization TEXT NOT NULL,
+        PRIMARY KEY (domain, organization)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS workspaces (
+        domain TEXT NOT NULL,
+        organization TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        workspace_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        terraform_version TEXT NOT NULL,
+        version_rank INTEGER,
+        auto_apply INTEGER NOT NULL,
+        locked INTEGER NOT NULL,
+        working_directory TEXT NOT NULL,
+        agent_pool_id TEXT NOT NULL,
+        execution_mode TEXT NOT NULL,
+        speculative INTEGER NOT NULL,
+        updated_at TEXT,
+        tag_names TEXT NOT NULL,
+        PRIMARY KEY (domain, organization, workspace_id)
+    )
+    """
+] + [
+    f"CREATE INDEX IF NOT EXISTS workspaces_{column} "
+    f"ON workspaces (domain, organization, {column}{collation})"
+    for column, collation in _indexed_columns
+]
+
+
+def _version_rank(version: str) -> Optional[int]:
+    # Versions are stored as integers so that they can be compared (and indexed) by SQLite;
+    # pre-release and build metadata are ignored
+    if version == LATEST_VERSION:
+        return _latest_rank
+    parsed = parse_version(version)
+    if parsed is None:
+        return None
+    return parsed.major * 10**12 + parsed.minor * 10**6 + parsed.patch
+
+
+def _columns(workspace: Workspace) -> Tuple[Any, ...]:
+    # The values of the columns following workspace_id, in order
+    return (
+        workspace.name,
+        workspace.terraform_version,
+        _version_rank(workspace.terraform_version),
+        workspace.auto_apply,
+        workspace.is_locked,
+        workspace.working_directory,
+        workspace.agent_pool_id,
+        workspace.execution_mode,
+        workspace.speculative,
+        workspace.updated_at,
+        # Tag names cannot contain commas
+        ",".join(workspace.tag_names)
+    )
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _token_pattern.match(expression, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"unexpected character at position {position + 1}")
+        operator, parenthesis, double_quoted, single_quoted, word = match.groups()
+        if operator is not None:
+            tokens.append(("operator", operator))
+        elif parenthesis is not None:
+            tokens.append((parenthesis, parenthesis))
+        elif word is not None:
+            tokens.append(("word", word))
+        else:
+            tokens.append(("string", double_quoted if double_quoted is not None else single_quoted))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    # A recursive descent parser which compiles a query expression into an SQL condition:
+    #   expression := conjunction ("or" conjunction)*
+    #   conjunction := negation ("and" negation)*
+    #   negation := "not" negation | "(" expression ")" | FIELD OPERATOR VALUE
+    def __init__(self, expression: str):
+        self._tokens = _tokenize(expression)
+        self._position = 0
+        self.parameters: List[Any] = []
+
+    def _peek_keyword(self, keyword: str) -> bool:
+        if self._position < len(self._tokens):
+            kind, value = self._tokens[self._position]
+            return kind == "word" and value.lower() == keyword
+        return False
+
+    def _next(self, description: str) -> Tuple[str, str]:
+        if self._position >= len(self._tokens):
+            raise ValueError(f"expected {description} but the query ended")
+        token = self._tokens[self._position]
+        self._position += 1
+        return token
+
+    def parse(self) -> str:
+        if len(self._tokens) == 0:
+            raise ValueError("the query is empty")
+        condition = self._expression()
+        if self._position < len(self._tokens):
+            raise ValueError(f'unexpected "{self._tokens[self._position][1]}"')
+        return condition
+
+    def _expression(self) -> str:
+        conditions = [self._conjunction()]
+        while self._peek_keyword("or"):
+            self._position += 1
+            conditions.append(self._conjunction())
+        return conditions[0] if len(conditions) == 1 else f"({' OR '.join(conditions)})"
+
+    def _conjunction(self) -> str:
+        conditions = [self._negation()]
+        while self._peek_keyword("and"):
+            self._position += 1
+            conditions.append(self._negation())
+        return conditions[0] if len(conditions) == 1 else f"({' AND '.join(conditions)})"
+
+    def _negation(self) -> str:
+        if self._peek_keyword("not"):
+            self._position += 1
+            return f"(NOT {self._negation()})"
+        kind, value = self._next("a field name")
+        if kind == "(":
+            condition = self._expression()
+            if self._next('")"')[0] != ")":
+                raise ValueError(f'expected ")" but found "{self._tokens[self._position - 1][1]}"')
+            return condition
+        elif kind != "word" or value.lower() not in _fields:
+            raise ValueError(f'unknown field "{value}" (expected one of {", ".join(_fields)})')
+        return self._comparison(value.lower())
+
+    def _comparison(self, field: str) -> str:
+        column, value_type = _fields[field]
+        kind, operator = self._next("an operator")
+        if kind != "operator":
+            raise ValueError(f'expected an operator after {field} but found "{operator}"')
+        kind, value = self._next("a value")
+        if kind not in ["word", "string"]:
+            raise ValueError(f'expected a value after {field} {operator} but found "{value}"')
+
+        if value_type == "boolean":
+            if operator not in ["=", "!="] or value.lower() not in ["true", "false"]:
+                raise ValueError(f"{field} can only be compared to true or false using = or !=")
+            self.parameters.append(1 if value.lower() == "true" else 0)
+        elif value_type == "version":
+            # Partial versions such as "1.0" are padded with zeros
+            padded = value if value == LATEST_VERSION else ".".join(
+                (value.split(".") + ["0", "0"])[:max(3, len(value.split(".")))]
+            )
+            rank = _version_rank(padded)
+            if rank is None:
+                raise ValueError(f'"{value}" is not a valid Terraform version')
+            self.parameters.append(rank)
+        elif value_type == "name" and operator in ["=", "!="] and "*" in value:
+            # Wildcards behave like they do in workspace names (see --workspaces)
+            escaped = re.sub(r"([\\%_])", r"\\\1", value).replace("*", "%")
+            self.parameters.append(escaped)
+            return f"({'' if operator == '=' else 'NOT '}{column} LIKE ? ESCAPE '\\')"
+        else:
+            self.parameters.append(value)
+        collation = " COLLATE NOCASE" if value_type == "name" else ""
+        return f"{column} {'<>' if operator == '!=' else operator} ?{collation}"
+
+
+def parse_query(expression: str) -> Tuple[str, List[Any]]:
+    """
+    Compiles a query expression into an SQL condition over the inventory's workspaces table. An
+    expression compares fields to values (e.g. "terraform_version < 1.0 and execution_mode = agent")
+    using =, !=, <, <=, > or >=, and comparisons can be combined using and, or, not and parentheses.
+    Terraform versions are compared as versions (workspaces whose version cannot be parsed never
+    match such comparisons), names are compared case-insensitively and may contain * wildcards, and
+    values containing spaces can be quoted.
+
+    :param expression: The query expression.
+    :return: The SQL condition and the parameters it references.
+    :raises ValueError: If the expression is not valid.
+    """
+
+    parser = _Parser(expression)
+    condition = parser.parse()
+    return condition, parser.parameters
+
+
+class Inventory:
+    def __init__(self, path: str):
+        """
+        A local SQLite database of workspaces per domain and organization, which allows selecting
+        workspaces using query expressions (see parse_query) without contacting the Terraform API.
+        The columns which are commonly queried are indexed. It is safe to share an inventory across
+        threads.
+
+        :param path: The path of the database file (it is created if it does not exist), or
+                     ":memory:" for a temporary in-memory database.
+        """
+
+        self.path = path
+        self._lock: Lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            for statement in _schema:
+                self._connection.execute(statement)
+
+    def store(self, terraform_domain: str, organization: str, workspaces: List[Workspace]) -> None:
+        """
+        Replaces the stored workspaces of an organization.
+
+        :param terraform_domain: The domain corresponding to the Terraform installation (either
+                                 Terraform Cloud or Enterprise) the organization belongs to.
+        :param organization: The organization.
+        :param workspaces: All the workspaces in the organization.
+        :return: None
+        """
+
+        key = (terraform_domain.lower(), organization)
+        rows = [
+            key + (position, workspace.workspace_id) + _columns(workspace)
+            for position, workspace in enumerate(workspaces)
+        ]
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR IGNORE INTO organizations VALUES (?, ?)", key)
+            self._connection.execute(
+                "DELETE FROM workspaces WHERE domain = ? AND organization = ?", key
+            )
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO workspaces VALUES ({', '.join(['?'] * 15)})", rows
+            )
+
+    def update(self, terraform_domain: str, organization: str, workspaces: List[Workspace]) -> None:
+        """
+        Updates stored workspaces in place (e.g. after they were patched), keeping their positions.
+        Workspaces which are not stored are ignored.
+
+        :param terraform_domain: The domain corresponding to the Terraform installation (either
+                                 Terraform Cloud or Enterprise) the organization belongs to.
+        :param organization: The organization.
+        :param workspaces: The workspaces to update.
+        :return: None
+        """
+
+        key = (terraform_domain.lower(), organization)
+        rows = [_columns(workspace) + key + (workspace.workspace_id, ) for workspace in workspaces]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE workspaces SET name = ?, terraform_version = ?, version_rank = ?, "
+                "auto_apply = ?, locked = ?, working_directory = ?, agent_pool_id = ?, "
+                "execution_mode = ?, speculative = ?, updated_at = ?, tag_names = ? "
+                "WHERE domain = ? AND organization = ? AND workspace_id = ?",
+                rows
+            )
+
+    def contains(self, terraform_domain: str, organization: str) -> bool:
+        """
+        :return: Whether the workspaces of the given organization have been stored.
+        """
+
+        with self._lock:
+            return self._connection.execute(
+                "SELECT 1 FROM organizations WHERE domain = ? AND organization = ?",
+                (terraform_domain.lower(), organization)
+            ).fetchone() is not None
+
+    def select(self,
+               terraform_domain: str,
+               organization: str,
+               expression: Optional[str] = None) -> List[Workspace]:
+        """
+        Selects stored workspaces.
+
+        :param terraform_domain: The domain corresponding to the Terraform installation (either
+                                 Terraform Cloud or Enterprise) the organization belongs to.
+        :param organization: The organization.
+        :param expression: A query expression (see parse_query). If not specified, all the
+                           organization's workspaces are selected.
+        :return: The selected workspaces, in the order in which they were stored.
+        :raises ValueError: If the expression is not valid.
+        """
+
+        condition, parameters = ("1", []) if expression is None else parse_query(expression)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT workspace_id, name, terraform_version, auto_apply, locked, "
+                "working_directory, agent_pool_id, execution_mode, speculative, updated_at, "
+                "tag_names "
+                f"FROM workspaces WHERE domain = ? AND organization = ? AND {condition} "
+                "ORDER BY position", [terraform_domain.lower(), organization] + parameters
+            ).fetchall()
+        return [
+            Workspace(
+                workspace_id=row[0],
+                name=row[1],
+                terraform_version=row[2],
+                auto_apply=bool(row[3]),
+                is_locked=bool(row[4]),
+                working_directory=row[5],
+                agent_pool_id=row[6],
+                execution_mode=row[7],
+                speculative=bool(row[8]),
+                updated_at=row[9],
+                tag_names=[tag for tag in row[10].split(",") if tag != ""]
+            ) for row in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "Inventory":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def use_inventory(inventory: Optional[Inventory]) -> None:
+    """
+    Makes all subsequent workspace fetches store the fetched workspaces in an inventory (see store),
+    and makes queries consult it (see select), or stops doing so.
+
+    :param inventory: The inventory to use, or None to stop using one.
+    :return: None
+    """
+
+    global _inventory
+    _inventory = inventory
+
+
+def store(terraform_domain: str, organization: str, workspaces: List[Workspace]) -> None:
+    """
+    See Inventory.store. This stores the workspaces in the active inventory, if any.
+    """
+
+    inventory = _inventory
+    if inventory is not None:
+        inventory.store(terraform_domain, organization, workspaces)
+
+
+def update(terraform_domain: str, organization: str, workspaces: List[Workspace]) -> None:
+    """
+    See Inventory.update. This updates the workspaces in the active inventory, if any.
+    """
+
+    inventory = _inventory
+    if inventory is not None:
+        inventory.update(terraform_domain, organization, workspaces)
+
+
+def select(terraform_domain: str,
+           organization: str,
+           expression: Optional[str] = None) -> Optional[List[Workspace]]:
+    """
+    See Inventory.select. This consults the active inventory.
+
+    :return: The selected workspaces, or None if no inventory is in use or the organization's
+             workspaces have not been stored in it.
+    """
+
+    inventory = _inventory
+    if inventory is None or not inventory.contains(terraform_domain, organization):
+        return None
+    return inventory.select(terraform_domain, organization, expression)
+
+
+def matching(workspaces: List[Workspace], expression: str) -> List[Workspace]:
+    """
+    Evaluates a query expression (see parse_query) against workspaces which are not stored in an
+    inventory.
+
+    :param workspaces: The workspaces.
+    :param expression: The query expression.
+    :return: The workspaces matching the expression, in their original order.
+    :raises ValueError: If the expression is not valid.
+    """
+
+    with Inventory(":memory:") as inventory:
+        inventory.store("", "", workspaces)
+        selected = {workspace.workspace_id for workspace in inventory.select("", "", expression)}
+    return [workspace for workspace in workspaces if workspace.workspace_id in selected]
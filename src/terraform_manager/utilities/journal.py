@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+from collections import Counter
+from threading import Lock
+from typing import Any, Optional, Set, Tuple
+
+from terraform_manager.entities.workspace import Workspace
+from terraform_manager.utilities import http_client
+
+# The number of entries after which the journal is synced to disk; entries are flushed to the
+# operating system as soon as they are written, so this only matters if the machine itself crashes
+_sync_interval: int = 50
+
+_journal: Optional["Journal"] = None
+
+JournalKey = Tuple[str, str, str]
+
+
+def _key(workspace_id: str, operation: str, payload: Any) -> JournalKey:
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+    return workspace_id, operation, digest
+
+
+class Journal:
+    def __init__(self, path: str, *, resume: bool, max_attempts: int = 3):
+        """
+        An append-only log of the per-workspace operations that have been performed, which allows an
+        interrupted operation to be resumed without repeating the work that was already done. Each
+        entry records a workspace, an operation, a digest of the operation's payload (so that
+        rerunning with e.g. different variables repeats the work), and whether the operation
+        succeeded. The file contains one JSON object per line.
+
+        :param path: The path of the journal file.
+        :param resume: Whether to resume from the entries already in the file (True) or to start a
+                       new journal, overwriting the file (False).
+        :param max_attempts: The number of times an operation may fail for a given workspace before
+                             resuming stops retrying it.
+        """
+
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock: Lock = Lock()
+        self._completed: Set[JournalKey] = set()
+        self._failures: Counter = Counter()
+        self._unsynced: int = 0
+        torn = False
+        if resume and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    # A partially-written last line is expected if the process died while writing it
+                    torn = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                        key = (entry["workspace"], entry["operation"], entry["payload"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if entry.get("successful"):
+                        self._completed.add(key)
+                    else:
+                        self._failures[key] += 1
+        self._file = open(path, "a" if resume else "w", encoding="utf-8")
+        if torn:
+            self._file.write("\n")  # Otherwise, the next entry would be appended to the torn line
+
+    def check(self, workspace_id: str, operation: str, payload: Any) -> Optional[Tuple[str, str]]:
+        """
+        :return: None if the given operation should be performed for the given workspace, otherwise
+                 a (status, message) tuple suitable for a report row explaining why it should not
+                 be. The status is "skipped" if the operation was already completed, or "error" if
+                 it failed too many times already.
+        """
+
+        key = _key(workspace_id, operation, payload)
+        with self._lock:
+            if key in self._completed:
+                return "skipped", "completed by a previous run"
+            elif self._failures[key] >= self.max_attempts:
+                return "error", f"gave up after {self._failures[key]} failed attempts"
+        return None
+
+    def record(self, workspace_id: str, operation: str, payload: Any, *, successful: bool) -> None:
+        """
+        Appends an entry to the journal.
+
+        :param workspace_id: The ID of the workspace the operation was performed on.
+        :param operation: The name of the operation (e.g. "patch-workspace").
+        :param payload: A JSON-compatible object describing what the operation did.
+        :param successful: Whether the operation succeeded.
+        :return: None
+        """
+
+        key = _key(workspace_id, operation, payload)
+        line = json.dumps({
+            "workspace": key[0], "operation": key[1], "payload": key[2], "successful": successful
+        }) + "\n"
+        with self._lock:
+            if successful:
+                self._completed.add(key)
+            else:
+                self._failures[key] += 1
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= _sync_interval:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def use_journal(journal: Optional[Journal]) -> None:
+    """
+    Makes all subsequent resumable operations (see check and record) use a journal, or stops doing
+    so.
+
+    :param journal: The journal to use, or None to stop using one.
+    :return: None
+    """
+
+    global _journal
+    _journal = journal
+
+
+def check(workspace: Workspace, operation: str, payload: Any) -> Optional[Tuple[str, str]]:
+    """
+    See Journal.check. This consults the active journal, and always returns None if no journal is in
+    use.
+    """
+
+    journal = _journal
+    return None if journal is None else journal.check(workspace.workspace_id, operation, payload)
+
+
+def record(workspace: Workspace, operation: str, payload: Any, *, successful: bool) -> None:
+    """
+    Records the outcome of an operation in the active journal, if any. Nothing is recorded while
+    planning, as nothing was actually done.
+
+    :return: None
+    """
+
+    journal = _journal
+    if journal is not None and not http_client.planning():
+        journal.record(workspace.workspace_id, operation, payload, successful=successful)
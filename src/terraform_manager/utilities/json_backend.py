@@ -0,0 +1,105 @@
+import json
+from typing import Any, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
+
+# The backends in order of preference; the first one which is installed is used
+BACKENDS = ["orjson", "ujson", "json"]
+
+_backend: Optional[str] = None
+
+
+def _detect() -> str:
+    for backend in BACKENDS[:-1]:
+        try:
+            __import__(backend)
+            return backend
+        except ImportError:
+            pass
+    return "json"
+
+
+def use_backend(backend: Optional[str]) -> None:
+    """
+    Selects the library used to decode and encode JSON. By default, the fastest installed library
+    is detected (and imported) the first time JSON is decoded or encoded.
+
+    :param backend: One of BACKENDS, or None to detect the fastest installed one again.
+    :return: None
+    """
+
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend {backend} (expected one of {', '.join(BACKENDS)})")
+    global _backend
+    _backend = backend
+
+
+def backend_name() -> str:
+    """
+    :return: The name of the library used to decode and encode JSON (one of BACKENDS).
+    """
+
+    global _backend
+    if _backend is None:
+        _backend = _detect()
+    return _backend
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decodes JSON.
+
+    :param data: The JSON document, either as a string or as UTF-8-encoded bytes.
+    :return: The decoded document.
+    :raises ValueError: If the data is not valid JSON (all backends raise subclasses of it).
+    """
+
+    backend = backend_name()
+    if backend == "orjson":
+        import orjson
+
+        return orjson.loads(data)
+    elif backend == "ujson":
+        import ujson
+
+        return ujson.loads(data)
+    return json.loads(data)
+
+
+def dumps(document: Any, *, indent: bool = False) -> str:
+    """
+    Encodes JSON. Non-ASCII characters are not escaped, and when indenting, the output is otherwise
+    identical to that of json.dumps(document, indent=2).
+
+    :param document: The document to encode.
+    :param indent: Whether to indent the output by two spaces per level.
+    :return: The encoded document.
+    """
+
+    backend = backend_name()
+    if backend == "orjson":
+        import orjson
+
+        return orjson.dumps(document, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    elif backend == "ujson":
+        import ujson
+
+        return ujson.dumps(
+            document, ensure_ascii=False, escape_forward_slashes=False, indent=2 if indent else 0
+        )
+    return json.dumps(document, ensure_ascii=False, indent=2 if indent else None)
+
+
+def decode_with_backend(response: Union["Response", Any]) -> None:
+    """
+    Makes a response's json() method decode its body using the selected backend instead of the
+    standard library's json module (the requests library always uses the latter). This is a no-op
+    if the standard library is the selected backend or the response has no body to decode.
+
+    :param response: The response.
+    :return: None
+    """
+
+    if backend_name() != "json" and isinstance(getattr(response, "content", None), bytes):
+        response.json = lambda **kwargs: loads(response.content)
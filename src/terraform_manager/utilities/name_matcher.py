@@ -0,0 +1,41 @@
+import re
+from fnmatch import translate
+from typing import List, Optional, Pattern, Set
+
+_wildcard_characters: str = "*?["
+
+
+class NameMatcher:
+    """
+    Matches names against Unix-like name patterns (see the fnmatch module) case-insensitively. All
+    the patterns are compiled once up front: patterns without wildcards are stored in a set for
+    constant-time exact matching, and the remaining patterns are combined into a single regular
+    expression. This keeps matching fast even when hundreds of patterns are specified.
+    """
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+
+        self._literals: Set[str] = set()
+        wildcard_expressions = []
+        for pattern in patterns:
+            lower_pattern = pattern.lower()
+            if any(character in lower_pattern for character in _wildcard_characters):
+                wildcard_expressions.append(translate(lower_pattern))
+            else:
+                self._literals.add(lower_pattern)
+
+        self._expression: Optional[Pattern[str]] = None
+        if len(wildcard_expressions) > 0:
+            self._expression = re.compile("|".join(wildcard_expressions))
+
+    def matches(self, name: str) -> bool:
+        lower_name = name.lower()
+        if lower_name in self._literals:
+            return True
+        return self._expression is not None and self._expression.match(lower_name) is not None
+
+    def __repr__(self) -> str:
+        return f"NameMatcher(patterns={self.patterns})"
+
+    def __str__(self) -> str:
+        return repr(self)
@@ -0,0 +1,132 @@
+from collections import Counter
+from threading import Lock
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+
+from terraform_manager.utilities import instrumentation, throttle
+from terraform_manager.utilities.utilities import parse_domain
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
+
+
+def _planned_status_code(method: str, url: str) -> int:
+    # These are the status codes the Terraform API responds with when the corresponding request
+    # succeeds
+    if method == "DELETE":
+        return 204
+    elif method == "POST" and "/actions/" not in url:
+        return 201  # A resource was created
+    else:
+        return 200
+
+
+class Plan:
+    """
+    Collects the Terraform API requests an operation would send without sending the ones that would
+    modify anything. While a plan is active (see http_client.use_plan), every mutating request is
+    recorded and answered with a synthetic successful response instead, whereas read requests are
+    still sent (they are needed to compute e.g. which variables must be created versus updated).
+    """
+    def __init__(self):
+        self._lock: Lock = Lock()
+        self._requests: List[Tuple[str, str, Optional[Any]]] = []
+        self._reads: Counter = Counter()
+
+    def add_request(self, method: str, url: str, json_body: Optional[Any]) -> "Response":
+        """
+        Records a mutating request.
+
+        :param method: The HTTP method of the request.
+        :param url: The URL of the request.
+        :param json_body: The JSON body of the request, if any.
+        :return: A synthetic response indicating that the request was successful.
+        """
+
+        from requests import Request, Response
+
+        method = method.upper()
+        with self._lock:
+            self._requests.append((method, url, json_body))
+        response = Response()
+        response.status_code = _planned_status_code(method, url)
+        response._content = b""
+        response.url = url
+        response.request = Request(method, url).prepare()
+        return response
+
+    def add_read(self, url: str) -> None:
+        with self._lock:
+            self._reads[parse_domain(url)] += 1
+
+    @property
+    def requests(self) -> List[Tuple[str, str, Optional[Any]]]:
+        """
+        :return: The planned (mutating) requests as (method, URL, JSON body) tuples, in the order
+                 they were planned.
+        """
+
+        with self._lock:
+            return list(self._requests)
+
+    @property
+    def request_count(self) -> int:
+        with self._lock:
+            return len(self._requests)
+
+    @property
+    def read_count(self) -> int:
+        with self._lock:
+            return sum(self._reads.values())
+
+    @property
+    def estimated_duration(self) -> float:
+        """
+        :return: The minimum number of seconds it would take to execute the plan (including its read
+                 requests) under the Terraform API rate limit. Each domain has its own rate limit,
+                 so the busiest domain determines the duration.
+        """
+
+        with self._lock:
+            per_domain = Counter(self._reads)
+            for _, url, _ in self._requests:
+                per_domain[parse_domain(url)] += 1
+        busiest = max(per_domain.values()) if len(per_domain) > 0 else 0
+        return busiest / throttle.calls_per_second()
+
+    def endpoint_counts(self) -> Dict[str, int]:
+        """
+        :return: The number of planned requests per endpoint (e.g.
+                 "PATCH /workspaces/:workspace_id").
+        """
+
+        return dict(
+            Counter([
+                instrumentation.endpoint_template(method, url) for method, url, _ in self.requests
+            ])
+        )
+
+    def write_summary(self, *, write_output: bool = False) -> None:
+        """
+        Writes a tabulated count of the planned requests per endpoint to STDOUT, followed by the
+        total number of requests and the estimated duration of the plan.
+
+        :param write_output: Whether to print the summary to STDOUT. If this is False, this method
+                             is a no-op.
+        :return: None
+        """
+
+        if write_output:
+            from tabulate import tabulate
+
+            print("Planned Terraform API requests (nothing has been modified):")
+            print()
+            print(
+                tabulate(sorted(self.endpoint_counts().items()), headers=["Endpoint", "Requests"])
+            )
+            print()
+            print((
+                f"Total: {self.request_count} modifying requests and {self.read_count} read "
+                f"requests, which would take at least {round(self.estimated_duration, 1)}s under "
+                f"the rate limit of {round(throttle.calls_per_second(), 2):g} requests per second"
+            ))
+            print()
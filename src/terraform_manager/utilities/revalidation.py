@@ -0,0 +1,102 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Hashable, Mapping, Optional, Union, TYPE_CHECKING
+
+from terraform_manager.entities.error_response import ErrorResponse
+from terraform_manager.utilities import instrumentation
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
+
+Request = Callable[[Mapping[str, str]], Union["Response", ErrorResponse]]
+
+
+class _Entry:
+    def __init__(self, response: "Response"):
+        self.response = response
+        self.etag: Optional[str] = response.headers.get("ETag")
+        self.last_modified: Optional[str] = response.headers.get("Last-Modified")
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        # If-None-Match takes precedence over If-Modified-Since, so only one of them is needed
+        if self.etag is not None:
+            return {"If-None-Match": self.etag}
+        return {"If-Modified-Since": self.last_modified}
+
+
+class ValidatorCache:
+    def __init__(self, *, maximum_entries: int = 256):
+        """
+        Revalidates GET requests instead of downloading the same response bodies over and over. The
+        most recent response to each request which carried a cache validator (an ETag or a
+        Last-Modified header) is stored, and when the request is repeated, the validator is sent
+        along with it (as If-None-Match or If-Modified-Since). If the server responds with 304 Not
+        Modified, the stored response is used. Responses without a validator are never stored, so
+        servers which do not emit validators are simply sent unconditional requests.
+
+        :param maximum_entries: The maximum number of stored responses. Once it is reached, the
+                                least recently used response is evicted.
+        """
+
+        self.maximum_entries = maximum_entries
+        self._lock: Lock = Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._not_modified_count: int = 0
+        self._bytes_saved: int = 0
+
+    @property
+    def not_modified_count(self) -> int:
+        with self._lock:
+            return self._not_modified_count
+
+    @property
+    def bytes_saved(self) -> int:
+        """
+        :return: The total size of the response bodies which did not have to be downloaded again.
+        """
+
+        with self._lock:
+            return self._bytes_saved
+
+    def send(self, key: Hashable, headers: Mapping[str, str], request: Request, *,
+             endpoint: str) -> Union["Response", ErrorResponse]:
+        """
+        Sends a request, conditionally if a response to an identical request is stored.
+
+        :param key: A key identifying the request; requests with equal keys are identical.
+        :param headers: The headers to send.
+        :param request: A function sending the request with the headers it is passed.
+        :param endpoint: The endpoint targeted by the request (see
+                         instrumentation.endpoint_template), for recording the bytes saved.
+        :return: The response, which is the stored one if the server responded with 304.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            response = request(headers)
+        else:
+            response = request({**headers, **entry.headers})
+            if response.status_code == 304:
+                bytes_saved = len(entry.response.content)
+                with self._lock:
+                    self._not_modified_count += 1
+                    self._bytes_saved += bytes_saved
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                if instrumentation.recorder.enabled:
+                    instrumentation.recorder.record_revalidation(endpoint, bytes_saved=bytes_saved)
+                return entry.response
+
+        if response.status_code == 200:
+            new_entry = _Entry(response)
+            with self._lock:
+                if new_entry.etag is None and new_entry.last_modified is None:
+                    self._entries.pop(key, None)
+                else:
+                    self._entries[key] = new_entry
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.maximum_entries:
+                        self._entries.popitem(last=False)
+        return response
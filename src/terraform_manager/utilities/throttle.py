@@ -1,23 +1,168 @@
-from typing import Callable
+import math
+import time
+from threading import Lock
+from typing import Callable, TYPE_CHECKING, Dict, Optional, Tuple
 
-from ratelimit import limits, sleep_and_retry
-from requests import Response
+from ratelimit import limits, RateLimitException
+from terraform_manager.utilities import instrumentation
+
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
 
 # The rate limit specified in this file is slightly under the real rate limit to prevent
 # disagreements between HashiCorp and terraform-manager caused by latency, race conditions, etc.
+_default_calls_per_second: int = 28
+_calls_per_second: int = _default_calls_per_second
+
+# The number of processes (e.g. CI jobs each handling one shard of the workspaces) which divide the
+# rate limit among themselves (see share_rate_limit)
+_shares: int = 1
+
+# Each Terraform domain has its own rate limit, so each domain gets its own limiter; the limiters
+# are thread-safe, so concurrent operations against the same domain share a single budget
+_limiters: Dict[Optional[str], Callable[[Callable[[], "Response"]], "Response"]] = {}
+_limiters_lock: Lock = Lock()
+
+
+def _rate_limit() -> Tuple[int, int]:
+    # Returns the number of requests which may be sent per period (in seconds). Processes which
+    # outnumber the requests allowed per second each get a single request per several seconds, so
+    # that together they still do not exceed the rate limit
+    if _shares <= _calls_per_second:
+        return _calls_per_second // _shares, 1
+    else:
+        return 1, math.ceil(_shares / _calls_per_second)
+
+
+def calls_per_second() -> float:
+    """
+    :return: The number of requests per second which this process may send to each Terraform
+             domain, given the processes it shares the rate limit with (see share_rate_limit). This
+             is less than one if the rate limit is shared by more processes than it allows requests
+             per second.
+    """
+
+    calls, period = _rate_limit()
+    return calls / period
+
+
+def set_rate_limit(calls: Optional[int]) -> None:
+    """
+    Overrides the number of requests per second allowed against each Terraform domain, e.g. to lift
+    the rate limit when benchmarking against a mock Terraform API.
+
+    :param calls: The number of requests per second, or None to restore the default rate limit.
+    :return: None
+    """
+
+    global _calls_per_second
+    with _limiters_lock:
+        _calls_per_second = _default_calls_per_second if calls is None else calls
+        # The limiters are rebuilt with the new rate the next time they are needed
+        _limiters.clear()
+
+
+def share_rate_limit(shares: int) -> None:
+    """
+    Divides the rate limit evenly among a number of processes which target the same Terraform
+    installations at the same time, so that together they do not exceed it.
+
+    :param shares: The number of processes sharing the rate limit (1 to use all of it).
+    :return: None
+    """
+
+    global _shares
+    with _limiters_lock:
+        _shares = max(1, shares)
+        # The limiters are rebuilt with the new rate the next time they are needed
+        _limiters.clear()
+
+
+def _get_limiter(
+    terraform_domain: Optional[str]
+) -> Callable[[Callable[[], "Response"]], "Response"]:
+    with _limiters_lock:
+        if terraform_domain not in _limiters:
+            calls, period = _rate_limit()
+
+            @limits(calls=calls, period=period)
+            def limiter(function: Callable[[], "Response"]) -> "Response":
+                return function()
+
+            _limiters[terraform_domain] = limiter
+        return _limiters[terraform_domain]
+
+
+def _invoke(function: Callable[[], "Response"], terraform_domain: Optional[str]) -> "Response":
+    limiter = _get_limiter(terraform_domain)
+    while True:
+        try:
+            return limiter(function)
+        except RateLimitException as e:
+            time.sleep(e.period_remaining)
+
+
+def _invoke_instrumented(
+    function: Callable[[], "Response"], terraform_domain: Optional[str]
+) -> "Response":
+    limiter = _get_limiter(terraform_domain)
+    entered = time.perf_counter()
+    started = entered
+    retries = 0
+
+    def timed() -> "Response":
+        nonlocal started
+        started = time.perf_counter()
+        return function()
+
+    try:
+        while True:
+            try:
+                response = limiter(timed)
+                break
+            except RateLimitException as e:
+                retries += 1
+                time.sleep(e.period_remaining)
+    except Exception as e:
+        instrumentation.recorder.record(
+            instrumentation.request_endpoint(getattr(e, "request", None)),
+            successful=False,
+            latency=time.perf_counter() - started,
+            limiter_retries=retries,
+            limiter_wait=started - entered
+        )
+        raise
+
+    instrumentation.recorder.record(
+        instrumentation.request_endpoint(getattr(response, "request", None)),
+        successful=getattr(response, "ok", True),
+        latency=time.perf_counter() - started,
+        bytes_received=len(getattr(response, "content", b"") or b""),
+        limiter_retries=retries,
+        limiter_wait=started - entered
+    )
+    return response
 
 
-@sleep_and_retry
-@limits(calls=28, period=1)
-def throttle(function: Callable[[], Response]) -> Response:
+def throttle(
+    function: Callable[[], "Response"], terraform_domain: Optional[str] = None
+) -> "Response":
     """
     Throttles an operation based on Terraform's documented API rate limits. If the operation would
-    breach the rate limit, it will block on the current thread until it is safe to execute.
+    breach the rate limit, it will block on the current thread until it is safe to execute. If
+    instrumentation is enabled (see terraform_manager.utilities.instrumentation), the operation's
+    latency and time spent blocked are recorded.
 
     See: https://www.terraform.io/docs/cloud/api/index.html#rate-limiting for more information.
 
     :param function: A function to invoke while throttling. This will commonly be an HTTP request.
+    :param terraform_domain: The domain of the Terraform installation the operation targets. All
+                             operations against the same domain (across all threads) share one rate
+                             limit. If not specified, a process-wide default limit is used.
     :return: The result of the function, if any.
     """
 
-    return function()
+    if instrumentation.recorder.enabled:
+        return _invoke_instrumented(function, terraform_domain)
+    else:
+        return _invoke(function, terraform_domain)
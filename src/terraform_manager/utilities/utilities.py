@@ -2,13 +2,16 @@ import os
 import sys
 import textwrap
 from datetime import datetime, timezone
-from typing import Callable, Union, Optional, Dict, Any, List
+from functools import lru_cache
+from typing import Callable, Union, Optional, Dict, Any, List, TYPE_CHECKING
 from urllib.parse import urlparse
 
-import requests
-from requests import Response
 from terraform_manager.entities.error_response import ErrorResponse
 
+if TYPE_CHECKING:  # pragma: no cover
+    from requests import Response
+    from semver import VersionInfo
+
 
 def is_windows_operating_system() -> bool:  # pragma: no cover
     # See: https://docs.python.org/3/library/sys.html#sys.platform
@@ -33,7 +36,7 @@ def get_protocol(no_tls: bool) -> str:
     return "http" if no_tls else "https"
 
 
-def safe_http_request(function: Callable[[], Response]) -> Union[Response, ErrorResponse]:
+def safe_http_request(function: Callable[[], "Response"]) -> Union["Response", ErrorResponse]:
     """
     Attempts to invoke a given function, catching various exceptions raised by the requests library.
     If any such exception is caught, a derived response entity is returned so that
@@ -43,12 +46,30 @@ def safe_http_request(function: Callable[[], Response]) -> Union[Response, Error
     :return: Either the result of invoking the given function or None.
     """
 
+    from requests import RequestException
+
     try:
         return function()
-    except requests.exceptions.RequestException as e:
+    except RequestException as e:
         return ErrorResponse(str(e))
 
 
+@lru_cache(maxsize=256)
+def parse_version(version: str) -> Optional["VersionInfo"]:
+    """
+    Parses a semantic version string. Results are cached because organizations typically only use a
+    handful of distinct Terraform versions across all of their workspaces, so the same strings are
+    parsed over and over again.
+
+    :param version: The version string to parse (e.g. "0.13.5").
+    :return: The parsed version, or None if the string is not a valid semantic version.
+    """
+
+    from semver import VersionInfo
+
+    return VersionInfo.parse(version) if VersionInfo.isvalid(version) else None
+
+
 def wrap_text(text: str, column_limit: int) -> str:
     return os.linesep.join(textwrap.wrap(text, width=column_limit, break_long_words=False))
 
@@ -1,3 +1,4 @@
+import pytest
 from pytest_mock import MockerFixture
 from terraform_manager.terraform import get_api_headers, HTTP_CONTENT_TYPE
 
@@ -19,3 +20,12 @@ def test_get_api_headers_missing_token(mocker: MockerFixture) -> None:
     mocker.patch("terraform_manager.terraform.find_token", return_value=None)
     headers = get_api_headers(TEST_TERRAFORM_DOMAIN, token=None)
     assert headers == {"Content-Type": HTTP_CONTENT_TYPE}
+
+
+def test_get_api_headers_reused_and_immutable(mocker: MockerFixture) -> None:
+    mocker.patch("terraform_manager.terraform.find_token", return_value="test")
+    headers = get_api_headers(TEST_TERRAFORM_DOMAIN)
+    assert get_api_headers(TEST_TERRAFORM_DOMAIN) is headers
+    assert get_api_headers(TEST_TERRAFORM_DOMAIN, token="other") is not headers
+    with pytest.raises(TypeError):
+        headers["Authorization"] = "something else"
@@ -0,0 +1,98 @@
+import pytest
+from terraform_manager.entities.desired_state import DesiredState
+from terraform_manager.entities.variable import Variable
+
+from tests.utilities.tooling import test_workspace
+
+_aws_workspace = test_workspace()
+_aws_workspace.name = "aws-production"
+_other_workspace = test_workspace()
+_other_workspace.name = "gcp-production"
+
+
+def test_rules_override_each_other() -> None:
+    desired_state = DesiredState.from_json({
+        "workspaces": [{
+            "settings": {
+                "auto-apply": False, "terraform-version": "0.13.5"
+            },
+            "variables": [{
+                "key": "region", "value": "global"
+            }]
+        },
+                       {
+                           "names":
+                           "AWS-*",
+                           "settings": {
+                               "auto-apply": True
+                           },
+                           "locked":
+                           True,
+                           "variables": [{
+                               "key": "region", "value": "us-east-1"
+                           }, {
+                               "key": "a", "value": "b"
+                           }]
+                       }, {
+                           "names": ["*-production"], "locked": False
+                       }]
+    })
+    assert desired_state.settings_for(_aws_workspace) == {
+        "auto-apply": True, "terraform-version": "0.13.5"
+    }
+    assert desired_state.settings_for(_other_workspace) == {
+        "auto-apply": False, "terraform-version": "0.13.5"
+    }
+    assert desired_state.lock_for(_aws_workspace) is False
+    assert desired_state.variables_for(_aws_workspace) == [
+        Variable(key="region", value="us-east-1"), Variable(key="a", value="b")
+    ]
+    assert desired_state.variables_for(_other_workspace) == [Variable(key="region", value="global")]
+    assert str(desired_state).startswith("DesiredState(rules=[WorkspaceRule(names=['*']")
+
+
+def test_empty_rules() -> None:
+    desired_state = DesiredState.from_json({"workspaces": []})
+    assert desired_state.settings_for(_aws_workspace) == {}
+    assert desired_state.lock_for(_aws_workspace) is None
+    assert desired_state.variables_for(_aws_workspace) == []
+
+
+def test_invalid_documents() -> None:
+    def document(*rules) -> dict:
+        return {"workspaces": list(rules)}
+
+    def setting(key: str, value) -> dict:
+        return document({"settings": {key: value}})
+
+    # yapf: disable
+    invalid_documents = [
+        ([], 'the document must be an object with a "workspaces" list'),
+        (document("*"), "workspaces[0] must be an object"),
+        (document({"names": [1]}), "workspaces[0].names must be a list of name patterns"),
+        (document({"settings": []}), "workspaces[0].settings must be an object"),
+        (setting("name", "x"), "workspaces[0].settings.name is not a supported setting"),
+        (setting("auto-apply", "yes"), "workspaces[0].settings.auto-apply must be true or false"),
+        (
+            setting("working-directory", None),
+            "workspaces[0].settings.working-directory must be a string"
+        ),
+        (
+            setting("terraform-version", "1.x"),
+            "workspaces[0].settings.terraform-version is not valid"
+        ),
+        (
+            setting("execution-mode", "fast"),
+            "workspaces[0].settings.execution-mode must be one of ['remote', 'local', 'agent']"
+        ),
+        (document({"locked": "no"}), "workspaces[0].locked must be true or false"),
+        (
+            document({}, {"variables": [{"key": "not valid", "value": ""}]}),
+            "workspaces[1].variables[0] is not a valid variable"
+        )
+    ]
+    # yapf: enable
+    for invalid_document, message in invalid_documents:
+        with pytest.raises(ValueError) as e:
+            DesiredState.from_json(invalid_document)
+        assert str(e.value) == message
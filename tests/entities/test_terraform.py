@@ -1,11 +1,14 @@
 import sys
+from typing import Optional, List
 from unittest.mock import MagicMock, call
 
 from pytest_mock import MockerFixture
+from terraform_manager.entities.desired_state import DesiredState
 from terraform_manager.entities.terraform import Terraform
 from terraform_manager.entities.workspace import Workspace
 from terraform_manager.terraform import CLOUD_DOMAIN
 
+from tests.utilities.mock_terraform_api import MockTerraformApi, generate_organization
 from tests.utilities.tooling import test_workspace, TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION
 
 _test_workspace: Workspace = test_workspace(version="0.13.0")
@@ -25,6 +28,22 @@ def test_lazy_workspace_fetching(mocker: MockerFixture) -> None:
     workspaces3 = terraform.workspaces
     assert fetch_mock.call_count == 2
 
+    terraform = Terraform("something.mycompany.com", TEST_ORGANIZATION, no_tls=True)
+    workspaces4 = terraform.workspaces
+    assert fetch_mock.call_count == 3
+    assert fetch_mock.call_args.kwargs["no_tls"]
+
+
+def test_version_index_rebuilt_per_fetch(mocker: MockerFixture) -> None:
+    mocker.patch("terraform_manager.entities.terraform.fetch_all", return_value=[_test_workspace])
+    terraform = Terraform(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, token=None)
+    index1 = terraform.version_index
+    assert terraform.version_index is index1
+    assert index1.counts() == [(_test_workspace.terraform_version, 1)]
+
+    terraform.token = "test"
+    assert terraform.version_index is not index1
+
 
 def test_configuration_validation_no_tls_against_terraform_cloud(mocker: MockerFixture) -> None:
     fetch_mock: MagicMock = mocker.patch(
@@ -79,6 +98,9 @@ def test_passthrough(mocker: MockerFixture) -> None:
         "terraform_manager.entities.terraform.lock_or_unlock_workspaces", return_value=True
     )
     summary_mock: MagicMock = mocker.patch("terraform_manager.entities.terraform.write_summary")
+    version_report_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform.write_version_report"
+    )
     configure_variables_mock: MagicMock = mocker.patch(
         "terraform_manager.entities.terraform.configure_variables", return_value=True
     )
@@ -88,6 +110,9 @@ def test_passthrough(mocker: MockerFixture) -> None:
     batch_operation_mock: MagicMock = mocker.patch(
         "terraform_manager.entities.terraform.batch_operation", return_value=True
     )
+    apply_desired_state_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform.apply_desired_state", return_value=True
+    )
 
     terraform = Terraform(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION)
 
@@ -126,6 +151,15 @@ def test_passthrough(mocker: MockerFixture) -> None:
         write_output=False
     )
 
+    terraform.write_version_report()
+    version_report_mock.assert_called_once_with(
+        TEST_TERRAFORM_DOMAIN,
+        TEST_ORGANIZATION,
+        terraform.version_index,
+        targeting_specific_workspaces=False,
+        write_output=False
+    )
+
     variables = []
     assert terraform.configure_variables(variables)
     configure_variables_mock.assert_called_once_with(
@@ -149,6 +183,18 @@ def test_passthrough(mocker: MockerFixture) -> None:
         write_output=False
     )
 
+    desired_state = DesiredState([])
+    assert terraform.apply_desired_state(desired_state)
+    apply_desired_state_mock.assert_called_once_with(
+        TEST_TERRAFORM_DOMAIN,
+        TEST_ORGANIZATION,
+        workspaces,
+        desired_state=desired_state,
+        no_tls=False,
+        token=None,
+        write_output=False
+    )
+
     assert terraform.set_working_directories("test")
     assert terraform.set_execution_modes("local")
     assert not terraform.set_execution_modes("something invalid")
@@ -236,3 +282,367 @@ def test_set_execution_modes(mocker: MockerFixture) -> None:
                     print_mock.reset_mock()
                 else:
                     print_mock.assert_not_called()
+
+
+def test_update_settings(mocker: MockerFixture) -> None:
+    for write_output in [True, False]:
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        mocker.patch(
+            "terraform_manager.entities.terraform.fetch_all", return_value=[_test_workspace]
+        )
+        batch_operation_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.batch_operation", return_value=True
+        )
+        terraform = Terraform(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, write_output=write_output)
+
+        assert terraform.update_settings(
+            terraform_version="0.13.5",
+            working_directory="",
+            execution_mode="agent",
+            agent_pool_id="apool-test",
+            auto_apply=True,
+            speculative=False
+        )
+        batch_operation_mock.assert_called_once()
+        kwargs = batch_operation_mock.call_args[1]
+        assert kwargs["field_names"] == [
+            "terraform-version",
+            "working-directory",
+            "execution-mode",
+            "agent-pool-id",
+            "auto-apply",
+            "speculative-enabled"
+        ]
+        assert kwargs["new_values"] == ["0.13.5", "", "agent", "apool-test", True, False]
+        assert [mapper(_test_workspace)
+                for mapper in kwargs["field_mappers"]] == ["0.13.0", "", "remote", "", False, True]
+        assert [
+            mapper(value)
+            for mapper, value in zip(kwargs["report_only_value_mappers"], kwargs["new_values"])
+        ] == ["0.13.5", "<none>", "agent", "apool-test", "True", "False"]
+        print_mock.assert_not_called()
+
+        # Any invalid setting should prevent every setting from being updated
+        for settings in [{}, {"terraform_version": "0.12.0", "auto_apply": True},
+                         {"execution_mode": "invalid", "speculative": True}]:
+            batch_operation_mock.reset_mock()
+            assert not terraform.update_settings(**settings)
+            batch_operation_mock.assert_not_called()
+            if write_output:
+                assert print_mock.call_count == 1
+                print_mock.reset_mock()
+            else:
+                print_mock.assert_not_called()
+
+
+def test_apply_desired_state_validation(mocker: MockerFixture) -> None:
+    agent_workspace = test_workspace(
+        version="0.11.0", execution_mode="agent", agent_pool_id="apool-test"
+    )
+    mocker.patch(
+        "terraform_manager.entities.terraform.fetch_all",
+        return_value=[_test_workspace, agent_workspace]
+    )
+    apply_desired_state_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform.apply_desired_state", return_value=True
+    )
+    print_mock: MagicMock = mocker.patch("builtins.print")
+    cloud_terraform = Terraform(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, write_output=True)
+    enterprise_terraform = Terraform("something.company.com", TEST_ORGANIZATION, write_output=True)
+
+    def rule(names: List[str], settings: dict) -> dict:
+        return {"names": names, "settings": settings}
+
+    # yapf: disable
+    tests = [
+        (cloud_terraform, [rule(["*"], {"terraform-version": "0.13.5"})], True),
+        (cloud_terraform, [rule(["*"], {"terraform-version": "0.12.9"})], False),
+        # Only the workspaces a rule applies to are checked for downgrades
+        (cloud_terraform, [rule([agent_workspace.name], {"terraform-version": "0.12.0"})], True),
+        (cloud_terraform, [rule([_test_workspace.name], {"terraform-version": "0.12.0"})], False),
+        (cloud_terraform, [rule(["*"], {"execution-mode": "agent"})], False),
+        (cloud_terraform, [rule(["*"], {"execution-mode": "agent", "agent-pool-id": "a"})], True),
+        (enterprise_terraform, [rule(["*"], {"execution-mode": "agent", "agent-pool-id": "a"})],
+         False),
+        (cloud_terraform, [rule(["*"], {"execution-mode": "local", "agent-pool-id": "a"})], False),
+        # A workspace which is already in agent mode keeps its agent pool
+        (cloud_terraform, [rule([agent_workspace.name], {"execution-mode": "agent"})], True),
+        (cloud_terraform, [rule(["*"], {"execution-mode": "agent"}),
+                           rule(["*"], {"agent-pool-id": "a"})], True),
+        (cloud_terraform, [rule(["*"], {"execution-mode": "remote"})], True)
+    ]
+    # yapf: enable
+    for terraform, rules, valid in tests:
+        apply_desired_state_mock.reset_mock()
+        print_mock.reset_mock()
+        desired_state = DesiredState.from_json({"workspaces": rules})
+        assert terraform.apply_desired_state(desired_state) == valid
+        if valid:
+            apply_desired_state_mock.assert_called_once()
+            print_mock.assert_not_called()
+        else:
+            # Nothing is changed if the desired state is not valid for any of the workspaces
+            apply_desired_state_mock.assert_not_called()
+            assert print_mock.call_count == 1
+
+
+def test_chained_operations() -> None:
+    with MockTerraformApi(generate_organization("synthetic", 5)) as api:
+        terraform = Terraform(api.domain, "synthetic", no_tls=True, token="test")
+        workspaces = terraform.workspaces
+        assert len(workspaces) == 5
+        terraform.version_index  # Builds the index before the versions change
+
+        assert terraform.update_settings(auto_apply=True, working_directory="chained")
+        assert terraform.lock_workspaces()
+        assert terraform.set_versions("latest")
+
+        # The cached workspaces were updated using the responses instead of being re-fetched
+        assert terraform.workspaces is workspaces
+        assert api.request_counts[("GET", "list_workspaces")] == 1
+        for workspace in workspaces:
+            assert workspace.auto_apply and workspace.is_locked
+            assert workspace.working_directory == "chained"
+            assert workspace.is_auto_updating
+        assert terraform.version_index.counts() == [("latest", 5)]
+
+
+def test_refresh_workspaces(mocker: MockerFixture) -> None:
+    with MockTerraformApi(generate_organization("synthetic", 150)) as api:
+        terraform = Terraform(
+            api.domain, "synthetic", workspace_names=["workspace-0000*"], no_tls=True, token="test"
+        )
+        workspaces = terraform.workspaces
+        assert len(workspaces) == 10
+        version_index = terraform.version_index
+
+        # The first refresh fetches the whole organization, but keeps the cached objects
+        api.workspace(workspaces[0].workspace_id)["attributes"]["locked"] = True
+        refreshed = terraform.refresh_workspaces()
+        assert api.request_counts[("GET", "list_workspaces")] == 2 + 2
+        assert all(a is b for a, b in zip(refreshed, workspaces)) and len(refreshed) == 10
+        assert workspaces[0].is_locked
+        assert terraform.workspaces is refreshed
+        assert terraform.version_index is not version_index
+
+        # Subsequent refreshes only fetch what changed
+        name = workspaces[1].name
+        other = Terraform(
+            api.domain, "synthetic", workspace_names=[name], no_tls=True, token="test"
+        )
+        assert other.update_settings(working_directory="elsewhere")
+        api.reset_counts()
+        assert len(terraform.refresh_workspaces()) == 10
+        assert api.request_counts[("GET", "list_workspaces")] == 1
+        assert workspaces[1].working_directory == "elsewhere"
+
+        # Changing the options starts over
+        terraform.workspace_names = ["workspace-0001*"]
+        api.reset_counts()
+        assert [w.name for w in terraform.refresh_workspaces()][0] == "workspace-00010"
+        assert api.request_counts[("GET", "list_workspaces")] == 2
+
+        # If the workspaces cannot be fetched, the cached ones are returned
+        cached = terraform.workspaces
+        mocker.patch("terraform_manager.entities.terraform.sync_workspaces", return_value=None)
+        assert terraform.refresh_workspaces() is cached
+
+    assert Terraform("domain", "organization", blacklist=True).refresh_workspaces() == []
+
+
+def test_query(mocker: MockerFixture, tmp_path) -> None:
+    from terraform_manager.utilities import inventory
+    from terraform_manager.utilities.inventory import Inventory
+
+    with MockTerraformApi(generate_organization("synthetic", 150)) as api:
+
+        def create(query: str) -> Terraform:
+            return Terraform(
+                api.domain,
+                "synthetic",
+                workspace_names=["workspace-000*"],
+                query=query,
+                no_tls=True,
+                token="test"
+            )
+
+        # Without an inventory, the workspaces are fetched and the query is evaluated locally
+        unfiltered = Terraform(
+            api.domain, "synthetic", workspace_names=["workspace-000*"], no_tls=True, token="test"
+        )
+        expected = [w for w in unfiltered.workspaces if w.execution_mode == "agent"]
+        assert len(expected) > 0
+        terraform = create("execution_mode = agent")
+        assert terraform.workspaces == expected
+        assert terraform.refresh_workspaces() == expected
+
+        with Inventory(str(tmp_path / "inventory.sqlite")) as opened:
+            inventory.use_inventory(opened)
+            try:
+                # The first selection fills the inventory, and subsequent ones do not need the API
+                assert create("execution_mode = agent").workspaces == expected
+                assert opened.contains(api.domain, "synthetic")
+                api.reset_counts()
+                selected = create("execution_mode = agent and locked = false").workspaces
+                assert selected == [workspace for workspace in expected if not workspace.is_locked]
+                assert api.request_count == 0
+            finally:
+                inventory.use_inventory(None)
+
+    print_mock: MagicMock = mocker.patch("builtins.print")
+    terraform = Terraform(
+        TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, query="locked =", write_output=True
+    )
+    assert not terraform.configuration_is_valid()
+    assert terraform.workspaces == []
+    print_mock.assert_called_with(
+        "Error: the query is not valid: expected a value but the query ended.", file=sys.stderr
+    )
+
+
+def test_query_before_changes(mocker: MockerFixture, tmp_path) -> None:
+    from terraform_manager.utilities import inventory
+    from terraform_manager.utilities.inventory import Inventory
+
+    with MockTerraformApi(generate_organization("synthetic", 150)) as api, \
+            Inventory(str(tmp_path / "inventory.sqlite")) as opened:
+
+        def create(query: str) -> Terraform:
+            return Terraform(api.domain, "synthetic", query=query, no_tls=True, token="test")
+
+        inventory.use_inventory(opened)
+        try:
+            outdated = create("terraform_version < 1.0").workspaces
+            assert len(outdated) > 1
+
+            # A workspace which was upgraded since the inventory was filled is still selected from
+            # it, but the selection is brought up to date before any workspace is changed
+            upgraded = api.workspace(outdated[0].workspace_id)["attributes"]
+            upgraded["terraform-version"] = "1.5.0"
+            upgraded["updated-at"] = "2021-04-01T12:00:00.000Z"
+            api.reset_counts()
+            terraform = create("terraform_version < 1.0")
+            assert terraform.workspaces == outdated
+            assert api.request_count == 0
+            assert terraform.set_versions("1.0.0")
+            assert upgraded["terraform-version"] == "1.5.0"
+            assert api.request_counts[("GET", "list_workspaces")] == 1
+            assert api.request_counts[("PATCH", "patch_workspace")] == len(outdated) - 1
+
+            # The patched workspaces are stored, so they are no longer selected
+            api.reset_counts()
+            assert create("terraform_version < 1.0").workspaces == []
+            assert len(create("terraform_version = 1.0.0").workspaces) == len(outdated) - 1
+            assert create("terraform_version = 1.5.0").workspaces == outdated[:1]
+            assert api.request_count == 0
+
+            # Locking updates the inventory as well, and read-only operations do not refresh
+            terraform = create("terraform_version = 1.0.0 and locked = false")
+            terraform.write_summary()
+            assert api.request_count == 0
+            assert terraform.lock_workspaces()
+            assert api.request_counts[("GET", "list_workspaces")] == 1
+            assert create("terraform_version = 1.0.0 and locked = false").workspaces == []
+
+            # Nothing is changed if the selection cannot be brought up to date
+            mocker.patch("terraform_manager.entities.terraform.sync_workspaces", return_value=None)
+            api.reset_counts()
+            assert not create("terraform_version = 1.0.0").unlock_workspaces()
+            assert api.request_count == 0
+        finally:
+            inventory.use_inventory(None)
+
+
+def test_where() -> None:
+    from terraform_manager.entities.workspace_filter import WorkspaceFilter
+
+    with MockTerraformApi(generate_organization("synthetic", 150)) as api:
+        unfiltered = Terraform(api.domain, "synthetic", no_tls=True, token="test")
+
+        def create(where: WorkspaceFilter, query: Optional[str] = None) -> Terraform:
+            return Terraform(
+                api.domain, "synthetic", query=query, where=where, no_tls=True, token="test"
+            )
+
+        # The criteria are applied both alongside and without a query, and when refreshing
+        where = WorkspaceFilter(execution_modes=["agent"], locked=False, tags=["prod"])
+        expected = [
+            w for w in unfiltered.workspaces
+            if w.execution_mode == "agent" and not w.is_locked and "prod" in w.tag_names
+        ]
+        assert len(expected) > 0
+        assert create(where).workspaces == expected
+        assert create(where).refresh_workspaces() == expected
+        terraform = create(WorkspaceFilter(tags=["prod"]), query="execution_mode = agent")
+        assert [w for w in terraform.workspaces if not w.is_locked] == expected
+        assert create(WorkspaceFilter()).workspaces == unfiltered.workspaces
+
+        # Changing the criteria re-selects the workspaces
+        terraform = create(where)
+        assert terraform.workspaces == expected
+        terraform.where = WorkspaceFilter(execution_modes=["agent"], locked=True)
+        assert all(w.is_locked for w in terraform.workspaces)
+
+        # The attribute index is rebuilt once locking changes the workspaces
+        terraform = create(WorkspaceFilter(execution_modes=["agent"]))
+        index = terraform.attribute_index
+        assert terraform.attribute_index is index
+        assert terraform.version_index is index.version_index
+        assert terraform.lock_workspaces()
+        assert terraform.attribute_index is not index
+        assert terraform.attribute_index.select(WorkspaceFilter(locked=False)) == []
+
+        # The same applies to every other operation which patches the workspaces
+        terraform.attribute_index  # Builds the index before the execution modes change
+        assert terraform.set_execution_modes("local")
+        local = terraform.attribute_index.select(WorkspaceFilter(execution_modes=["local"]))
+        assert len(local) > 0 and local == terraform.workspaces
+        assert terraform.attribute_index.select(WorkspaceFilter(execution_modes=["agent"])) == []
+
+
+def test_shard(mocker: MockerFixture) -> None:
+    from terraform_manager.entities.workspace_filter import WorkspaceFilter
+
+    with MockTerraformApi(generate_organization("synthetic", 150)) as api:
+        selected = Terraform(
+            api.domain, "synthetic", workspace_names=["workspace-000*"], no_tls=True, token="test"
+        ).workspaces
+
+        # The shards partition the selected workspaces however the workspaces are selected
+        for query, where in [(None, None), ("locked = false", WorkspaceFilter(tags=["aws"]))]:
+            shards = [
+                Terraform(
+                    api.domain,
+                    "synthetic",
+                    workspace_names=["workspace-000*"],
+                    query=query,
+                    where=where,
+                    shard=(index, 3),
+                    no_tls=True,
+                    token="test"
+                ) for index in range(1, 4)
+            ]
+            expected = Terraform(
+                api.domain,
+                "synthetic",
+                workspace_names=["workspace-000*"],
+                query=query,
+                where=where,
+                no_tls=True,
+                token="test"
+            ).workspaces
+            assert all(len(terraform.workspaces) > 0 for terraform in shards)
+            assert sorted(w.name for t in shards for w in t.workspaces) == \
+                [w.name for w in expected]
+            assert shards[0].refresh_workspaces() == shards[0].workspaces
+        assert len(expected) < len(selected)
+
+    print_mock: MagicMock = mocker.patch("builtins.print")
+    for shard in [(0, 2), (3, 2)]:
+        terraform = Terraform(
+            TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, shard=shard, write_output=True
+        )
+        assert not terraform.configuration_is_valid()
+        print_mock.assert_called_with(
+            "Error: the shard index must be between 1 and the number of shards.", file=sys.stderr
+        )
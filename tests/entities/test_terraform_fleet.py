@@ -0,0 +1,160 @@
+import sys
+from unittest.mock import MagicMock
+
+from pytest_mock import MockerFixture
+from terraform_manager.entities.desired_state import DesiredState
+from terraform_manager.entities.terraform_fleet import TerraformFleet
+from terraform_manager.entities.workspace import Workspace
+from terraform_manager.terraform import CLOUD_DOMAIN
+
+from tests.utilities.tooling import test_workspace, TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION
+
+_other_domain: str = "terraform.example.com"
+_other_organization: str = "other-organization"
+_test_workspace1: Workspace = test_workspace(version="0.13.0")
+_test_workspace2: Workspace = test_workspace(version="0.14.0")
+
+
+def _fetch_side_effect(domain: str, organization: str, **kwargs) -> list:
+    return [_test_workspace1] if organization == TEST_ORGANIZATION else [_test_workspace2]
+
+
+def _test_fleet(**kwargs) -> TerraformFleet:
+    return TerraformFleet([(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION),
+                           (_other_domain, _other_organization)],
+                          **kwargs)
+
+
+def test_concurrent_workspace_fetching(mocker: MockerFixture) -> None:
+    fetch_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform.fetch_all", side_effect=_fetch_side_effect
+    )
+    fleet = _test_fleet(tokens={_other_domain: "test"})
+    assert fleet.workspaces == [_test_workspace1, _test_workspace2]
+    assert fleet.workspaces == [_test_workspace1, _test_workspace2]
+    assert fetch_mock.call_count == 2
+    assert fleet.terraforms[0].token is None
+    assert fleet.terraforms[1].token == "test"
+    assert str(fleet) == (
+        f"TerraformFleet(targets=[{TEST_TERRAFORM_DOMAIN}/{TEST_ORGANIZATION}, "
+        f"{_other_domain}/{_other_organization}])"
+    )
+
+
+def test_configuration_validation(mocker: MockerFixture) -> None:
+    mocker.patch("builtins.print")
+    assert _test_fleet().configuration_is_valid()
+    fleet = TerraformFleet([(_other_domain, _other_organization),
+                            (CLOUD_DOMAIN, TEST_ORGANIZATION)],
+                           no_tls=True)
+    assert not fleet.configuration_is_valid()
+
+
+def test_operations(mocker: MockerFixture) -> None:
+    for write_output in [True, False]:
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        mocker.patch(
+            "terraform_manager.entities.terraform.fetch_all", side_effect=_fetch_side_effect
+        )
+        lock_or_unlock_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.lock_or_unlock_workspaces",
+            side_effect=[True, True, True, False]
+        )
+        batch_operation_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.batch_operation", return_value=True
+        )
+        variables_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.configure_variables", return_value=True
+        )
+        delete_variables_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.delete_variables", return_value=True
+        )
+        apply_desired_state_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.apply_desired_state", return_value=True
+        )
+
+        fleet = _test_fleet(write_output=write_output)
+        assert fleet.lock_workspaces()
+        assert not fleet.unlock_workspaces()
+        assert lock_or_unlock_mock.call_count == 4
+
+        assert fleet.set_working_directories("test")
+        assert fleet.set_execution_modes("local")
+        assert fleet.set_auto_apply(True)
+        assert fleet.set_speculative(True)
+        assert batch_operation_mock.call_count == 8
+
+        assert fleet.configure_variables([])
+        assert fleet.delete_variables([])
+        assert variables_mock.call_count == 2
+        assert delete_variables_mock.call_count == 2
+
+        assert fleet.apply_desired_state(DesiredState([]))
+        assert apply_desired_state_mock.call_count == 2
+
+        if write_output:
+            print_mock.assert_any_call("Terraform fleet results for 2 organizations:")
+        else:
+            print_mock.assert_not_called()
+
+
+def test_set_versions(mocker: MockerFixture) -> None:
+    for write_output in [True, False]:
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        mocker.patch(
+            "terraform_manager.entities.terraform.fetch_all", side_effect=_fetch_side_effect
+        )
+        batch_operation_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.batch_operation", return_value=True
+        )
+
+        fleet = _test_fleet(write_output=write_output)
+        assert fleet.check_versions("0.14.0")
+        assert not fleet.check_versions("0.13.5")
+
+        # A downgrade in any organization should prevent all organizations from being updated
+        assert not fleet.set_versions("0.13.5")
+        batch_operation_mock.assert_not_called()
+        if write_output:
+            # yapf: disable
+            print_mock.assert_called_once_with((
+                "Error: at least one of the target workspaces has a version newer than the one "
+                "you are attempting to change to. No workspaces were updated."
+            ), file=sys.stderr)
+            # yapf: enable
+        else:
+            print_mock.assert_not_called()
+
+        assert fleet.set_versions("0.15.0")
+        assert batch_operation_mock.call_count == 2
+
+        print_mock.reset_mock()
+        assert not fleet.update_settings(terraform_version="0.13.5", auto_apply=True)
+        assert batch_operation_mock.call_count == 2
+        if not write_output:
+            print_mock.assert_not_called()
+
+        assert fleet.update_settings(terraform_version="0.15.0", auto_apply=True)
+        assert fleet.update_settings(working_directory="test", speculative=False)
+        assert batch_operation_mock.call_count == 6
+
+
+def test_reports(mocker: MockerFixture) -> None:
+    mocker.patch("terraform_manager.entities.terraform.fetch_all", side_effect=_fetch_side_effect)
+    summary_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform_fleet.write_fleet_summary"
+    )
+    version_report_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform.write_version_report"
+    )
+
+    fleet = _test_fleet(workspace_names=["*"])
+    fleet.write_summary()
+    targets = [(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, [_test_workspace1]),
+               (_other_domain, _other_organization, [_test_workspace2])]
+    summary_mock.assert_called_once_with(
+        targets, targeting_specific_workspaces=True, write_output=False
+    )
+
+    fleet.write_version_report()
+    assert version_report_mock.call_count == 2
@@ -0,0 +1,47 @@
+from terraform_manager.entities.workspace_attribute_index import WorkspaceAttributeIndex
+from terraform_manager.entities.workspace_filter import WorkspaceFilter
+from terraform_manager.terraform import LATEST_VERSION
+
+from tests.utilities.tooling import test_workspace
+
+_workspaces = [
+    test_workspace(version="0.13.5", tags=["aws", "dev"]),
+    test_workspace(
+        version="1.0.0", execution_mode="agent", agent_pool_id="apool-1", tags=["aws", "prod"]
+    ),
+    test_workspace(version="0.13.5", locked=True, tags=["gcp", "prod"]),
+    test_workspace(version=LATEST_VERSION, execution_mode="local"),
+    test_workspace(
+        version="1.0.0", execution_mode="agent", agent_pool_id="apool-2", locked=True, tags=["aws"]
+    )
+]
+
+
+def test_select() -> None:
+    # yapf: disable
+    tests = [
+        (WorkspaceFilter(), [0, 1, 2, 3, 4]),
+        (WorkspaceFilter(versions=["0.13.5"]), [0, 2]),
+        (WorkspaceFilter(versions=[LATEST_VERSION, "1.0.0"]), [1, 3, 4]),
+        (WorkspaceFilter(versions=["0.12.31"]), []),
+        (WorkspaceFilter(versions=[]), []),
+        (WorkspaceFilter(execution_modes=["agent", "local"]), [1, 3, 4]),
+        (WorkspaceFilter(agent_pool_ids=["apool-2"]), [4]),
+        (WorkspaceFilter(locked=True), [2, 4]),
+        (WorkspaceFilter(locked=False), [0, 1, 3]),
+        (WorkspaceFilter(tags=["aws"]), [0, 1, 4]),
+        (WorkspaceFilter(tags=["aws", "prod"]), [1]),
+        (WorkspaceFilter(tags=["azure"]), []),
+        (WorkspaceFilter(tags=[]), [0, 1, 2, 3, 4]),
+        (WorkspaceFilter(versions=["1.0.0"], execution_modes=["agent"], locked=False), [1]),
+        (WorkspaceFilter(versions=["0.13.5"], tags=["prod"], locked=True), [2])
+    ]
+    # yapf: enable
+    index = WorkspaceAttributeIndex(_workspaces)
+    for workspace_filter, positions in tests:
+        expected = [_workspaces[position] for position in positions]
+        assert index.select(workspace_filter) == expected, workspace_filter
+        # Testing every workspace against the criteria selects the same workspaces
+        assert [w for w in _workspaces if workspace_filter.matches(w)] == expected, workspace_filter
+    assert index.version_index.versions == [LATEST_VERSION, "1.0.0", "0.13.5"]
+    assert str(index) == "WorkspaceAttributeIndex(workspaces=5)"
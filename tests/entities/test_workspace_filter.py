@@ -0,0 +1,60 @@
+from terraform_manager.entities.workspace_filter import WorkspaceFilter
+
+
+def test_is_empty() -> None:
+    assert WorkspaceFilter().is_empty
+    tests = [
+        WorkspaceFilter(versions=[]),
+        WorkspaceFilter(execution_modes=["agent"]),
+        WorkspaceFilter(agent_pool_ids=["apool-1"]),
+        WorkspaceFilter(locked=False),
+        WorkspaceFilter(tags=["aws"])
+    ]
+    for workspace_filter in tests:
+        assert not workspace_filter.is_empty
+
+
+def test_search_parameters() -> None:
+    # yapf: disable
+    tests = [
+        (WorkspaceFilter(), {}),
+        (WorkspaceFilter(tags=[]), {}),
+        (WorkspaceFilter(execution_modes=["agent"], locked=True), {}),
+        (WorkspaceFilter(tags=["aws"]), {"search[tags]": "aws"}),
+        (WorkspaceFilter(versions=["1.0.0"], tags=["aws", "prod"]), {"search[tags]": "aws,prod"})
+    ]
+    # yapf: enable
+    for workspace_filter, parameters in tests:
+        assert workspace_filter.search_parameters() == parameters
+
+
+def test_describe() -> None:
+    # yapf: disable
+    tests = [
+        (WorkspaceFilter(), ""),
+        (WorkspaceFilter(locked=False), "unlocked"),
+        (
+            WorkspaceFilter(versions=["0.13.5", "1.0.0"], agent_pool_ids=["apool-1"], locked=True),
+            "versions 0.13.5, 1.0.0; agent pools apool-1; locked"
+        ),
+        (
+            WorkspaceFilter(execution_modes=["agent"], tags=["aws"]),
+            "execution modes agent; tags aws"
+        )
+    ]
+    # yapf: enable
+    for workspace_filter, description in tests:
+        assert workspace_filter.describe() == description
+
+
+def test_equality() -> None:
+    workspace_filter = WorkspaceFilter(versions=["1.0.0"], locked=True, tags=["aws"])
+    assert workspace_filter == WorkspaceFilter(versions=["1.0.0"], locked=True, tags=["aws"])
+    assert hash(workspace_filter) == hash(
+        WorkspaceFilter(versions=["1.0.0"], locked=True, tags=["aws"])
+    )
+    assert workspace_filter != WorkspaceFilter(versions=["1.0.0"], locked=False, tags=["aws"])
+    assert workspace_filter != WorkspaceFilter(versions=["1.0.0"], tags=["aws"])
+    assert WorkspaceFilter(tags=[]) != WorkspaceFilter()
+    assert workspace_filter != "not a filter"
+    assert str(workspace_filter) == repr(workspace_filter)
@@ -0,0 +1,38 @@
+from terraform_manager.entities.workspace_version_index import WorkspaceVersionIndex
+from terraform_manager.terraform import LATEST_VERSION
+
+from tests.utilities.tooling import test_workspace
+
+_old_workspace1 = test_workspace(version="0.12.28")
+_old_workspace2 = test_workspace(version="0.12.28")
+_new_workspace = test_workspace(version="0.13.5")
+_latest_workspace = test_workspace(version=LATEST_VERSION)
+_invalid_workspace = test_workspace(version="not a version")
+
+
+def test_counts() -> None:
+    index = WorkspaceVersionIndex([
+        _old_workspace1, _new_workspace, _invalid_workspace, _latest_workspace, _old_workspace2
+    ])
+    assert index.versions == [LATEST_VERSION, "0.13.5", "0.12.28", "not a version"]
+    expected_counts = [(LATEST_VERSION, 1), ("0.13.5", 1), ("0.12.28", 2), ("not a version", 1)]
+    assert index.counts() == expected_counts
+    assert index.workspaces_with_version("0.12.28") == [_old_workspace1, _old_workspace2]
+    assert index.workspaces_with_version("1.0.0") == []
+
+
+def test_any_newer_than() -> None:
+    all_workspaces = [_old_workspace1, _old_workspace2, _new_workspace, _latest_workspace]
+    for workspaces in [all_workspaces, all_workspaces[:3], all_workspaces[:2], []]:
+        index = WorkspaceVersionIndex(workspaces)
+        for version in ["0.12.0", "0.12.28", "0.13.0", "0.13.5", "1.0.0", LATEST_VERSION]:
+            expected = any(w.is_terraform_version_newer_than(version) for w in workspaces)
+            assert index.any_newer_than(version) == expected
+
+
+def test_older_than() -> None:
+    workspaces = [_old_workspace1, _old_workspace2, _new_workspace, _latest_workspace]
+    index = WorkspaceVersionIndex(workspaces)
+    for version in ["0.12.0", "0.12.28", "0.13.0", "0.13.5", "1.0.0", LATEST_VERSION]:
+        expected = [w for w in workspaces if w.is_terraform_version_older_than(version)]
+        assert index.older_than(version) == expected
@@ -0,0 +1,100 @@
+from threading import Thread
+from typing import List
+
+import requests
+from terraform_manager.entities.run import Run
+from terraform_manager.interface.run_metrics import RunMetrics, create_metrics_server, poll_once
+
+from tests.utilities.tooling import test_run, test_workspace
+
+_created_at: str = "2020-11-05T04:29:38.792Z"
+_created_at_unix_time: int = 1604550578
+
+
+def _run(run: Run, status: str) -> Run:
+    return Run(
+        run_id=run.run_id,
+        workspace=run.workspace,
+        created_at=run.created_at,
+        status=status,
+        all_status_timestamps=run.all_status_timestamps,
+        has_changes=run.has_changes
+    )
+
+
+def _samples(metrics: RunMetrics, now: float = _created_at_unix_time + 60) -> dict:
+    lines = metrics.render(now).splitlines()
+    assert lines[-1] == "# EOF"
+    return {
+        line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+        for line in lines
+        if not line.startswith("#")
+    }
+
+
+def test_incremental_snapshots() -> None:
+    workspace = test_workspace()
+    pending = test_run(status="pending", created_at=_created_at)
+    pending.workspace = workspace
+    applying = test_run(status="applying", created_at=_created_at)
+    metrics = RunMetrics()
+
+    metrics.apply_snapshot([pending, applying], poll_duration=1.5, api_calls=2)
+    samples = _samples(metrics)
+    assert samples['terraform_active_runs{status="pending"}'] == 1
+    assert samples['terraform_active_runs{status="applying"}'] == 1
+    age_sample = (
+        f'terraform_workspace_oldest_pending_run_age_seconds{{workspace="{workspace.name}"}}'
+    )
+    assert samples[age_sample] == 60
+    assert samples["terraform_run_watcher_polls_total"] == 1
+    assert samples["terraform_run_watcher_poll_duration_seconds"] == 1.5
+    assert samples["terraform_run_watcher_poll_api_calls"] == 2
+
+    # The pending run starts planning and the applying run finishes
+    metrics.apply_snapshot([_run(pending, "planning")], poll_duration=0.5, api_calls=2)
+    samples = _samples(metrics)
+    assert samples['terraform_active_runs{status="pending"}'] == 0
+    assert samples['terraform_active_runs{status="applying"}'] == 0
+    assert samples['terraform_active_runs{status="planning"}'] == 1
+    assert samples['terraform_run_status_transitions_total{status="pending"}'] == 1
+    assert samples['terraform_run_status_transitions_total{status="planning"}'] == 1
+    assert age_sample not in samples
+    assert samples["terraform_run_watcher_polls_total"] == 2
+
+    metrics.apply_snapshot([], poll_duration=0.5, api_calls=2)
+    assert _samples(metrics)['terraform_active_runs{status="planning"}'] == 0
+
+
+def test_label_escaping() -> None:
+    run = test_run(status='odd"status\\')
+    metrics = RunMetrics()
+    metrics.apply_snapshot([run], poll_duration=0, api_calls=1)
+    assert 'terraform_active_runs{status="odd\\"status\\\\"} 1' in metrics.render()
+
+
+def test_metrics_server() -> None:
+    metrics = RunMetrics()
+    requests_sent = 10
+
+    def poll() -> List[Run]:
+        nonlocal requests_sent
+        requests_sent += 3  # E.g. a retried request in addition to one request per workspace
+        return [test_run(status="pending")]
+
+    poll_once(metrics, poll, lambda: requests_sent)
+    assert "terraform_run_watcher_poll_api_calls 3" in metrics.render()
+    server = create_metrics_server(metrics, 0)
+    # Only the loopback interface is listened on unless another one is requested
+    assert server.server_address[0] == "127.0.0.1"
+    Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        response = requests.get(f"{base_url}/metrics")
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+        assert 'terraform_active_runs{status="pending"} 1' in response.text
+        assert requests.get(f"{base_url}/other").status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,5 +1,6 @@
 import json
 import os
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
@@ -13,8 +14,8 @@ _sample_credentials_file_contents: str = json.dumps({"credentials": {_domain: {"
 
 
 @pytest.fixture(autouse=True)
-def clear_token_cache() -> None:
-    credentials._cached_token = None
+def clear_credentials_file_cache() -> None:
+    credentials._credentials_file_cache.clear()
 
 
 def test_find_token_custom_environment_variable(mocker: MockerFixture) -> None:
@@ -22,7 +23,7 @@ def test_find_token_custom_environment_variable(mocker: MockerFixture) -> None:
         os.environ, {credentials._token_environment_variable_name: _token}, clear=True
     )
     assert find_token(_domain) == _token
-    assert find_token(_domain) == _token  # Tests the caching functionality
+    assert find_token("something.mycompany.com") == _token
 
 
 def _test_find_token_configuration_file(
@@ -41,6 +42,7 @@ def _test_find_token_configuration_file(
     )
     mocker.patch("os.path.expandvars", return_value="something")
     mocker.patch("os.path.exists", return_value=configuration_file_exists)
+    mocker.patch("os.path.getmtime", return_value=1.0)
 
     file_mock: MagicMock = mocker.patch("terraform_manager.terraform.credentials.open")
     mocker.mock_open(
@@ -79,3 +81,37 @@ def test_find_token_configuration_file_empty(mocker: MockerFixture) -> None:
     _test_find_token_configuration_file(
         mocker=mocker, configuration_file_exists=True, configuration_file_empty=True, windows=True
     )
+
+
+def test_find_token_multiple_domains(tmp_path: Path, mocker: MockerFixture) -> None:
+    other_domain = "something.mycompany.com"
+    other_token = "other test token"
+    credentials_file = tmp_path / "credentials.tfrc.json"
+    credentials = {_domain: {"token": _token}, other_domain: {"token": other_token}}
+    credentials_file.write_text(json.dumps({"credentials": credentials}))
+    mocker.patch.dict(os.environ, {"TF_CLI_CONFIG_FILE": str(credentials_file)}, clear=True)
+    json_load_spy: MagicMock = mocker.spy(json, "load")
+
+    for _ in range(2):
+        assert find_token(_domain) == _token
+        assert find_token(other_domain) == other_token
+        assert find_token("unknown.mycompany.com") is None
+    assert json_load_spy.call_count == 1
+
+
+def test_find_token_credentials_file_modified(tmp_path: Path, mocker: MockerFixture) -> None:
+    credentials_file = tmp_path / "credentials.tfrc.json"
+    credentials_file.write_text(_sample_credentials_file_contents)
+    mocker.patch.dict(os.environ, {"TF_CLI_CONFIG_FILE": str(credentials_file)}, clear=True)
+    json_load_spy: MagicMock = mocker.spy(json, "load")
+
+    assert find_token(_domain) == _token
+    assert find_token(_domain) == _token
+    assert json_load_spy.call_count == 1
+
+    new_token = "new test token"
+    credentials_file.write_text(json.dumps({"credentials": {_domain: {"token": new_token}}}))
+    modification_time = os.path.getmtime(credentials_file) + 10
+    os.utime(credentials_file, (modification_time, modification_time))
+    assert find_token(_domain) == new_token
+    assert json_load_spy.call_count == 2
@@ -1,9 +1,12 @@
+import sys
 from unittest.mock import MagicMock, call
 
 import responses
 from pytest_mock import MockerFixture
 from tabulate import tabulate
 from terraform_manager.terraform.locking import lock_or_unlock_workspaces
+from terraform_manager.utilities import http_client
+from terraform_manager.utilities.circuit_breaker import CircuitBreaker
 
 from tests.utilities.tooling import test_workspace, TEST_API_URL, TEST_TERRAFORM_DOMAIN, \
     TEST_ORGANIZATION
@@ -59,7 +62,7 @@ def test_lock_or_unlock_workspaces(mocker: MockerFixture) -> None:
                             ],
                             [
                                 _test_workspace1.name,
-                                _test_workspace1.is_locked,
+                                not test,
                                 test,
                                 "success",
                                 "none" if status == 200 else f"workspace was already {operation}ed"
@@ -78,3 +81,33 @@ def test_lock_or_unlock_workspaces(mocker: MockerFixture) -> None:
             ])
             # yapf: enable
             assert print_mock.call_count == 4
+            # The workspaces are updated in place to reflect the outcome
+            assert _test_workspace1.is_locked == test
+            assert _test_workspace2.is_locked
+
+
+@responses.activate
+def test_lock_or_unlock_workspaces_circuit_breaker(mocker: MockerFixture) -> None:
+    _establish_mocks(mocker)
+    print_mock: MagicMock = mocker.patch("builtins.print")
+    workspaces = [test_workspace(locked=False) for _ in range(3)]
+    responses.add(
+        responses.POST,
+        f"{TEST_API_URL}/workspaces/{workspaces[0].workspace_id}/actions/lock",
+        json={"errors": []},
+        status=401
+    )
+    http_client.use_circuit_breaker(CircuitBreaker())
+    try:
+        assert not lock_or_unlock_workspaces(
+            TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, workspaces, set_lock=True, write_output=True
+        )
+    finally:
+        http_client.use_circuit_breaker(None)
+    # Only the first request was sent, and the other workspaces were reported in aggregate
+    assert len(responses.calls) == 1
+    message = (
+        "Error: the remaining 2 workspace(s) were skipped because the Terraform API at "
+        f"{TEST_TERRAFORM_DOMAIN} rejected the token (HTTP 401)."
+    )
+    print_mock.assert_any_call(message, file=sys.stderr)
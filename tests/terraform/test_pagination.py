@@ -2,7 +2,7 @@ from typing import Any, List, Dict
 
 import responses
 from pytest_mock import MockerFixture
-from terraform_manager.terraform.pagination import exhaust_pages
+from terraform_manager.terraform.pagination import exhaust_pages, fetch_pages
 
 _test_url: str = "http://some.endpoint/thing"
 
@@ -134,3 +134,40 @@ def test_exhaust_pages_multiple_pages(mocker: MockerFixture) -> None:
     assert exhaust_pages(
         _test_url, json_mapper=_simple_mapper
     ) == [["test1", "test2"], ["test3", "test4"]]
+
+
+@responses.activate
+def test_fetch_pages(mocker: MockerFixture) -> None:
+    _establish_mocks(mocker)
+    for page in [1, 2]:
+        pagination = {"next-page": page + 1, "total-count": 500}
+        document = {"data": [{"objectname": f"test{page}"}], "meta": {"pagination": pagination}}
+        responses.add(
+            responses.GET,
+            f"{_test_url}?sort=name&page[number]={page}&page[size]=100",
+            match_querystring=True,
+            json=document,
+            status=200
+        )
+    responses.add(
+        responses.GET,
+        f"{_test_url}?sort=name&page[number]=3&page[size]=100",
+        match_querystring=True,
+        json={"errors": []},
+        status=500
+    )
+
+    # The total count is taken from the first page
+    assert fetch_pages(
+        _test_url, json_mapper=_simple_mapper, parameters={"sort": "name"}
+    ) == ([["test1"], ["test2"]], 500, False)
+    assert len(responses.calls) == 3
+
+    # Paging stops as soon as the output for a page satisfies the stop condition
+    assert fetch_pages(
+        _test_url,
+        json_mapper=_simple_mapper,
+        parameters={"sort": "name"},
+        stop_when=lambda page: page == ["test1"]
+    ) == ([["test1"]], 500, True)
+    assert len(responses.calls) == 4
@@ -0,0 +1,242 @@
+import json
+import sys
+from unittest.mock import MagicMock
+
+from pytest_mock import MockerFixture
+from terraform_manager.entities.desired_state import DesiredState
+from terraform_manager.terraform.reconcile import apply_desired_state, parse_desired_state
+from terraform_manager.terraform.workspaces import fetch_all
+from terraform_manager.utilities import http_client
+from terraform_manager.utilities.circuit_breaker import CircuitBreaker
+
+from tests.utilities.mock_terraform_api import MockTerraformApi, generate_organization
+
+_organization: str = "synthetic"
+_token: str = "test"
+
+
+def _variable_state(api: MockTerraformApi, workspace_id: str) -> dict:
+    return {v["key"]: v for v in api.workspace(workspace_id)["vars"].values()}
+
+
+def test_apply_desired_state(mocker: MockerFixture) -> None:
+    for write_output in [True, False]:
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        with MockTerraformApi(generate_organization(_organization, 4)) as api:
+            workspaces = fetch_all(api.domain, _organization, no_tls=True, token=_token)
+            first, second = workspaces[0], workspaces[1]
+            api.workspace(second.workspace_id)["attributes"]["locked"] = second.is_locked = True
+            first_variables = _variable_state(api, first.workspace_id)
+            # yapf: disable
+            desired_state = DesiredState.from_json({
+                "workspaces": [
+                    {
+                        "names": ["workspace-0000[01]"],
+                        "settings": {
+                            "auto-apply": True,
+                            "working-directory": "infrastructure",
+                            "terraform-version": first.terraform_version
+                        },
+                        "locked": True,
+                        "variables": [
+                            # This variable already matches, so it should not be touched
+                            {**first_variables["variable0"]},
+                            {"key": "variable1", "value": "changed", "category": "env"},
+                            {"key": "new", "value": "secret", "sensitive": True}
+                        ]
+                    },
+                    {"names": [second.name], "locked": False}
+                ]
+            })
+            # yapf: enable
+            first_was_locked = first.is_locked
+            api.reset_counts()
+
+            assert apply_desired_state(
+                api.domain,
+                _organization,
+                workspaces,
+                desired_state=desired_state,
+                no_tls=True,
+                token=_token,
+                write_output=write_output
+            )
+
+            for workspace in [first, second]:
+                state = api.workspace(workspace.workspace_id)
+                assert state["attributes"]["auto-apply"]
+                assert state["attributes"]["working-directory"] == "infrastructure"
+                assert state["attributes"]["locked"] == (workspace is first)
+                variables = _variable_state(api, workspace.workspace_id)
+                assert variables["variable1"]["value"] == "changed"
+                assert variables["new"]["sensitive"]
+            # One PATCH per workspace carries every changed setting, and untouched workspaces
+            # cause no requests at all
+            assert api.request_counts[("PATCH", "patch_workspace")] == 2
+            assert api.request_counts[("GET", "list_variables")] == 2
+            assert api.request_counts[("PATCH", "update_variable")] == 2
+            assert api.request_counts[("POST", "create_variable")] == 2
+            assert api.request_counts[("POST", "lock_workspace")] == 2 - int(first_was_locked)
+            # The workspaces were updated in place using the responses
+            assert first.is_locked and not second.is_locked
+            assert first.auto_apply and second.working_directory == "infrastructure"
+
+            # Applying the same state again (without re-fetching the workspaces) is a no-op (apart
+            # from fetching the variables)
+            # yapf: disable
+            matched_state = DesiredState.from_json({
+                "workspaces": [{
+                    "names": ["workspace-0000[01]"],
+                    "settings": {"auto-apply": True, "working-directory": "infrastructure"},
+                    "variables": [{"key": "variable1", "value": "changed", "category": "env"}]
+                }]
+            })
+            # yapf: enable
+            api.reset_counts()
+            assert apply_desired_state(
+                api.domain,
+                _organization,
+                workspaces,
+                desired_state=matched_state,
+                no_tls=True,
+                token=_token,
+                write_output=write_output
+            )
+            assert set(api.request_counts.keys()) == {("GET", "list_variables")}
+
+        if write_output:
+            print_mock.assert_any_call("4 of 4 workspaces already matched the desired state.")
+        else:
+            print_mock.assert_not_called()
+
+
+def test_apply_desired_state_twice(mocker: MockerFixture) -> None:
+    print_mock: MagicMock = mocker.patch("builtins.print")
+    with MockTerraformApi(generate_organization(_organization, 2)) as api:
+        workspaces = fetch_all(api.domain, _organization, no_tls=True, token=_token)
+
+        def apply(variables: list) -> None:
+            desired_state = DesiredState.from_json({"workspaces": [{"variables": variables}]})
+            print_mock.reset_mock()
+            api.reset_counts()
+            assert apply_desired_state(
+                api.domain,
+                _organization,
+                workspaces,
+                desired_state=desired_state,
+                no_tls=True,
+                token=_token,
+                write_output=True
+            )
+
+        secret = {"key": "secret", "value": "value", "sensitive": True}
+        plain = {"key": "plain", "value": "value"}
+        apply([secret, plain])
+        assert api.request_counts[("POST", "create_variable")] == 4
+
+        # The values of sensitive variables cannot be compared, so applying the same state again
+        # changes nothing
+        apply([secret, plain])
+        assert set(api.request_counts.keys()) == {("GET", "list_variables")}
+        print_mock.assert_any_call("2 of 2 workspaces already matched the desired state.")
+
+        # Sensitive variables are still updated if any of their other attributes changed
+        apply([{**secret, "description": "changed"}, plain])
+        assert api.request_counts[("PATCH", "update_variable")] == 2
+        for workspace in workspaces:
+            secret_state = _variable_state(api, workspace.workspace_id)["secret"]
+            assert secret_state["description"] == "changed"
+
+
+def test_apply_desired_state_failures(mocker: MockerFixture) -> None:
+    mocker.patch("builtins.print")
+    with MockTerraformApi(generate_organization(_organization, 2)) as api:
+        workspaces = fetch_all(api.domain, _organization, no_tls=True, token=_token)
+        # yapf: disable
+        desired_state = DesiredState.from_json({
+            "workspaces": [{
+                "settings": {"auto-apply": not workspaces[0].auto_apply},
+                "variables": [{"key": "new", "value": "value"}]
+            }]
+        })
+        # yapf: enable
+        # Workspaces which no longer exist cannot be patched, and their variables cannot be fetched
+        for workspace in workspaces:
+            workspace.workspace_id = "ws-missing"
+        assert not apply_desired_state(
+            api.domain,
+            _organization,
+            workspaces,
+            desired_state=desired_state,
+            no_tls=True,
+            token=_token,
+            write_output=True
+        )
+    assert apply_desired_state(
+        "localhost", _organization, [], desired_state=desired_state, no_tls=True, token=_token
+    )
+
+
+def test_parse_desired_state(mocker: MockerFixture, tmp_path) -> None:
+    document = {"workspaces": [{"names": ["aws-*"], "settings": {"auto-apply": True}}]}
+    json_file = tmp_path / "state.json"
+    json_file.write_text(json.dumps(document))
+    yaml_file = tmp_path / "state.YAML"
+    yaml_file.write_text("workspaces:\n  - names: [aws-*]\n    settings:\n      auto-apply: true\n")
+    for file in [json_file, yaml_file]:
+        desired_state = parse_desired_state(str(file))
+        assert desired_state.rules[0].names == ["aws-*"]
+        assert desired_state.rules[0].settings == {"auto-apply": True}
+
+    invalid_file = tmp_path / "invalid.json"
+    invalid_file.write_text(json.dumps({"workspaces": {}}))
+    missing_file = str(tmp_path / "missing.json")
+    for write_output in [True, False]:
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        assert parse_desired_state(str(invalid_file), write_output=write_output) is None
+        assert parse_desired_state(missing_file, write_output=write_output) is None
+        if write_output:
+            message = (
+                f"Error: {invalid_file} is not a valid desired state: the document must be an "
+                'object with a "workspaces" list'
+            )
+            print_mock.assert_any_call(message, file=sys.stderr)
+            assert print_mock.call_count == 2
+        else:
+            print_mock.assert_not_called()
+
+    mocker.patch.dict(sys.modules, {"yaml": None})  # Simulates PyYAML not being installed
+    print_mock: MagicMock = mocker.patch("builtins.print")
+    assert parse_desired_state(str(yaml_file), write_output=True) is None
+    print_mock.assert_called_once_with(
+        "Error: PyYAML must be installed to read YAML files (pip install PyYAML).", file=sys.stderr
+    )
+
+
+def test_apply_desired_state_circuit_breaker(mocker: MockerFixture) -> None:
+    print_mock: MagicMock = mocker.patch("builtins.print")
+    with MockTerraformApi(generate_organization(_organization, 3)) as api:
+        workspaces = fetch_all(api.domain, _organization, no_tls=True, token=_token)
+        desired_state = DesiredState.from_json({"workspaces": [{"settings": {"auto-apply": True}}]})
+        breaker = CircuitBreaker()
+        breaker.record(api.domain, MagicMock(status_code=401))
+        request_count = api.request_count
+        http_client.use_circuit_breaker(breaker)
+        try:
+            assert not apply_desired_state(
+                api.domain,
+                _organization,
+                workspaces,
+                desired_state=desired_state,
+                no_tls=True,
+                token=_token,
+                write_output=True
+            )
+        finally:
+            http_client.use_circuit_breaker(None)
+        assert api.request_count == request_count
+    message = (
+        "Error: the remaining 3 workspace(s) were skipped because the Terraform API at "
+        f"{api.domain} rejected the token (HTTP 401)."
+    )
+    print_mock.assert_any_call(message, file=sys.stderr)
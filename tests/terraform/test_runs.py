@@ -3,7 +3,9 @@ from unittest.mock import MagicMock
 import responses
 from pytest_mock import MockerFixture
 from terraform_manager.entities.run import Run
-from terraform_manager.terraform.runs import _get_active_runs_for_workspace, launch_run_watcher
+from terraform_manager.terraform.runs import _get_active_runs_for_workspace, launch_run_watcher, \
+    export_run_metrics
+from terraform_manager.utilities import http_client
 
 from tests.utilities.tooling import TEST_API_URL, test_run, TEST_TERRAFORM_DOMAIN, \
     establish_asciimatics_widget_mocks
@@ -104,3 +106,23 @@ def test_launch_watcher(mocker: MockerFixture) -> None:
         else:
             print_mock.assert_not_called()  # --watch-runs does not tolerate writing to STDOUT
             loop_mock.assert_not_called()
+
+
+@responses.activate
+def test_export_run_metrics(mocker: MockerFixture) -> None:
+    _establish_mocks(mocker)
+    responses.add(responses.GET, _test_api_url, match_querystring=True, json=_test_json, status=200)
+    loop_mock: MagicMock = mocker.patch(
+        "terraform_manager.interface.run_metrics.run_metrics_loop", return_value=None
+    )
+
+    export_run_metrics(
+        TEST_TERRAFORM_DOMAIN, [_test_run.workspace], port=9100, token=None, write_output=True
+    )
+
+    loop_mock.assert_called_once()
+    run_generator = loop_mock.call_args.args[0]
+    assert run_generator() == [_test_run]
+    assert loop_mock.call_args.kwargs["port"] == 9100
+    assert loop_mock.call_args.kwargs["host"] == "127.0.0.1"
+    assert loop_mock.call_args.kwargs["count_requests"] is http_client.requests_sent
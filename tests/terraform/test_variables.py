@@ -9,8 +9,10 @@ from tabulate import tabulate
 from terraform_manager.entities.variable import Variable
 from terraform_manager.entities.workspace import Workspace
 from terraform_manager.terraform.variables import create_variables_template, parse_variables, \
-    _get_existing_variables, _update_variables, _create_variables, configure_variables, \
+    get_existing_variables, _update_variables, _create_variables, configure_variables, \
     delete_variables
+from terraform_manager.utilities import journal
+from terraform_manager.utilities.journal import Journal
 
 from tests.utilities.tooling import test_workspace, TEST_API_URL, TEST_TERRAFORM_DOMAIN, \
     TEST_ORGANIZATION
@@ -158,9 +160,7 @@ def test_parse_variables_file_missing(mocker: MockerFixture) -> None:
 @responses.activate
 def test_get_existing_variables() -> None:
     responses.add(responses.GET, _test_variables_api_url, json=_test_variable_api_json, status=200)
-    existing_variables = _get_existing_variables(
-        TEST_API_URL, headers={}, workspace=_test_workspace
-    )
+    existing_variables = get_existing_variables(TEST_API_URL, headers={}, workspace=_test_workspace)
     assert existing_variables == _test_variables_with_ids
 
 
@@ -168,7 +168,7 @@ def test_get_existing_variables() -> None:
 def test_get_existing_variables_bad_json_response() -> None:
     for test in [{}, {"data": {}}, {"data": [{}]}, {"data": [{"id": "1", "attributes": {}}]}]:
         responses.add(responses.GET, _test_variables_api_url, json=test, status=200)
-        existing_variables = _get_existing_variables(
+        existing_variables = get_existing_variables(
             TEST_API_URL, headers={}, workspace=_test_workspace
         )
         assert existing_variables is None
@@ -177,9 +177,7 @@ def test_get_existing_variables_bad_json_response() -> None:
 @responses.activate
 def test_get_existing_variables_api_error() -> None:
     responses.add(responses.GET, _test_variables_api_url, status=500)
-    existing_variables = _get_existing_variables(
-        TEST_API_URL, headers={}, workspace=_test_workspace
-    )
+    existing_variables = get_existing_variables(TEST_API_URL, headers={}, workspace=_test_workspace)
     assert existing_variables is None
 
 
@@ -294,7 +292,7 @@ def test_configure_variables(mocker: MockerFixture) -> None:
     for create_return_value, update_return_value in tests:
         for existing_variables in [None, {}, _test_variables_with_ids]:
             fetch_mock: MagicMock = mocker.patch(
-                "terraform_manager.terraform.variables._get_existing_variables",
+                "terraform_manager.terraform.variables.get_existing_variables",
                 return_value=existing_variables
             )
             create_mock: MagicMock = mocker.patch(
@@ -329,7 +327,7 @@ def test_configure_variables_report(mocker: MockerFixture) -> None:
     tests = {"create": {}, "update": _test_variables_with_ids}
     for operation, existing_variables in tests.items():
         mocker.patch(
-            "terraform_manager.terraform.variables._get_existing_variables",
+            "terraform_manager.terraform.variables.get_existing_variables",
             return_value=existing_variables
         )
         responses.add(responses.POST, _test_variables_api_url, status=201)
@@ -390,7 +388,7 @@ def test_configure_variables_empty_argument() -> None:
 def test_delete_variables(mocker: MockerFixture) -> None:
     for existing_variables in [None, {}, _test_variables_with_ids]:
         fetch_mock: MagicMock = mocker.patch(
-            "terraform_manager.terraform.variables._get_existing_variables",
+            "terraform_manager.terraform.variables.get_existing_variables",
             return_value=existing_variables
         )
         responses.add(responses.DELETE, _test_specific_variable_api_url, status=204)
@@ -435,3 +433,66 @@ def test_delete_variables_empty_argument() -> None:
         variables=[],
         write_output=True
     )
+
+
+@responses.activate
+def test_variables_with_journal(mocker: MockerFixture, tmp_path) -> None:
+    mocker.patch(
+        "terraform_manager.terraform.variables.get_existing_variables",
+        return_value=_test_variables_with_ids
+    )
+    mocker.patch("builtins.print")
+    responses.add(responses.PATCH, _test_specific_variable_api_url, status=200)
+    responses.add(responses.DELETE, _test_specific_variable_api_url, status=500, json={})
+    active = Journal(str(tmp_path / "journal.jsonl"), resume=False, max_attempts=1)
+    journal.use_journal(active)
+    try:
+        for _ in range(2):
+            assert configure_variables(
+                TEST_TERRAFORM_DOMAIN,
+                TEST_ORGANIZATION,
+                workspaces=[_test_workspace],
+                variables=[_test_variable]
+            )
+        # The second run skipped the workspace
+        assert len(responses.calls) == 1
+
+        for _ in range(2):
+            assert not delete_variables(
+                TEST_TERRAFORM_DOMAIN,
+                TEST_ORGANIZATION,
+                workspaces=[_test_workspace],
+                variables=[_test_variable.key]
+            )
+        # The failed deletion was not retried because only one attempt is allowed
+        assert len(responses.calls) == 2
+    finally:
+        journal.use_journal(None)
+        active.close()
+
+
+def test_variables_with_journal_fetch_error(mocker: MockerFixture, tmp_path) -> None:
+    fetch_mock: MagicMock = mocker.patch(
+        "terraform_manager.terraform.variables.get_existing_variables", return_value=None
+    )
+    mocker.patch("builtins.print")
+    active = Journal(str(tmp_path / "journal.jsonl"), resume=False, max_attempts=2)
+    journal.use_journal(active)
+    try:
+        for _ in range(3):
+            assert not configure_variables(
+                TEST_TERRAFORM_DOMAIN,
+                TEST_ORGANIZATION,
+                workspaces=[_test_workspace],
+                variables=[_test_variable]
+            )
+            assert not delete_variables(
+                TEST_TERRAFORM_DOMAIN,
+                TEST_ORGANIZATION,
+                workspaces=[_test_workspace],
+                variables=[_test_variable.key]
+            )
+        assert fetch_mock.call_count == 4
+    finally:
+        journal.use_journal(None)
+        active.close()
@@ -1,15 +1,24 @@
 import os
 import sys
+from typing import List, Dict, Any
 from unittest.mock import MagicMock, call
 
+import requests
 import responses
 from pytest_mock import MockerFixture
 from tabulate import tabulate
 from terraform_manager.entities.workspace import Workspace
+from terraform_manager.entities.workspace_filter import WorkspaceFilter
+from terraform_manager.entities.workspace_version_index import WorkspaceVersionIndex
 from terraform_manager.terraform import TARGETING_SPECIFIC_WORKSPACES_TEXT
 from terraform_manager.terraform.workspaces import fetch_all, batch_operation, _map_workspaces, \
-    write_summary
+    write_summary, write_version_report, write_fleet_summary, update_from_response, \
+    sync_workspaces, shard_workspaces
+from terraform_manager.utilities import journal, inventory
+from terraform_manager.utilities.inventory import Inventory
+from terraform_manager.utilities.journal import Journal
 
+from tests.utilities.mock_terraform_api import MockTerraformApi, generate_organization
 from tests.utilities.tooling import test_workspace, TEST_API_URL, TEST_TERRAFORM_DOMAIN, \
     TEST_ORGANIZATION
 
@@ -60,6 +69,34 @@ def test_map_workspaces() -> None:
         assert _map_workspaces(test) == []
 
 
+def test_update_from_response() -> None:
+    workspace = test_workspace(version="0.13.5")
+    document = {"data": {**_test_json["data"][0], "id": workspace.workspace_id}}
+    document["data"]["attributes"] = {
+        **document["data"]["attributes"], "terraform-version": "latest", "locked": True
+    }
+    # yapf: disable
+    for response_json in [
+        ValueError("not JSON"),
+        ["not", "a", "dictionary"],
+        {"data": [document["data"]]},
+        {"data": {**document["data"], "id": "ws-other"}},
+        {"data": {"id": workspace.workspace_id, "attributes": {}}}
+    ]:
+        # yapf: enable
+        response = MagicMock()
+        response.json.side_effect = [response_json]
+        assert not update_from_response(workspace, response)
+        assert workspace.terraform_version == "0.13.5"
+
+    response = MagicMock()
+    response.json.return_value = document
+    assert update_from_response(workspace, response)
+    assert workspace.terraform_version == "latest" and workspace.is_auto_updating
+    assert workspace.is_locked
+    assert workspace.name == _test_workspace1.name
+
+
 @responses.activate
 def test_fetch_all_workspaces(mocker: MockerFixture) -> None:
     _establish_mocks(mocker)
@@ -154,6 +191,160 @@ def test_fetch_all_workspaces_bad_json_response(mocker: MockerFixture) -> None:
         assert fetch_all(TEST_TERRAFORM_DOMAIN, _test_organization) == []
 
 
+def test_shard_workspaces() -> None:
+    workspaces = [test_workspace() for _ in range(6)]
+    for i, workspace in enumerate(workspaces):
+        workspace.workspace_id = f"ws-{'abcdef'[i]}"
+
+    # The assignment is based on a hash which is the same in every process
+    tests = [(1, 1, [0, 1, 2, 3, 4, 5]), (1, 3, [2, 3]), (2, 3, [1]), (3, 3, [0, 4, 5])]
+    for index, count, positions in tests:
+        shard = shard_workspaces(workspaces, index=index, count=count)
+        assert shard == [workspaces[position] for position in positions]
+
+    # The shards partition the workspaces regardless of their order
+    workspaces = [test_workspace() for _ in range(200)]
+    for i, workspace in enumerate(workspaces):
+        workspace.workspace_id = f"ws-{i:016d}"
+    shards = [shard_workspaces(workspaces, index=i, count=4) for i in range(1, 5)]
+    assert sorted(w.workspace_id for shard in shards for w in shard) == \
+        [w.workspace_id for w in workspaces]
+    assert all(len(shard) > 25 for shard in shards)
+    assert shard_workspaces(list(reversed(workspaces)), index=1, count=4) == \
+        list(reversed(shards[0]))
+
+
+def test_fetch_all_workspaces_with_workspace_filter() -> None:
+    with MockTerraformApi(generate_organization(_test_organization, 250)) as api:
+        every_workspace = fetch_all(api.domain, _test_organization, no_tls=True, token="test")
+
+        # yapf: disable
+        tests = [
+            (WorkspaceFilter(tags=["aws", "prod"]), 1, lambda w: w.tag_names == ["aws", "prod"]),
+            (
+                WorkspaceFilter(tags=["dev", "gcp"], execution_modes=["agent", "local"]),
+                1,
+                lambda w: w.tag_names == ["gcp", "dev"] and w.execution_mode in ["agent", "local"]
+            ),
+            (
+                WorkspaceFilter(execution_modes=["agent"], locked=False),
+                3,
+                lambda w: w.execution_mode == "agent" and not w.is_locked
+            )
+        ]
+        # yapf: enable
+        for workspace_filter, requests_made, predicate in tests:
+            api.reset_counts()
+            with Inventory(":memory:") as opened:
+                inventory.use_inventory(opened)
+                try:
+                    workspaces = fetch_all(
+                        api.domain,
+                        _test_organization,
+                        workspace_filter=workspace_filter,
+                        no_tls=True,
+                        token="test"
+                    )
+                    # Only complete organizations are stored in the inventory
+                    stored = len(workspace_filter.search_parameters()) == 0
+                    assert opened.contains(api.domain, _test_organization) == stored
+                finally:
+                    inventory.use_inventory(None)
+            # Server-side filtering means fewer pages of workspaces are fetched
+            assert api.request_counts[("GET", "list_workspaces")] == requests_made
+            assert len(workspaces) > 0
+            assert workspaces == [w for w in every_workspace if predicate(w)]
+
+
+def test_sync_workspaces() -> None:
+    with MockTerraformApi(generate_organization(_test_organization, 250)) as api:
+        base_url = f"http://{api.domain}/api/v2"
+        headers = {"Authorization": "Bearer test"}
+
+        def sync(known: List[Workspace]) -> List[Workspace]:
+            api.reset_counts()
+            return sync_workspaces(api.domain, _test_organization, known, no_tls=True, token="test")
+
+        # Without known workspaces, every page is fetched
+        workspaces = sync([])
+        assert api.request_counts[("GET", "list_workspaces")] == 3
+        assert [w.name for w in workspaces] == [f"workspace-{i:05d}" for i in range(250)]
+        assert workspaces == fetch_all(api.domain, _test_organization, no_tls=True, token="test")
+
+        # Updates only take a single page to pick up, and are applied to the known workspaces
+        modified = workspaces[100]
+        data = {"type": "workspaces", "attributes": {"terraform-version": "latest"}}
+        requests.patch(
+            f"{base_url}/workspaces/{modified.workspace_id}", headers=headers, json={"data": data}
+        )
+        synced = sync(workspaces)
+        assert api.request_counts[("GET", "list_workspaces")] == 1
+        assert synced[100] is modified and modified.terraform_version == "latest"
+        assert all(a is b for a, b in zip(synced, workspaces))
+
+        # New workspaces are added
+        new = generate_organization("new", 1, seed=1)["workspaces"][0]
+        new["attributes"]["name"] = "workspace-new"
+        api.add_workspace(_test_organization, new)
+        synced = sync(synced)
+        assert api.request_counts[("GET", "list_workspaces")] == 1
+        assert len(synced) == 251 and synced[-1].workspace_id == new["id"]
+
+        # Deletions are detected via the total count, and then every page is fetched
+        requests.delete(f"{base_url}/workspaces/{modified.workspace_id}", headers=headers)
+        synced = sync(synced)
+        assert api.request_counts[("GET", "list_workspaces")] == 4
+        assert len(synced) == 250 and modified not in synced
+
+        # Without timestamps, there is no watermark to stop at
+        synced[0].updated_at = None
+        assert len(sync(synced)) == 250
+        assert api.request_counts[("GET", "list_workspaces")] == 3
+
+
+@responses.activate
+def test_sync_workspaces_without_sorting(mocker: MockerFixture) -> None:
+    _establish_mocks(mocker)
+    known = test_workspace()
+    known.updated_at = "2021-01-02T00:00:00.000Z"
+
+    def workspace_json(workspace_id: str, name: str, updated_at: str) -> Dict[str, Any]:
+        attributes = {**_test_json["data"][0]["attributes"], "name": name}
+        return {"id": workspace_id, "attributes": {**attributes, "updated-at": updated_at}}
+
+    # The API ignores the sort parameter, so paging must not stop at the first older workspace
+    for page, data, next_page in [
+        (1, [
+            workspace_json(known.workspace_id, "c", "2021-01-01T00:00:00.000Z"),
+            workspace_json("ws-b", "b", "2021-01-03T00:00:00.000Z")
+        ], 2),
+        (2, [workspace_json("ws-a", "a", "2021-01-01T00:00:00.000Z")], None)
+    ]:
+        pagination = {"next-page": next_page, "total-count": 3}
+        document = {"data": data, "meta": {"pagination": pagination}}
+        responses.add(
+            responses.GET,
+            f"{_test_api_url}?sort=-updated-at&page[number]={page}&page[size]=100",
+            match_querystring=True,
+            json=document,
+            status=200
+        )
+    synced = sync_workspaces(TEST_TERRAFORM_DOMAIN, _test_organization, [known])
+    assert [w.name for w in synced] == ["a", "b", "c"]
+    assert synced[2] is known
+    assert len(responses.calls) == 2
+
+    responses.replace(
+        responses.GET,
+        f"{_test_api_url}?sort=-updated-at&page[number]=1&page[size]=100",
+        match_querystring=True,
+        json={"errors": []},
+        status=500
+    )
+    assert sync_workspaces(TEST_TERRAFORM_DOMAIN, _test_organization, [known]) is None
+    assert sync_workspaces(TEST_TERRAFORM_DOMAIN, _test_organization, []) is None
+
+
 @responses.activate
 def test_batch_operation(mocker: MockerFixture) -> None:
     for write_output in [True, False]:
@@ -231,10 +422,12 @@ def test_batch_operation(mocker: MockerFixture) -> None:
                         headers=["Workspace", "Field", "Before", "After", "Status", "Message"]
                     )
                 ),
+                call(),
+                call("2 fields were patched using 2 requests (one per workspace) instead of 4."),
                 call()
             ])
             # yapf: enable
-            assert print_mock.call_count == 4
+            assert print_mock.call_count == 6
         else:
             print_mock.assert_not_called()
 
@@ -312,6 +505,51 @@ def test_batch_operation_bad_arguments(mocker: MockerFixture) -> None:
                 print_mock.assert_not_called()
 
 
+@responses.activate
+def test_batch_operation_with_journal(mocker: MockerFixture, tmp_path) -> None:
+    _establish_mocks(mocker)
+    print_mock: MagicMock = mocker.patch("builtins.print")
+    test_workspace3 = test_workspace()
+    responses.add(
+        responses.PATCH, f"{TEST_API_URL}/workspaces/{test_workspace3.workspace_id}", status=200
+    )
+    payload = {"data": {"type": "workspaces", "attributes": {"auto-apply": True}}}
+    active = Journal(str(tmp_path / "journal.jsonl"), resume=False, max_attempts=1)
+    active.record(_test_workspace1.workspace_id, "patch-workspace", payload, successful=True)
+    active.record(_test_workspace2.workspace_id, "patch-workspace", payload, successful=False)
+    journal.use_journal(active)
+    try:
+        # The workspace which exhausted its attempts makes the operation unsuccessful
+        assert not batch_operation(
+            TEST_TERRAFORM_DOMAIN,
+            TEST_ORGANIZATION, [_test_workspace1, _test_workspace2, test_workspace3],
+            field_mappers=[lambda w: w.auto_apply],
+            field_names=["auto-apply"],
+            new_values=[True],
+            write_output=True
+        )
+        assert len(responses.calls) == 1
+        assert active.check(test_workspace3.workspace_id, "patch-workspace", payload) is not None
+    finally:
+        journal.use_journal(None)
+        active.close()
+
+    # yapf: disable
+    print_mock.assert_any_call(
+        tabulate(
+            sorted([
+                [_test_workspace1.name, "auto-apply", "False", "False", "skipped",
+                 "completed by a previous run"],
+                [_test_workspace2.name, "auto-apply", "False", "False", "error",
+                 "gave up after 1 failed attempts"],
+                [test_workspace3.name, "auto-apply", "False", "True", "success", "none"]
+            ], key=lambda x: (x[4], x[0], x[1])),
+            headers=["Workspace", "Field", "Before", "After", "Status", "Message"]
+        )
+    )
+    # yapf: enable
+
+
 def test_summary(mocker: MockerFixture) -> None:
     for write_output in [True, False]:
         print_mock: MagicMock = mocker.patch("builtins.print")
@@ -374,3 +612,95 @@ def test_summary(mocker: MockerFixture) -> None:
             ])
         else:
             print_mock.assert_not_called()
+
+
+def test_version_report(mocker: MockerFixture) -> None:
+    for write_output in [True, False]:
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        index = WorkspaceVersionIndex([_test_workspace1, _test_workspace2, _test_workspace2])
+        write_version_report(
+            TEST_TERRAFORM_DOMAIN,
+            TEST_ORGANIZATION,
+            index,
+            targeting_specific_workspaces=True,
+            write_output=write_output
+        )
+        if write_output:
+            version1 = _test_workspace1.terraform_version
+            version2 = _test_workspace2.terraform_version
+            rows = [[version1, 1], [version2, 2]]
+            print_mock.assert_has_calls([
+                call((
+                    f'Terraform version report for organization "{TEST_ORGANIZATION}" at '
+                    f'"{TEST_TERRAFORM_DOMAIN}":'
+                )),
+                call(),
+                call(tabulate(rows, headers=["Version", "Workspaces"])),
+                call(),
+                call(os.linesep + TARGETING_SPECIFIC_WORKSPACES_TEXT),
+                call()
+            ])
+        else:
+            print_mock.assert_not_called()
+
+
+def test_fleet_summary(mocker: MockerFixture) -> None:
+    for write_output in [True, False]:
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        other_domain = "terraform.example.com"
+        write_fleet_summary([(other_domain, TEST_ORGANIZATION, [_test_workspace2]),
+                             (TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, [_test_workspace1])],
+                            targeting_specific_workspaces=False,
+                            write_output=write_output)
+        # yapf: disable
+        data = [
+            [
+                TEST_TERRAFORM_DOMAIN,
+                TEST_ORGANIZATION,
+                _test_workspace1.name,
+                _test_workspace1.terraform_version,
+                _test_workspace1.is_locked,
+                _test_workspace1.auto_apply,
+                _test_workspace1.speculative,
+                "<none>",
+                "<none>",
+                _test_workspace1.execution_mode
+            ], [
+                other_domain,
+                TEST_ORGANIZATION,
+                _test_workspace2.name,
+                _test_workspace2.terraform_version,
+                _test_workspace2.is_locked,
+                _test_workspace2.auto_apply,
+                _test_workspace2.speculative,
+                _test_workspace2.working_directory,
+                _test_workspace2.agent_pool_id,
+                _test_workspace2.execution_mode
+            ]
+        ]
+        # yapf: enable
+        if write_output:
+            print_mock.assert_has_calls([
+                call("Terraform workspace summary for 2 organizations:"),
+                call(),
+                call(
+                    tabulate(
+                        sorted(data, key=lambda x: (x[0], x[1], x[2])),
+                        headers=[
+                            "Domain",
+                            "Organization",
+                            "Name",
+                            "Version",
+                            "Locked",
+                            "Auto-Apply",
+                            "Speculative",
+                            "Working Directory",
+                            "Agent Pool ID",
+                            "Execution Mode"
+                        ]
+                    )
+                ),
+                call()
+            ])
+        else:
+            print_mock.assert_not_called()
@@ -1,9 +1,13 @@
+import os
+import subprocess
 import sys
 from typing import Dict, Any, List, Optional
 from unittest.mock import MagicMock, call
 
+import pytest
 from pytest_mock import MockerFixture
-from terraform_manager.__main__ import main
+import terraform_manager
+from terraform_manager.__main__ import main, _get_selection_argument
 from terraform_manager.entities.variable import Variable
 from terraform_manager.entities.workspace import Workspace
 
@@ -19,7 +23,14 @@ _bool_flags: Dict[str, bool] = {
     "blacklist": False,
     "silent": False,
     "summary": False,
+    "version_report": False,
+    "plan": False,
+    "resume": False,
+    "hedge": False,
+    "stats": False,
     "watch_runs": False,
+    "where_locked": False,
+    "where_unlocked": False,
     "lock_workspaces": False,
     "unlock_workspaces": False,
     "clear_working_directory": False,
@@ -32,7 +43,7 @@ _bool_flags: Dict[str, bool] = {
 
 
 def _arguments(merge_with: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    arguments = {"organization": TEST_ORGANIZATION}
+    arguments = {"organization": [TEST_ORGANIZATION]}
     if merge_with is None:
         return {**arguments, **_bool_flags}
     else:
@@ -126,14 +137,24 @@ def test_incompatible_argument_groups(mocker: MockerFixture) -> None:
         "--organization",
         "--domain",
         "--no-tls",
-        "--no-ssl"
+        "--no-ssl",
         "-w",
         "--workspaces",
         "-b",
-        "--blacklist"
+        "--blacklist",
+        "--query",
+        "--inventory",
+        "--where-version",
+        "--where-execution-mode",
+        "--where-agent-pool",
+        "--where-locked",
+        "--where-unlocked",
+        "--where-tag",
+        "--shard"
     ]
     special_flags = ["--create-vars-template"]
     for selection in selection_flags:
+        assert _get_selection_argument(["--create-vars-template", selection, "value"]) == selection
         for special in special_flags:
             _mock_sys_argv_arguments(mocker)
             parser_mock: MagicMock = mocker.patch("terraform_manager.__main__._parser.error")
@@ -259,6 +280,71 @@ def test_summary(mocker: MockerFixture) -> None:
     fail_mock.assert_not_called()
 
 
+def test_version_report(mocker: MockerFixture) -> None:
+    _mock_sys_argv_arguments(mocker)
+    fail_mock: MagicMock = _mock_cli_fail(mocker)
+    report_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform.Terraform.write_version_report", return_value=None
+    )
+    _mock_fetch_workspaces(mocker, [_test_workspace1])
+    _mock_parsed_arguments(mocker, _arguments({"version_report": True}))
+    _mock_get_group_arguments(mocker)
+
+    main()
+
+    report_mock.assert_called_once()
+    fail_mock.assert_not_called()
+
+
+def test_stats(mocker: MockerFixture, tmp_path) -> None:
+    from terraform_manager.utilities.instrumentation import recorder
+
+    for silent in [True, False]:
+        _mock_sys_argv_arguments(mocker)
+        fail_mock: MagicMock = _mock_cli_fail(mocker)
+        mocker.patch(
+            "terraform_manager.entities.terraform.Terraform.write_summary", return_value=None
+        )
+        report_mock: MagicMock = mocker.patch.object(recorder, "write_report")
+        _mock_fetch_workspaces(mocker, [_test_workspace1])
+        stats_file = tmp_path / "stats.json"
+        _mock_parsed_arguments(
+            mocker,
+            _arguments({
+                "summary": True, "stats": True, "stats_file": str(stats_file), "silent": silent
+            })
+        )
+        _mock_get_group_arguments(mocker)
+
+        main()
+
+        report_mock.assert_called_once_with(write_output=not silent)
+        assert stats_file.exists()
+        fail_mock.assert_not_called()
+    recorder.enabled = False
+
+
+def test_stats_file_not_writable(mocker: MockerFixture, tmp_path) -> None:
+    from terraform_manager.utilities.instrumentation import recorder
+
+    _mock_sys_argv_arguments(mocker)
+    _mock_cli_fail(mocker)
+    print_mock: MagicMock = mocker.patch("builtins.print")
+    mocker.patch("terraform_manager.entities.terraform.Terraform.write_summary", return_value=None)
+    _mock_fetch_workspaces(mocker, [_test_workspace1])
+    stats_file = str(tmp_path / "missing" / "stats.json")
+    _mock_parsed_arguments(mocker, _arguments({"summary": True, "stats_file": stats_file}))
+    _mock_get_group_arguments(mocker)
+
+    main()
+
+    assert any(
+        c.args[0].startswith(f"Error: unable to write request statistics to {stats_file}")
+        for c in print_mock.call_args_list
+    )
+    recorder.enabled = False
+
+
 def test_run_watcher(mocker: MockerFixture) -> None:
     _mock_sys_argv_arguments(mocker)
     fail_mock: MagicMock = _mock_cli_fail(mocker)
@@ -275,6 +361,121 @@ def test_run_watcher(mocker: MockerFixture) -> None:
     fail_mock.assert_not_called()
 
 
+def test_summary_multiple_organizations(mocker: MockerFixture) -> None:
+    _mock_sys_argv_arguments(mocker)
+    fail_mock: MagicMock = _mock_cli_fail(mocker)
+    summary_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform_fleet.TerraformFleet.write_summary",
+        return_value=None
+    )
+    fetch_mock: MagicMock = _mock_fetch_workspaces(mocker, [_test_workspace1])
+    _mock_parsed_arguments(
+        mocker,
+        _arguments({
+            "summary": True, "organization": [TEST_ORGANIZATION, "example.com/other-organization"]
+        })
+    )
+    _mock_get_group_arguments(mocker)
+
+    main()
+
+    summary_mock.assert_called_once()
+    fail_mock.assert_not_called()
+    assert fetch_mock.call_count == 2
+    targets = sorted([(c.args[0], c.args[1]) for c in fetch_mock.call_args_list])
+    assert targets == [("app.terraform.io", TEST_ORGANIZATION),
+                       ("example.com", "other-organization")]
+
+
+def test_run_watcher_multiple_organizations(mocker: MockerFixture) -> None:
+    for silent in [True, False]:
+        _mock_sys_argv_arguments(mocker)
+        _mock_cli_fail(mocker)
+        parser_fail_mock: MagicMock = mocker.patch("terraform_manager.__main__._parser_fail")
+        parser_mock: MagicMock = mocker.patch("terraform_manager.__main__._parser.error")
+        watcher_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.Terraform.launch_run_watcher", return_value=None
+        )
+        fetch_mock: MagicMock = _mock_fetch_workspaces(mocker, [_test_workspace1])
+        _mock_parsed_arguments(
+            mocker,
+            _arguments({
+                "watch_runs": True,
+                "silent": silent,
+                "organization": [TEST_ORGANIZATION, "other-organization"]
+            })
+        )
+        _mock_get_group_arguments(mocker)
+
+        main()
+
+        fetch_mock.assert_not_called()
+        watcher_mock.assert_not_called()
+        if silent:
+            parser_mock.assert_not_called()
+            parser_fail_mock.assert_called_once()
+        else:
+            parser_mock.assert_called_once_with(
+                "The run watcher can only target a single organization."
+            )
+            parser_fail_mock.assert_not_called()
+
+
+def test_run_metrics(mocker: MockerFixture) -> None:
+    tests = [({}, call(9100)), ({"metrics_host": "0.0.0.0"}, call(9100, host="0.0.0.0"))]
+    for arguments, expected_call in tests:
+        _mock_sys_argv_arguments(mocker)
+        fail_mock: MagicMock = _mock_cli_fail(mocker)
+        metrics_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.Terraform.export_run_metrics", return_value=None
+        )
+        _mock_fetch_workspaces(mocker, [_test_workspace1])
+        _mock_parsed_arguments(
+            mocker, _arguments({
+                "watch_runs": True, "metrics_port": 9100, **arguments
+            })
+        )
+        _mock_get_group_arguments(mocker)
+
+        main()
+
+        assert metrics_mock.call_args_list == [expected_call]
+        fail_mock.assert_not_called()
+
+
+def test_metrics_port_without_run_watcher(mocker: MockerFixture) -> None:
+    # yapf: disable
+    tests = [
+        (
+            {"lock_workspaces": True, "metrics_port": 9100},
+            "The --metrics-port flag can only be used with --watch-runs."
+        ),
+        (
+            {"watch_runs": True, "metrics_host": "0.0.0.0"},
+            "The --metrics-host flag can only be used with --metrics-port."
+        )
+    ]
+    # yapf: enable
+    for silent in [True, False]:
+        for test, message in tests:
+            _mock_sys_argv_arguments(mocker)
+            parser_fail_mock: MagicMock = mocker.patch("terraform_manager.__main__._parser_fail")
+            parser_mock: MagicMock = mocker.patch("terraform_manager.__main__._parser.error")
+            fetch_mock: MagicMock = _mock_fetch_workspaces(mocker, [_test_workspace1])
+            _mock_parsed_arguments(mocker, _arguments({**test, "silent": silent}))
+            _mock_get_group_arguments(mocker)
+
+            main()
+
+            fetch_mock.assert_not_called()
+            if silent:
+                parser_mock.assert_not_called()
+                parser_fail_mock.assert_called_once()
+            else:
+                parser_mock.assert_called_once_with(message)
+                parser_fail_mock.assert_not_called()
+
+
 def test_set_versions(mocker: MockerFixture) -> None:
     for success in [True, False]:
         _mock_sys_argv_arguments(mocker)
@@ -514,7 +715,7 @@ def test_create_variables_template(mocker: MockerFixture) -> None:
     _mock_sys_argv_arguments(mocker)
     fail_mock: MagicMock = _mock_cli_fail(mocker)
     create_mock: MagicMock = mocker.patch(
-        "terraform_manager.cli_handlers.variables.create_variables_template", return_value=True
+        "terraform_manager.terraform.variables.create_variables_template", return_value=True
     )
     _mock_parsed_arguments(mocker, _arguments({"create_variables_template": True}))
     _mock_get_group_arguments(mocker)
@@ -529,7 +730,7 @@ def test_create_variables_template_failure(mocker: MockerFixture) -> None:
     _mock_sys_argv_arguments(mocker)
     fail_mock: MagicMock = _mock_cli_fail(mocker)
     create_mock: MagicMock = mocker.patch(
-        "terraform_manager.cli_handlers.variables.create_variables_template", return_value=False
+        "terraform_manager.terraform.variables.create_variables_template", return_value=False
     )
     _mock_parsed_arguments(mocker, _arguments({"create_variables_template": True}))
     _mock_get_group_arguments(mocker)
@@ -546,7 +747,7 @@ def test_configure_variables(mocker: MockerFixture) -> None:
         test_variable = Variable(key="key", value="value")
         fail_mock: MagicMock = _mock_cli_fail(mocker)
         parse_mock: MagicMock = mocker.patch(
-            "terraform_manager.__main__.cli_handlers.parse_variables", return_value=[test_variable]
+            "terraform_manager.terraform.variables.parse_variables", return_value=[test_variable]
         )
         configure_mock: MagicMock = mocker.patch(
             "terraform_manager.entities.terraform.Terraform.configure_variables",
@@ -572,7 +773,7 @@ def test_configure_variables_nothing_parsed(mocker: MockerFixture) -> None:
     _mock_sys_argv_arguments(mocker)
     fail_mock: MagicMock = _mock_cli_fail(mocker)
     parse_mock: MagicMock = mocker.patch(
-        "terraform_manager.cli_handlers.parse_variables", return_value=[]
+        "terraform_manager.terraform.variables.parse_variables", return_value=[]
     )
     configure_mock: MagicMock = mocker.patch(
         "terraform_manager.entities.terraform.Terraform.configure_variables", return_value=True
@@ -610,3 +811,534 @@ def test_delete_variables(mocker: MockerFixture) -> None:
             fail_mock.assert_not_called()
         else:
             fail_mock.assert_called_once()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="-X importtime requires Python 3.7+")
+def test_startup_does_not_import_heavy_modules() -> None:
+    # This uses a fresh interpreter with -X importtime (as opposed to inspecting sys.modules in this
+    # process) because the other tests in this suite will already have imported everything
+    heavy_modules = [
+        "asciimatics", "pkg_resources", "regex", "requests", "semver", "tabulate", "timeago"
+    ]
+    source_directory = os.path.dirname(os.path.dirname(terraform_manager.__file__))
+    python_path = os.pathsep.join([source_directory, os.environ.get("PYTHONPATH", "")])
+    environment = {**os.environ, "PYTHONPATH": python_path}
+    for module in ["terraform_manager.__main__", "terraform_manager.terraform.variables"]:
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                env=environment,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                universal_newlines=True)
+        assert result.returncode == 0
+        # Each line of the -X importtime output looks like: "import time: 123 | 456 | module.name"
+        imported = [
+            line.split("|")[-1].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:") and "|" in line
+        ]
+        # Guards against the check passing vacuously if the output format is not as expected
+        assert module in imported
+        for heavy_module in heavy_modules:
+            assert heavy_module not in imported, f"{module} imports {heavy_module}"
+
+
+def test_record_and_replay(mocker: MockerFixture, tmp_path) -> None:
+    from terraform_manager.utilities import http_client
+
+    cassette_file = str(tmp_path / "cassette.jsonl.gz")
+    for flag in ["record", "replay"]:
+        _mock_sys_argv_arguments(mocker)
+        fail_mock: MagicMock = _mock_cli_fail(mocker)
+        use_cassette_mock: MagicMock = mocker.patch.object(
+            http_client, "use_cassette", wraps=http_client.use_cassette
+        )
+        mocker.patch(
+            "terraform_manager.entities.terraform.Terraform.write_summary", return_value=None
+        )
+        _mock_fetch_workspaces(mocker, [_test_workspace1])
+        _mock_parsed_arguments(mocker, _arguments({"summary": True, flag: cassette_file}))
+        _mock_get_group_arguments(mocker)
+
+        main()
+
+        assert use_cassette_mock.call_args_list[0].args[0].replaying == (flag == "replay")
+        assert use_cassette_mock.call_args_list[-1] == call(None)
+        fail_mock.assert_not_called()
+
+
+def test_record_and_replay_errors(mocker: MockerFixture, tmp_path) -> None:
+    cassette_file = str(tmp_path / "missing.jsonl.gz")
+    for arguments in [{"record": cassette_file, "replay": cassette_file}, {"replay":
+                                                                           cassette_file}]:
+        for silent in [True, False]:
+            _mock_sys_argv_arguments(mocker)
+            fail_mock: MagicMock = _mock_cli_fail(mocker)
+            print_mock: MagicMock = mocker.patch("builtins.print")
+            mocker.patch(
+                "terraform_manager.entities.terraform.Terraform.write_summary", return_value=None
+            )
+            _mock_fetch_workspaces(mocker, [_test_workspace1])
+            _mock_parsed_arguments(
+                mocker, _arguments({
+                    "summary": True, "silent": silent, **arguments
+                })
+            )
+            _mock_get_group_arguments(mocker)
+
+            main()
+
+            fail_mock.assert_called_once()
+            assert print_mock.call_count == (0 if silent else 1)
+
+
+def test_plan(mocker: MockerFixture) -> None:
+    from terraform_manager.utilities import http_client
+    from terraform_manager.utilities.planner import Plan
+
+    for silent in [True, False]:
+        _mock_sys_argv_arguments(mocker)
+        fail_mock: MagicMock = _mock_cli_fail(mocker)
+        summary_mock: MagicMock = mocker.patch.object(Plan, "write_summary")
+        lock_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.Terraform.lock_workspaces",
+            side_effect=lambda: http_client.planning()
+        )
+        _mock_fetch_workspaces(mocker, [_test_workspace1])
+        _mock_parsed_arguments(
+            mocker, _arguments({
+                "lock_workspaces": True, "plan": True, "silent": silent
+            })
+        )
+        _mock_get_group_arguments(mocker)
+
+        main()
+
+        lock_mock.assert_called_once()
+        summary_mock.assert_called_once_with(write_output=not silent)
+        assert not http_client.planning()
+        fail_mock.assert_not_called()
+
+
+def test_apply_desired_state(mocker: MockerFixture) -> None:
+    from terraform_manager.entities.desired_state import DesiredState
+
+    desired_state = DesiredState([])
+    for parsed in [desired_state, None]:
+        for success in [True, False]:
+            _mock_sys_argv_arguments(mocker)
+            fail_mock: MagicMock = _mock_cli_fail(mocker)
+            parse_mock: MagicMock = mocker.patch(
+                "terraform_manager.terraform.reconcile.parse_desired_state", return_value=parsed
+            )
+            apply_mock: MagicMock = mocker.patch(
+                "terraform_manager.entities.terraform.Terraform.apply_desired_state",
+                return_value=success
+            )
+            _mock_fetch_workspaces(mocker, [_test_workspace1])
+            _mock_parsed_arguments(mocker, _arguments({"apply_state": "state.json"}))
+            _mock_get_group_arguments(mocker)
+
+            main()
+
+            parse_mock.assert_called_once_with("state.json", write_output=True)
+            if parsed is None:
+                apply_mock.assert_not_called()
+            else:
+                apply_mock.assert_called_once_with(desired_state)
+            if parsed is not None and success:
+                fail_mock.assert_not_called()
+            else:
+                fail_mock.assert_called_once()
+
+
+def test_update_settings(mocker: MockerFixture) -> None:
+    for success in [True, False]:
+        _mock_sys_argv_arguments(mocker)
+        fail_mock: MagicMock = _mock_cli_fail(mocker)
+        update_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.Terraform.update_settings", return_value=success
+        )
+        _mock_fetch_workspaces(mocker, [_test_workspace1])
+        _mock_parsed_arguments(
+            mocker,
+            _arguments({
+                "terraform_version": "0.13.5",
+                "clear_working_directory": True,
+                "execution_mode": "agent,apool-test",
+                "enable_auto_apply": True,
+                "disable_speculative": True
+            })
+        )
+        _mock_get_group_arguments(mocker)
+
+        main()
+
+        update_mock.assert_called_once_with(
+            terraform_version="0.13.5",
+            working_directory="",
+            execution_mode="agent",
+            agent_pool_id="apool-test",
+            auto_apply=True,
+            speculative=False
+        )
+        if success:
+            fail_mock.assert_not_called()
+        else:
+            fail_mock.assert_called_once()
+
+
+def test_update_settings_invalid_version(mocker: MockerFixture) -> None:
+    _mock_sys_argv_arguments(mocker)
+    mocker.patch("builtins.print")
+    fail_mock: MagicMock = _mock_cli_fail(mocker)
+    update_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform.Terraform.update_settings"
+    )
+    _mock_fetch_workspaces(mocker, [_test_workspace1])
+    _mock_parsed_arguments(
+        mocker, _arguments({
+            "terraform_version": "invalid", "working_directory": "test"
+        })
+    )
+    _mock_get_group_arguments(mocker)
+
+    main()
+
+    update_mock.assert_not_called()
+    fail_mock.assert_called_once()
+
+
+def test_update_settings_conflicts(mocker: MockerFixture) -> None:
+    # yapf: disable
+    tests = [
+        (
+            {"working_directory": "test", "clear_working_directory": True},
+            "You cannot specify --working-dir at the same time as --clear-working-dir."
+        ),
+        (
+            {"enable_auto_apply": True, "disable_auto_apply": True},
+            "You cannot specify --enable-auto-apply at the same time as --disable-auto-apply."
+        ),
+        (
+            {"enable_speculative": True, "disable_speculative": True},
+            "You cannot specify --enable-speculative at the same time as --disable-speculative."
+        ),
+        (
+            {"enable_auto_apply": True, "lock_workspaces": True},
+            "The flags which change workspace settings cannot be combined with other operations."
+        )
+    ]
+    # yapf: enable
+    for silent in [True, False]:
+        for test, message in tests:
+            _mock_sys_argv_arguments(mocker)
+            parser_fail_mock: MagicMock = mocker.patch("terraform_manager.__main__._parser_fail")
+            parser_mock: MagicMock = mocker.patch("terraform_manager.__main__._parser.error")
+            update_mock: MagicMock = mocker.patch(
+                "terraform_manager.entities.terraform.Terraform.update_settings"
+            )
+            fetch_mock: MagicMock = _mock_fetch_workspaces(mocker, [_test_workspace1])
+            _mock_parsed_arguments(mocker, _arguments({**test, "silent": silent}))
+            _mock_get_group_arguments(mocker)
+
+            main()
+
+            fetch_mock.assert_not_called()
+            update_mock.assert_not_called()
+            if silent:
+                parser_mock.assert_not_called()
+                parser_fail_mock.assert_called_once()
+            else:
+                parser_mock.assert_called_once_with(message)
+                parser_fail_mock.assert_not_called()
+
+
+def test_journal(mocker: MockerFixture, tmp_path) -> None:
+    from terraform_manager.utilities import journal
+
+    journal_file = str(tmp_path / "journal.jsonl")
+    for resume in [False, True]:
+        _mock_sys_argv_arguments(mocker)
+        fail_mock: MagicMock = _mock_cli_fail(mocker)
+        lock_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.Terraform.lock_workspaces",
+            side_effect=lambda: journal._journal is not None
+        )
+        _mock_fetch_workspaces(mocker, [_test_workspace1])
+        _mock_parsed_arguments(
+            mocker,
+            _arguments({
+                "lock_workspaces": True, "journal": journal_file, "resume": resume
+            })
+        )
+        _mock_get_group_arguments(mocker)
+
+        main()
+
+        lock_mock.assert_called_once()
+        fail_mock.assert_not_called()
+        assert journal._journal is None
+
+
+def test_journal_errors(mocker: MockerFixture, tmp_path) -> None:
+    tests = [{"resume": True}, {"journal": str(tmp_path / "missing" / "journal.jsonl")}]
+    for arguments in tests:
+        for silent in [True, False]:
+            _mock_sys_argv_arguments(mocker)
+            fail_mock: MagicMock = _mock_cli_fail(mocker)
+            print_mock: MagicMock = mocker.patch("builtins.print")
+            mocker.patch(
+                "terraform_manager.entities.terraform.Terraform.write_summary", return_value=None
+            )
+            _mock_fetch_workspaces(mocker, [_test_workspace1])
+            _mock_parsed_arguments(
+                mocker, _arguments({
+                    "summary": True, "silent": silent, **arguments
+                })
+            )
+            _mock_get_group_arguments(mocker)
+
+            main()
+
+            fail_mock.assert_called_once()
+            assert print_mock.call_count == (0 if silent else 1)
+
+
+def test_resources_closed_when_opening_fails(mocker: MockerFixture, tmp_path) -> None:
+    import gzip
+    from terraform_manager.utilities import http_client, journal
+
+    cassette_file = str(tmp_path / "cassette.jsonl.gz")
+    _mock_sys_argv_arguments(mocker)
+    mocker.patch("builtins.print")
+    summary_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform.Terraform.write_summary", return_value=None
+    )
+    _mock_parsed_arguments(
+        mocker,
+        _arguments({
+            "summary": True,
+            "record": cassette_file,
+            "journal": str(tmp_path / "missing" / "journal.jsonl"),
+            "plan": True,
+            "hedge": True
+        })
+    )
+    _mock_get_group_arguments(mocker)
+
+    with pytest.raises(SystemExit) as e:
+        main()
+
+    assert e.value.code == 1
+    summary_mock.assert_not_called()
+    # The cassette which was opened before the journal failed to open was finalized
+    with gzip.open(cassette_file, "rt") as file:
+        assert file.read() == ""
+    assert http_client._cassette is None and journal._journal is None
+    assert http_client._plan is None and http_client._hedger is None
+    assert http_client._circuit_breaker is None and http_client._validator_cache is None
+
+
+def test_timeouts_and_hedging(mocker: MockerFixture) -> None:
+    from terraform_manager.utilities import http_client
+
+    _mock_sys_argv_arguments(mocker)
+    fail_mock: MagicMock = _mock_cli_fail(mocker)
+    lock_mock: MagicMock = mocker.patch(
+        "terraform_manager.entities.terraform.Terraform.lock_workspaces",
+        side_effect=lambda: http_client._hedger is not None and http_client._timeouts == (5, 60)
+    )
+    validator_cache_mock: MagicMock = mocker.patch(
+        "terraform_manager.utilities.http_client.use_validator_cache",
+        wraps=http_client.use_validator_cache
+    )
+    breaker_mock: MagicMock = mocker.patch(
+        "terraform_manager.utilities.http_client.use_circuit_breaker",
+        wraps=http_client.use_circuit_breaker
+    )
+    _mock_fetch_workspaces(mocker, [_test_workspace1])
+    _mock_parsed_arguments(
+        mocker, _arguments({
+            "lock_workspaces": True, "hedge": True, "connect_timeout": 5
+        })
+    )
+    _mock_get_group_arguments(mocker)
+
+    main()
+
+    lock_mock.assert_called_once()
+    fail_mock.assert_not_called()
+    assert http_client._hedger is None
+    # Every run gets a fresh circuit breaker, which is removed once the run is over
+    assert breaker_mock.call_count == 2
+    assert breaker_mock.call_args_list[0][0][0] is not None
+    assert http_client._circuit_breaker is None
+    assert validator_cache_mock.call_args_list[0][0][0] is not None
+    assert http_client._validator_cache is None
+
+
+def test_positive_number() -> None:
+    from argparse import ArgumentTypeError
+    from terraform_manager.__main__ import _positive_number
+
+    assert _positive_number("2.5") == 2.5
+    for value in ["0", "-1", "abc"]:
+        try:
+            _positive_number(value)
+            assert False
+        except ArgumentTypeError:
+            pass
+
+
+def test_shard_argument() -> None:
+    from argparse import ArgumentTypeError
+    from terraform_manager.__main__ import _shard
+
+    assert _shard("2/4") == (2, 4)
+    for value in ["2", "2/", "a/4", "1/2/3", "0/4", "5/4"]:
+        try:
+            _shard(value)
+            assert False
+        except ArgumentTypeError:
+            pass
+
+
+def test_shard(mocker: MockerFixture) -> None:
+    from terraform_manager.utilities import throttle
+
+    for workspaces in [[_test_workspace1, _test_workspace2], []]:
+        rates = []
+        _mock_sys_argv_arguments(mocker)
+        fail_mock: MagicMock = _mock_cli_fail(mocker)
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        summary_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.Terraform.write_summary",
+            side_effect=lambda: rates.append(throttle.calls_per_second())
+        )
+        shard_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.shard_workspaces", return_value=workspaces
+        )
+        _mock_fetch_workspaces(mocker, [_test_workspace1, _test_workspace2])
+        _mock_parsed_arguments(mocker, _arguments({"summary": True, "shard": (2, 2)}))
+        _mock_get_group_arguments(mocker)
+
+        main()
+
+        # The rate limit is only shared for the duration of the operation
+        assert throttle.calls_per_second() == 28
+        assert shard_mock.call_args.kwargs == {"index": 2, "count": 2}
+        fail_mock.assert_not_called()
+        if len(workspaces) > 0:
+            summary_mock.assert_called_once()
+            assert rates == [14]
+        else:
+            # An empty shard is not an error
+            summary_mock.assert_not_called()
+            print_mock.assert_called_once_with(
+                "There are no selected workspaces in shard 2/2; nothing to do."
+            )
+
+
+def test_query_and_inventory(mocker: MockerFixture, tmp_path) -> None:
+    from terraform_manager.utilities import inventory
+
+    inventory_file = str(tmp_path / "inventory.sqlite")
+    for query, successful in [("locked = false", True), ("locked = true", False)]:
+        _mock_sys_argv_arguments(mocker)
+        fail_mock: MagicMock = _mock_cli_fail(mocker)
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        summary_mock: MagicMock = mocker.patch(
+            "terraform_manager.entities.terraform.Terraform.write_summary",
+            side_effect=lambda: inventory._inventory is not None
+        )
+        _mock_fetch_workspaces(mocker, [_test_workspace1, _test_workspace2])
+        _mock_parsed_arguments(
+            mocker, _arguments({
+                "summary": True, "query": query, "inventory": inventory_file
+            })
+        )
+        _mock_get_group_arguments(mocker)
+
+        main()
+
+        assert inventory._inventory is None
+        if successful:
+            summary_mock.assert_called_once()
+            fail_mock.assert_not_called()
+        else:
+            summary_mock.assert_not_called()
+            fail_mock.assert_called_once()
+            message = f"Error: no workspaces could be found matching the query: {query}"
+            print_mock.assert_called_once_with(message, file=sys.stderr)
+
+
+def test_inventory_errors(mocker: MockerFixture, tmp_path) -> None:
+    for silent in [True, False]:
+        _mock_sys_argv_arguments(mocker)
+        fail_mock: MagicMock = _mock_cli_fail(mocker)
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        mocker.patch(
+            "terraform_manager.entities.terraform.Terraform.write_summary", return_value=None
+        )
+        _mock_fetch_workspaces(mocker, [_test_workspace1])
+        _mock_parsed_arguments(
+            mocker,
+            _arguments({
+                "summary": True,
+                "silent": silent,
+                "inventory": str(tmp_path / "missing" / "inventory.sqlite")
+            })
+        )
+        _mock_get_group_arguments(mocker)
+
+        main()
+
+        fail_mock.assert_called_once()
+        assert print_mock.call_count == (0 if silent else 1)
+
+
+def test_where(mocker: MockerFixture) -> None:
+    from terraform_manager.entities.workspace_filter import WorkspaceFilter
+
+    # yapf: disable
+    tests = [
+        ({"where_locked": True}, WorkspaceFilter(locked=True), "locked"),
+        ({"where_unlocked": True}, WorkspaceFilter(locked=False), "unlocked"),
+        (
+            {"where_version": ["0.13.5"], "where_execution_mode": ["agent", "local"]},
+            WorkspaceFilter(versions=["0.13.5"], execution_modes=["agent", "local"]),
+            "versions 0.13.5; execution modes agent, local"
+        ),
+        (
+            {"where_agent_pool": ["apool-1"], "where_tag": ["aws", "prod"]},
+            WorkspaceFilter(agent_pool_ids=["apool-1"], tags=["aws", "prod"]),
+            "agent pools apool-1; tags aws, prod"
+        )
+    ]
+    # yapf: enable
+    for merge_with, where, description in tests:
+        for workspaces in [[_test_workspace1], []]:
+            _mock_sys_argv_arguments(mocker)
+            fail_mock: MagicMock = _mock_cli_fail(mocker)
+            print_mock: MagicMock = mocker.patch("builtins.print")
+            summary_mock: MagicMock = mocker.patch(
+                "terraform_manager.entities.terraform.Terraform.write_summary", return_value=None
+            )
+            fetch_mock: MagicMock = _mock_fetch_workspaces(mocker, workspaces)
+            _mock_parsed_arguments(mocker, _arguments({"summary": True, **merge_with}))
+            _mock_get_group_arguments(mocker)
+
+            main()
+
+            assert fetch_mock.call_args.kwargs["workspace_filter"] == where
+            if len(workspaces) > 0:
+                summary_mock.assert_called_once()
+                fail_mock.assert_not_called()
+            else:
+                summary_mock.assert_not_called()
+                fail_mock.assert_called_once()
+                print_mock.assert_called_once_with(
+                    "Error: no workspaces could be found matching the selection criteria: "
+                    f"{description}",
+                    file=sys.stderr
+                )
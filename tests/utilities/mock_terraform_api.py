@@ -0,0 +1,503 @@
+"""
+A local, in-memory imitation of the parts of the Terraform Cloud/Enterprise API that
+terraform-manager interacts with. Unlike the responses library (which intercepts requests before
+they reach the network stack), this is a real HTTP server, so it can be used to measure the actual
+throughput of terraform-manager's HTTP code paths.
+
+It can be used programmatically:
+
+    with MockTerraformApi(generate_organization("example", 1000)) as api:
+        workspaces = fetch_all(api.domain, "example", no_tls=True, token="test")
+
+Or launched standalone (e.g. to point the CLI at it using --domain and --no-tls):
+
+    python -m tests.utilities.mock_terraform_api --workspaces 1000 --port 8080
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import string
+import threading
+import time
+from collections import deque, Counter
+from datetime import datetime
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from typing import Dict, Any, List, Optional, Tuple, Deque
+from urllib.parse import urlparse, parse_qs
+
+# Terraform Cloud allows 30 requests per second per token
+DEFAULT_RATE_LIMIT: int = 30
+_maximum_page_size: int = 100
+_versions: List[str] = ["0.12.31", "0.13.7", "0.14.11", "0.15.5", "1.0.11", "1.1.9", "latest"]
+_run_statuses: List[str] = ["applied", "planned", "planning", "pending", "errored", "discarded"]
+
+
+def _random_id(prefix: str, rng: random.Random) -> str:
+    return prefix + "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(16))
+
+
+def generate_organization(
+    name: str,
+    workspace_count: int,
+    *,
+    variables_per_workspace: int = 3,
+    runs_per_workspace: int = 2,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Generates the state of a synthetic organization. The same arguments always generate the same
+    organization.
+
+    :param name: The name of the organization.
+    :param workspace_count: The number of workspaces to generate.
+    :param variables_per_workspace: The number of variables to generate in each workspace.
+    :param runs_per_workspace: The number of runs to generate in each workspace.
+    :param seed: The seed for the random number generator.
+    :return: A dictionary suitable for passing to MockTerraformApi.
+    """
+
+    rng = random.Random(seed)
+    workspaces = []
+    for i in range(workspace_count):
+        workspace_id = _random_id("ws-", rng)
+        execution_mode = rng.choice(["remote", "remote", "local", "agent"])
+        # yapf: disable
+        workspaces.append({
+            "id": workspace_id,
+            "attributes": {
+                "name": f"workspace-{i:05d}",
+                "terraform-version": rng.choice(_versions),
+                "auto-apply": rng.random() < 0.2,
+                "locked": rng.random() < 0.1,
+                "working-directory": rng.choice(["", "", "dev", "prod"]),
+                "execution-mode": execution_mode,
+                "speculative-enabled": rng.random() < 0.9,
+                "updated-at": f"2021-03-{rng.randint(1, 28):02d}T12:00:00.000Z",
+                # Derived from the index rather than the random number generator so that adding
+                # tags does not change the other generated attributes
+                "tag-names": [["aws", "gcp"][i % 2], ["dev", "prod", "staging"][i % 3]]
+            },
+            "agent-pool-id": _random_id("apool-", rng) if execution_mode == "agent" else None,
+            "vars": {
+                _random_id("var-", rng): {
+                    "key": f"variable{j}",
+                    "value": f"value{j}",
+                    "description": "",
+                    "category": rng.choice(["terraform", "env"]),
+                    "hcl": False,
+                    "sensitive": False
+                }
+                for j in range(variables_per_workspace)
+            },
+            "runs": [{
+                "id": _random_id("run-", rng),
+                "attributes": {
+                    "created-at": "2021-03-01T12:00:00.000Z",
+                    "status": rng.choice(_run_statuses),
+                    "status-timestamps": {"planned-at": "2021-03-01T12:01:00+00:00"},
+                    "has-changes": rng.random() < 0.5
+                }
+            } for _ in range(runs_per_workspace)]
+        })
+        # yapf: enable
+    return {"name": name, "workspaces": workspaces}
+
+
+def _workspace_json(workspace: Dict[str, Any]) -> Dict[str, Any]:
+    agent_pool = None
+    if workspace["agent-pool-id"] is not None:
+        agent_pool = {"id": workspace["agent-pool-id"], "type": "agent-pools"}
+    return {
+        "id": workspace["id"],
+        "type": "workspaces",
+        "attributes": dict(workspace["attributes"]),
+        "relationships": {
+            "agent-pool": {
+                "data": agent_pool
+            }
+        }
+    }
+
+
+def _variable_json(variable_id: str, variable: Dict[str, Any]) -> Dict[str, Any]:
+    attributes = dict(variable)
+    if attributes["sensitive"]:
+        attributes["value"] = None
+    return {"id": variable_id, "type": "vars", "attributes": attributes}
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer does not exist in Python 3.6
+    daemon_threads = True
+
+
+def _timestamp() -> str:
+    return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _error(status: int, title: str) -> Tuple[int, Dict[str, Any]]:
+    return status, {"errors": [{"status": str(status), "title": title}]}
+
+
+class MockTerraformApi:
+    def __init__(
+        self,
+        *organizations: Dict[str, Any],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        rate_limit: Optional[int] = None,
+        etags: bool = True
+    ):
+        """
+        Creates (but does not start) a mock Terraform API server.
+
+        :param organizations: The states of the organizations to serve (see generate_organization).
+        :param host: The interface on which to listen.
+        :param port: The port on which to listen. If 0, an available port is chosen.
+        :param latency: The number of seconds each response is delayed by, to simulate the network.
+        :param rate_limit: The number of requests per second allowed for each token before
+                           responding with 429 (see DEFAULT_RATE_LIMIT). If not specified, requests
+                           are never rate-limited.
+        :param etags: Whether to send ETags with successful GET responses (and respond with 304 to
+                      requests whose If-None-Match header matches).
+        """
+
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.etags = etags
+        self.not_modified_count: int = 0
+        self.request_counts: Counter = Counter()
+        self.rate_limited_count: int = 0
+        self._lock = threading.Lock()
+        self._request_times: Dict[str, Deque[float]] = {}
+        self._organizations: Dict[str, List[Dict[str, Any]]] = {}
+        self._workspaces: Dict[str, Dict[str, Any]] = {}
+        for organization in organizations:
+            self.add_organization(organization)
+        self._server = _ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    def add_organization(self, organization: Dict[str, Any]) -> None:
+        with self._lock:
+            self._organizations[organization["name"]] = organization["workspaces"]
+            for workspace in organization["workspaces"]:
+                self._workspaces[workspace["id"]] = workspace
+
+    def add_workspace(self, organization: str, workspace: Dict[str, Any]) -> None:
+        """
+        Adds a workspace (see generate_organization) to an organization which is already served.
+        """
+
+        with self._lock:
+            workspace["attributes"]["updated-at"] = _timestamp()
+            self._organizations[organization].append(workspace)
+            self._organizations[organization].sort(key=lambda w: w["attributes"]["name"])
+            self._workspaces[workspace["id"]] = workspace
+
+    @property
+    def domain(self) -> str:
+        """
+        :return: The domain (including the port) at which the server is listening. Clients must
+                 communicate with it without TLS.
+        """
+
+        host, port = self._server.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        return sum(self.request_counts.values())
+
+    def workspace(self, workspace_id: str) -> Dict[str, Any]:
+        return self._workspaces[workspace_id]
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.request_counts.clear()
+            self.rate_limited_count = 0
+            self.not_modified_count = 0
+
+    def start(self) -> "MockTerraformApi":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockTerraformApi":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _is_rate_limited(self, token: str) -> bool:
+        if self.rate_limit is None:
+            return False
+        now = time.monotonic()
+        times = self._request_times.setdefault(token, deque())
+        while len(times) > 0 and now - times[0] >= 1:
+            times.popleft()
+        if len(times) >= self.rate_limit:
+            self.rate_limited_count += 1
+            return True
+        times.append(now)
+        return False
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, List[str]],
+        body: Optional[Dict[str, Any]],
+        token: Optional[str]
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        Computes the response to a single request. This is where all the API behavior lives; the
+        HTTP handler only translates between this method and the wire format.
+
+        :return: A status code and an optional JSON body.
+        """
+
+        if token is None:
+            return _error(401, "unauthorized")
+
+        with self._lock:
+            if self._is_rate_limited(token):
+                return _error(429, "Too many requests")
+
+            for route, pattern in _routes:
+                match = pattern.match(path)
+                if match is not None and route[0] == method:
+                    self.request_counts[route] += 1
+                    handler = getattr(self, "_" + route[1])
+                    return handler(*match.groups(), query=query, body=body)
+            return _error(404, "not found")
+
+    def _list_workspaces(self, organization: str, *, query, body) -> Tuple[int, Dict[str, Any]]:
+        if organization not in self._organizations:
+            return _error(404, "not found")
+        workspaces = self._organizations[organization]
+        tags = query.get("search[tags]", [None])[0]
+        if tags is not None:
+            workspaces = [
+                workspace for workspace in workspaces
+                if set(tags.split(",")) <= set(workspace["attributes"].get("tag-names", []))
+            ]
+        sort = query.get("sort", [None])[0]
+        if sort is not None:
+            if sort.lstrip("-") not in ["name", "updated-at"]:
+                return _error(400, f"invalid sort {sort}")
+            workspaces = sorted(
+                workspaces,
+                key=lambda workspace: workspace["attributes"][sort.lstrip("-")],
+                reverse=sort.startswith("-")
+            )
+        page_number = int(query.get("page[number]", ["1"])[0])
+        page_size = min(int(query.get("page[size]", ["20"])[0]), _maximum_page_size)
+        total_pages = max(1, -(-len(workspaces) // page_size))
+        page = workspaces[(page_number - 1) * page_size:page_number * page_size]
+        return 200, {
+            "data": [_workspace_json(workspace) for workspace in page],
+            "meta": {
+                "pagination": {
+                    "current-page": page_number,
+                    "prev-page": page_number - 1 if page_number > 1 else None,
+                    "next-page": page_number + 1 if page_number < total_pages else None,
+                    "total-pages": total_pages,
+                    "total-count": len(workspaces)
+                }
+            }
+        }
+
+    def _get_workspace(self, workspace_id: str, *, query, body) -> Tuple[int, Dict[str, Any]]:
+        if workspace_id not in self._workspaces:
+            return _error(404, "not found")
+        return 200, {"data": _workspace_json(self._workspaces[workspace_id])}
+
+    def _patch_workspace(self, workspace_id: str, *, query, body) -> Tuple[int, Dict[str, Any]]:
+        if workspace_id not in self._workspaces:
+            return _error(404, "not found")
+        workspace = self._workspaces[workspace_id]
+        attributes = dict(((body or {}).get("data") or {}).get("attributes") or {})
+        if "agent-pool-id" in attributes:
+            workspace["agent-pool-id"] = attributes.pop("agent-pool-id")
+        for key, value in attributes.items():
+            if key not in workspace["attributes"]:
+                return _error(422, f"unknown attribute {key}")
+            workspace["attributes"][key] = value
+        workspace["attributes"]["updated-at"] = _timestamp()
+        return 200, {"data": _workspace_json(workspace)}
+
+    def _lock_workspace(self, workspace_id: str, action: str, *, query, body):
+        if workspace_id not in self._workspaces:
+            return _error(404, "not found")
+        workspace = self._workspaces[workspace_id]
+        set_lock = action == "lock"
+        if workspace["attributes"]["locked"] == set_lock:
+            return _error(409, f"workspace already {action}ed")
+        workspace["attributes"]["locked"] = set_lock
+        workspace["attributes"]["updated-at"] = _timestamp()
+        return 200, {"data": _workspace_json(workspace)}
+
+    def _delete_workspace(self, workspace_id: str, *, query, body):
+        if workspace_id not in self._workspaces:
+            return _error(404, "not found")
+        workspace = self._workspaces.pop(workspace_id)
+        for workspaces in self._organizations.values():
+            workspaces[:] = [w for w in workspaces if w["id"] != workspace_id]
+        return 204, None
+
+    def _list_variables(self, workspace_id: str, *, query, body) -> Tuple[int, Dict[str, Any]]:
+        if workspace_id not in self._workspaces:
+            return _error(404, "not found")
+        variables = self._workspaces[workspace_id]["vars"]
+        return 200, {"data": [_variable_json(i, v) for i, v in variables.items()]}
+
+    def _create_variable(self, workspace_id: str, *, query, body) -> Tuple[int, Dict[str, Any]]:
+        if workspace_id not in self._workspaces:
+            return _error(404, "not found")
+        variables = self._workspaces[workspace_id]["vars"]
+        attributes = ((body or {}).get("data") or {}).get("attributes") or {}
+        keys = [variable["key"] for variable in variables.values()]
+        if "key" not in attributes or attributes["key"] in keys:
+            return _error(422, "invalid variable")
+        variable_id = "var-" + "".join(random.choice(string.ascii_letters) for _ in range(16))
+        variables[variable_id] = {
+            "key": attributes["key"],
+            "value": attributes.get("value", ""),
+            "description": attributes.get("description", ""),
+            "category": attributes.get("category", "terraform"),
+            "hcl": attributes.get("hcl", False),
+            "sensitive": attributes.get("sensitive", False)
+        }
+        return 201, {"data": _variable_json(variable_id, variables[variable_id])}
+
+    def _update_variable(self, workspace_id: str, variable_id: str, *, query, body):
+        variables = self._workspaces.get(workspace_id, {}).get("vars", {})
+        if variable_id not in variables:
+            return _error(404, "not found")
+        attributes = ((body or {}).get("data") or {}).get("attributes") or {}
+        variables[variable_id].update(attributes)
+        return 200, {"data": _variable_json(variable_id, variables[variable_id])}
+
+    def _delete_variable(self, workspace_id: str, variable_id: str, *, query, body):
+        variables = self._workspaces.get(workspace_id, {}).get("vars", {})
+        if variable_id not in variables:
+            return _error(404, "not found")
+        del variables[variable_id]
+        return 204, None
+
+    def _list_runs(self, workspace_id: str, *, query, body) -> Tuple[int, Dict[str, Any]]:
+        if workspace_id not in self._workspaces:
+            return _error(404, "not found")
+        runs = self._workspaces[workspace_id]["runs"]
+        return 200, {"data": [dict(run, type="runs") for run in runs]}
+
+    def _handler_class(self) -> type:
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self) -> None:
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length > 0 else None
+                authorization = self.headers.get("Authorization") or ""
+                token = authorization[len("Bearer "):] if authorization.startswith("Bearer ") \
+                    else None
+                if api.latency > 0:
+                    time.sleep(api.latency)
+                status, response_json = api.handle(
+                    self.command, url.path, parse_qs(url.query), body, token
+                )
+                payload = b"" if response_json is None else json.dumps(response_json).encode()
+                etag = None
+                if api.etags and self.command == "GET" and status == 200:
+                    etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        status, payload = 304, b""
+                        with api._lock:
+                            api.not_modified_count += 1
+                self.send_response(status)
+                self.send_header("Content-Type", "application/vnd.api+json")
+                self.send_header("Content-Length", str(len(payload)))
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                if status == 429:
+                    self.send_header("X-RateLimit-Limit", str(api.rate_limit))
+                    self.send_header("X-RateLimit-Reset", "1.0")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = _respond
+            do_POST = _respond
+            do_PATCH = _respond
+            do_DELETE = _respond
+
+            def log_message(self, *args) -> None:
+                pass  # Logging every request would dominate the cost of serving it
+
+        return Handler
+
+
+# Each route is identified by a (method, handler name) pair, and request counts are keyed by it
+# yapf: disable
+_routes: List[Tuple[Tuple[str, str], "re.Pattern"]] = [
+    (("GET", "list_workspaces"), re.compile(r"^/api/v2/organizations/([^/]+)/workspaces$")),
+    (("GET", "get_workspace"), re.compile(r"^/api/v2/workspaces/([^/]+)$")),
+    (("PATCH", "patch_workspace"), re.compile(r"^/api/v2/workspaces/([^/]+)$")),
+    (("DELETE", "delete_workspace"), re.compile(r"^/api/v2/workspaces/([^/]+)$")),
+    (("POST", "lock_workspace"),
+     re.compile(r"^/api/v2/workspaces/([^/]+)/actions/(lock|unlock)$")),
+    (("GET", "list_variables"), re.compile(r"^/api/v2/workspaces/([^/]+)/vars$")),
+    (("POST", "create_variable"), re.compile(r"^/api/v2/workspaces/([^/]+)/vars$")),
+    (("PATCH", "update_variable"), re.compile(r"^/api/v2/workspaces/([^/]+)/vars/([^/]+)$")),
+    (("DELETE", "delete_variable"), re.compile(r"^/api/v2/workspaces/([^/]+)/vars/([^/]+)$")),
+    (("GET", "list_runs"), re.compile(r"^/api/v2/workspaces/([^/]+)/runs$"))
+]
+# yapf: enable
+
+
+def _main() -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Serves a mock Terraform API.")
+    parser.add_argument("--organization", type=str, default="example")
+    parser.add_argument("--workspaces", type=int, default=100)
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response.")
+    parser.add_argument("--rate-limit", type=int, default=DEFAULT_RATE_LIMIT)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    organization = generate_organization(
+        arguments.organization, arguments.workspaces, seed=arguments.seed
+    )
+    api = MockTerraformApi(
+        organization,
+        host=arguments.host,
+        port=arguments.port,
+        latency=arguments.latency,
+        rate_limit=arguments.rate_limit
+    )
+    print((
+        f'Serving organization "{arguments.organization}" with {arguments.workspaces} workspaces '
+        f"at http://{api.domain} (use --domain {api.domain} --no-tls)"
+    ))
+    try:
+        api._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _main()
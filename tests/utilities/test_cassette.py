@@ -0,0 +1,106 @@
+import gzip
+import json
+
+import responses
+from terraform_manager.entities.error_response import ErrorResponse
+from terraform_manager.utilities.cassette import Cassette
+
+from tests.utilities.tooling import TEST_API_URL
+
+_url: str = f"{TEST_API_URL}/workspaces/ws-1"
+
+
+@responses.activate
+def test_record_and_replay(tmp_path) -> None:
+    import requests
+
+    path = str(tmp_path / "cassette.jsonl.gz")
+    responses.add(
+        responses.GET, _url, json={"data": 1}, status=200, headers={
+            "ETag": "abc", "X-Other": "1"
+        }
+    )
+    responses.add(responses.GET, _url, json={"data": 2}, status=200)
+    with Cassette(path, replay=False) as cassette:
+        for _ in range(2):
+            cassette.record("get", _url, params=None, json_body=None, response=requests.get(_url))
+        cassette.record(
+            "PATCH",
+            _url,
+            params={"page[size]": 100},
+            json_body={"secret": "value"},
+            response=ErrorResponse("Connection refused")
+        )
+
+    with gzip.open(path, "rt") as file:
+        contents = file.read()
+    assert "value" not in contents  # Request bodies are only stored as digests
+    assert "X-Other" not in contents and "x-other" not in contents
+
+    cassette = Cassette(path, replay=True)
+    first = cassette.replay("GET", _url, params=None, json_body=None)
+    assert first.status_code == 200
+    assert first.json() == {"data": 1}
+    assert first.headers["etag"] == "abc"
+    assert first.request.method == "GET"
+    # Exhausted recordings repeat the last response
+    for _ in range(2):
+        assert cassette.replay("GET", _url, params=None, json_body=None).json() == {"data": 2}
+
+    error = cassette.replay(
+        "PATCH", _url, params={"page[size]": 100}, json_body={"secret": "value"}
+    )
+    assert isinstance(error, ErrorResponse)
+    assert error.error_message == "Connection refused"
+
+    # A different body (or different query string parameters) is a different request
+    missing = cassette.replay("PATCH", _url, params=None, json_body={"secret": "other"})
+    assert isinstance(missing, ErrorResponse)
+    assert missing.error_message.startswith(f"No response to PATCH {_url} was recorded in")
+    cassette.close()
+
+
+def test_recorded_format(tmp_path) -> None:
+    path = str(tmp_path / "cassette.jsonl.gz")
+    with Cassette(path, replay=False) as cassette:
+        cassette.record(
+            "GET", _url, params={"a": "b"}, json_body=None, response=ErrorResponse("error")
+        )
+    with gzip.open(path, "rt") as file:
+        entries = [json.loads(line) for line in file]
+    assert entries == [{"method": "GET", "url": f"{_url}?a=b", "body-digest": "", "error": "error"}]
+
+
+@responses.activate
+def test_variable_values_are_not_recorded(tmp_path) -> None:
+    import requests
+
+    path = str(tmp_path / "cassette.jsonl.gz")
+    variables_url = f"{_url}/vars"
+    variable = {"key": "region", "value": "plaintext-value", "sensitive": False}
+    variable_json = {"id": "var-1", "type": "vars", "attributes": variable}
+    responses.add(responses.GET, variables_url, json={"data": [variable_json]}, status=200)
+    responses.add(responses.POST, variables_url, json={"data": variable_json}, status=201)
+    responses.add(responses.GET, _url, body="plaintext-value", status=200)
+    with Cassette(path, replay=False) as cassette:
+        cassette.record(
+            "GET", variables_url, params=None, json_body=None, response=requests.get(variables_url)
+        )
+        cassette.record(
+            "POST",
+            variables_url,
+            params=None,
+            json_body={"data": variable_json},
+            response=requests.post(variables_url, json={})
+        )
+        # Responses which are not JSON are recorded as they are
+        cassette.record("GET", _url, params=None, json_body=None, response=requests.get(_url))
+
+    with gzip.open(path, "rt") as file:
+        lines = file.read().splitlines()
+    assert all(["plaintext-value" not in line for line in lines[:2]])
+    assert "plaintext-value" in lines[2]
+
+    with Cassette(path, replay=True) as cassette:
+        listed = cassette.replay("GET", variables_url, params=None, json_body=None).json()
+        assert listed["data"][0]["attributes"] == {**variable, "value": None}
@@ -0,0 +1,53 @@
+from pytest_mock import MockerFixture
+from terraform_manager.entities.error_response import ErrorResponse
+from terraform_manager.utilities.circuit_breaker import CircuitBreaker
+
+_domain: str = "app.terraform.io"
+
+
+class _Response:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+def test_server_errors(mocker: MockerFixture) -> None:
+    time_mock = mocker.patch("terraform_manager.utilities.circuit_breaker.time.monotonic")
+    time_mock.return_value = 100.0
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30.0)
+    assert breaker.open_reason(_domain) is None
+
+    breaker.record(_domain, _Response(502))
+    breaker.record(_domain, ErrorResponse("Connection refused"))
+    breaker.record(_domain, _Response(200))  # Successes reset the count
+    for _ in range(2):
+        breaker.record(_domain, _Response(503))
+    assert breaker.open_reason(_domain) is None
+    breaker.record(_domain, _Response(503))
+    assert breaker.open_reason(_domain) == f"3 consecutive requests to {_domain} failed"
+    # Other domains are unaffected
+    assert breaker.open_reason("localhost") is None
+
+    # Once the cooldown is over, a request is let through to determine whether the domain recovered
+    time_mock.return_value = 130.0
+    assert breaker.open_reason(_domain) is None
+    breaker.record(_domain, _Response(500))
+    assert breaker.open_reason(_domain) is not None
+    time_mock.return_value = 160.0
+    breaker.record(_domain, _Response(200))
+    assert breaker.open_reason(_domain) is None
+
+
+def test_fatal_responses(mocker: MockerFixture) -> None:
+    time_mock = mocker.patch("terraform_manager.utilities.circuit_breaker.time.monotonic")
+    for status in [401, 403]:
+        time_mock.return_value = 100.0
+        breaker = CircuitBreaker()
+        breaker.record(_domain, _Response(404))  # Client errors other than 401/403 are normal
+        assert breaker.open_reason(_domain) is None
+        breaker.record(_domain, _Response(status))
+        expected = f"the Terraform API at {_domain} rejected the token (HTTP {status})"
+        assert breaker.open_reason(_domain) == expected
+        # Circuits opened by a rejected token never close
+        time_mock.return_value = 1000000.0
+        breaker.record(_domain, _Response(200))
+        assert breaker.open_reason(_domain) == expected
@@ -0,0 +1,119 @@
+import time
+from threading import Event, Thread
+from typing import Any, List
+
+from pytest_mock import MockerFixture
+from requests import Response
+from terraform_manager.entities.error_response import ErrorResponse
+from terraform_manager.utilities.coalescing import Coalescer
+
+
+def _response(status_code: int = 200, content: bytes = b'{"data": []}') -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+def test_in_flight_requests_are_shared() -> None:
+    coalescer = Coalescer()
+    release = Event()
+    sent = []
+
+    def request() -> Response:
+        sent.append(True)
+        release.wait(5)
+        return _response()
+
+    results: List[Any] = []
+    threads = [Thread(target=lambda: results.append(coalescer.send("key", request)))]
+    threads[0].start()
+    while len(sent) == 0:
+        time.sleep(0.001)
+    threads.extend([
+        Thread(target=lambda: results.append(coalescer.send("key", request))) for _ in range(4)
+    ])
+    for thread in threads[1:]:
+        thread.start()
+    while coalescer.coalesced_count < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(sent) == 1
+    assert coalescer.sent_count == 1
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    # The body is parsed once, and the parsed result is shared as well
+    assert results[0].json() is results[1].json()
+
+    # Requests which are not in flight at the same time are sent separately (no TTL was given)
+    release.set()
+    coalescer.send("key", request)
+    assert len(sent) == 2
+
+
+def test_exceptions_are_shared() -> None:
+    coalescer = Coalescer()
+    release = Event()
+    errors = []
+
+    def request() -> Response:
+        release.wait(5)
+        raise RuntimeError("test")
+
+    def send() -> None:
+        try:
+            coalescer.send("key", request)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [Thread(target=send) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while coalescer.sent_count + coalescer.coalesced_count < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3 and all(error is errors[0] for error in errors)
+
+    # The failed request is no longer in flight
+    assert coalescer.send("key", _response).status_code == 200
+
+
+def test_cache(mocker: MockerFixture) -> None:
+    time_mock = mocker.patch("terraform_manager.utilities.coalescing.time.monotonic")
+    time_mock.return_value = 100.0
+    coalescer = Coalescer(ttl=5.0, maximum_entries=2)
+    first = coalescer.send("first", _response)
+    assert coalescer.send("first", _response) is first
+
+    # Only successful responses are cached
+    error = coalescer.send("error", lambda: ErrorResponse("test"))
+    assert coalescer.send("error", lambda: ErrorResponse("test")) is not error
+    not_found = coalescer.send("missing", lambda: _response(404))
+    assert coalescer.send("missing", lambda: _response(404)) is not not_found
+
+    # The least recently used response is evicted once the cache is full
+    second = coalescer.send("second", _response)
+    coalescer.send("first", _response)
+    third = coalescer.send("third", _response)
+    assert coalescer.send("second", _response) is not second
+    assert coalescer.send("third", _response) is third
+
+    # Responses expire
+    time_mock.return_value = 105.0
+    assert coalescer.send("third", _response) is not third
+
+    # Invalidating evicts everything, including responses to requests which were in flight
+    fourth = coalescer.send("fourth", _response)
+    coalescer.invalidate()
+    assert coalescer.send("fourth", _response) is not fourth
+
+    def invalidating_request() -> Response:
+        coalescer.invalidate()
+        return _response()
+
+    fifth = coalescer.send("fifth", invalidating_request)
+    assert coalescer.send("fifth", _response) is not fifth
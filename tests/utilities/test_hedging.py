@@ -0,0 +1,77 @@
+import time
+from typing import Any, Callable, Tuple
+
+from terraform_manager.entities.error_response import ErrorResponse
+from terraform_manager.utilities.hedging import Hedger
+
+_endpoint: str = "GET /workspaces/:workspace_id/vars"
+
+
+class _Response:
+    def __init__(self, status_code: int, name: str):
+        self.status_code = status_code
+        self.name = name
+
+
+def _requests(*responses: Tuple[float, Any]) -> Callable[[], Any]:
+    # Each invocation of the returned function returns the next response after its delay
+    remaining = list(responses)
+
+    def request():
+        delay, response = remaining.pop(0)
+        time.sleep(delay)
+        return response
+
+    return request
+
+
+def _warmed_up_hedger(**kwargs) -> Hedger:
+    # The observed latencies will all be about 20ms, so requests will be hedged after about 20ms
+    hedger = Hedger(minimum_samples=10, **kwargs)
+    for _ in range(10):
+        hedger.send(_requests((0.02, _Response(200, "warm-up"))), _endpoint)
+    return hedger
+
+
+def test_delay() -> None:
+    hedger = Hedger(minimum_samples=3, percentile=0.5)
+    assert hedger.delay(_endpoint) is None
+    for delay in [0.03, 0.01, 0.02]:
+        hedger.send(_requests((delay, _Response(200, "test"))), _endpoint)
+    assert 0.02 <= hedger.delay(_endpoint) < 0.03
+    assert hedger.delay("GET /other") is None
+    assert hedger.hedge_count == 0  # Requests are not hedged before enough latencies are observed
+
+
+def test_hedged_request_wins() -> None:
+    hedger = _warmed_up_hedger(budget=1.0)
+    request = _requests((0.5, _Response(200, "primary")), (0.0, _Response(200, "hedge")))
+    started = time.perf_counter()
+    assert hedger.send(request, _endpoint).name == "hedge"
+    assert time.perf_counter() - started < 0.4
+    assert hedger.hedge_count == 1
+    assert hedger.hedge_wins == 1
+
+
+def test_fast_request_is_not_hedged() -> None:
+    hedger = _warmed_up_hedger(budget=1.0)
+    assert hedger.send(_requests((0.0, _Response(200, "primary"))), _endpoint).name == "primary"
+    assert hedger.hedge_count == 0
+
+
+def test_budget() -> None:
+    hedger = _warmed_up_hedger(budget=0.05)  # 11 requests only allow for 0 hedged requests
+    request = _requests((0.2, _Response(200, "primary")), (0.0, _Response(200, "hedge")))
+    assert hedger.send(request, _endpoint).name == "primary"
+    assert hedger.hedge_count == 0
+
+
+def test_errors_are_not_preferred() -> None:
+    hedger = _warmed_up_hedger(budget=1.0)
+    request = _requests((0.3, _Response(200, "primary")), (0.0, ErrorResponse("test")))
+    assert hedger.send(request, _endpoint).name == "primary"
+    assert hedger.hedge_wins == 0
+
+    # If both requests fail, the last failure is returned
+    request = _requests((0.3, _Response(502, "primary")), (0.0, ErrorResponse("test")))
+    assert hedger.send(request, _endpoint).status_code == 502
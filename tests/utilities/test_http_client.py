@@ -0,0 +1,164 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from terraform_manager.entities.error_response import ErrorResponse
+from terraform_manager.terraform.workspaces import fetch_all
+from terraform_manager.utilities import http_client
+from terraform_manager.utilities.cassette import Cassette
+from terraform_manager.utilities.circuit_breaker import CircuitBreaker
+from terraform_manager.utilities.coalescing import Coalescer
+from terraform_manager.utilities.hedging import Hedger
+from terraform_manager.utilities.instrumentation import recorder
+from terraform_manager.utilities.revalidation import ValidatorCache
+
+from tests.utilities.mock_terraform_api import MockTerraformApi, generate_organization
+
+_organization: str = "synthetic"
+_token: str = "test"
+
+
+def test_record_and_replay(tmp_path) -> None:
+    path = str(tmp_path / "cassette.jsonl.gz")
+    with MockTerraformApi(generate_organization(_organization, 150)) as api:
+        requests_sent = http_client.requests_sent()
+        with Cassette(path, replay=False) as cassette:
+            http_client.use_cassette(cassette)
+            try:
+                recorded = fetch_all(api.domain, _organization, no_tls=True, token=_token)
+            finally:
+                http_client.use_cassette(None)
+        domain = api.domain
+        request_count = api.request_count
+        assert http_client.requests_sent() - requests_sent == request_count
+        requests_sent = http_client.requests_sent()
+
+        with Cassette(path, replay=True) as cassette:
+            http_client.use_cassette(cassette)
+            recorder.enabled = True
+            try:
+                replayed = fetch_all(domain, _organization, no_tls=True, token=_token)
+            finally:
+                http_client.use_cassette(None)
+                recorder.enabled = False
+        assert api.request_count == request_count  # Nothing was sent to the API
+        assert http_client.requests_sent() == requests_sent
+
+    assert len(recorded) == 150
+    assert [w.workspace_id for w in replayed] == [w.workspace_id for w in recorded]
+    statistics = recorder.statistics["GET /organizations/:organization/workspaces"]
+    assert statistics.count == 2
+    assert statistics.errors == 0
+    recorder.reset()
+
+
+def test_replay_missing_response(tmp_path) -> None:
+    path = str(tmp_path / "cassette.jsonl.gz")
+    Cassette(path, replay=False).close()
+    with Cassette(path, replay=True) as cassette:
+        http_client.use_cassette(cassette)
+        try:
+            response = http_client.send("GET", "http://localhost:1/api/v2/ping", headers={})
+        finally:
+            http_client.use_cassette(None)
+    assert isinstance(response, ErrorResponse)
+
+
+def test_timeouts() -> None:
+    with MockTerraformApi(generate_organization(_organization, 1), latency=0.5) as api:
+        url = f"http://{api.domain}/api/v2/organizations/{_organization}/workspaces"
+        http_client.set_timeouts(read=0.05)
+        try:
+            response = http_client.send("GET", url, headers={})
+        finally:
+            http_client.set_timeouts()
+        assert isinstance(response, ErrorResponse)
+        assert "timed out" in response.error_message.lower()
+        assert http_client._timeouts == (
+            http_client.DEFAULT_CONNECT_TIMEOUT, http_client.DEFAULT_READ_TIMEOUT
+        )
+
+
+def test_hedging() -> None:
+    with MockTerraformApi(generate_organization(_organization, 1)) as api:
+        url = f"http://{api.domain}/api/v2/organizations/{_organization}/workspaces"
+        hedger = Hedger(minimum_samples=1)
+        http_client.use_hedger(hedger)
+        try:
+            for method in ["GET", "GET", "PATCH"]:
+                http_client.send(method, url, headers={})
+        finally:
+            http_client.use_hedger(None)
+        # Only the (idempotent) GET requests were sent via the hedger
+        assert hedger._request_count == 2
+        assert hedger.delay("GET /organizations/:organization/workspaces") is not None
+
+
+def test_circuit_breaker() -> None:
+    with MockTerraformApi(generate_organization(_organization, 1)) as api:
+        url = f"http://{api.domain}/api/v2/organizations/{_organization}/workspaces"
+        http_client.use_circuit_breaker(CircuitBreaker())
+        try:
+            assert http_client.circuit_open_reason(api.domain) is None
+            assert http_client.send("GET", url, headers={}).status_code == 401  # No token
+            request_count = api.request_count
+            response = http_client.send("GET", url, headers={})
+            assert http_client.circuit_open_reason(api.domain) is not None
+        finally:
+            http_client.use_circuit_breaker(None)
+        # The request was not sent, since its outcome was a foregone conclusion
+        assert isinstance(response, ErrorResponse)
+        assert "rejected the token (HTTP 401)" in response.error_message
+        assert api.request_count == request_count
+        assert http_client.circuit_open_reason(api.domain) is None
+
+
+def test_coalescing() -> None:
+    with MockTerraformApi(generate_organization(_organization, 1), latency=0.2) as api:
+        url = f"http://{api.domain}/api/v2/organizations/{_organization}/workspaces"
+        headers = {"Authorization": f"Bearer {_token}"}
+        coalescer = Coalescer(ttl=60)
+        http_client.use_coalescer(coalescer)
+        try:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                responses = list(
+                    executor.map(lambda _: http_client.send("GET", url, headers=headers), range(4))
+                )
+            assert all(response.status_code == 200 for response in responses)
+            assert api.request_count == 1
+            # Different tokens or parameters do not share responses
+            http_client.send("GET", url, headers={"Authorization": "Bearer other"})
+            http_client.send("GET", url, headers=headers, params={"page[number]": 2})
+            assert api.request_count == 3
+            http_client.send("GET", url, headers=headers)
+            assert api.request_count == 3
+            # Requests which may modify something evict cached responses
+            patch_url = f"http://{api.domain}/api/v2/workspaces/ws-missing"
+            http_client.send("PATCH", patch_url, headers=headers)
+            http_client.send("GET", url, headers=headers)
+            assert api.request_count == 5
+        finally:
+            http_client.use_coalescer(Coalescer())
+        http_client.use_coalescer(None)
+        try:
+            http_client.send("GET", url, headers=headers)
+            assert api.request_count == 6
+        finally:
+            http_client.use_coalescer(Coalescer())
+
+
+def test_revalidation() -> None:
+    for etags in [True, False]:
+        with MockTerraformApi(generate_organization(_organization, 1), etags=etags) as api:
+            url = f"http://{api.domain}/api/v2/organizations/{_organization}/workspaces"
+            headers = {"Authorization": f"Bearer {_token}"}
+            validator_cache = ValidatorCache()
+            http_client.use_validator_cache(validator_cache)
+            try:
+                first = http_client.send("GET", url, headers=headers)
+                second = http_client.send("GET", url, headers=headers)
+            finally:
+                http_client.use_validator_cache(None)
+            assert first.status_code == 200 and second.status_code == 200
+            assert first.json() == second.json()
+            assert api.request_count == 2
+            # Servers which do not send validators are sent unconditional requests
+            assert api.not_modified_count == validator_cache.not_modified_count == int(etags)
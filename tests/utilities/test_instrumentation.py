@@ -0,0 +1,117 @@
+import json
+from unittest.mock import MagicMock
+
+import responses
+from pytest_mock import MockerFixture
+from terraform_manager.utilities.instrumentation import endpoint_template, RequestRecorder, \
+    EndpointStatistics, request_endpoint
+
+from tests.utilities.tooling import TEST_API_URL
+
+
+def test_endpoint_template() -> None:
+    assert endpoint_template("get", f"{TEST_API_URL}/organizations/test/workspaces?page=1") == \
+        "GET /organizations/:organization/workspaces"
+    assert endpoint_template("PATCH", f"{TEST_API_URL}/workspaces/ws-123") == \
+        "PATCH /workspaces/:workspace_id"
+    assert endpoint_template("POST", f"{TEST_API_URL}/workspaces/ws-123/actions/lock") == \
+        "POST /workspaces/:workspace_id/actions/lock"
+    assert endpoint_template("DELETE", f"{TEST_API_URL}/workspaces/ws-123/vars/var-456") == \
+        "DELETE /workspaces/:workspace_id/vars/:variable_id"
+    assert endpoint_template("GET", f"{TEST_API_URL}/workspaces/ws-123/runs") == \
+        "GET /workspaces/:workspace_id/runs"
+    assert request_endpoint(None) == "unknown"
+
+
+def test_endpoint_statistics() -> None:
+    statistics = EndpointStatistics()
+    assert statistics.mean_latency == 0
+    for latency in [0.005, 0.02, 0.02, 0.04, 7.5]:
+        statistics.add(
+            successful=latency < 1,
+            latency=latency,
+            bytes_received=10,
+            limiter_retries=1,
+            limiter_wait=0.5
+        )
+    assert statistics.count == 5
+    assert statistics.errors == 1
+    assert statistics.bytes_received == 50
+    assert statistics.limiter_retries == 5
+    assert statistics.limiter_wait == 2.5
+    assert statistics.max_latency == 7.5
+    assert statistics.latency_percentile(50) == 0.025
+    assert statistics.latency_percentile(95) == 7.5
+    assert statistics.to_json()["latency-histogram-milliseconds"] == {
+        "10": 1,
+        "25": 2,
+        "50": 1,
+        "100": 0,
+        "250": 0,
+        "500": 0,
+        "1000": 0,
+        "2500": 0,
+        "5000": 0,
+        "+Inf": 1
+    }
+
+
+def test_recorder_report(mocker: MockerFixture, tmp_path) -> None:
+    recorder = RequestRecorder()
+    recorder.record("GET /a", successful=True, latency=0.01, bytes_received=100)
+    recorder.record("GET /a", successful=False, latency=0.03, limiter_wait=1.0)
+    recorder.record("POST /b", successful=True, latency=0.02, limiter_retries=2)
+    recorder.record("GET /a", successful=True, latency=0.01)  # Answered with 304 Not Modified
+    recorder.record_revalidation("GET /a", bytes_saved=100)
+
+    for write_output in [True, False]:
+        print_mock: MagicMock = mocker.patch("builtins.print")
+        recorder.write_report(write_output=write_output)
+        if write_output:
+            print_mock.assert_any_call("Terraform API request statistics:")
+            print_mock.assert_any_call((
+                "Total: 4 requests, 1 errors, 0.07s waiting on responses, 100 bytes received, "
+                "100 bytes saved by 1 revalidated responses, 1.0s blocked by the rate limiter"
+            ))
+        else:
+            print_mock.assert_not_called()
+
+    path = tmp_path / "stats.json"
+    recorder.write_json(str(path))
+    exported = json.loads(path.read_text())
+    assert list(exported.keys()) == ["GET /a", "POST /b"]
+    assert exported["GET /a"]["count"] == 3
+    assert exported["GET /a"]["not-modified"] == 1
+    assert exported["GET /a"]["bytes-saved"] == 100
+    assert exported["POST /b"]["limiter-retries"] == 2
+
+    recorder.reset()
+    assert recorder.statistics == {}
+
+
+@responses.activate
+def test_throttle_records_requests(mocker: MockerFixture) -> None:
+    import requests
+    from terraform_manager.utilities.instrumentation import recorder
+    from terraform_manager.utilities.throttle import throttle
+
+    url = f"{TEST_API_URL}/workspaces/ws-123"
+    responses.add(responses.PATCH, url, json={"data": {}}, status=200)
+    responses.add(responses.PATCH, url, json={"errors": []}, status=422)
+    mocker.patch.object(recorder, "enabled", True)
+    recorder.reset()
+    try:
+        throttle(lambda: requests.patch(url))
+        throttle(lambda: requests.patch(url))
+        try:
+            throttle(lambda: requests.get(f"{TEST_API_URL}/not-mocked"))
+            assert False
+        except requests.RequestException:
+            pass
+        statistics = recorder.statistics
+        assert statistics["PATCH /workspaces/:workspace_id"].count == 2
+        assert statistics["PATCH /workspaces/:workspace_id"].errors == 1
+        assert statistics["PATCH /workspaces/:workspace_id"].bytes_received > 0
+        assert statistics["GET /not-mocked"].errors == 1
+    finally:
+        recorder.reset()
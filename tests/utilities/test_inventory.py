@@ -0,0 +1,147 @@
+import pytest
+from terraform_manager.entities.workspace import Workspace
+from terraform_manager.utilities import inventory
+from terraform_manager.utilities.inventory import Inventory, parse_query, matching
+
+from tests.utilities.tooling import test_workspace, TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION
+
+
+def _workspace(name: str, **kwargs) -> Workspace:
+    workspace = test_workspace(**kwargs)
+    workspace.name = name
+    return workspace
+
+
+_workspaces = [
+    _workspace(
+        "aws-dev", version="0.13.5", execution_mode="agent", agent_pool_id="apool-1", tags=["aws"]
+    ),
+    _workspace("aws-prod", version="1.0.11", locked=True, tags=["aws", "prod"]),
+    _workspace("gcp-dev", version="0.12.31", working_directory="dev envs"),
+    _workspace("GCP_prod", version="latest", execution_mode="local"),
+    _workspace("odd", version="not-a-version", speculative=False)
+]
+
+
+def test_matching() -> None:
+    # yapf: disable
+    tests = [
+        ("terraform_version < 1.0 and execution_mode = agent", ["aws-dev"]),
+        ("terraform_version < 1.0", ["aws-dev", "gcp-dev"]),
+        ("terraform_version >= 1", ["aws-prod", "GCP_prod"]),
+        ("terraform_version = latest", ["GCP_prod"]),
+        ("terraform_version > 0.13.5", ["aws-prod", "GCP_prod"]),
+        ("terraform_version <= 0.13.5 or locked = true", ["aws-dev", "aws-prod", "gcp-dev"]),
+        # Versions which cannot be parsed never match comparisons of the version
+        ("TERRAFORM_VERSION != 0.12.31 AND NOT (locked = true or name = gcp*)", ["aws-dev"]),
+        ("not terraform_version = 0.12.31", ["aws-dev", "aws-prod", "GCP_prod"]),
+        ("name = AWS*", ["aws-dev", "aws-prod"]),
+        ("name != aws*", ["gcp-dev", "GCP_prod", "odd"]),
+        ("name = gcp_prod", ["GCP_prod"]),
+        ("name = gcp_*", ["GCP_prod"]),
+        ("name > gcp-dev", ["GCP_prod", "odd"]),
+        ("working_directory = 'dev envs'", ["gcp-dev"]),
+        ('agent_pool_id = "apool-1"', ["aws-dev"]),
+        ("speculative = false", ["odd"]),
+        ("auto_apply = true", []),
+        (f"id = {_workspaces[1].workspace_id}", ["aws-prod"])
+    ]
+    # yapf: enable
+    for expression, names in tests:
+        selected = matching(_workspaces, expression)
+        assert [workspace.name for workspace in selected] == names, expression
+        assert all(workspace in _workspaces for workspace in selected)
+
+
+def test_parse_query_errors() -> None:
+    tests = [
+        "",
+        "   ",
+        "name",
+        "name =",
+        "name = a b",
+        "unknown = a",
+        "name a",
+        "name = =",
+        "(name = a",
+        "(name = a b",
+        "name = a and",
+        "locked < true",
+        "locked = maybe",
+        "terraform_version < abc",
+        "name ! a",
+        ")"
+    ]
+    for expression in tests:
+        with pytest.raises(ValueError):
+            parse_query(expression)
+
+
+def test_inventory(tmp_path) -> None:
+    path = str(tmp_path / "inventory.sqlite")
+    with Inventory(path) as opened:
+        assert not opened.contains(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION)
+        opened.store(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, _workspaces)
+        opened.store(TEST_TERRAFORM_DOMAIN, "other", _workspaces[:1])
+        opened.store(TEST_TERRAFORM_DOMAIN, "empty", [])
+
+    # The inventory persists, and storing an organization again replaces its workspaces
+    with Inventory(path) as opened:
+        assert opened.contains(TEST_TERRAFORM_DOMAIN.upper(), TEST_ORGANIZATION)
+        assert opened.contains(TEST_TERRAFORM_DOMAIN, "empty")
+        assert opened.select(TEST_TERRAFORM_DOMAIN, "empty") == []
+        selected = opened.select(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION)
+        assert selected == _workspaces
+        for stored, original in zip(selected, _workspaces):
+            assert repr(stored) == repr(original)
+            assert stored.parsed_terraform_version == original.parsed_terraform_version
+            assert stored.tag_names == original.tag_names
+        assert opened.select(TEST_TERRAFORM_DOMAIN, "other", "locked = false") == _workspaces[:1]
+
+        opened.store(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, _workspaces[3:])
+        assert opened.select(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION) == _workspaces[3:]
+
+        # Updating workspaces keeps their positions and ignores the ones which are not stored
+        patched = _workspace("GCP_prod", version="1.0.11", locked=True, tags=["gcp"])
+        patched.workspace_id = _workspaces[3].workspace_id
+        opened.update(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, [patched, _workspaces[0]])
+        selected = opened.select(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION)
+        assert selected == [patched, _workspaces[4]]
+        assert repr(selected[0]) == repr(patched) and selected[0].tag_names == ["gcp"]
+        assert opened.select(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, "locked = true") == [patched]
+
+        # The commonly-queried columns are indexed
+        for expression, index in [
+            ("name = aws-dev", "workspaces_name"),
+            ("terraform_version < 1.0", "workspaces_version_rank"),
+            ("execution_mode = agent", "workspaces_execution_mode"),
+            ("agent_pool_id = apool-1", "workspaces_agent_pool_id"),
+            ("locked = true", "workspaces_locked")
+        ]:
+            condition, parameters = parse_query(expression)
+            plan = opened._connection.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM workspaces WHERE domain = ? AND "
+                f"organization = ? AND {condition}", ["", ""] + parameters
+            ).fetchall()
+            assert any(index in str(row) for row in plan), expression
+
+
+def test_active_inventory() -> None:
+    assert inventory.select(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, "locked = true") is None
+    inventory.store(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, _workspaces)  # Nothing happens
+    inventory.update(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, _workspaces)  # Nothing happens
+
+    with Inventory(":memory:") as opened:
+        inventory.use_inventory(opened)
+        try:
+            selected = inventory.select(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, "locked = true")
+            assert selected is None
+            inventory.store(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, _workspaces)
+            selected = inventory.select(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, "locked = true")
+            assert selected == [_workspaces[1]]
+            unlocked = _workspace("aws-prod", version="1.0.11", tags=["aws", "prod"])
+            unlocked.workspace_id = _workspaces[1].workspace_id
+            inventory.update(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, [unlocked])
+            assert inventory.select(TEST_TERRAFORM_DOMAIN, TEST_ORGANIZATION, "locked = true") == []
+        finally:
+            inventory.use_inventory(None)
@@ -0,0 +1,87 @@
+import json
+from unittest.mock import MagicMock
+
+from pytest_mock import MockerFixture
+from terraform_manager.utilities import http_client, journal
+from terraform_manager.utilities.journal import Journal
+from terraform_manager.utilities.planner import Plan
+
+from tests.utilities.tooling import test_workspace
+
+_payload = {"data": {"attributes": {"auto-apply": True}}}
+_completed = ("skipped", "completed by a previous run")
+
+
+def test_journal(tmp_path) -> None:
+    path = str(tmp_path / "journal.jsonl")
+    with Journal(path, resume=False, max_attempts=2) as first_run:
+        assert first_run.check("ws-1", "patch-workspace", _payload) is None
+        first_run.record("ws-1", "patch-workspace", _payload, successful=True)
+        first_run.record("ws-2", "patch-workspace", _payload, successful=False)
+        first_run.record("ws-3", "patch-workspace", _payload, successful=False)
+        first_run.record("ws-3", "patch-workspace", _payload, successful=False)
+        assert first_run.check("ws-1", "patch-workspace", _payload) == _completed
+
+    with open(path, "r") as file:
+        lines = file.read().splitlines()
+    assert len(lines) == 4
+    assert "auto-apply" not in lines[0]  # Payloads are only stored as digests
+    assert json.loads(lines[0])["successful"]
+
+    # Simulates the process dying while an entry was being written
+    with open(path, "a") as file:
+        file.write('{"workspace": "ws-4", "operat')
+
+    with Journal(path, resume=True, max_attempts=2) as resumed:
+        assert resumed.check("ws-1", "patch-workspace", _payload) == _completed
+        # A different payload or operation is different work
+        assert resumed.check("ws-1", "patch-workspace", {"other": True}) is None
+        assert resumed.check("ws-1", "configure-variables", _payload) is None
+        assert resumed.check("ws-2", "patch-workspace", _payload) is None
+        exhausted = ("error", "gave up after 2 failed attempts")
+        assert resumed.check("ws-3", "patch-workspace", _payload) == exhausted
+        assert resumed.check("ws-4", "patch-workspace", _payload) is None
+        resumed.record("ws-2", "patch-workspace", _payload, successful=True)
+
+    with Journal(path, resume=True) as resumed_again:
+        assert resumed_again.check("ws-2", "patch-workspace", _payload) is not None
+
+    # Not resuming starts over
+    with Journal(path, resume=False) as new_run:
+        assert new_run.check("ws-1", "patch-workspace", _payload) is None
+    with open(path, "r") as file:
+        assert file.read() == ""
+
+
+def test_journal_sync_interval(mocker: MockerFixture, tmp_path) -> None:
+    mocker.patch("terraform_manager.utilities.journal._sync_interval", 2)
+    fsync_mock: MagicMock = mocker.patch("terraform_manager.utilities.journal.os.fsync")
+    new_journal = Journal(str(tmp_path / "journal.jsonl"), resume=False)
+    for i in range(5):
+        new_journal.record(f"ws-{i}", "patch-workspace", None, successful=True)
+    assert fsync_mock.call_count == 2
+    new_journal.close()
+    new_journal.close()  # Closing is idempotent
+    assert fsync_mock.call_count == 3
+
+
+def test_active_journal(tmp_path) -> None:
+    workspace = test_workspace()
+    assert journal.check(workspace, "patch-workspace", _payload) is None
+    journal.record(workspace, "patch-workspace", _payload, successful=True)  # No-op
+
+    active = Journal(str(tmp_path / "journal.jsonl"), resume=False)
+    journal.use_journal(active)
+    try:
+        # Nothing is actually done while planning, so nothing is recorded
+        http_client.use_plan(Plan())
+        journal.record(workspace, "patch-workspace", _payload, successful=True)
+        http_client.use_plan(None)
+        assert journal.check(workspace, "patch-workspace", _payload) is None
+
+        journal.record(workspace, "patch-workspace", _payload, successful=True)
+        assert journal.check(workspace, "patch-workspace", _payload) is not None
+    finally:
+        http_client.use_plan(None)
+        journal.use_journal(None)
+        active.close()
@@ -0,0 +1,82 @@
+import json
+
+from pytest_mock import MockerFixture
+from requests import Response
+from terraform_manager.entities.error_response import ErrorResponse
+from terraform_manager.utilities import json_backend
+
+# yapf: disable
+_document = {
+    "data": [{
+        "id": "ws-123",
+        "attributes": {"name": "ümlaut/workspace", "locked": False, "count": 3, "ratio": 0.5},
+        "relationships": {"agent-pool": {"data": None}}
+    }]
+}
+# yapf: enable
+
+
+def _installed_backends():
+    backends = []
+    for backend in json_backend.BACKENDS:
+        try:
+            __import__(backend)
+            backends.append(backend)
+        except ImportError:
+            pass
+    return backends
+
+
+def test_backends() -> None:
+    try:
+        for backend in _installed_backends():
+            json_backend.use_backend(backend)
+            assert json_backend.backend_name() == backend
+            encoded = json_backend.dumps(_document)
+            assert json.loads(encoded) == _document
+            assert "ümlaut/workspace" in encoded  # Nothing is escaped unnecessarily
+            assert json_backend.loads(encoded) == _document
+            assert json_backend.loads(encoded.encode("utf-8")) == _document
+            expected = json.dumps(_document, indent=2, ensure_ascii=False)
+            assert json_backend.dumps(_document, indent=True) == expected
+            try:
+                json_backend.loads(b"{not json")
+                assert False
+            except ValueError:
+                pass
+    finally:
+        json_backend.use_backend(None)
+
+
+def test_backend_detection(mocker: MockerFixture) -> None:
+    try:
+        # The first installed library is used
+        mocker.patch.object(json_backend, "BACKENDS", ["not_installed", "json", "json"])
+        json_backend.use_backend(None)
+        assert json_backend.backend_name() == "json"
+        mocker.patch.object(json_backend, "BACKENDS", ["not_installed", "json"])
+        json_backend.use_backend(None)
+        assert json_backend.backend_name() == "json"
+        try:
+            json_backend.use_backend("simplejson")
+            assert False
+        except ValueError:
+            pass
+    finally:
+        json_backend.use_backend(None)
+
+
+def test_decode_with_backend() -> None:
+    try:
+        for backend in _installed_backends():
+            json_backend.use_backend(backend)
+            response = Response()
+            response._content = json.dumps(_document).encode("utf-8")
+            json_backend.decode_with_backend(response)
+            assert response.json() == _document
+            # Error responses have no body to decode
+            error_response = ErrorResponse("test")
+            json_backend.decode_with_backend(error_response)
+            assert error_response.json()["terraform-manager"]["error"] == "test"
+    finally:
+        json_backend.use_backend(None)
@@ -0,0 +1,74 @@
+import requests
+from terraform_manager.entities.variable import Variable
+from terraform_manager.terraform.locking import lock_or_unlock_workspaces
+from terraform_manager.terraform.runs import _get_active_runs_for_workspace
+from terraform_manager.terraform.variables import configure_variables, delete_variables
+from terraform_manager.terraform.workspaces import fetch_all, batch_operation
+
+from tests.utilities.mock_terraform_api import MockTerraformApi, generate_organization
+
+_organization: str = "synthetic"
+_token: str = "test"
+
+
+def test_generate_organization() -> None:
+    organization = generate_organization(_organization, 10, variables_per_workspace=2)
+    assert organization == generate_organization(_organization, 10, variables_per_workspace=2)
+    assert organization != generate_organization(_organization, 10, seed=1)
+    assert len(organization["workspaces"]) == 10
+    assert all(len(workspace["vars"]) == 2 for workspace in organization["workspaces"])
+
+
+def test_end_to_end_operations() -> None:
+    with MockTerraformApi(generate_organization(_organization, 150)) as api:
+        workspaces = fetch_all(api.domain, _organization, no_tls=True, token=_token)
+        assert len(workspaces) == 150
+        assert api.request_counts[("GET", "list_workspaces")] == 2  # Two pages of 100
+
+        targets = workspaces[:5]
+        assert lock_or_unlock_workspaces(
+            api.domain, _organization, targets, set_lock=True, no_tls=True, token=_token
+        )
+        assert all(api.workspace(w.workspace_id)["attributes"]["locked"] for w in targets)
+
+        assert batch_operation(
+            api.domain,
+            _organization,
+            targets,
+            field_mappers=[lambda w: w.auto_apply],
+            field_names=["auto-apply"],
+            new_values=[True],
+            no_tls=True,
+            token=_token
+        )
+        assert all(api.workspace(w.workspace_id)["attributes"]["auto-apply"] for w in targets)
+
+        variables = [Variable(key="variable0", value="new"), Variable(key="added", value="x")]
+        assert configure_variables(
+            api.domain, _organization, targets, variables=variables, no_tls=True, token=_token
+        )
+        assert delete_variables(
+            api.domain, _organization, targets, variables=["added"], no_tls=True, token=_token
+        )
+        for workspace in targets:
+            state = api.workspace(workspace.workspace_id)["vars"].values()
+            values = {variable["key"]: variable["value"] for variable in state}
+            assert values["variable0"] == "new"
+            assert "added" not in values
+
+        runs = _get_active_runs_for_workspace(api.domain, targets[0], no_tls=True, token=_token)
+        assert all(run.is_active and run.has_changes for run in runs)
+        assert api.request_counts[("GET", "list_runs")] == 1
+
+
+def test_authorization_and_rate_limiting() -> None:
+    with MockTerraformApi(generate_organization(_organization, 1), rate_limit=3) as api:
+        url = f"http://{api.domain}/api/v2/organizations/{_organization}/workspaces"
+        assert requests.get(url).status_code == 401
+        headers = {"Authorization": f"Bearer {_token}"}
+        assert requests.get(f"http://{api.domain}/api/v2/nothing", headers=headers).status_code \
+            == 404
+        responses = [requests.get(url, headers=headers) for _ in range(3)]
+        assert [response.status_code for response in responses] == [200, 200, 429]
+        assert responses[2].headers["X-RateLimit-Limit"] == "3"
+        assert api.rate_limited_count == 1
@@ -0,0 +1,24 @@
+from fnmatch import fnmatch
+
+from terraform_manager.utilities.name_matcher import NameMatcher
+
+
+def test_literal_patterns() -> None:
+    matcher = NameMatcher(["Workspace1", "workspace2"])
+    for name in ["workspace1", "WORKSPACE1", "workspace2"]:
+        assert matcher.matches(name)
+    for name in ["workspace", "workspace3", "workspace1-suffix"]:
+        assert not matcher.matches(name)
+
+
+def test_wildcard_patterns() -> None:
+    patterns = ["aws-*", "gcp-?", "azure-[ab]*", "exact"]
+    matcher = NameMatcher(patterns)
+    names = ["aws-dev", "AWS-PROD", "aws", "gcp-1", "gcp-12", "azure-a1", "azure-c1", "exact", "x"]
+    for name in names:
+        expected = any(fnmatch(name.lower(), pattern.lower()) for pattern in patterns)
+        assert matcher.matches(name) == expected
+
+
+def test_no_patterns() -> None:
+    assert not NameMatcher([]).matches("anything")
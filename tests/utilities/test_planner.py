@@ -0,0 +1,78 @@
+from unittest.mock import MagicMock
+
+from pytest_mock import MockerFixture
+from terraform_manager.entities.variable import Variable
+from terraform_manager.terraform.locking import lock_or_unlock_workspaces
+from terraform_manager.terraform.variables import configure_variables, delete_variables
+from terraform_manager.terraform.workspaces import fetch_all
+from terraform_manager.utilities import http_client
+from terraform_manager.utilities.planner import Plan
+
+from tests.utilities.mock_terraform_api import MockTerraformApi, generate_organization
+
+_organization: str = "synthetic"
+_token: str = "test"
+
+
+def test_plan_does_not_modify_anything(mocker: MockerFixture) -> None:
+    plan = Plan()
+    with MockTerraformApi(generate_organization(_organization, 3)) as api:
+        http_client.use_plan(plan)
+        try:
+            workspaces = fetch_all(api.domain, _organization, no_tls=True, token=_token)
+            assert lock_or_unlock_workspaces(
+                api.domain, _organization, workspaces, set_lock=True, no_tls=True, token=_token
+            )
+            assert configure_variables(
+                api.domain,
+                _organization,
+                workspaces,
+                variables=[Variable(key="variable0", value="x"), Variable(key="new", value="y")],
+                no_tls=True,
+                token=_token
+            )
+            assert delete_variables(
+                api.domain,
+                _organization,
+                workspaces,
+                variables=["variable1"],
+                no_tls=True,
+                token=_token
+            )
+        finally:
+            http_client.use_plan(None)
+
+        for workspace in workspaces:
+            state = api.workspace(workspace.workspace_id)
+            assert not state["attributes"]["locked"]
+            assert len(state["vars"]) == 3
+        reads = {("GET", "list_workspaces"), ("GET", "list_variables")}
+        assert set(api.request_counts.keys()) == reads
+
+    assert plan.endpoint_counts() == {
+        "POST /workspaces/:workspace_id/actions/lock": 3,
+        "POST /workspaces/:workspace_id/vars": 3,
+        "PATCH /workspaces/:workspace_id/vars/:variable_id": 3,
+        "DELETE /workspaces/:workspace_id/vars/:variable_id": 3
+    }
+    assert plan.request_count == 12
+    assert plan.read_count == 7  # One workspace page and two variable fetches per workspace
+    assert plan.requests[0][0] == "POST"
+    assert plan.estimated_duration == 19 / 28
+
+    print_mock: MagicMock = mocker.patch("builtins.print")
+    plan.write_summary(write_output=False)
+    print_mock.assert_not_called()
+    plan.write_summary(write_output=True)
+    assert any("12 modifying requests and 7 read requests" in str(c) for c in print_mock.mock_calls)
+
+
+def test_planned_responses() -> None:
+    plan = Plan()
+    assert plan.estimated_duration == 0
+    url = "https://app.terraform.io/api/v2/workspaces/ws-1"
+    assert plan.add_request("patch", url, {}).status_code == 200
+    assert plan.add_request("POST", f"{url}/vars", {}).status_code == 201
+    assert plan.add_request("POST", f"{url}/actions/lock", None).status_code == 200
+    assert plan.add_request("DELETE", f"{url}/vars/var-1", None).status_code == 204
+    assert plan.requests[0] == ("PATCH", url, {})
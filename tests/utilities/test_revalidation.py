@@ -0,0 +1,78 @@
+from typing import Dict, List, Mapping
+
+from pytest_mock import MockerFixture
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from terraform_manager.entities.error_response import ErrorResponse
+from terraform_manager.utilities.instrumentation import recorder
+from terraform_manager.utilities.revalidation import ValidatorCache
+
+_endpoint: str = "GET /workspaces/:workspace_id/vars"
+
+
+def _response(status_code: int, headers: Dict[str, str], content: bytes = b"") -> Response:
+    response = Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    return response
+
+
+class _Server:
+    # Responds with the given responses in order, remembering the headers of each request
+    def __init__(self, *responses: Response):
+        self.responses = list(responses)
+        self.sent_headers: List[Mapping[str, str]] = []
+
+    def __call__(self, headers: Mapping[str, str]) -> Response:
+        self.sent_headers.append(headers)
+        return self.responses.pop(0)
+
+
+def test_revalidation(mocker: MockerFixture) -> None:
+    mocker.patch.object(recorder, "enabled", True)
+    recorder.reset()
+    cache = ValidatorCache()
+    headers = {"Authorization": "Bearer test"}
+    original = _response(200, {"ETag": '"v1"'}, b'{"data": []}')
+    changed = _response(200, {"ETag": '"v2"'}, b'{"data": [{}]}')
+    server = _Server(original, _response(304, {}), changed, _response(304, {}))
+    try:
+        assert cache.send("key", headers, server, endpoint=_endpoint) is original
+        assert cache.send("key", headers, server, endpoint=_endpoint) is original
+        assert cache.send("key", headers, server, endpoint=_endpoint) is changed
+        assert cache.send("key", headers, server, endpoint=_endpoint) is changed
+        revalidate_v1 = {**headers, "If-None-Match": '"v1"'}
+        revalidate_v2 = {**headers, "If-None-Match": '"v2"'}
+        assert server.sent_headers == [headers, revalidate_v1, revalidate_v1, revalidate_v2]
+        assert cache.not_modified_count == 2
+        assert cache.bytes_saved == len(original.content) + len(changed.content)
+        assert recorder.statistics[_endpoint].bytes_saved == cache.bytes_saved
+        assert recorder.statistics[_endpoint].not_modified == 2
+    finally:
+        recorder.reset()
+
+
+def test_validator_fallbacks() -> None:
+    cache = ValidatorCache(maximum_entries=1)
+    last_modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+    server = _Server(
+        _response(200, {"Last-Modified": last_modified}),
+        ErrorResponse("test"),
+        _response(200, {}),  # The server stopped sending validators
+        _response(200, {}),
+        _response(200, {"ETag": '"v1"'}),
+        _response(200, {"ETag": '"v2"'}),
+        _response(200, {})
+    )
+    for _ in range(4):
+        cache.send("key", {}, server, endpoint=_endpoint)
+    revalidate = {"If-Modified-Since": last_modified}
+    assert server.sent_headers == [{}, revalidate, revalidate, {}]
+
+    # The least recently used response is evicted once the cache is full
+    cache.send("first", {}, server, endpoint=_endpoint)
+    cache.send("second", {}, server, endpoint=_endpoint)
+    cache.send("first", {}, server, endpoint=_endpoint)
+    assert server.sent_headers[-1] == {}
+    assert cache.not_modified_count == 0
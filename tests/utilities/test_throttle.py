@@ -0,0 +1,78 @@
+from typing import Callable
+
+from pytest_mock import MockerFixture
+from ratelimit import RateLimitException
+from terraform_manager.utilities.instrumentation import recorder
+from terraform_manager.utilities.throttle import throttle, _get_limiter, calls_per_second, \
+    share_rate_limit, set_rate_limit
+
+from tests.utilities.tooling import TEST_TERRAFORM_DOMAIN
+
+
+def test_throttle() -> None:
+    assert throttle(lambda: "test", TEST_TERRAFORM_DOMAIN) == "test"
+    assert throttle(lambda: "test") == "test"
+
+
+def test_limiters_are_per_domain() -> None:
+    assert _get_limiter(TEST_TERRAFORM_DOMAIN) is _get_limiter(TEST_TERRAFORM_DOMAIN)
+    assert _get_limiter(TEST_TERRAFORM_DOMAIN) is not _get_limiter("terraform.example.com")
+
+
+def test_throttle_retries_when_limited(mocker: MockerFixture) -> None:
+    for instrumented in [True, False]:
+        attempts = []
+
+        def limiter(function: Callable[[], str]) -> str:
+            attempts.append(None)
+            if len(attempts) < 3:
+                raise RateLimitException("limited", 0.01)
+            return function()
+
+        mocker.patch("terraform_manager.utilities.throttle._get_limiter", return_value=limiter)
+        mocker.patch.object(recorder, "enabled", instrumented)
+        recorder.reset()
+        assert throttle(lambda: "test", TEST_TERRAFORM_DOMAIN) == "test"
+        assert len(attempts) == 3
+        if instrumented:
+            assert recorder.statistics["unknown"].limiter_retries == 2
+            assert recorder.statistics["unknown"].limiter_wait >= 0.02
+        else:
+            assert recorder.statistics == {}
+    recorder.reset()
+
+
+def test_share_rate_limit() -> None:
+    limiter = _get_limiter(TEST_TERRAFORM_DOMAIN)
+    assert calls_per_second() == 28
+    try:
+        share_rate_limit(4)
+        assert calls_per_second() == 7
+        # The limiters are rebuilt so that they use the shared rate
+        assert _get_limiter(TEST_TERRAFORM_DOMAIN) is not limiter
+        # Processes which outnumber the requests allowed per second get one request per several
+        # seconds each
+        share_rate_limit(100)
+        assert calls_per_second() == 0.25
+        for shares in range(1, 200):
+            share_rate_limit(shares)
+            assert 0 < shares * calls_per_second() <= 28
+        share_rate_limit(0)
+        assert calls_per_second() == 28
+    finally:
+        share_rate_limit(1)
+    assert calls_per_second() == 28
+
+
+def test_set_rate_limit() -> None:
+    limiter = _get_limiter(TEST_TERRAFORM_DOMAIN)
+    try:
+        set_rate_limit(1000)
+        assert calls_per_second() == 1000
+        assert _get_limiter(TEST_TERRAFORM_DOMAIN) is not limiter
+        share_rate_limit(4)
+        assert calls_per_second() == 250
+    finally:
+        share_rate_limit(1)
+        set_rate_limit(None)
+    assert calls_per_second() == 28
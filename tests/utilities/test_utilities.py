@@ -1,6 +1,7 @@
 from requests import RequestException, Response
+from semver import VersionInfo
 from terraform_manager.utilities.utilities import parse_domain, safe_http_request, safe_deep_get, \
-    convert_timestamp_to_unix_time, convert_hashicorp_timestamp_to_unix_time
+    convert_timestamp_to_unix_time, convert_hashicorp_timestamp_to_unix_time, parse_version
 
 
 def test_parse_url() -> None:
@@ -41,6 +42,13 @@ def test_safe_http_request() -> None:
     assert response.json() == {"terraform-manager": {"error": message, "status": 500}}
 
 
+def test_parse_version() -> None:
+    assert parse_version("0.13.5") == VersionInfo(0, 13, 5)
+    assert parse_version("0.13.5") is parse_version("0.13.5")  # Tests the caching functionality
+    for test in ["latest", "0.13", "not a version"]:
+        assert parse_version(test) is None
+
+
 def test_safe_deep_get() -> None:
     assert safe_deep_get({}, []) is None
     assert safe_deep_get({}, ["test", "test"]) is None
@@ -1,6 +1,6 @@
 import random
 import string
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from unittest.mock import MagicMock
 
 from pytest_mock import MockerFixture
@@ -20,7 +20,8 @@ def test_workspace(
     working_directory: str = "",
     agent_pool_id: str = "",
     execution_mode: str = "remote",
-    speculative: bool = True
+    speculative: bool = True,
+    tags: Optional[List[str]] = None
 ) -> Workspace:
     letters = string.ascii_lowercase
     return Workspace(
@@ -32,7 +33,8 @@ def test_workspace(
         working_directory=working_directory,
         agent_pool_id=agent_pool_id,
         execution_mode=execution_mode,
-        speculative=speculative
+        speculative=speculative,
+        tag_names=tags
     )
 
 